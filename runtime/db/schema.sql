@@ -26,4 +26,24 @@ CREATE TABLE IF NOT EXISTS tasks (
   verb TEXT,
   vector BLOB,
   source_loop_id TEXT
-); 
\ No newline at end of file
+);
+
+-- Bumped on every write to tasks so readers can cache the vector matrix
+CREATE TABLE IF NOT EXISTS table_versions (
+  name TEXT PRIMARY KEY,
+  version INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO table_versions (name, version) VALUES ('tasks', 0);
+
+CREATE TRIGGER IF NOT EXISTS tasks_version_insert AFTER INSERT ON tasks
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_version_update AFTER UPDATE ON tasks
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_version_delete AFTER DELETE ON tasks
+BEGIN
+  UPDATE table_versions SET version = version + 1 WHERE name = 'tasks';
+END;
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: header-only frontmatter reader vs. split("---") + yaml.safe_load.
+
+Builds a synthetic vault of loop files in a temporary directory and times three
+ways of pulling the metadata out of every file:
+
+  split+safe_load     the pattern most parsers in the tree used (whole file read)
+  header+SafeLoader   read_header() with the pure-Python loader
+  header+CSafeLoader  read_frontmatter(), metadata-only (libyaml if available)
+
+Usage:
+    python scripts/bench_frontmatter.py --files 5000 --body-kb 16
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.system.frontmatter_reader import HAS_LIBYAML, read_frontmatter, read_header
+
+
+def build_vault(directory: Path, files: int, body_kb: int) -> None:
+    rng = random.Random(42)
+    words = ["loop", "signal", "roadmap", "phase", "task", "feedback", "ora", "workstream"]
+    for i in range(files):
+        frontmatter = {
+            "uuid": f"{i:08d}-0000-4000-8000-{rng.getrandbits(48):012x}",
+            "title": f"Synthetic loop {i}",
+            "phase": f"{rng.randint(1, 12)}.{rng.randint(0, 9)}",
+            "workstream": rng.choice(["ora", "mecca", "system"]),
+            "status": rng.choice(["open", "active", "closed"]),
+            "tags": rng.sample(words, 3),
+            "created": "2025-06-01",
+        }
+        line = " ".join(rng.choice(words) for _ in range(16)) + "\n"
+        body = "## Summary\n" + line * max(1, (body_kb * 1024) // len(line))
+        (directory / f"loop-{i:06d}.md").write_text(
+            f"---\n{yaml.safe_dump(frontmatter)}---\n\n{body}", encoding="utf-8"
+        )
+
+
+def split_and_safe_load(path: Path) -> dict:
+    parts = path.read_text(encoding="utf-8").split("---", 2)
+    return yaml.safe_load(parts[1]) if len(parts) >= 3 else {}
+
+
+def header_pure_python(path: Path) -> dict:
+    header, _ = read_header(path)
+    return yaml.load(header, Loader=yaml.SafeLoader) if header is not None else {}
+
+
+def header_fast(path: Path) -> dict:
+    metadata, _ = read_frontmatter(path)
+    return metadata or {}
+
+
+def time_pass(func, paths, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for path in paths:
+            func(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--body-kb", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = Path(tmp)
+        print(f"Building {args.files} synthetic loops with ~{args.body_kb} KB bodies...")
+        build_vault(vault, args.files, args.body_kb)
+        paths = sorted(vault.glob("*.md"))
+
+        # Sanity check: every approach must agree on the parsed metadata
+        for path in paths[:50]:
+            assert split_and_safe_load(path) == header_fast(path) == header_pure_python(path)
+
+        print(f"libyaml available: {HAS_LIBYAML}\n")
+        baseline = None
+        for label, func in [
+            ("split+safe_load", split_and_safe_load),
+            ("header+SafeLoader", header_pure_python),
+            ("header+CSafeLoader", header_fast),
+        ]:
+            elapsed = time_pass(func, paths, args.repeat)
+            baseline = baseline or elapsed
+            per_file_us = elapsed / len(paths) * 1e6
+            print(f"{label:<20} {elapsed:8.3f}s  {per_file_us:8.1f} µs/file  {baseline / elapsed:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Benchmark: filtering inside the vector search vs filtering its results.
+
+query_loops used to fetch the top k loops and then drop the ones whose status
+or weight did not match in SQLite. With a selective filter that returns fewer
+than k loops, and fetching more candidates helps recall but costs latency. It
+now filters inside the search (the "pre" strategy below) on the status and
+weight that insert_to_sqlite and weight_loops copy into each point's payload.
+This script runs the strategies against each VectorStore backend for three
+filters of decreasing selectivity:
+
+    status = open                          ~50% of points
+    status = blocked                       ~10%
+    status = blocked and weight >= 10      ~1%
+
+    post        search(limit=k), then keep the hits that match
+    post xN     search(limit=k * N), then keep the first k hits that match
+    pre         search(limit=k, filter=...), the filter applied during the search
+
+Recall@k is measured against exact filtered search on the NumPy store. On a
+Qdrant server (--url) the payload indexes from
+src.memory.qdrant_sync.ensure_payload_indexes are created first. Local mode
+has no payload indexes, so there the pre-filter scans every payload.
+
+Usage:
+    python scripts/bench_payload_filters.py --points 20000 --dim 384
+    python scripts/bench_payload_filters.py --backends numpy,qdrant --url http://localhost:6333
+"""
+
+import argparse
+import functools
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from bench_vector_index import recall_at_k, synthetic_corpus  # noqa: E402
+from qdrant_client.http import models
+
+from src.memory.qdrant_clients import (
+    QdrantSettings,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
+from src.memory.qdrant_sync import PAYLOAD_INDEXES, ensure_payload_indexes
+from src.memory.vector_store import (
+    NumpyVectorStore,
+    QdrantVectorStore,
+    Range,
+    VectorRecord,
+    matches,
+)
+
+COLLECTION = "bench_payload_filters"
+FILTERS = {
+    "open (50%)": {"status": "open"},
+    "blocked (10%)": {"status": "blocked"},
+    "blocked, w>=10 (1%)": {"status": "blocked", "weight": Range(gte=10)},
+}
+
+
+def make_records(vectors: np.ndarray, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    statuses = rng.choice(["open", "closed", "blocked"], size=len(vectors), p=[0.5, 0.4, 0.1])
+    weights = rng.integers(1, 11, size=len(vectors))
+    return [
+        VectorRecord(id=str(uuid.UUID(int=i + 1)), vector=vector.tolist(),
+                     payload={"status": str(statuses[i]), "weight": int(weights[i])})
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def open_store(backend: str, url: Optional[str] = None):
+    if backend == "numpy":
+        return NumpyVectorStore(COLLECTION)
+    if backend == "local":
+        return QdrantVectorStore.local(COLLECTION)
+    client = get_qdrant_client(QdrantSettings(url=url) if url else None)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    return QdrantVectorStore(COLLECTION, client=client)
+
+
+def load(store, records, batch_size: int = 256):
+    store.ensure_collection(len(records[0].vector))
+    if store.backend == "qdrant":
+        ensure_payload_indexes(store.client, COLLECTION, {**PAYLOAD_INDEXES, "weight": models.PayloadSchemaType.INTEGER})
+    for start in range(0, len(records), batch_size):
+        store.upsert_batch(records[start:start + batch_size])
+
+
+def post_filter(store, queries, k: int, filter, overfetch: int = 1):
+    results = []
+    for query in queries:
+        hits = store.search(query, limit=k * overfetch)
+        results.append([h.id for h in hits if matches(h.payload, filter)][:k])
+    return results
+
+
+def pre_filter(store, queries, k: int, filter):
+    return [[h.id for h in store.search(query, limit=k, filter=filter)] for query in queries]
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--overfetch", type=int, default=10, help="Candidate multiplier for the 'post xN' strategy")
+    parser.add_argument("--backends", default="numpy,local", help="Comma-separated: numpy, local, qdrant")
+    parser.add_argument("--url", help="Qdrant server URL for the qdrant backend (default: environment)")
+    args = parser.parse_args()
+
+    records = make_records(synthetic_corpus(args.points, args.dim, args.clusters, seed=42))
+    queries = synthetic_corpus(args.queries, args.dim, args.clusters, seed=43)
+    print(f"{args.points} points, {args.dim}-d, {args.queries} queries, recall@{args.k} against exact filtered search\n")
+
+    exact = NumpyVectorStore(f"{COLLECTION}_truth")
+    load(exact, records)
+    truth = {name: pre_filter(exact, queries, args.k, f) for name, f in FILTERS.items()}
+
+    strategies = {
+        "post": lambda store, f: post_filter(store, queries, args.k, f),
+        f"post x{args.overfetch}": lambda store, f: post_filter(store, queries, args.k, f, args.overfetch),
+        "pre": lambda store, f: pre_filter(store, queries, args.k, f),
+    }
+    print(f"{'backend':<8} {'filter':<20} {'strategy':<9} {'ms/query':>9} {'hits/query':>11} {'recall':>7}")
+    for backend in args.backends.split(","):
+        store = open_store(backend, args.url)
+        load(store, records)
+        for name, filter in FILTERS.items():
+            for label, run in strategies.items():
+                found, elapsed = timed(functools.partial(run, store, filter))
+                hits = np.mean([len(f) for f in found])
+                recall = recall_at_k(found, truth[name])
+                print(f"{backend:<8} {name:<20} {label:<9} {elapsed / len(queries) * 1000:9.2f} "
+                      f"{hits:11.1f} {recall:7.3f}")
+    close_qdrant_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: per-point hash check + upsert vs. batched retrieve + bulk upsert.
+
+Simulates a resync of N loop points against a collection. The "before" path
+retrieves each id to compare its content hash and upserts changed points one
+per request (waiting on each). The "after" path uses src.memory.qdrant_sync:
+hashes fetched RETRIEVE_BATCH_SIZE ids at a time, unchanged points skipped
+locally, upserts sent in batches without waiting plus one final barrier.
+
+Runs against an in-process Qdrant (local mode) by default, adding --rtt-ms of
+simulated network latency to every request; pass --url to measure a real server.
+
+Usage:
+    python scripts/bench_qdrant_upsert.py --points 5000 --changed 0.1 --rtt-ms 2
+    python scripts/bench_qdrant_upsert.py --url http://localhost:6333
+"""
+
+import argparse
+import hashlib
+import sys
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.memory.qdrant_clients import (
+    QdrantSettings,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
+from src.memory.qdrant_sync import BulkUpserter, fetch_payload_values
+
+COLLECTION = "bench_upsert"
+
+
+class LatencyClient:
+    """Wraps a client so every request pays a fixed round trip, like a server on the network."""
+
+    def __init__(self, client: QdrantClient, rtt: float):
+        self._client = client
+        self._rtt = rtt
+
+    def __getattr__(self, name):
+        attr = getattr(self._client, name)
+        if name not in ("retrieve", "upsert", "scroll") or not self._rtt:
+            return attr
+
+        def call(*args, **kwargs):
+            time.sleep(self._rtt)
+            return attr(*args, **kwargs)
+        return call
+
+
+def make_points(count: int, dim: int, version: int, changed: float, rng: np.random.Generator):
+    """Points whose content hash depends on ``version`` for the first ``changed`` fraction."""
+    vectors = rng.standard_normal((count, dim), dtype=np.float32)
+    cutoff = int(count * changed)
+    points = []
+    for i in range(count):
+        content = f"loop {i} v{version if i < cutoff else 0}"
+        points.append(models.PointStruct(
+            id=str(uuid.uuid5(uuid.NAMESPACE_DNS, f"loop-{i}")),
+            vector=vectors[i].tolist(),
+            payload={"loop": i, "content_hash": hashlib.sha256(content.encode()).hexdigest()},
+        ))
+    return points
+
+
+def reset(client: QdrantClient, dim: int) -> None:
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(COLLECTION, vectors_config=models.VectorParams(size=dim, distance=models.Distance.COSINE))
+
+
+def sync_per_point(client, points) -> int:
+    upserted = 0
+    for point in points:
+        existing = client.retrieve(COLLECTION, ids=[point.id], with_payload=True)
+        if existing and (existing[0].payload or {}).get("content_hash") == point.payload["content_hash"]:
+            continue
+        client.upsert(COLLECTION, points=[point], wait=True)
+        upserted += 1
+    return upserted
+
+
+def sync_bulk(client, points, batch_size: int) -> int:
+    known = fetch_payload_values(client, COLLECTION, [p.id for p in points])
+    changed = [p for p in points if known.get(str(p.id)) != p.payload["content_hash"]]
+    with BulkUpserter(client, COLLECTION, batch_size=batch_size) as upserter:
+        upserter.add_many(changed)
+    return len(changed)
+
+
+def timed(label: str, fn, points) -> None:
+    started = time.perf_counter()
+    upserted = fn(points)
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<22} {elapsed:7.2f}s  {len(points) / elapsed:9.0f} points checked/s  ({upserted} upserted)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=5000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--changed", type=float, default=0.1, help="Fraction of points changed on resync")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--url", help="Qdrant server URL (default: in-process local mode)")
+    parser.add_argument("--rtt-ms", type=float, default=2.0, help="Simulated round trip for local mode")
+    args = parser.parse_args()
+
+    base = get_qdrant_client(QdrantSettings(url=args.url) if args.url else QdrantSettings(location=":memory:"))
+    client = base if args.url else LatencyClient(base, args.rtt_ms / 1000)
+    rng = np.random.default_rng(42)
+    initial = make_points(args.points, args.dim, 0, 0.0, rng)
+    resync = make_points(args.points, args.dim, 1, args.changed, rng)
+    target = f"server {args.url}" if args.url else f"in-process Qdrant, {args.rtt_ms:g} ms simulated RTT"
+    print(f"{args.points} points, {args.dim}-d, {args.changed:.0%} changed on resync, {target}")
+
+    strategies = {
+        "per-point": lambda points: sync_per_point(client, points),
+        "bulk": lambda points: sync_bulk(client, points, args.batch_size),
+    }
+    for label, sync in strategies.items():
+        reset(base, args.dim)
+        print(f"{label}:")
+        timed("initial load", sync, initial)
+        timed("resync", sync, resync)
+        assert base.count(COLLECTION).count == args.points
+    close_qdrant_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark: recall@k versus query latency for the vector_memory index types.
+
+Builds each index type from src.memory.vector_memory.create_index over the
+same synthetic corpus. The corpus is clustered on a low-dimensional subspace,
+like real chunk embeddings, and L2-normalised. The exact flat index gives the true top k. Each IVF-PQ
+nprobe and each HNSW efSearch setting is then scored on:
+
+- recall@k: the share of the true top k that it returns;
+- mean and p95 single-query latency;
+- batch throughput.
+
+Build time and serialised index size are reported too.
+
+Usage:
+    python scripts/bench_vector_index.py --chunks 200000 --dim 384
+    python scripts/bench_vector_index.py --kinds hnsw --ef-search 32,64,128,256
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.memory.vector_memory import IndexConfig, create_index, set_search_params
+
+
+def synthetic_corpus(count: int, dim: int, clusters: int, seed: int, latent: int = 32) -> np.ndarray:
+    """Clustered points on a low-dimensional subspace plus a little noise, like text embeddings."""
+    structure = np.random.default_rng(0)          # Shared by corpus and queries
+    centers = structure.standard_normal((clusters, latent), dtype=np.float32)
+    projection = structure.standard_normal((latent, dim), dtype=np.float32)
+    rng = np.random.default_rng(seed)
+    points = centers[rng.integers(0, clusters, count)] + 0.5 * rng.standard_normal((count, latent), dtype=np.float32)
+    vectors = points @ projection + 0.5 * rng.standard_normal((count, dim), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray) -> float:
+    return float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found, truth)]))
+
+
+def measure(index, queries: np.ndarray, k: int):
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query[None, :], k)
+        latencies.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    _, labels = index.search(queries, k)
+    batch_qps = len(queries) / (time.perf_counter() - started)
+    return labels, np.array(latencies) * 1000, batch_qps
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--kinds", default="ivfpq,hnsw")
+    parser.add_argument("--nprobe", default="1,4,16,64")
+    parser.add_argument("--ef-search", default="16,32,64,128")
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--pq-m", type=int, default=0, help="PQ sub-quantizers (0: one per 16 dims)")
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.chunks, args.dim, args.clusters, seed=42)
+    queries = synthetic_corpus(args.queries, args.dim, args.clusters, seed=43)
+    ids = np.arange(args.chunks, dtype=np.int64)
+    print(f"{args.chunks} chunks, {args.dim}-d, {args.queries} queries, recall@{args.k}\n")
+    print(f"{'index':<26} {'build s':>8} {'size MB':>8} {'recall':>7} {'mean ms':>8} {'p95 ms':>7} {'batch q/s':>10}")
+
+    def row(label, build_s, index, labels, latencies, qps, truth):
+        size = len(faiss.serialize_index(index)) / 2**20
+        recall = recall_at_k(labels, truth) if truth is not None else 1.0
+        print(f"{label:<26} {build_s:8.1f} {size:8.1f} {recall:7.3f} "
+              f"{latencies.mean():8.3f} {np.percentile(latencies, 95):7.3f} {qps:10.0f}")
+
+    started = time.perf_counter()
+    flat, _ = create_index(IndexConfig(), args.dim, corpus)
+    flat.add_with_ids(corpus, ids)
+    flat_build = time.perf_counter() - started
+    truth, latencies, qps = measure(flat, queries, args.k)
+    row("flat (exact)", flat_build, flat, truth, latencies, qps, None)
+
+    sweeps = {
+        "ivfpq": ("nprobe", [int(v) for v in args.nprobe.split(",")]),
+        "hnsw": ("ef_search", [int(v) for v in args.ef_search.split(",")]),
+    }
+    for kind in args.kinds.split(","):
+        started = time.perf_counter()
+        index, config = create_index(IndexConfig(kind=kind, hnsw_m=args.hnsw_m, pq_m=args.pq_m), args.dim, corpus)
+        index.add_with_ids(corpus, ids)
+        build_s = time.perf_counter() - started
+        if config.kind != kind:
+            print(f"{kind}: corpus too small, fell back to {config.kind}")
+            continue
+        param, values = sweeps[kind]
+        label_base = f"IVF{config.nlist},PQ{config.pq_m}" if kind == "ivfpq" else f"HNSW{config.hnsw_m}"
+        for value in values:
+            setattr(config, param, value)
+            set_search_params(index, config)
+            labels, latencies, qps = measure(index, queries, args.k)
+            row(f"{label_base} {param}={value}", build_s, index, labels, latencies, qps, truth)
+
+
+if __name__ == "__main__":
+    main()
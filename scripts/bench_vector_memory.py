@@ -0,0 +1,97 @@
+"""
+Benchmark: per-query index reload vs. the resident VectorMemory service.
+
+The "legacy" path is what query_vector_memory used to do for every query:
+faiss.read_index on the whole file, pickle.load of the chunk metadata, then
+search. The service opens a generation once, memory-mapped, and keeps it.
+"cold" is the first query on a fresh VectorMemory, including the load;
+"warm" is every query after that; "batch" searches all queries in one call.
+
+Embedding is excluded: queries are random vectors, so only index and
+metadata costs are measured.
+
+Usage:
+    python scripts/bench_vector_memory.py --chunks 50000 --dim 1536 --queries 200
+"""
+
+import argparse
+import pickle
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.memory.embedding_providers import HashingProvider
+from src.memory.vector_memory import VectorMemory, publish_generation
+
+
+def legacy_query(index_path: Path, meta_path: Path, vector: np.ndarray, top_k: int):
+    index = faiss.read_index(str(index_path))
+    with meta_path.open("rb") as f:
+        metadata = pickle.load(f)
+    _, labels = index.search(vector, top_k)
+    return [(metadata[i]["source"], metadata[i]["text"]) for i in labels[0]]
+
+
+def report(label: str, seconds) -> None:
+    ms = [s * 1000 for s in seconds]
+    print(f"  {label:<28} mean {statistics.fmean(ms):9.3f} ms   p50 {statistics.median(ms):9.3f} ms   max {max(ms):9.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunks", type=int, default=20000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((args.chunks, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    sources = [f"notes/file-{i // 10}.md" for i in range(args.chunks)]
+    texts = [f"chunk {i} " + "lorem ipsum " * 60 for i in range(args.chunks)]
+    index = faiss.IndexFlatL2(args.dim)
+    index.add(vectors)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        index_path, meta_path = tmp / "faiss_index.idx", tmp / "chunk_metadata.pkl"
+        faiss.write_index(index, str(index_path))
+        meta_path.write_bytes(pickle.dumps([{"source": s, "text": t} for s, t in zip(sources, texts)]))
+        publish_generation(index, sources, texts, tmp / "vector_memory")
+        print(f"{args.chunks} chunks, {args.dim}-d, top {args.top_k}, {args.queries} queries")
+
+        legacy = []
+        for query in queries[: min(args.queries, 20)]:  # Slow path: a sample is enough
+            started = time.perf_counter()
+            legacy_query(index_path, meta_path, query[None, :], args.top_k)
+            legacy.append(time.perf_counter() - started)
+        report("legacy reload per query", legacy)
+
+        memory = VectorMemory(tmp / "vector_memory", provider=HashingProvider(args.dim), index_name="bench_vector_memory")
+        started = time.perf_counter()
+        memory.search(queries[:1], args.top_k)
+        report("service cold (load + query)", [time.perf_counter() - started])
+
+        warm = []
+        for query in queries:
+            started = time.perf_counter()
+            memory.search(query[None, :], args.top_k)
+            warm.append(time.perf_counter() - started)
+        report("service warm", warm)
+
+        started = time.perf_counter()
+        memory.search(queries, args.top_k)
+        report("service batch (per query)", [(time.perf_counter() - started) / len(queries)])
+
+
+if __name__ == "__main__":
+    main()
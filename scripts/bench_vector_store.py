@@ -0,0 +1,145 @@
+"""
+Benchmark: one workload against every VectorStore backend.
+
+Runs the same operations through src.memory.vector_store against each backend:
+the NumPy brute-force store, qdrant-client local mode, and a Qdrant server
+when --url is given. The operations are upsert_batch, single and batched
+search, filtered search, retrieve, scroll and delete_by_filter. The NumPy store
+is exact, so its results are the ground truth for each backend's recall@k.
+
+The corpus is the clustered synthetic one from bench_vector_index.py. Each
+point has a payload with a "type" drawn from four values, as in workstream_items.
+
+Usage:
+    python scripts/bench_vector_store.py --points 20000 --dim 384
+    python scripts/bench_vector_store.py --backends numpy,qdrant --url http://localhost:6333
+"""
+
+import argparse
+import functools
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from bench_vector_index import recall_at_k, synthetic_corpus  # noqa: E402
+
+from src.memory.qdrant_clients import (
+    QdrantSettings,
+    close_qdrant_clients,
+    get_qdrant_client,
+)
+from src.memory.vector_store import NumpyVectorStore, QdrantVectorStore, VectorRecord
+
+COLLECTION = "bench_vector_store"
+TYPES = ["loop", "program", "project", "task"]
+
+
+def make_records(vectors: np.ndarray):
+    return [
+        VectorRecord(id=str(uuid.UUID(int=i + 1)), vector=vector.tolist(),
+                     payload={"type": TYPES[i % len(TYPES)], "n": i})
+        for i, vector in enumerate(vectors)
+    ]
+
+
+def open_store(backend: str, url: Optional[str] = None):
+    if backend == "numpy":
+        return NumpyVectorStore(COLLECTION)
+    if backend == "local":
+        return QdrantVectorStore.local(COLLECTION)
+    client = get_qdrant_client(QdrantSettings(url=url) if url else None)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    return QdrantVectorStore(COLLECTION, client=client)
+
+
+def timed(fn):
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def run_workload(store, records, queries: np.ndarray, k: int, batch_size: int):
+    """Times every VectorStore operation on ``store``; returns (timings in seconds, search results)."""
+    store.ensure_collection(len(records[0].vector))
+    timings = {}
+
+    def upsert_all():
+        for start in range(0, len(records), batch_size):
+            store.upsert_batch(records[start:start + batch_size])
+    _, timings["upsert"] = timed(upsert_all)
+
+    single = []
+    latencies = []
+    for query in queries:
+        hits, elapsed = timed(functools.partial(store.search, query, limit=k))
+        single.append([h.id for h in hits])
+        latencies.append(elapsed)
+    timings["search_mean"] = float(np.mean(latencies))
+    timings["search_p95"] = float(np.percentile(latencies, 95))
+
+    batched, timings["search_batch"] = timed(lambda: store.search_batch(queries, limit=k))
+    filtered, timings["filtered_search"] = timed(
+        lambda: [store.search(q, limit=k, filter={"type": "project"}) for q in queries]
+    )
+    timings["filtered_search"] /= len(queries)
+
+    sample = [r.id for r in records[:: max(1, len(records) // 1000)]]
+    _, timings["retrieve"] = timed(lambda: store.retrieve(sample))
+    scrolled, timings["scroll"] = timed(lambda: sum(1 for _ in store.scroll()))
+    _, timings["delete_by_filter"] = timed(lambda: store.delete_by_filter({"type": "task"}))
+    assert scrolled == len(records) and store.count() == len(records) - len(records[3::4])
+
+    results = {
+        "search": single,
+        "batch": [[h.id for h in hits] for hits in batched],
+        "filtered": [[h.id for h in hits] for hits in filtered],
+    }
+    return timings, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--backends", default="numpy,local", help="Comma-separated: numpy, local, qdrant")
+    parser.add_argument("--url", help="Qdrant server URL for the qdrant backend (default: environment)")
+    args = parser.parse_args()
+
+    records = make_records(synthetic_corpus(args.points, args.dim, args.clusters, seed=42))
+    queries = synthetic_corpus(args.queries, args.dim, args.clusters, seed=43)
+    print(f"{args.points} points, {args.dim}-d, {args.queries} queries, recall@{args.k} against exact NumPy search\n")
+
+    truth = None
+    header = (f"{'backend':<8} {'upsert/s':>9} {'search ms':>10} {'p95 ms':>7} {'batch q/s':>10} "
+              f"{'filter ms':>10} {'retrieve ms':>12} {'scroll s':>9} {'delete ms':>10} {'recall':>7}")
+    print(header)
+    backends = args.backends.split(",")
+    if "numpy" not in backends:
+        backends.insert(0, "numpy")               # Needed for the ground truth
+    for backend in backends:
+        store = open_store(backend, args.url)
+        timings, results = run_workload(store, records, queries, args.k, args.batch_size)
+        if truth is None:
+            truth = results
+        recall = np.mean([recall_at_k(results[kind], truth[kind]) for kind in ("search", "batch", "filtered")])
+        print(f"{backend:<8} {len(records) / timings['upsert']:9.0f} {timings['search_mean'] * 1000:10.2f} "
+              f"{timings['search_p95'] * 1000:7.2f} {len(queries) / timings['search_batch']:10.0f} "
+              f"{timings['filtered_search'] * 1000:10.2f} {timings['retrieve'] * 1000:12.1f} "
+              f"{timings['scroll']:9.2f} {timings['delete_by_filter'] * 1000:10.1f} {recall:7.3f}")
+    close_qdrant_clients()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
-from qdrant_client import QdrantClient
+import sys
+from pathlib import Path
 
-client = QdrantClient(host="localhost", port=6333)
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.memory.qdrant_clients import get_qdrant_client
+
+client = get_qdrant_client()
 
 count = client.count(
     collection_name="workstream_items",
@@ -1,28 +1,17 @@
-import hashlib
+import sys
 from pathlib import Path
 
-import yaml
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
 
-loop_dir = Path("runtime/loops")
-manifest = {}
+from src.system.path_config import RUNTIME_LOOPS_DIR
+from src.system.sync_manifest import MANIFEST_YAML, open_manifest
 
-for file in loop_dir.glob("*.md"):
-    content = file.read_bytes()
-    sha256 = hashlib.sha256(content).hexdigest()
-    filename = file.name
-    front = file.read_text().split("---", 2)[1]
-    try:
-        frontmatter = yaml.safe_load(front)
-    except Exception:
-        frontmatter = {}
+# Stat-only pre-pass: unchanged loop files are not read; changed ones are read once
+manifest = open_manifest()
+stats = manifest.refresh(RUNTIME_LOOPS_DIR)
+written = manifest.export_yaml(MANIFEST_YAML)
+manifest.close()
 
-    manifest[filename] = {
-        "sha256": sha256,
-        "id": frontmatter.get("id", None),
-        "feedback_tags": frontmatter.get("feedback_tags", None)
-    }
-
-with open(".system_manifest.yaml", "w") as f:
-    yaml.dump(manifest, f)
-
-print("✅ System manifest written to .system_manifest.yaml")
+print(f"🔍 {stats['scanned']} loop files scanned, {stats['updated']} re-hashed, {stats['removed']} removed")
+print(f"✅ System manifest written to {MANIFEST_YAML.name} ({written} entries)")
@@ -1,11 +1,16 @@
 import json
 import re
+import sys
 from pathlib import Path
+
 import yaml
-import frontmatter
 
 # --- Configuration ---
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.system.loop_index import get_loop_index
+
 LOOPS_DIR = PROJECT_ROOT / "runtime/loops"
 OUTPUT_DIR = PROJECT_ROOT / "src/ui/react-app/data"
 OUTPUT_FILE = OUTPUT_DIR / "tasks.json"
@@ -13,6 +18,7 @@ OUTPUT_FILE = OUTPUT_DIR / "tasks.json"
 # Regex to find tasks within a "Tasks" section
 TASK_SECTION_PATTERN = re.compile(r"##\s*🛠\s*Tasks\s*([\s\S]*)", re.IGNORECASE)
 CHECKLIST_ITEM_PATTERN = re.compile(r"-\s*\[(\s|x)\]\s*(.*)", re.IGNORECASE)
+TASK_HEADING_PATTERN = re.compile(r"🛠\s*Tasks", re.IGNORECASE)
 
 def parse_tasks_from_content(content):
     """
@@ -44,19 +50,21 @@ def prepare_task_data():
     
     print(f"🔍 Parsing loop files from '{LOOPS_DIR}'...")
 
-    for loop_file_path in LOOPS_DIR.glob("*.md"):
+    loop_entries = get_loop_index(LOOPS_DIR).entries()
+    for entry in loop_entries:
         try:
-            post = frontmatter.load(loop_file_path)
-            metadata = post.metadata
-            content = post.content
-            
+            metadata = entry.frontmatter
+
             loop_uuid = metadata.get('uuid', 'N/A')
             loop_title = metadata.get('title', 'Untitled Loop')
             loop_phase = metadata.get('phase', 'N/A')
             loop_workstream = metadata.get('workstream', 'N/A')
             loop_tags = metadata.get('tags', [])
 
-            tasks = parse_tasks_from_content(content)
+            # Only loops with a Tasks heading in the index need their body read
+            if not any(TASK_HEADING_PATTERN.search(heading) for heading in entry.sections):
+                continue
+            tasks = parse_tasks_from_content(entry.read_body())
 
             for is_checked_str, description in tasks:
                 all_tasks.append({
@@ -72,7 +80,7 @@ def prepare_task_data():
                     }
                 })
         except Exception as e:
-            print(f"⚠️  Could not process file {loop_file_path.name}: {e}")
+            print(f"⚠️  Could not process file {entry.name}: {e}")
 
     # Ensure the output directory exists
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -81,7 +89,7 @@ def prepare_task_data():
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(all_tasks, f, indent=2)
 
-    print(f"\n✅ Successfully parsed {len(all_tasks)} tasks from {len(list(LOOPS_DIR.glob('*.md')))} loop files.")
+    print(f"\n✅ Successfully parsed {len(all_tasks)} tasks from {len(loop_entries)} loop files.")
     print(f"Data written to '{OUTPUT_FILE}'")
 
 
@@ -89,10 +97,9 @@ if __name__ == "__main__":
     # Ensure dependencies are available.
     try:
         import yaml
-        import frontmatter
     except ImportError:
-        print("Error: PyYAML or python-frontmatter is not installed.")
-        print("Please install them using: .venv/bin/pip install PyYAML python-frontmatter")
+        print("Error: PyYAML is not installed.")
+        print("Please install it using: .venv/bin/pip install PyYAML")
         exit(1)
         
     prepare_task_data() 
\ No newline at end of file
@@ -1,15 +1,13 @@
-import os
 import sqlite3
 import sys
 from pathlib import Path
 
-import frontmatter
-
 # Add project root to path to allow importing from src
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
 from src.agent.commands.promote_loop import promote_loop_to_roadmap
+from src.system.loop_index import get_loop_index
 
 
 def find_promotable_loops(
@@ -30,14 +28,9 @@ def find_promotable_loops(
 
     promoted_uuids = set()
     if roadmap_dir.exists():
-        for fname in os.listdir(roadmap_dir):
-            if fname.endswith(".md"):
-                try:
-                    post = frontmatter.load(roadmap_dir / fname)
-                    if "origin_loop" in post:
-                        promoted_uuids.add(post["origin_loop"])
-                except Exception:
-                    continue
+        for entry in get_loop_index(roadmap_dir).entries():
+            if "origin_loop" in entry.frontmatter:
+                promoted_uuids.add(entry.frontmatter["origin_loop"])
 
     all_db_loops = []
     if db_path.exists():
@@ -51,14 +44,9 @@ def find_promotable_loops(
     db_loops_with_files = set()
     if loops_dir.exists():
         all_loop_files_by_uuid = {}
-        for fname in os.listdir(loops_dir):
-            if fname.endswith(".md"):
-                try:
-                    post = frontmatter.load(loops_dir / fname)
-                    if "uuid" in post:
-                        all_loop_files_by_uuid[post["uuid"]] = fname
-                except Exception:
-                    continue
+        for entry in get_loop_index(loops_dir).entries():
+            if "uuid" in entry.frontmatter:
+                all_loop_files_by_uuid[entry.frontmatter["uuid"]] = entry.name
         for loop_data in all_db_loops:
             if loop_data["uuid"] in all_loop_files_by_uuid:
                 db_loops_with_files.add(loop_data["uuid"])
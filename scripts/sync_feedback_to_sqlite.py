@@ -1,14 +1,18 @@
 import json
 import logging
 import sqlite3
+import sys
 from collections import Counter
 from pathlib import Path
 
-import yaml
-
 # --- Configuration ---
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(PROJECT_ROOT))
+
+from src.system.frontmatter_reader import read_frontmatter
+from src.system.loop_index import get_loop_index
+
 DB_PATH = PROJECT_ROOT / "runtime/db/feedback.db"
 LOOP_DIR = PROJECT_ROOT / "runtime/loops"
 FEEDBACK_TAG_SCORES = {
@@ -48,15 +52,8 @@ def setup_database(conn: sqlite3.Connection):
 def parse_frontmatter(file_path: Path) -> dict | None:
     """Parses YAML frontmatter from a Markdown file, returning None on error."""
     try:
-        with open(file_path, encoding="utf-8") as f:
-            content = f.read()
-        if not content.startswith("---"):
-            return None
-        parts = content.split("---", 2)
-        if len(parts) < 3:
-            return None
-        frontmatter = yaml.safe_load(parts[1])
-        return frontmatter if isinstance(frontmatter, dict) else None
+        frontmatter, _ = read_frontmatter(file_path)
+        return frontmatter or None
     except Exception as e:
         logging.error(f"Error parsing frontmatter for {file_path.name}: {e}")
         return None
@@ -82,13 +79,16 @@ def sync_feedback_to_db():
     # Counters for summary
     stats = Counter()
 
-    all_loop_files = list(LOOP_DIR.glob("loop-*.md"))
-    stats['loops_scanned'] = len(all_loop_files)
+    # Only files changed since the last run are re-parsed; the rest come from the index.
+    all_loop_entries = get_loop_index(LOOP_DIR).entries("loop-*.md")
+    stats['loops_scanned'] = len(all_loop_entries)
 
-    for file_path in all_loop_files:
-        frontmatter = parse_frontmatter(file_path)
+    for entry in all_loop_entries:
+        if entry.error:
+            logging.error(f"Error parsing frontmatter for {entry.name}: {entry.error}")
+        frontmatter = entry.frontmatter
         if not (frontmatter and frontmatter.get("uuid") and "tags" in frontmatter):
-            logging.warning(f"Skipping {file_path.name}: missing uuid or tags.")
+            logging.warning(f"Skipping {entry.name}: missing uuid or tags.")
             continue
 
         uuid = str(frontmatter["uuid"]).strip()
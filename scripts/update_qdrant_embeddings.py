@@ -1,16 +1,33 @@
 import glob
+import hashlib
 import logging
 import os
+import sys
 import uuid
+from pathlib import Path
 
 import yaml
 
 # Load environment variables from .env file
 from dotenv import load_dotenv
-from openai import OpenAI
-from qdrant_client import QdrantClient, models
+from qdrant_client import models
 from qdrant_client.http.exceptions import UnexpectedResponse
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.memory.collection_registry import (
+    EmbeddingModelMismatchError,
+    verify_collection,
+)
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import QdrantSettings, try_qdrant_client
+from src.memory.qdrant_sync import (
+    BulkUpserter,
+    ensure_payload_indexes,
+    fetch_payload_values,
+)
+
 load_dotenv()
 
 # --- Configuration ---
@@ -20,14 +37,11 @@ logger = logging.getLogger(__name__)
 
 # Environment variables (ensure these are set in your execution environment)
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-QDRANT_URL = os.getenv("QDRANT_URL") # e.g., "http://localhost:6333"
 
 # Constants
 LOOPS_DIR = "runtime/loops"
 MD_FILE_PATTERN = "loop-*.md"
 QDRANT_COLLECTION_NAME = "workstream_items"
-EMBEDDING_MODEL = "text-embedding-3-small" # OpenAI model for embeddings
-EMBEDDING_DIMENSIONS = 1536 # Dimensions for text-embedding-3-small
 
 # --- Helper Functions ---
 
@@ -70,28 +84,20 @@ def parse_md_file(file_path):
 def main():
     logger.info("Starting Qdrant embedding update script...")
 
-    if not OPENAI_API_KEY:
+    # Embedding provider (EMBEDDING_PROVIDER, defaults to OpenAI text-embedding-3-small)
+    provider = get_provider()
+    logger.info(f"Embedding with {provider.model_id} ({provider.dimension} dimensions).")
+    if provider.backend == "openai" and not OPENAI_API_KEY:
         logger.error("OPENAI_API_KEY environment variable is not set. Exiting.")
         return
-    if not QDRANT_URL:
-        logger.error("QDRANT_URL environment variable is not set. Exiting.")
-        return
-
-    # Initialize OpenAI client
-    try:
-        openai_client = OpenAI(api_key=OPENAI_API_KEY)
-        logger.info("OpenAI client initialized.")
-    except Exception as e:
-        logger.error(f"Failed to initialize OpenAI client: {e}. Exiting.")
-        return
 
-    # Initialize Qdrant client
-    try:
-        qdrant_client = QdrantClient(url=QDRANT_URL)
-        logger.info(f"Qdrant client initialized with URL: {QDRANT_URL}")
-    except Exception as e:
-        logger.error(f"Failed to initialize Qdrant client (is Qdrant running at {QDRANT_URL}?): {e}. Exiting.")
+    # Shared Qdrant client (QDRANT_URL or QDRANT_HOST, see src/memory/qdrant_clients.py)
+    qdrant_target = QdrantSettings.from_env().target
+    qdrant_client = try_qdrant_client()
+    if qdrant_client is None:
+        logger.error(f"Failed to initialize Qdrant client (is Qdrant running at {qdrant_target}?). Exiting.")
         return
+    logger.info(f"Qdrant client initialized for {qdrant_target}")
 
     # Ensure the collection exists
     try:
@@ -101,11 +107,18 @@ def main():
             logger.info(f"Collection '{QDRANT_COLLECTION_NAME}' not found. Creating it...")
             qdrant_client.create_collection(
                 collection_name=QDRANT_COLLECTION_NAME,
-                vectors_config=models.VectorParams(size=EMBEDDING_DIMENSIONS, distance=models.Distance.COSINE)
+                vectors_config=models.VectorParams(size=provider.dimension, distance=models.Distance.COSINE)
             )
             logger.info(f"Collection '{QDRANT_COLLECTION_NAME}' created successfully.")
         else:
             logger.info(f"Collection '{QDRANT_COLLECTION_NAME}' already exists.")
+        verify_collection(QDRANT_COLLECTION_NAME, provider, client=qdrant_client, record=True)
+        created = ensure_payload_indexes(qdrant_client, QDRANT_COLLECTION_NAME)
+        if created:
+            logger.info(f"Created payload indexes on {', '.join(created)}.")
+    except EmbeddingModelMismatchError as e:
+        logger.error(f"{e} Exiting.")
+        return
     except UnexpectedResponse as e:
         logger.error(f"Error checking/creating Qdrant collection (is Qdrant server okay?): {e.status_code} - {e.content}. Exiting.")
         return
@@ -122,7 +135,7 @@ def main():
         return
 
     logger.info(f"Found {len(md_files)} markdown files to process in '{LOOPS_DIR}'.")
-    points_to_upsert = []
+    prepared = []
 
     for md_file_path in md_files:
         logger.info(f"Processing file: {md_file_path}")
@@ -157,43 +170,52 @@ def main():
             logger.warning(f"Content for {loop_uuid} in {md_file_path} is empty after stripping. Skipping embedding.")
             continue
 
-        try:
-            logger.info(f"Generating embedding for loop UUID: {loop_uuid} (Title: {loop_title}) using model {EMBEDDING_MODEL}...")
-            response = openai_client.embeddings.create(
-                input=[text_to_embed],
-                model=EMBEDDING_MODEL
-            )
-            embedding_vector = response.data[0].embedding
-            logger.info(f"Embedding generated for {loop_uuid}.")
-        except Exception as e:
-            logger.error(f"Failed to generate embedding for {loop_uuid} from {md_file_path}: {e}. Skipping this loop.")
-            continue
-
         payload = {
             "title": loop_title,
             "uuid": str(loop_uuid), # Ensure UUID is a string
             "tags": loop_tags,
             "summary": loop_summary,
             "content": content_text, # The full markdown content after frontmatter
-            "original_source": md_file_path
+            "original_source": md_file_path,
+            "content_hash": hashlib.sha256(text_to_embed.encode("utf-8")).hexdigest(),
         }
+        prepared.append((qdrant_point_id, payload, text_to_embed))
+
+    # Skip loops whose stored hash matches, checked in batched retrieves
+    try:
+        existing = fetch_payload_values(qdrant_client, QDRANT_COLLECTION_NAME, [point_id for point_id, _, _ in prepared])
+    except Exception as e:
+        logger.warning(f"Could not read existing content hashes ({e}); re-embedding everything.")
+        existing = {}
+    unchanged = sum(1 for point_id, payload, _ in prepared if existing.get(point_id) == payload["content_hash"])
+    prepared = [item for item in prepared if existing.get(item[0]) != item[1]["content_hash"]]
+    logger.info(f"{unchanged} loops unchanged since the last run.")
+
+    # Embed all loops in token-budgeted batches instead of one request per file
+    logger.info(f"Generating embeddings for {len(prepared)} loops using {provider.model_id}...")
+    vectors = provider.embed(text for _, _, text in prepared)
+
+    points_to_upsert = []
+    for (qdrant_point_id, payload, _), embedding_vector in zip(prepared, vectors):
+        loop_uuid = payload["uuid"]
+        if embedding_vector is None:
+            logger.error(f"Failed to generate embedding for {loop_uuid} from {payload['original_source']}. Skipping this loop.")
+            continue
 
         points_to_upsert.append(models.PointStruct(
             id=qdrant_point_id, # Qdrant point ID must be a valid UUID
             vector=embedding_vector,
             payload=payload
         ))
-        logger.info(f"Prepared point for {loop_uuid} (Qdrant ID: {qdrant_point_id}) from {md_file_path}.")
+        logger.info(f"Prepared point for {loop_uuid} (Qdrant ID: {qdrant_point_id}) from {payload['original_source']}.")
 
     if points_to_upsert:
         logger.info(f"Upserting {len(points_to_upsert)} points to Qdrant collection '{QDRANT_COLLECTION_NAME}'...")
         try:
-            qdrant_client.upsert(
-                collection_name=QDRANT_COLLECTION_NAME,
-                points=points_to_upsert,
-                wait=True # Wait for operation to complete
-            )
-            logger.info(f"Successfully upserted {len(points_to_upsert)} points.")
+            # Batches go out without waiting; the final one waits, so everything is applied on return
+            with BulkUpserter(qdrant_client, QDRANT_COLLECTION_NAME) as upserter:
+                upserter.add_many(points_to_upsert)
+            logger.info(f"Successfully upserted {len(points_to_upsert)} points in {upserter.stats['requests']} requests.")
         except Exception as e:
             logger.error(f"Failed to upsert points to Qdrant: {e}")
     else:
@@ -1,8 +1,12 @@
 import sys  # Added for sys.exit
+from pathlib import Path
 
-from qdrant_client import QdrantClient
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
 
-client = QdrantClient(host="localhost", port=6333)
+from src.memory.qdrant_clients import get_qdrant_client
+
+client = get_qdrant_client()
 COLLECTION_NAME = "workstream_items"
 
 try:
@@ -7,28 +7,19 @@ from typing import Optional
 import frontmatter
 import pandas as pd
 
+from src.system.loop_index import find_loop_file
 from src.system.path_config import PROJECT_ROOT
 
 # Assuming similarity and other agent command functions are in sibling directories
 # This might need adjustment based on final project structure.
-from src.tasks.similarity import find_similar_tasks
+from src.tasks.similarity import find_similar_tasks_batch
 
 
 def find_loop_file_by_uuid(loop_uuid: str, loops_dir=None) -> Optional[Path]:
     """Finds the markdown file for a loop by its UUID."""
     if loops_dir is None:
         loops_dir = PROJECT_ROOT / "runtime/loops"
-    if not loops_dir.exists():
-        return None
-    for loop_file in loops_dir.glob("*.md"):
-        try:
-            post = frontmatter.load(loop_file)
-            if post.get("uuid") == loop_uuid:
-                return loop_file
-        except Exception:
-            # Ignore files that fail to parse
-            continue
-    return None
+    return find_loop_file(loop_uuid, directory=loops_dir)
 
 def promote_loop_to_roadmap(loop_uuid: str, loops_dir=None, roadmap_dir=None):
     """Creates a new roadmap markdown file from an existing loop."""
@@ -87,14 +78,18 @@ def suggest_roadmap_promotions(workstream_id: str, db_path=None, top_n=2):
         conn.close()
         return {"promoted_items": [], "message": "No active loops to suggest from."}
 
+    # One embedding batch and one product against the memory-mapped task matrix for all loops
+    similar_by_loop = find_similar_tasks_batch(loops_df["title"].tolist(), threshold=0.8, db_path=db_path)
+    if isinstance(similar_by_loop, dict):  # No tasks table: no repetition signal
+        similar_by_loop = [similar_by_loop] * len(loops_df)
+
     scores = []
-    for _, row in loops_df.iterrows():
+    for (_, row), similar_tasks in zip(loops_df.iterrows(), similar_by_loop):
         loop_uuid, loop_title = row["uuid"], row["title"]
         score = 0
         reasons = []
 
         # Score based on task repetition (high similarity to other tasks)
-        similar_tasks = find_similar_tasks(loop_title, threshold=0.8)
         if isinstance(similar_tasks, list) and len(similar_tasks) > 1:
             score += len(similar_tasks)
             reasons.append(f"{len(similar_tasks)} similar tasks")
@@ -8,49 +8,72 @@ import argparse
 import sqlite3
 from datetime import datetime
 
-from openai import OpenAI
-from qdrant_client import QdrantClient
-
+from src.memory.collection_registry import verify_collection
+from src.memory.embedding_providers import get_provider
+from src.memory.query_cache import embed_query as cached_query_embedding
+from src.memory.vector_store import Range, get_vector_store
 from src.system.path_config import LOG_DIR, LOOP_MEMORY_DB
 
-client = OpenAI()
-qdrant = QdrantClient(host="localhost", port=6333)
 COLLECTION_NAME = "loop_embeddings"
 LOG_PATH = LOG_DIR / "loop_queries.md"
 
 
 def embed_query(text):
-    response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-    return response.data[0].embedding
+    vector = cached_query_embedding(text, get_provider())
+    if vector is None:
+        raise RuntimeError("Failed to embed query")
+    return vector
 
 
-def search_qdrant(embedding, top_k=5):
-    results = qdrant.search(
-        collection_name=COLLECTION_NAME,
-        query_vector=embedding,
-        limit=top_k,
-        with_payload=True,
-    )
-    return results
+def loop_filter(status_filter=None, min_weight=None):
+    """Payload filter for the loop_embeddings search (status and weight are in each point's payload)."""
+    conditions = {}
+    if status_filter:
+        conditions["status"] = status_filter
+    if min_weight is not None:
+        conditions["weight"] = Range(gte=min_weight)
+    return conditions or None
+
+
+def search_qdrant(embedding, top_k=5, status_filter=None, min_weight=None):
+    store = get_vector_store(COLLECTION_NAME)
+    verify_collection(COLLECTION_NAME, get_provider(), client=store.client)
+    # Filtering inside the search returns top_k matching loops, not the matches among the top_k
+    return store.search(embedding, limit=top_k, filter=loop_filter(status_filter, min_weight))
 
 
 def filter_sqlite(loop_ids, status_filter=None, min_weight=None):
     conn = sqlite3.connect(LOOP_MEMORY_DB)
     cursor = conn.cursor()
     placeholders = ",".join(["?"] * len(loop_ids))
+    params = list(loop_ids)
     query = f"SELECT id, summary, status, priority, weight FROM loops WHERE id IN ({placeholders})"
     if status_filter:
         query += " AND status = ?"
-        loop_ids.append(status_filter)
+        params.append(status_filter)
     if min_weight is not None:
         query += " AND weight >= ?"
-        loop_ids.append(min_weight)
-    cursor.execute(query, loop_ids)
+        params.append(min_weight)
+    cursor.execute(query, params)
     results = cursor.fetchall()
     conn.close()
     return results
 
 
+def search_loops(embedding, top_k=5, status_filter=None, min_weight=None):
+    """
+    The ``top_k`` nearest loops that pass the filters, best first, as SQLite rows.
+    Qdrant applies the filters during the search, using the status and weight
+    that insert_to_sqlite and weight_loops copy into each point's payload
+    (src/qdrant_utils/insert_to_qdrant.py). The SQLite read re-checks them, so
+    a payload that lags behind the table can drop a loop but never add one.
+    """
+    hits = search_qdrant(embedding, top_k, status_filter, min_weight)
+    loop_ids = list(dict.fromkeys(hit.payload["loop_id"] for hit in hits if "loop_id" in hit.payload))
+    rows = {row[0]: row for row in filter_sqlite(loop_ids, status_filter, min_weight)}
+    return [rows[loop_id] for loop_id in loop_ids if loop_id in rows]
+
+
 def log_results(query_text, results):
     LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
     with LOG_PATH.open("a") as log:
@@ -76,9 +99,7 @@ def main():
 
     print(f"🔍 Query: {args.query}")
     embedding = embed_query(args.query)
-    qdrant_results = search_qdrant(embedding)
-    loop_ids = [hit.payload.get("loop_id") for hit in qdrant_results if "loop_id" in hit.payload]
-    sqlite_data = filter_sqlite(loop_ids, args.status, args.min_weight)
+    sqlite_data = search_loops(embedding, status_filter=args.status, min_weight=args.min_weight)
 
     print("\n🎯 Matched Loops:")
     for row in sqlite_data:
@@ -4,19 +4,18 @@ import uuid
 
 import numpy as np
 import pandas as pd
-from openai import OpenAI
+
+from src.memory.embedder import get_embedding_service
+from src.tasks.similarity import tasks_table_version
+from src.tasks.task_vector_store import TaskVectorStore
+
+EMBEDDING_MODEL = "text-embedding-ada-002"
 
 
 # --- Utility Functions ---
-def get_embedding(text, model="text-embedding-ada-002"):
+def get_embedding(text, model=EMBEDDING_MODEL):
     """Generates an embedding for the given text using OpenAI."""
-    try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        response = client.embeddings.create(input=[text], model=model)
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error getting embedding for '{text}': {e}")
-        return None
+    return get_embedding_service(model).embed_one(text)
 
 def extract_verb_from_title(title):
     """A simple heuristic to extract a 'verb' from a loop title."""
@@ -26,8 +25,12 @@ def extract_verb_from_title(title):
     return title.strip()
 
 # --- Main Indexing Logic ---
-def index_task_verbs(db_path="runtime/db/ora.db"):
-    """Indexes task verbs from active loops into the 'tasks' table."""
+def index_task_verbs(db_path="runtime/db/ora.db", sidecar=True):
+    """
+    Indexes task verbs from active loops into the 'tasks' table.
+    With ``sidecar``, the new vectors are also appended to the memory-mapped
+    sidecar that similarity readers use (see task_vector_store).
+    """
     print("🚀 Starting task verb indexing...")
     conn = sqlite3.connect(db_path)
 
@@ -48,13 +51,17 @@ def index_task_verbs(db_path="runtime/db/ora.db"):
 
     print(f"Found {len(loops_df)} active/pending loops to index.")
 
-    tasks_to_insert = []
+    rows = []
     for index, row in loops_df.iterrows():
         verb = extract_verb_from_title(row['title'])
-        if not verb:
-            continue
+        if verb:
+            rows.append((row, verb))
+
+    # One batched embedding pass instead of a request per loop
+    vectors = get_embedding_service(EMBEDDING_MODEL).embed(verb for _, verb in rows)
 
-        vector = get_embedding(verb)
+    tasks_to_insert = []
+    for (row, verb), vector in zip(rows, vectors):
         if not vector:
             print(f"Skipping loop {row['uuid']} due to embedding failure.")
             continue
@@ -71,6 +78,7 @@ def index_task_verbs(db_path="runtime/db/ora.db"):
         ))
 
     if tasks_to_insert:
+        version_before = tasks_table_version(conn)
         cur = conn.cursor()
         cur.executemany(
             "INSERT OR REPLACE INTO tasks (uuid, workstream, verb, vector, source_loop_id) VALUES (?, ?, ?, ?, ?)",
@@ -78,6 +86,17 @@ def index_task_verbs(db_path="runtime/db/ora.db"):
         )
         conn.commit()
         print(f"✅ Indexed {len(tasks_to_insert)} task verbs.")
+
+        if sidecar:
+            store = TaskVectorStore.for_db(db_path)
+            version = tasks_table_version(conn)
+            dims = {len(task[3]) // 4 for task in tasks_to_insert}
+            if store.exists and store.table_version == version_before and dims == {store.dim}:
+                vectors = np.frombuffer(b"".join(task[3] for task in tasks_to_insert), dtype=np.float32)
+                store.append([task[0] for task in tasks_to_insert], vectors, table_version=version)
+            else:
+                store.sync(conn, version)  # Missing or stale: rebuild from the table
+            print(f"🧮 Task vector sidecar: {store.live_count} vectors in {store.directory}")
     else:
         print("No new tasks to index.")
 
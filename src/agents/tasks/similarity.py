@@ -1,18 +1,21 @@
-import os
 import sqlite3
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Tuple
 
 import numpy as np
 import pandas as pd
-from openai import OpenAI
 
+from src.memory.embedder import get_embedding_service
+from src.tasks.task_vector_store import TaskVectorStore
 
-# --- Embedding Utility (could be shared) ---
+
+# --- Embedding Utility ---
 def get_embedding(text, model="text-embedding-ada-002"):
-    """Generates an embedding for the given text using OpenAI."""
+    """Generates an embedding for the given text with the shared OpenAI embedding service."""
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        response = client.embeddings.create(input=[text], model=model)
-        return np.array(response.data[0].embedding).astype(np.float32)
+        vector = get_embedding_service(model).embed_one(text)
+        return None if vector is None else np.array(vector).astype(np.float32)
     except Exception as e:
         print(f"Error getting embedding for '{text}': {e}")
         return None
@@ -27,45 +30,196 @@ def cosine_similarity(v1, v2):
         return 0.0
     return dot_product / (norm_v1 * norm_v2)
 
-# --- Main Similarity Logic ---
-def find_similar_tasks(verb: str, threshold: float = 0.85, db_path="runtime/db/ora.db"):
-    """Finds tasks with verbs semantically similar to the input verb."""
-    input_vector = get_embedding(verb)
-    if input_vector is None:
-        return {"error": "Could not generate embedding for the input verb."}
+def get_embeddings(texts, model="text-embedding-ada-002"):
+    """Embeds many texts in one batched pass; None where a text could not be embedded."""
+    try:
+        vectors = get_embedding_service(model).embed(texts)
+        return [None if v is None else np.array(v).astype(np.float32) for v in vectors]
+    except Exception as e:
+        print(f"Error getting embeddings for {len(texts)} texts: {e}")
+        return [None] * len(texts)
+
+# --- Task Matrix Cache ---
+@dataclass
+class TaskMatrix:
+    """Task rows with their vectors stacked into L2-normalised float32 matrices, one per dimension."""
+    version: Any
+    columns: Dict[str, list]
+    matrices: Dict[int, Tuple[np.ndarray, np.ndarray]] = field(default_factory=dict)  # dim -> (unit rows, row ids)
+    quantized: Dict[int, Tuple[Any, np.ndarray]] = field(default_factory=dict)  # dim -> (quantizer, codes) of those rows
+
+    def __len__(self):
+        return len(self.columns["uuid"])
+
+_task_matrices: Dict[str, TaskMatrix] = {}
+_task_matrices_lock = threading.Lock()
+
+def tasks_table_version(conn):
+    """
+    The tasks write counter kept by triggers in schema.sql. Databases created
+    before the counter existed fall back to a (row count, max rowid) fingerprint.
+    """
+    try:
+        row = conn.execute("SELECT version FROM table_versions WHERE name = 'tasks'").fetchone()
+        if row is not None:
+            return ("version", row[0])
+    except sqlite3.Error:
+        pass
+    try:
+        return ("fingerprint",) + tuple(conn.execute("SELECT COUNT(*), MAX(rowid) FROM tasks").fetchone())
+    except sqlite3.Error:
+        return None
+
+def build_task_matrix(tasks_df, version=None):
+    def column(name):
+        return tasks_df[name].tolist() if name in tasks_df else []
+
+    matrix = TaskMatrix(version, {name: column(name) for name in ("uuid", "workstream", "verb", "source_loop_id")})
+    blobs = column("vector")
+    dims = np.array([len(blob) // 4 if blob else 0 for blob in blobs])
+    for dim in np.unique(dims[dims > 0]):
+        rows = np.flatnonzero(dims == dim)
+        vectors = np.frombuffer(b"".join(blobs[i] for i in rows), dtype=np.float32).reshape(len(rows), dim).copy()
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1.0, norms)  # Zero vectors stay zero and score 0, as before
+        matrix.matrices[int(dim)] = (vectors, rows)
+    return matrix
 
+def sidecar_task_matrix(tasks_df, store, version=None):
+    """A TaskMatrix whose vectors are a zero-copy view of the memory-mapped sidecar (rows already unit length)."""
+    matrix = build_task_matrix(tasks_df.drop(columns=["vector"], errors="ignore"), version)
+    vectors, ids, live = store.view()
+    row_of = {uuid: i for i, uuid in enumerate(matrix.columns["uuid"])}
+    rows = np.array([row_of.get(uuid, -1) for uuid in ids.tolist()], dtype=np.int64)
+    rows[~live] = -1  # Tombstones
+    matrix.matrices[store.dim] = (vectors, rows)
+    quantized = store.quantized_view()
+    if quantized is not None:
+        matrix.quantized[store.dim] = quantized
+    return matrix
+
+def load_task_matrix(db_path="runtime/db/ora.db"):
+    """
+    The cached TaskMatrix for ``db_path``; reloaded only when the tasks table has changed. None if there is no table.
+    Vectors come from the memory-mapped sidecar when it is current (see task_vector_store), else from the BLOBs.
+    A stale sidecar is left for the indexer or the task_vector_store CLI to rebuild.
+    """
+    key = str(db_path)
+    store = TaskVectorStore.for_db(db_path)
     conn = sqlite3.connect(db_path)
     try:
-        # Fetch all tasks and their vectors
-        tasks_df = pd.read_sql("SELECT uuid, workstream, verb, vector, source_loop_id FROM tasks", conn)
+        version = tasks_table_version(conn)
+        cached = _task_matrices.get(key)
+        if cached is not None and version is not None and cached.version == version:
+            return cached
+        if store.is_current(version):
+            tasks_df = pd.read_sql("SELECT uuid, workstream, verb, source_loop_id FROM tasks", conn)
+        else:
+            store = None
+            tasks_df = pd.read_sql("SELECT uuid, workstream, verb, vector, source_loop_id FROM tasks", conn)
     except pd.io.sql.DatabaseError:
-        return {"error": "The 'tasks' table does not exist. Please run the indexer first."}
+        return None
     finally:
         conn.close()
 
-    if tasks_df.empty:
-        return []
+    matrix = sidecar_task_matrix(tasks_df, store, version) if store else build_task_matrix(tasks_df, version)
+    with _task_matrices_lock:
+        _task_matrices[key] = matrix
+    return matrix
 
-    similar_tasks = []
-    for index, row in tasks_df.iterrows():
-        # The vector dimension is 1536 for text-embedding-ada-002
-        stored_vector = np.frombuffer(row['vector'], dtype=np.float32)
+def invalidate_task_matrix(db_path=None):
+    with _task_matrices_lock:
+        if db_path is None:
+            _task_matrices.clear()
+        else:
+            _task_matrices.pop(str(db_path), None)
 
-        # Ensure vectors are of the same dimension before comparing
-        if stored_vector.shape != input_vector.shape:
-            print(f"Skipping task {row['uuid']} due to mismatched vector dimensions.")
+# --- Main Similarity Logic ---
+def threshold_candidates(task_matrix, dim, queries, threshold):
+    """
+    Per query, ``(matrix rows, scores)`` of tasks scoring >= threshold. With
+    quantized codes the codes are scored first. Only rows within the
+    quantizer's error bound (plus float32 rounding) of the threshold are
+    re-scored against the float32 rows, so the result is the same as scoring
+    every float32 row.
+    """
+    vectors, _ = task_matrix.matrices[dim]
+    if dim not in task_matrix.quantized:
+        scores = queries @ vectors.T  # (inputs, tasks)
+        return [(np.flatnonzero(row >= threshold), row) for row in scores]
+    quantizer, codes = task_matrix.quantized[dim]
+    approximate = quantizer.scores(codes, queries)
+    rounding = dim * float(np.finfo(np.float32).eps)  # Approximate and exact dot products round differently
+    candidates = []
+    for query, row, bound in zip(queries, approximate, quantizer.error_bound(queries)):
+        rows = np.flatnonzero(row >= threshold - bound - rounding)
+        exact = np.full(len(vectors), -np.inf, dtype=np.float32)
+        exact[rows] = np.asarray(vectors[rows], dtype=np.float32) @ query
+        candidates.append((rows[exact[rows] >= threshold], exact))
+    return candidates
+
+def rank_similar_tasks(task_matrix, input_vectors, threshold=0.85, top_k=None):
+    """
+    Scores every task against each input vector with one matrix product.
+    Per input: tasks with cosine similarity >= threshold, best first, at most ``top_k``.
+    """
+    results = [[] for _ in input_vectors]
+    by_dim = {}
+    for i, vector in enumerate(input_vectors):
+        by_dim.setdefault(len(vector), []).append(i)
+
+    for dim, positions in by_dim.items():
+        if dim not in task_matrix.matrices:
             continue
+        _, rows = task_matrix.matrices[dim]  # rows[i] is -1 for sidecar rows without a task
+        skipped = len(task_matrix) - int(np.count_nonzero(rows >= 0))
+        if skipped:
+            print(f"Skipping {skipped} tasks due to mismatched vector dimensions.")
+        queries = np.array([input_vectors[i] for i in positions], dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        scored = threshold_candidates(task_matrix, dim, queries / np.where(norms == 0, 1.0, norms), threshold)
+
+        for (candidates, column_scores), position in zip(scored, positions):
+            candidates = candidates[rows[candidates] >= 0]
+            if top_k is not None and len(candidates) > top_k:
+                candidates = candidates[np.argpartition(-column_scores[candidates], top_k - 1)[:top_k]]
+            candidates = candidates[np.argsort(-column_scores[candidates], kind="stable")]
+            results[position] = [
+                {
+                    "task_uuid": task_matrix.columns["uuid"][rows[c]],
+                    "verb": task_matrix.columns["verb"][rows[c]],
+                    "workstream": task_matrix.columns["workstream"][rows[c]],
+                    "similarity": float(round(float(column_scores[c]), 4)),
+                    "source_loop_id": task_matrix.columns["source_loop_id"][rows[c]],
+                }
+                for c in candidates
+            ]
+    return results
 
-        similarity = cosine_similarity(input_vector, stored_vector)
+def find_similar_tasks(verb: str, threshold: float = 0.85, db_path="runtime/db/ora.db", top_k=None):
+    """Finds tasks with verbs semantically similar to the input verb."""
+    input_vector = get_embedding(verb)
+    if input_vector is None:
+        return {"error": "Could not generate embedding for the input verb."}
 
-        if similarity >= threshold:
-            similar_tasks.append({
-                "task_uuid": row['uuid'],
-                "verb": row['verb'],
-                "workstream": row['workstream'],
-                "similarity": float(round(similarity, 4)),
-                "source_loop_id": row['source_loop_id']
-            })
+    task_matrix = load_task_matrix(db_path)
+    if task_matrix is None:
+        return {"error": "The 'tasks' table does not exist. Please run the indexer first."}
+    if not len(task_matrix):
+        return []
+    return rank_similar_tasks(task_matrix, [input_vector], threshold, top_k)[0]
+
+def find_similar_tasks_batch(verbs, threshold: float = 0.85, db_path="runtime/db/ora.db", top_k=None):
+    """find_similar_tasks for many verbs: one embedding batch and one matrix product."""
+    verbs = list(verbs)
+    input_vectors = get_embeddings(verbs)
+    task_matrix = load_task_matrix(db_path)
+    if task_matrix is None:
+        return {"error": "The 'tasks' table does not exist. Please run the indexer first."}
 
-    # Sort by similarity score, descending
-    return sorted(similar_tasks, key=lambda x: x['similarity'], reverse=True)
+    embedded = [i for i, vector in enumerate(input_vectors) if vector is not None]
+    ranked = rank_similar_tasks(task_matrix, [input_vectors[i] for i in embedded], threshold, top_k) if len(task_matrix) else []
+    results = [{"error": "Could not generate embedding for the input verb."} for _ in verbs]
+    for i, position in enumerate(embedded):
+        results[position] = ranked[i] if ranked else []
+    return results
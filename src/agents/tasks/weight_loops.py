@@ -3,6 +3,8 @@ from pathlib import Path
 
 import frontmatter
 
+from src.qdrant_utils.insert_to_qdrant import sync_loop_payloads
+
 PROJECTS_PATH = "/Users/air/AIR01/02 Workstreams/Projects"
 PROGRAMS_PATH = "/Users/air/AIR01/02 Workstreams/Programs"
 LOOP_PATH = "/Users/air/AIR01/Retrospectives"
@@ -70,6 +72,7 @@ def update_weight(file_path, feedback_map):
 def main():
     feedback_map = extract_feedback_tags()
     updates = []
+    loop_weights = {}
 
     for folder, type_ in [
         (PROGRAMS_PATH, "program"),
@@ -79,12 +82,16 @@ def main():
         for file in Path(folder).glob("*.md"):
             item_id, weight = update_weight(file, feedback_map)
             updates.append((item_id, weight))
+            if type_ == "loop":
+                loop_weights[item_id] = {"weight": weight}
 
     with open(LOG_PATH, "a", encoding="utf-8") as log:
         for item_id, weight in updates:
             log.write(f"{datetime.now().isoformat()} - {item_id} → weight: {weight}\n")
 
-    print(f"✅ Updated weights for {len(updates)} items.")
+    # query_loops filters on the payload copy of weight inside the search
+    synced = sync_loop_payloads(loop_weights)
+    print(f"✅ Updated weights for {len(updates)} items ({synced} loop payloads synced).")
 
 
 # ✅ Final test for recursive autologging 3
@@ -0,0 +1,240 @@
+"""
+Columnar cache of parsed interaction files for the Interaction Index dashboard.
+
+Parsed interactions are persisted as Parquet next to the interaction files
+(``.interaction_index.parquet``). ``refresh_interaction_index`` diffs filenames,
+sizes and mtimes against the cached columns and only parses new or changed
+files. ``load_interactions`` pushes actor and time filters down to the Parquet
+read, so the dashboard never touches the markdown on a warm start.
+
+Example usage:
+    from src.data.interaction_store import load_interactions
+    df = load_interactions(actors=["user"], since="2025-06-01")
+"""
+
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import pandas as pd
+
+from src.system.frontmatter_reader import read_frontmatter
+from src.system.path_config import RUNTIME_INTERACTIONS_DIR
+
+try:
+    import pyarrow  # noqa: F401  (pandas' Parquet engine)
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+CACHE_FILENAME = ".interaction_index.parquet"
+FILE_PATTERN = re.compile(r"^interaction-.*\.md$")
+MESSAGE_PATTERN = re.compile(r'## 💬 Message\s*\n(.*?)(?=\n## |$)', re.DOTALL)
+OUTCOME_PATTERN = re.compile(r'## 🔄 Outcome\s*\n(.*?)(?=\n## |$)', re.DOTALL)
+
+STRING_COLUMNS = [
+    "uuid", "timestamp", "actor", "source", "context", "message", "outcome",
+    "phase", "workstream", "extra", "parse_error",
+]
+COLUMNS = ["filename", "size", "mtime_ns", "parsed_timestamp", "tags"] + STRING_COLUMNS
+KNOWN_FIELDS = {"uuid", "timestamp", "actor", "source", "context", "tags"}
+
+TimeBound = Optional[Union[str, datetime, pd.Timestamp]]
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def parse_interaction_file(filepath: Path) -> Dict[str, Any]:
+    """Parses one interaction file into a flat row. Failures are kept as rows with ``parse_error``."""
+    row: Dict[str, Any] = {"filename": filepath.name}
+    try:
+        frontmatter, body = read_frontmatter(filepath, metadata_only=False)
+    except Exception as e:
+        row["parse_error"] = str(e)
+        return row
+    if frontmatter is None:
+        row["parse_error"] = "missing frontmatter"
+        return row
+
+    # Extract message and outcome from body
+    message_match = MESSAGE_PATTERN.search(body)
+    outcome_match = OUTCOME_PATTERN.search(body)
+    row["message"] = message_match.group(1).strip() if message_match else ""
+    row["outcome"] = outcome_match.group(1).strip() if outcome_match else ""
+
+    for field in ("uuid", "timestamp", "actor", "source", "context"):
+        row[field] = _text(frontmatter.get(field))
+
+    tags = frontmatter.get("tags")
+    row["tags"] = [str(tag) for tag in tags] if isinstance(tags, list) else []
+
+    # Extract phase from tags if available
+    row["phase"] = next((tag for tag in row["tags"] if tag.startswith("phase-")), None)
+
+    # Extract workstream info
+    context = row["context"] or ""
+    if "loop-" in context:
+        row["workstream"] = "loop"
+    elif "task-" in context:
+        row["workstream"] = "task"
+    elif "phase-" in context:
+        row["workstream"] = "phase"
+    else:
+        row["workstream"] = None
+
+    extra = {k: v for k, v in frontmatter.items() if k not in KNOWN_FIELDS}
+    row["extra"] = json.dumps(extra, default=str) if extra else None
+    return row
+
+
+def _to_frame(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    df = pd.DataFrame(rows).reindex(columns=COLUMNS)
+    df["parsed_timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce", format="mixed")
+    df["tags"] = df["tags"].apply(lambda tags: tags if isinstance(tags, list) else [])
+    for column in STRING_COLUMNS:
+        df[column] = df[column].astype("object").where(df[column].notna(), None)
+    df["size"] = df["size"].astype("int64")
+    df["mtime_ns"] = df["mtime_ns"].astype("int64")
+    return df
+
+
+def scan_interaction_files(interactions_dir: Path) -> Dict[str, tuple]:
+    """``{file name: (size, mtime_ns)}`` for the interaction files in ``interactions_dir``."""
+    files = {}
+    with os.scandir(interactions_dir) as it:
+        for entry in it:
+            if FILE_PATTERN.match(entry.name) and entry.is_file():
+                st = entry.stat()
+                files[entry.name] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def _cache_path(interactions_dir: Path, cache_path: Optional[Path]) -> Path:
+    return Path(cache_path) if cache_path else Path(interactions_dir) / CACHE_FILENAME
+
+
+def _read_cache(cache_path: Path, columns: Optional[List[str]] = None, filters=None) -> Optional[pd.DataFrame]:
+    if not cache_path.exists():
+        return None
+    try:
+        return pd.read_parquet(cache_path, columns=columns, filters=filters)
+    except Exception as e:
+        print(f"⚠️ Rebuilding unreadable interaction cache {cache_path.name}: {e}")
+        return None
+
+
+def refresh_interaction_index(
+    interactions_dir: Path = RUNTIME_INTERACTIONS_DIR, cache_path: Optional[Path] = None
+) -> Dict[str, int]:
+    """Brings the Parquet cache up to date. Only new or changed files are parsed."""
+    interactions_dir = Path(interactions_dir)
+    stats = {"scanned": 0, "parsed": 0, "removed": 0}
+    if not interactions_dir.exists() or not PARQUET_AVAILABLE:
+        return stats
+
+    cache_path = _cache_path(interactions_dir, cache_path)
+    on_disk = scan_interaction_files(interactions_dir)
+    stats["scanned"] = len(on_disk)
+
+    cached = _read_cache(cache_path, columns=["filename", "size", "mtime_ns"])
+    known = {} if cached is None else {
+        name: (size, mtime_ns)
+        for name, size, mtime_ns in zip(cached["filename"], cached["size"], cached["mtime_ns"])
+    }
+
+    changed = [name for name, sig in on_disk.items() if known.get(name) != sig]
+    removed = [name for name in known if name not in on_disk]
+    stats["parsed"], stats["removed"] = len(changed), len(removed)
+    if cached is not None and not changed and not removed:
+        return stats
+
+    rows = []
+    for name in changed:
+        row = parse_interaction_file(interactions_dir / name)
+        row["size"], row["mtime_ns"] = on_disk[name]
+        rows.append(row)
+
+    frames = []
+    if cached is not None and known:
+        keep = _read_cache(cache_path)
+        if keep is not None:
+            frames.append(keep[~keep["filename"].isin(set(changed) | set(removed))])
+    if rows:
+        frames.append(_to_frame(rows))
+    df = pd.concat(frames, ignore_index=True) if frames else _to_frame([])
+    df = df.sort_values("filename", ignore_index=True)
+
+    # Write beside the target and swap so readers never see a partial file
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+    return stats
+
+
+def _timestamp(value: TimeBound) -> pd.Timestamp:
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def load_interactions(
+    interactions_dir: Path = RUNTIME_INTERACTIONS_DIR,
+    cache_path: Optional[Path] = None,
+    actors: Optional[Sequence[str]] = None,
+    since: TimeBound = None,
+    until: TimeBound = None,
+    columns: Optional[List[str]] = None,
+    refresh: bool = True,
+) -> pd.DataFrame:
+    """
+    Returns parsed interactions, newest first. ``actors`` and the ``since``/``until``
+    bounds on ``parsed_timestamp`` are applied by the Parquet reader.
+    """
+    interactions_dir = Path(interactions_dir)
+    if not interactions_dir.exists():
+        return pd.DataFrame()
+
+    if not PARQUET_AVAILABLE:
+        print("⚠️ pyarrow not installed; parsing interactions without a cache")
+        rows = [parse_interaction_file(interactions_dir / name) for name in sorted(scan_interaction_files(interactions_dir))]
+        df = _to_frame(rows) if rows else pd.DataFrame(columns=COLUMNS)
+        if actors:
+            df = df[df["actor"].isin(list(actors))]
+        if since is not None:
+            df = df[df["parsed_timestamp"] >= _timestamp(since)]
+        if until is not None:
+            df = df[df["parsed_timestamp"] <= _timestamp(until)]
+    else:
+        if refresh:
+            refresh_interaction_index(interactions_dir, cache_path)
+        filters = []
+        if actors:
+            filters.append(("actor", "in", list(actors)))
+        if since is not None:
+            filters.append(("parsed_timestamp", ">=", _timestamp(since)))
+        if until is not None:
+            filters.append(("parsed_timestamp", "<=", _timestamp(until)))
+        read_columns = None if columns is None else list(dict.fromkeys(columns + ["parsed_timestamp", "parse_error"]))
+        df = _read_cache(_cache_path(interactions_dir, cache_path), columns=read_columns, filters=filters or None)
+        if df is None:
+            return pd.DataFrame()
+
+    df = df[df["parse_error"].isna()].drop(columns=["parse_error"])
+    if "tags" in df.columns:
+        df["tags"] = df["tags"].apply(lambda tags: [] if tags is None else list(tags))
+    df = df.sort_values("parsed_timestamp", ascending=False, na_position="last")
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df.reset_index(drop=True)
+
+
+def list_parse_errors(interactions_dir: Path = RUNTIME_INTERACTIONS_DIR, cache_path: Optional[Path] = None) -> pd.DataFrame:
+    """Files that failed to parse, with the reason."""
+    df = _read_cache(_cache_path(interactions_dir, cache_path), columns=["filename", "parse_error"])
+    if df is None:
+        return pd.DataFrame(columns=["filename", "parse_error"])
+    return df[df["parse_error"].notna()].reset_index(drop=True)
@@ -1,9 +1,11 @@
 import os
 import sqlite3
 
-import frontmatter
 import pandas as pd
 
+from src.system.frontmatter_reader import read_frontmatter
+from src.system.loop_index import get_loop_index
+
 
 def load_promotable_loops(db_path, loops_dir, roadmap_dir):
     """
@@ -12,14 +14,9 @@ def load_promotable_loops(db_path, loops_dir, roadmap_dir):
     # 1. Get promoted UUIDs
     promoted_uuids = set()
     if roadmap_dir.exists():
-        for fname in os.listdir(roadmap_dir):
-            if fname.endswith(".md"):
-                try:
-                    post = frontmatter.load(roadmap_dir / fname)
-                    if "origin_loop" in post:
-                        promoted_uuids.add(post["origin_loop"])
-                except Exception:
-                    pass
+        for entry in get_loop_index(roadmap_dir).entries():
+            if "origin_loop" in entry.frontmatter:
+                promoted_uuids.add(entry.frontmatter["origin_loop"])
 
     # 2. Get all loops from DB
     all_loops = []
@@ -35,14 +32,9 @@ def load_promotable_loops(db_path, loops_dir, roadmap_dir):
     promotable_loops = []
     if loops_dir.exists():
         all_loop_files_by_uuid = {}
-        for f in os.listdir(loops_dir):
-            if f.endswith(".md"):
-                try:
-                    post = frontmatter.load(loops_dir / f)
-                    if "uuid" in post:
-                        all_loop_files_by_uuid[post.get("uuid")] = f
-                except Exception:
-                    continue # Ignore malformed files
+        for entry in get_loop_index(loops_dir).entries():
+            if "uuid" in entry.frontmatter:  # Malformed files index with empty frontmatter
+                all_loop_files_by_uuid[entry.frontmatter["uuid"]] = entry.name
 
         for loop in all_loops:
             if loop["uuid"] in all_loop_files_by_uuid and loop["uuid"] not in promoted_uuids:
@@ -74,15 +66,15 @@ def load_workstream_view_data(db_path, loops_dir):
         for fname in os.listdir(loops_dir):
             if fname.endswith(".md"):
                 try:
-                    post = frontmatter.load(loops_dir / fname)
-                    metadata = post.metadata
+                    metadata, content = read_frontmatter(loops_dir / fname, metadata_only=False)
+                    metadata = metadata or {}
                     all_loops.append({
                         "uuid": metadata.get("uuid"),
                         "title": metadata.get("title", "Untitled"),
                         "workstream": metadata.get("workstream"),
                         "status": metadata.get("status", "unknown"),
                         "tags": metadata.get("tags", []),
-                        "content": post.content
+                        "content": content.strip()
                     })
                 except Exception as e:
                     print(f"DEBUG: Error loading {fname}: {e}") # DEBUG
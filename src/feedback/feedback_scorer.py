@@ -4,6 +4,8 @@ from typing import Any, Dict, List  # Added for type hinting
 
 import yaml
 
+from src.system.loop_index import get_loop_index
+
 # Determine project root assuming this script is in src/feedback/feedback_scorer.py
 project_root = Path(__file__).resolve().parent.parent.parent
 LOOP_DIR = project_root / "runtime/loops"
@@ -23,30 +25,15 @@ def score_feedback_from_loops() -> List[Dict[str, Any]]:
         print(f"Warning: Loop directory not found: {LOOP_DIR}")
         return results
 
-    for path in LOOP_DIR.glob("*.md"):
-        try:
-            raw_content = path.read_text(encoding="utf-8")
-            parts = raw_content.split("---", 2)
-            if len(parts) < 3:
-                print(f"Warning: Malformed file (no valid frontmatter section): {path.name}")
-                continue
-
-            frontmatter = yaml.safe_load(parts[1])
-            if not isinstance(frontmatter, dict):
-                print(f"Warning: Frontmatter in {path.name} is not a dictionary. Skipping.")
-                frontmatter = {} # Ensure frontmatter is a dict to avoid errors on .get
-                # Or skip this file if frontmatter is critical and invalid:
-                # continue
-
-        except yaml.YAMLError as e:
-            print(f"Error parsing YAML frontmatter in {path.name}: {e}. Skipping.")
+    for entry in get_loop_index(LOOP_DIR).entries():
+        if entry.error:
+            print(f"Error parsing YAML frontmatter in {entry.name}: {entry.error}. Skipping.")
             continue
-        except FileNotFoundError:
-            print(f"Error: File not found during processing (should not happen if glob succeeded): {path.name}")
-            continue
-        except Exception as e:
-            print(f"An unexpected error occurred reading/parsing {path.name}: {e}. Skipping.")
+        if not entry.has_frontmatter:
+            print(f"Warning: Malformed file (no valid frontmatter section): {entry.name}")
             continue
+        frontmatter = entry.frontmatter
+        path = entry.path
 
         raw_feedback_tags = frontmatter.get("feedback_tags")
         feedback_tags_list: List[str] = []
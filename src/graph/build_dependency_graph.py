@@ -1,24 +1,58 @@
 # /Users/air/ea_assistant/query_dependency_graph.py
 
 import argparse
+import hashlib
+import os
 import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
-import frontmatter
+from src.system.frontmatter_reader import load_yaml, read_header
 
 # Configuration
 BASE_DIR = Path(__file__).parent.parent  # Go up one level to project root
 GRAPH_DB = BASE_DIR / "data" / "dependency_graph.db"
 VAULT_PATH = Path("/Users/air/AIR01")
 
+# Frontmatter key -> (node type, edge reason)
+LINK_FIELDS: List[Tuple[str, str, str]] = [
+    ("loop", "loop", "linked_loop"),
+    ("project", "project", "linked_project"),
+    ("person", "person", "linked_person"),
+    ("goal", "goal", "linked_goal"),
+]
+PARALLEL_THRESHOLD = 256  # Below this many changed files a process pool costs more than it saves
+
 
 # Initialization
-def init_db() -> None:
-    with sqlite3.connect(GRAPH_DB) as conn:
+def init_db(db_path: Path = GRAPH_DB) -> None:
+    with sqlite3.connect(db_path) as conn:
         c = conn.cursor()
         c.execute("CREATE TABLE IF NOT EXISTS nodes (id TEXT PRIMARY KEY, type TEXT)")
         c.execute("CREATE TABLE IF NOT EXISTS edges (from_id TEXT, to_id TEXT, reason TEXT)")
+        has_unique = c.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_edges_unique'"
+        ).fetchone()
+        if not has_unique:
+            # Older databases accumulated duplicate edges on every rerun; collapse them
+            # before the unique index can be created.
+            c.execute("""
+                DELETE FROM edges WHERE rowid NOT IN (
+                    SELECT MIN(rowid) FROM edges GROUP BY from_id, to_id, reason
+                )
+            """)
+            c.execute("CREATE UNIQUE INDEX idx_edges_unique ON edges (from_id, to_id, reason)")
+        c.execute("CREATE INDEX IF NOT EXISTS idx_edges_to ON edges (to_id)")
+        c.execute("""
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            )
+        """)
         conn.commit()
 
 
@@ -29,11 +63,46 @@ def add_node(conn: sqlite3.Connection, node_id: str, node_type: str) -> None:
 
 def add_edge(conn: sqlite3.Connection, from_id: str, to_id: str, reason: str) -> None:
     conn.execute(
-        "INSERT INTO edges (from_id, to_id, reason) VALUES (?, ?, ?)",
+        "INSERT OR IGNORE INTO edges (from_id, to_id, reason) VALUES (?, ?, ?)",
         (from_id, to_id, reason),
     )
 
 
+def derive_links(fm: Dict[str, Any]) -> List[Tuple[str, str, str]]:
+    """Returns (target_id, target_type, reason) for every link declared in the frontmatter."""
+    links: List[Tuple[str, str, str]] = []
+    for key, node_type, reason in LINK_FIELDS:
+        if key not in fm or fm[key] is None:
+            continue
+        values = fm[key] if isinstance(fm[key], list) else [fm[key]]
+        for value in values:
+            target = str(value)
+            if key == "goal":
+                target = f"goal:{target[:64]}"
+            links.append((target, node_type, reason))
+    return links
+
+
+def parse_file(path_str: str) -> Dict[str, Any]:
+    """Hashes one file and derives its links. Runs in worker processes, so it only returns plain data."""
+    path = Path(path_str)
+    result: Dict[str, Any] = {"path": path_str, "links": [], "error": None}
+    try:
+        raw = path.read_bytes()
+        st = path.stat()
+    except OSError as e:
+        result.update(sha256="", size=0, mtime_ns=0, error=str(e))
+        return result
+    result.update(sha256=hashlib.sha256(raw).hexdigest(), size=st.st_size, mtime_ns=st.st_mtime_ns)
+    try:
+        header, _ = read_header(path)
+        fm = load_yaml(header) if header is not None else {}
+        result["links"] = derive_links(fm if isinstance(fm, dict) else {})
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
 def fix_frontmatter(file_path: Path) -> bool:
     with open(file_path) as f:
         content = f.read()
@@ -84,73 +153,96 @@ def validate_frontmatter(file_path: Path) -> bool:
     return False
 
 
-def scan_md_files() -> None:
-    all_files = list(VAULT_PATH.rglob("*.md"))
+def _parse_all(paths: List[str], workers: Optional[int]) -> List[Dict[str, Any]]:
+    workers = workers or os.cpu_count() or 1
+    if len(paths) < PARALLEL_THRESHOLD or workers == 1:
+        return [parse_file(p) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(parse_file, paths, chunksize=64))
+
+
+def scan_md_files(
+    vault_path: Path = VAULT_PATH,
+    db_path: Path = GRAPH_DB,
+    workers: Optional[int] = None,
+    full: bool = False,
+) -> Dict[str, int]:
+    """
+    Incrementally rebuilds the graph for ``vault_path``. Files whose size and mtime
+    match the stored entry are skipped without being read; changed files are hashed
+    and parsed across a process pool, and only files whose content hash changed get
+    their edges re-derived. Deleted files lose their node and outgoing edges.
+    """
+    stats = {"scanned": 0, "parsed": 0, "changed": 0, "deleted": 0, "skipped": 0}
     skipped_files: List[Tuple[Path, str]] = []
-    with sqlite3.connect(GRAPH_DB) as conn:
-        for file_path in all_files:
-            relative_id = str(file_path.relative_to(VAULT_PATH))
-            add_node(conn, relative_id, "file")
-
-            try:
-                post = frontmatter.load(file_path)
-                fm = post.metadata
-
-                # Link to loop
-                if "loop" in fm:
-                    loop_id = fm["loop"]
-                    add_node(conn, loop_id, "loop")
-                    add_edge(conn, relative_id, loop_id, "linked_loop")
-
-                # Link to project
-                if "project" in fm:
-                    project_id = fm["project"]
-                    add_node(conn, project_id, "project")
-                    add_edge(conn, relative_id, project_id, "linked_project")
-
-                # Link to person
-                if "person" in fm:
-                    person_id = fm["person"]
-                    add_node(conn, person_id, "person")
-                    add_edge(conn, relative_id, person_id, "linked_person")
-
-                # Link to goal
-                if "goal" in fm:
-                    goal = fm["goal"]
-                    goal_id = f"goal:{goal[:64]}"
-                    add_node(conn, goal_id, "goal")
-                    add_edge(conn, relative_id, goal_id, "linked_goal")
-
-            except Exception as e:
-                print(f"⚠️ Failed to parse {file_path}: {e}")
-                # Attempt to fix the frontmatter
+
+    with sqlite3.connect(db_path) as conn:
+        known = {
+            row[0]: row[1:]
+            for row in conn.execute("SELECT path, size, mtime_ns, sha256 FROM file_hashes")
+        }
+
+        seen = set()
+        candidates: List[str] = []
+        for file_path in vault_path.rglob("*.md"):
+            relative_id = str(file_path.relative_to(vault_path))
+            seen.add(relative_id)
+            st = file_path.stat()
+            stored = known.get(relative_id)
+            if full or stored is None or stored[0] != st.st_size or stored[1] != st.st_mtime_ns:
+                candidates.append(str(file_path))
+        stats["scanned"] = len(seen)
+        deleted = [rel for rel in known if rel not in seen]
+
+        results = _parse_all(candidates, workers)
+        stats["parsed"] = len(results)
+
+        changed: List[Tuple[str, List[Tuple[str, str, str]]]] = []
+        hash_rows = []
+        for result in results:
+            file_path = Path(result["path"])
+            relative_id = str(file_path.relative_to(vault_path))
+            if result["error"]:
+                print(f"⚠️ Failed to parse {file_path}: {result['error']}")
+                # Attempt to fix the frontmatter, then parse again in-process
                 if fix_frontmatter(file_path):
-                    try:
-                        post = frontmatter.load(file_path)
-                        fm = post.metadata
-                        # Re-process the file after fixing
-                        if "loop" in fm:
-                            loop_id = fm["loop"]
-                            add_node(conn, loop_id, "loop")
-                            add_edge(conn, relative_id, loop_id, "linked_loop")
-                        if "project" in fm:
-                            project_id = fm["project"]
-                            add_node(conn, project_id, "project")
-                            add_edge(conn, relative_id, project_id, "linked_project")
-                        if "person" in fm:
-                            person_id = fm["person"]
-                            add_node(conn, person_id, "person")
-                            add_edge(conn, relative_id, person_id, "linked_person")
-                        if "goal" in fm:
-                            goal = fm["goal"]
-                            goal_id = f"goal:{goal[:64]}"
-                            add_node(conn, goal_id, "goal")
-                            add_edge(conn, relative_id, goal_id, "linked_goal")
-                    except Exception as e2:
-                        print(f"⚠️ Failed to parse {file_path} even after fixing: {e2}")
-                        skipped_files.append((file_path, str(e2)))
-                else:
-                    skipped_files.append((file_path, str(e)))
+                    result = parse_file(str(file_path))
+                if result["error"]:
+                    skipped_files.append((file_path, result["error"]))
+            hash_rows.append((relative_id, result["size"], result["mtime_ns"], result["sha256"]))
+            stored = known.get(relative_id)
+            if not full and stored is not None and stored[2] == result["sha256"]:
+                continue  # Touched but not modified
+            changed.append((relative_id, result["links"]))
+        stats["changed"] = len(changed)
+        stats["deleted"] = len(deleted)
+        stats["skipped"] = len(skipped_files)
+
+        # One transaction for the whole delta
+        conn.executemany("DELETE FROM edges WHERE from_id = ?", [(rel,) for rel, _ in changed])
+        conn.executemany("DELETE FROM edges WHERE from_id = ?", [(rel,) for rel in deleted])
+        conn.executemany("DELETE FROM nodes WHERE id = ?", [(rel,) for rel in deleted])
+        conn.executemany("DELETE FROM file_hashes WHERE path = ?", [(rel,) for rel in deleted])
+        conn.executemany(
+            "INSERT OR IGNORE INTO nodes (id, type) VALUES (?, ?)",
+            [(rel, "file") for rel, _ in changed]
+            + [(target, node_type) for _, links in changed for target, node_type, _ in links],
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO edges (from_id, to_id, reason) VALUES (?, ?, ?)",
+            [(rel, target, reason) for rel, links in changed for target, _, reason in links],
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+            hash_rows,
+        )
+        if changed or deleted:
+            # Drop loop/project/person/goal nodes that nothing links to any more
+            conn.execute("""
+                DELETE FROM nodes WHERE type != 'file'
+                AND id NOT IN (SELECT to_id FROM edges)
+                AND id NOT IN (SELECT from_id FROM edges)
+            """)
         conn.commit()
 
     if skipped_files:
@@ -164,6 +256,8 @@ def scan_md_files() -> None:
             for file, err in skipped_files:
                 f.write(f"- **{file}**\n    - Error: `{err}`\n")
 
+    return stats
+
 
 def get_connections(node_id: str) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str]]]:
     with sqlite3.connect(GRAPH_DB) as conn:
@@ -192,7 +286,18 @@ def main() -> None:
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dependency graph incrementally.")
+    parser.add_argument("--vault", type=Path, default=VAULT_PATH, help="Vault root to scan")
+    parser.add_argument("--full", action="store_true", help="Re-derive edges for every file")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    args = parser.parse_args()
+
     print("🧠 Building dependency graph...")
+    started = time.perf_counter()
     init_db()
-    scan_md_files()
-    print(f"✅ Graph updated: {GRAPH_DB}")
+    stats = scan_md_files(args.vault, workers=args.workers, full=args.full)
+    print(
+        f"✅ Graph updated: {GRAPH_DB} "
+        f"({stats['scanned']} scanned, {stats['changed']} changed, {stats['deleted']} deleted "
+        f"in {time.perf_counter() - started:.2f}s)"
+    )
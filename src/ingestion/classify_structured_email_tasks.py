@@ -10,15 +10,15 @@ import logging
 from datetime import datetime
 from pathlib import Path
 
-import openai
-from qdrant_client import QdrantClient
+from src.memory.collection_registry import verify_collection
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import lazy_qdrant_client
 
 SIGNAL_FILE = Path("/Users/air/AIR01/0001-HQ/Signal_Tasks.md")
 RETRO_DIR = Path("/Users/air/AIR01/Retrospectives")
 COLLECTION_NAME = "loop_embeddings"
 
-client = openai.OpenAI()
-qdrant = QdrantClient(host="localhost", port=6333)
+qdrant = lazy_qdrant_client()
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -27,12 +27,15 @@ logger = logging.getLogger(__name__)
 
 
 def embed(text):
-    response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-    return response.data[0].embedding
+    vector = get_provider().embed_one(text)
+    if vector is None:
+        raise RuntimeError("Failed to embed task text")
+    return vector
 
 
-def classify_task(text):
-    vector = embed(text)
+def classify_task(text, vector=None):
+    if vector is None:
+        vector = embed(text)
     results = qdrant.search(
         collection_name=COLLECTION_NAME, query_vector=vector, limit=3, with_payload=True
     )
@@ -72,12 +75,21 @@ def classify_and_route_tasks():
     updated_lines = []
     archived_lines = []
 
+    # Embed every pending task up front in batched requests
+    pending = [
+        line.split("Follow up on:")[-1].strip()
+        for line in lines
+        if line.strip().startswith("- [ ]") and "#classified" not in line and "#ignore" not in line
+    ]
+    verify_collection(COLLECTION_NAME, get_provider(), client=qdrant)
+    vectors = dict(zip(pending, get_provider().embed(pending)))
+
     for line in lines:
         if line.strip().startswith("- [ ]") and "#classified" not in line:
             if "#ignore" in line:
                 continue
             content = line.split("Follow up on:")[-1].strip()
-            tags, loop_id, score = classify_task(content)
+            tags, loop_id, score = classify_task(content, vectors.get(content))
 
             if score < min_conf and "#force-route" not in line:
                 archived_lines.append(line + " #low_confidence #archived")
@@ -1,5 +1,325 @@
-"""Monitors file changes."""
+"""
+Monitors file changes.
 
+``VaultWatcher`` wraps a watchdog observer around runtime/loops,
+runtime/interactions and the vault. Raw filesystem events are debounced and
+coalesced per path, so an editor's save (or a tmp-file + rename atomic write)
+reaches handlers as a single ``ChangeEvent`` once the path has been quiet for
+``debounce`` seconds:
 
-def watch():
-    pass
+    created + modified   -> created
+    created + deleted    -> (nothing)
+    deleted + created    -> modified
+    tmp file moved in    -> modified
+    a -> b, then b -> c  -> moved a -> c
+
+Example usage:
+    from src.ingestion.watcher import VaultWatcher
+
+    watcher = VaultWatcher()
+    watcher.subscribe(lambda event: print(event.kind, event.path), kinds=["modified"])
+    with watcher:
+        ...
+"""
+
+import fnmatch
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+from src.system.path_config import (
+    RUNTIME_INTERACTIONS_DIR,
+    RUNTIME_LOOPS_DIR,
+    VAULT_PATH,
+)
+
+CREATED = "created"
+MODIFIED = "modified"
+MOVED = "moved"
+DELETED = "deleted"
+CHANGE_KINDS = (CREATED, MODIFIED, MOVED, DELETED)
+
+DEFAULT_ROOTS = [RUNTIME_LOOPS_DIR, RUNTIME_INTERACTIONS_DIR, VAULT_PATH]
+DEFAULT_PATTERNS = ("*.md",)
+IGNORE_PATTERNS = (".*", "*~", "*.tmp", "*.swp", "*.part")
+DEBOUNCE_SECONDS = 0.5
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    kind: str                         # created / modified / moved / deleted
+    path: Path                        # Current path (destination for moves)
+    root: Path                        # Watched root the path belongs to
+    src_path: Optional[Path] = None   # Original path for moves
+    timestamp: float = 0.0            # time.time() of the last raw event
+
+
+@dataclass
+class _Pending:
+    kind: str
+    src_path: Optional[Path]
+    last_seen: float
+    wall_time: float = 0.0
+
+
+class ChangeCoalescer:
+    """Collapses bursts of raw events into one pending change per path."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._pending: Dict[Path, _Pending] = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, kind: str, path: Path, dest_path: Optional[Path] = None) -> None:
+        now = self._clock()
+        prev = self._pending.get(path)
+        wall = time.time()
+
+        if kind == MOVED:
+            self._pending.pop(path, None)
+            if prev and prev.kind == CREATED:
+                self._pending[dest_path] = _Pending(CREATED, None, now, wall)
+            else:
+                origin = prev.src_path if prev and prev.kind == MOVED else path
+                if origin == dest_path:   # Moved back to where it started
+                    self._pending[dest_path] = _Pending(MODIFIED, None, now, wall)
+                else:
+                    self._pending[dest_path] = _Pending(MOVED, origin, now, wall)
+            return
+
+        if kind == CREATED:
+            new_kind = MODIFIED if prev and prev.kind in (DELETED, MODIFIED) else CREATED
+            self._pending[path] = _Pending(new_kind, None, now, wall)
+        elif kind == MODIFIED:
+            if prev and prev.kind in (CREATED, MOVED):
+                prev.last_seen, prev.wall_time = now, wall
+            else:
+                self._pending[path] = _Pending(MODIFIED, None, now, wall)
+        elif kind == DELETED:
+            if prev and prev.kind == CREATED:
+                del self._pending[path]
+            elif prev and prev.kind == MOVED:
+                del self._pending[path]
+                self._pending[prev.src_path] = _Pending(DELETED, None, now, wall)
+            else:
+                self._pending[path] = _Pending(DELETED, None, now, wall)
+
+    def drain(self, quiet: float, force: bool = False) -> List[tuple]:
+        """Returns (kind, path, src_path, wall_time) for every path quiet for ``quiet`` seconds."""
+        now = self._clock()
+        ready = [
+            path for path, pending in self._pending.items()
+            if force or now - pending.last_seen >= quiet
+        ]
+        drained = []
+        for path in ready:
+            pending = self._pending.pop(path)
+            drained.append((pending.kind, path, pending.src_path, pending.wall_time))
+        return drained
+
+    def next_deadline(self, quiet: float) -> Optional[float]:
+        if not self._pending:
+            return None
+        return min(p.last_seen for p in self._pending.values()) + quiet
+
+
+@dataclass
+class _Subscription:
+    handler: Callable[[ChangeEvent], None]
+    kinds: Optional[frozenset]
+    root: Optional[Path]
+
+
+class _ObserverBridge(FileSystemEventHandler):
+    def __init__(self, watcher: "VaultWatcher"):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type not in CHANGE_KINDS:
+            return
+        dest = getattr(event, "dest_path", None)
+        self.watcher._record(event.event_type, Path(event.src_path), Path(dest) if dest else None)
+
+
+class VaultWatcher:
+    def __init__(
+        self,
+        roots: Optional[Iterable[Path]] = None,
+        patterns: Sequence[str] = DEFAULT_PATTERNS,
+        ignore_patterns: Sequence[str] = IGNORE_PATTERNS,
+        debounce: float = DEBOUNCE_SECONDS,
+    ):
+        self.roots = [Path(r).resolve() for r in (roots if roots is not None else DEFAULT_ROOTS)]
+        self.patterns = tuple(patterns)
+        self.ignore_patterns = tuple(ignore_patterns)
+        self.debounce = debounce
+        self._coalescer = ChangeCoalescer()
+        self._subscriptions: List[_Subscription] = []
+        self._cond = threading.Condition()
+        self._observer = None
+        self._dispatcher = None
+        self._stopping = False
+
+    # --- Registration -----------------------------------------------------
+
+    def subscribe(
+        self,
+        handler: Callable[[ChangeEvent], None],
+        kinds: Optional[Iterable[str]] = None,
+        root: Optional[Path] = None,
+    ) -> Callable[[ChangeEvent], None]:
+        """Registers ``handler``, optionally limited to some change kinds and one watched root."""
+        kinds = frozenset(kinds) if kinds else None
+        if kinds and not kinds <= set(CHANGE_KINDS):
+            raise ValueError(f"Unknown change kinds: {sorted(kinds - set(CHANGE_KINDS))}")
+        with self._cond:
+            self._subscriptions.append(
+                _Subscription(handler, kinds, Path(root).resolve() if root else None)
+            )
+        return handler
+
+    def unsubscribe(self, handler: Callable[[ChangeEvent], None]) -> None:
+        with self._cond:
+            self._subscriptions = [s for s in self._subscriptions if s.handler is not handler]
+
+    # --- Lifecycle --------------------------------------------------------
+
+    def start(self) -> "VaultWatcher":
+        if self._observer:
+            return self
+        self._stopping = False
+        self._observer = Observer()
+        bridge = _ObserverBridge(self)
+        for root in self.roots:
+            if root.is_dir():
+                self._observer.schedule(bridge, str(root), recursive=True)
+            else:
+                print(f"⚠️ Watch root not found, skipping: {root}")
+        self._observer.start()
+        self._dispatcher = threading.Thread(target=self._dispatch_loop, name="vault-watcher", daemon=True)
+        self._dispatcher.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops watching and delivers anything still pending."""
+        if not self._observer:
+            return
+        self._observer.stop()
+        self._observer.join()
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        self._dispatcher.join()
+        self._observer = self._dispatcher = None
+        self.flush()
+
+    def __enter__(self) -> "VaultWatcher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def flush(self) -> List[ChangeEvent]:
+        """Publishes every pending change immediately, ignoring the debounce window."""
+        with self._cond:
+            ready = self._coalescer.drain(self.debounce, force=True)
+        return self._publish(ready)
+
+    # --- Internals --------------------------------------------------------
+
+    def _matches(self, path: Path) -> bool:
+        name = path.name
+        if any(fnmatch.fnmatch(name, pat) for pat in self.ignore_patterns):
+            return False
+        if not self.patterns:
+            return True
+        return any(fnmatch.fnmatch(name, pat) for pat in self.patterns)
+
+    def _root_for(self, path: Path) -> Optional[Path]:
+        candidates = [r for r in self.roots if path == r or r in path.parents]
+        return max(candidates, key=lambda r: len(r.parts)) if candidates else None
+
+    def _record(self, kind: str, path: Path, dest: Optional[Path] = None) -> None:
+        """Feeds one raw event into the coalescer (also used directly by tests)."""
+        if kind == MOVED:
+            src_ok, dest_ok = self._matches(path), self._matches(dest)
+            if not src_ok and not dest_ok:
+                return
+            if not src_ok:
+                kind, path, dest = MODIFIED, dest, None   # Atomic write: tmp file renamed into place
+            elif not dest_ok:
+                kind, dest = DELETED, None                # Renamed to something we don't track
+        elif not self._matches(path):
+            return
+        with self._cond:
+            self._coalescer.add(kind, path, dest)
+            self._cond.notify_all()
+
+    def _dispatch_loop(self) -> None:
+        while True:
+            with self._cond:
+                deadline = self._coalescer.next_deadline(self.debounce)
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if not self._stopping and (timeout is None or timeout > 0):
+                    self._cond.wait(timeout)
+                if self._stopping:
+                    return
+                ready = self._coalescer.drain(self.debounce)
+            self._publish(ready)
+
+    def _publish(self, ready: List[tuple]) -> List[ChangeEvent]:
+        events = []
+        with self._cond:
+            subscriptions = list(self._subscriptions)
+            for kind, path, src_path, wall_time in ready:
+                root = self._root_for(path) or self._root_for(src_path or path)
+                events.append(ChangeEvent(
+                    kind=kind,
+                    path=path,
+                    root=root,
+                    src_path=src_path,
+                    timestamp=wall_time,
+                ))
+        for event in events:
+            for sub in subscriptions:
+                if sub.kinds and event.kind not in sub.kinds:
+                    continue
+                if sub.root and sub.root != event.root:
+                    continue
+                try:
+                    sub.handler(event)
+                except Exception as e:
+                    print(f"❌ Watch handler {getattr(sub.handler, '__name__', sub.handler)} failed for {event.path}: {e}")
+        return events
+
+
+def log_event(event: ChangeEvent) -> None:
+    if event.kind == MOVED:
+        print(f"🔁 {event.kind}: {event.src_path} → {event.path}")
+    else:
+        print(f"📝 {event.kind}: {event.path}")
+
+
+def watch(roots: Optional[Iterable[Path]] = None, handlers: Iterable[Callable[[ChangeEvent], None]] = (log_event,)):
+    """Blocks, publishing debounced change events until interrupted."""
+    watcher = VaultWatcher(roots)
+    for handler in handlers:
+        watcher.subscribe(handler)
+    print(f"👀 Watching {', '.join(str(r) for r in watcher.roots)}")
+    with watcher:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print("🛑 Stopping watcher")
+
+
+if __name__ == "__main__":
+    watch()
@@ -1,7 +1,8 @@
-from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
 
-client = QdrantClient(host="localhost", port=6333)
+from src.memory.qdrant_clients import get_qdrant_client
+
+client = get_qdrant_client()
 
 client.recreate_collection(
     collection_name="test_collection",
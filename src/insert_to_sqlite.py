@@ -8,6 +8,7 @@ import sqlite3
 from datetime import date
 from pathlib import Path
 
+from src.qdrant_utils.insert_to_qdrant import sync_loop_payload
 from src.system.path_config import LOOP_MEMORY_DB
 
 # Ensure the database directory exists
@@ -54,3 +55,6 @@ def insert_to_sqlite(loop_id, summary, metadata):
     conn.commit()
     conn.close()
     print(f"✅ Inserted {loop_id} into SQLite at {LOOP_MEMORY_DB}")
+
+    # query_loops filters on the payload copy of status inside the search
+    sync_loop_payload(loop_id, status=metadata["status"])
@@ -2,7 +2,8 @@ import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 
-from src.path_config import DB_LOOP_FEEDBACK
+from src.system.loop_index import get_loop_index
+from src.system.path_config import DB_LOOP_FEEDBACK
 
 # Config
 LOOP_DIR = "/Users/air/AIR01/Retrospectives/loops"
@@ -12,16 +13,16 @@ OUTPUT_FILE = "/Users/air/AIR01/System/Dashboards/loop-status.md"
 def count_loop_files():
     open_loops = closed_loops = verified_loops = 0
     total_loops = 0
-    for file in Path(LOOP_DIR).glob("*.md"):
-        with open(file) as f:
-            content = f.read()
-            if "status: open" in content:
-                open_loops += 1
-            elif "status: closed" in content:
-                closed_loops += 1
-            if "verified: true" in content:
-                verified_loops += 1
-            total_loops += 1
+    # Frontmatter comes from the shared loop index: only changed files are re-read
+    for entry in get_loop_index(Path(LOOP_DIR)).entries("*.md"):
+        status = str(entry.frontmatter.get("status", "")).strip().lower()
+        if status == "open":
+            open_loops += 1
+        elif status == "closed":
+            closed_loops += 1
+        if entry.frontmatter.get("verified") is True:
+            verified_loops += 1
+        total_loops += 1
     return total_loops, open_loops, closed_loops, verified_loops
 
 
@@ -1,15 +1,21 @@
 # For example usage (if __name__ == "__main__"):
+import time
 import traceback
+from dataclasses import dataclass, field
 from datetime import datetime  # Keep for __main__ if it uses it
 from pathlib import Path
-from typing import Any, Dict, List  # Added for type hinting
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # Added for type hinting
 
 import yaml
 
 from src.loops.loop_creator import LOOP_DIR as creator_loop_dir
 from src.loops.loop_creator import create_loop_from_signal  # Keep for __main__
-from src.qdrant.query import find_nearest_project_match  # fallback via Qdrant
+from src.qdrant.query import (  # fallback via Qdrant
+    find_nearest_project_match,
+    find_nearest_project_matches,
+)
 from src.signals.collector import Signal  # Keep for __main__
+from src.system.frontmatter_reader import read_frontmatter
 
 TAG_PROJECT_MAP: Dict[str, str] = {
     "#ora": "Ora Executive Assistant",
@@ -24,25 +30,19 @@ PHASE_TAGS: Dict[str, str] = {
 def extract_tags(text: str) -> List[str]:
     return [word for word in text.split() if word.startswith("#") or word.startswith("@")]
 
-# Updated function definition: find_nearest_match_func argument removed
-def route_loop_to_project(loop_path: Path) -> Dict[str, Any]:
-    raw = loop_path.read_text(encoding="utf-8")
-    # Split only on the first two --- to correctly separate frontmatter, ---, and body
-    parts = raw.split("---", 2)
-    if len(parts) < 3:
-        raise ValueError(f"Malformed loop file (could not split frontmatter and body): {loop_path}")
-
+def _read_loop(loop_path: Path) -> Tuple[Dict[str, Any], str]:
     try:
-        frontmatter = yaml.safe_load(parts[1])
-        if not isinstance(frontmatter, dict):
-            # Handle cases where frontmatter is not a dict (e.g. empty or just a string)
-            print(f"Warning: Frontmatter in {loop_path} is not a dictionary. Initializing empty frontmatter.")
-            frontmatter = {}
+        # Non-mapping frontmatter (e.g. empty or just a string) comes back as {}
+        frontmatter, body = read_frontmatter(loop_path, metadata_only=False)
     except yaml.YAMLError as e:
         raise ValueError(f"Invalid YAML frontmatter in {loop_path}: {e}")
+    if frontmatter is None:
+        raise ValueError(f"Malformed loop file (could not split frontmatter and body): {loop_path}")
+    return frontmatter, body.strip() # Ensure body is stripped here
 
-    body = parts[2].strip() # Ensure body is stripped here
 
+def route_from_tags(frontmatter: Dict[str, Any], body: str) -> Tuple[Optional[str], Optional[str]]:
+    """Project and phase named by tags in the body or the frontmatter (None where no tag applies)."""
     # Extract tags from the main body content first
     body_tags = extract_tags(body)
     project = None
@@ -58,48 +58,119 @@ def route_loop_to_project(loop_path: Path) -> Dict[str, Any]:
             project = TAG_PROJECT_MAP[tag]
         if tag in PHASE_TAGS:
             phase = PHASE_TAGS[tag]
-
-    score = 0.0 # Default score
-
-    # Fallback to embedding if tags not found
-    if not project or not phase:
-        # Directly call the imported find_nearest_project_match
-        vector_result = find_nearest_project_match(body)
+    return project, phase
+
+
+def _apply_route(
+    loop_path: Path,
+    frontmatter: Dict[str, Any],
+    project: Optional[str],
+    phase: Optional[str],
+    vector_result: Optional[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """Routing fields for the loop: tags win, the embedding match fills the gaps and sets the score."""
+    if vector_result is None: # Tags provided both project and phase
+        score = 1.0
+    else:
         project = project or vector_result.get("project")
         phase = phase or vector_result.get("phase")
         score = vector_result.get("score", 0.0)
         if vector_result.get("error"):
             print(f"Warning: Embedding fallback for {loop_path.name} encountered an error: {vector_result.get('error')}")
-    elif project and phase: # If tags provided both, score is 1.0
-        score = 1.0
-    # If only one is provided by tags, and the other is found by embedding, score might be adjusted.
-    # Current logic uses the embedding score if embedding is called.
-    # If one is from tag and other from embedding, what should score be? Let's use embedding score or 0.75 if tag helped.
-    elif (project and not phase) or (not project and phase): # One found by tag, other might be found by embedding (already handled by above block)
-        # This case is implicitly handled by the logic above.
-        # If, for instance, project was found by tag, but phase was not,
-        # the (not project or not phase) condition is true, embedding is called.
-        # project remains set, phase gets updated from embedding, score is from embedding.
-        # We could argue for a higher base score if a tag match contributed.
-        if project or phase: # At least one was found by a tag initially
-             score = max(score, 0.75) # Boost score if a tag contributed something
-
-    # Update YAML
-    frontmatter.update({
-        "project": project,
-        "phase": phase,
-        "routed": True,
-        "score": round(score, 3)
-    })
-
-    # Reconstruct content ensuring body is stripped once at the end
-    # new_content = f"---\n{yaml.safe_dump(frontmatter).strip()}\n---\n\n{body}"
-    # Simplified construction to avoid potential EOL in complex f-string with newlines
-    frontmatter_str = yaml.safe_dump(frontmatter).strip()
-    new_content = f"---\n{frontmatter_str}\n---\n\n{body}" # Reverted to f-string as it should be fine, EOL likely elsewhere
-    loop_path.write_text(new_content, encoding="utf-8")
-
-    return frontmatter
+    return {**frontmatter, "project": project, "phase": phase, "routed": True, "score": round(score, 3)}
+
+
+def _write_if_changed(loop_path: Path, original: Dict[str, Any], routed: Dict[str, Any], body: str) -> bool:
+    """Rewrites the loop only when its frontmatter changed. Returns True if the file was written."""
+    if routed == original:
+        return False
+    frontmatter_str = yaml.safe_dump(routed).strip()
+    loop_path.write_text(f"---\n{frontmatter_str}\n---\n\n{body}", encoding="utf-8")
+    return True
+
+
+# Updated function definition: find_nearest_match_func argument removed
+def route_loop_to_project(loop_path: Path) -> Dict[str, Any]:
+    frontmatter, body = _read_loop(loop_path)
+    project, phase = route_from_tags(frontmatter, body)
+
+    # Fallback to embedding if tags not found
+    vector_result = None
+    if not project or not phase:
+        vector_result = find_nearest_project_match(body)
+
+    routed = _apply_route(loop_path, frontmatter, project, phase, vector_result)
+    _write_if_changed(loop_path, frontmatter, routed, body)
+    return routed
+
+
+@dataclass
+class RouteBatchStats:
+    files: int = 0
+    tag_routed: int = 0
+    embedded: int = 0
+    written: int = 0
+    unchanged: int = 0
+    errors: int = 0
+    seconds: Dict[str, float] = field(default_factory=lambda: {"read": 0.0, "match": 0.0, "write": 0.0})
+
+    def report(self) -> None:
+        total = sum(self.seconds.values())
+        per_loop = total / self.files * 1000 if self.files else 0.0
+        print(f"🧭 Routed {self.files} loops in {total:.2f}s ({per_loop:.1f} ms/loop): "
+              f"{self.tag_routed} by tags, {self.embedded} by embedding, {self.errors} errors")
+        print(f"  read {self.seconds['read']:.2f}s | embed + search {self.seconds['match']:.2f}s | "
+              f"write {self.seconds['write']:.2f}s  ({self.written} written, {self.unchanged} unchanged)")
+
+
+def route_loops_batch(paths: Iterable[Path], collection_name: str = "workstream_items") -> Dict[Path, Dict[str, Any]]:
+    """
+    Routes many loops at once. Loops fully resolved by tags never leave the process;
+    the rest are embedded in one batched request and matched with Qdrant search_batch.
+    Only files whose frontmatter changed are rewritten. Returns the routed frontmatter
+    per path (unreadable files are skipped) and prints a latency summary.
+    """
+    stats = RouteBatchStats()
+    loops = []
+
+    started = time.perf_counter()
+    for loop_path in map(Path, paths):
+        stats.files += 1
+        try:
+            frontmatter, body = _read_loop(loop_path)
+        except (ValueError, OSError) as e:
+            print(f"❌ Skipping {loop_path.name}: {e}")
+            stats.errors += 1
+            continue
+        loops.append((loop_path, frontmatter, body, *route_from_tags(frontmatter, body)))
+    stats.seconds["read"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    needs_match = [i for i, (_, _, _, project, phase) in enumerate(loops) if not project or not phase]
+    matches = find_nearest_project_matches([loops[i][2] for i in needs_match], collection_name)
+    vector_results = dict(zip(needs_match, matches))
+    stats.seconds["match"] = time.perf_counter() - started
+    stats.embedded = len(needs_match)
+    stats.tag_routed = len(loops) - len(needs_match)
+
+    started = time.perf_counter()
+    routed_loops: Dict[Path, Dict[str, Any]] = {}
+    for i, (loop_path, frontmatter, body, project, phase) in enumerate(loops):
+        routed = _apply_route(loop_path, frontmatter, project, phase, vector_results.get(i))
+        try:
+            if _write_if_changed(loop_path, frontmatter, routed, body):
+                stats.written += 1
+            else:
+                stats.unchanged += 1
+        except OSError as e:
+            print(f"❌ Could not write {loop_path.name}: {e}")
+            stats.errors += 1
+            continue
+        routed_loops[loop_path] = routed
+    stats.seconds["write"] = time.perf_counter() - started
+
+    stats.report()
+    return routed_loops
 
 # --- Example Usage ---
 # This mock function is now specific to this __main__ block for testing the router's logic flow
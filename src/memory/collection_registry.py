@@ -0,0 +1,114 @@
+"""
+Records which embedding model produced each collection's vectors.
+
+Vectors from different models are not comparable, even when their dimensions
+match (ada-002 and 3-small are both 1536-d). Writers call
+``verify_collection(..., record=True)`` so the first write claims the
+collection for its provider. Searches call ``verify_collection`` and get an
+``EmbeddingModelMismatchError`` instead of silently ranking by noise.
+
+Model ids are kept in ``runtime/vector_index/collections.json``. Qdrant 1.7 has
+no collection metadata, so when a client is passed the vector size is also
+checked against the live collection config.
+
+Example usage:
+    from src.memory.collection_registry import verify_collection
+
+    verify_collection("workstream_items", provider, client=qdrant)              # before a search
+    verify_collection("workstream_items", provider, client=qdrant, record=True) # before an upsert
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.system.path_config import VECTOR_INDEX_DIR
+
+REGISTRY_PATH = VECTOR_INDEX_DIR / "collections.json"
+
+_lock = threading.Lock()
+_checked_sizes: Dict[tuple, int] = {}
+
+
+class EmbeddingModelMismatchError(ValueError):
+    """Raised when a collection's vectors came from a different model or dimension."""
+
+
+def load_registry(path: Path = REGISTRY_PATH) -> Dict[str, Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8")) or {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read collection registry {path}: {e}")
+        return {}
+
+
+def collection_info(name: str, path: Path = REGISTRY_PATH) -> Optional[Dict[str, Any]]:
+    return load_registry(path).get(name)
+
+
+def record_collection(name: str, provider, path: Path = REGISTRY_PATH) -> None:
+    path = Path(path)
+    with _lock:
+        registry = load_registry(path)
+        entry = registry.get(name)
+        if entry and entry.get("model") == provider.model_id and entry.get("dimension") == provider.dimension:
+            return
+        registry[name] = {
+            "model": provider.model_id,
+            "dimension": provider.dimension,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(registry, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+
+def _collection_size(client, name: str) -> Optional[int]:
+    """Vector size of an existing Qdrant collection (None if it has named vectors or can't be read)."""
+    key = (id(client), name)
+    if key not in _checked_sizes:
+        try:
+            vectors = client.get_collection(name).config.params.vectors
+        except Exception:
+            return None   # Missing collection or unreachable server; the search/upsert reports it
+        size = getattr(vectors, "size", None)
+        if size is None:
+            return None
+        _checked_sizes[key] = int(size)
+    return _checked_sizes[key]
+
+
+def verify_collection(
+    name: str,
+    provider,
+    client=None,
+    record: bool = False,
+    path: Path = REGISTRY_PATH,
+) -> None:
+    """
+    Raises ``EmbeddingModelMismatchError`` if ``name`` holds vectors from another model
+    or of another size. With ``record=True`` an unclaimed collection is claimed.
+    """
+    entry = collection_info(name, path)
+    if entry and (entry.get("model") != provider.model_id or entry.get("dimension") != provider.dimension):
+        raise EmbeddingModelMismatchError(
+            f"Collection '{name}' holds {entry.get('model')} vectors ({entry.get('dimension')}-d) "
+            f"but the active provider is {provider.model_id} ({provider.dimension}-d). "
+            f"Re-index the collection or set EMBEDDING_PROVIDER={entry.get('model')}."
+        )
+    if client is not None:
+        size = _collection_size(client, name)
+        if size is not None and size != provider.dimension:
+            raise EmbeddingModelMismatchError(
+                f"Collection '{name}' stores {size}-d vectors but {provider.model_id} "
+                f"produces {provider.dimension}-d vectors."
+            )
+    if record and not entry:
+        record_collection(name, provider, path)
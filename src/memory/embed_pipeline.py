@@ -0,0 +1,366 @@
+"""
+Asynchronous read → hash → embed → upsert pipeline.
+
+Each stage runs on its own and hands work to the next through a bounded
+queue, so file reads, embedding requests and Qdrant upserts overlap instead of
+adding up. Blocking calls (file IO, the OpenAI and Qdrant clients) run in a
+thread pool. Embedding concurrency is adaptive: it grows by one after a run of
+successful requests and halves, pausing new requests for the server's
+Retry-After, whenever the API answers 429.
+
+Example usage:
+    from src.memory.embed_pipeline import EmbedItem, run_embed_pipeline
+
+    def read(path):
+        text = path.read_text()
+        return EmbedItem(key=path, point_id=..., text=text, payload={"path": str(path)})
+
+    def upsert(points):
+        qdrant.upsert(collection_name="workstream_items", points=points)
+
+    stats = run_embed_pipeline(paths, read, upsert)
+    stats.report()
+"""
+
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from qdrant_client.http import models
+
+from src.memory.embedding_providers import EmbeddingProvider, get_provider
+
+QUEUE_SIZE = 256
+READ_WORKERS = 4
+EMBED_BATCH_SIZE = 64
+EMBED_CONCURRENCY = 4          # Upper bound; the limiter starts at 2 and adapts
+UPSERT_BATCH_SIZE = 128
+UPSERT_CONCURRENCY = 2
+LINGER_SECONDS = 0.05          # How long a stage waits to fill a batch once it has one item
+
+_DONE = object()
+
+
+@dataclass
+class EmbedItem:
+    key: Any                       # Caller's handle, e.g. the file path
+    point_id: str
+    text: str
+    payload: Dict[str, Any] = field(default_factory=dict)
+    content_hash: Optional[str] = None
+    vector: Optional[List[float]] = None
+
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    items: int = 0
+    busy_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    def record(self, seconds: float, items: int = 1) -> None:
+        self.calls += 1
+        self.items += items
+        self.busy_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+
+    @property
+    def mean_ms(self) -> float:
+        return self.busy_seconds / self.calls * 1000 if self.calls else 0.0
+
+
+@dataclass
+class PipelineStats:
+    stages: Dict[str, StageStats] = field(
+        default_factory=lambda: {name: StageStats() for name in ("read", "hash", "embed", "upsert")}
+    )
+    skipped: int = 0
+    failed: int = 0
+    upserted: int = 0
+    rate_limited: int = 0
+    peak_concurrency: int = 0
+    wall_seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.upserted / self.wall_seconds if self.wall_seconds else 0.0
+
+    def report(self) -> None:
+        print(
+            f"📊 Pipeline: {self.upserted} upserted, {self.skipped} unchanged, {self.failed} failed "
+            f"in {self.wall_seconds:.2f}s ({self.throughput:.1f} items/s)"
+        )
+        for name, stage in self.stages.items():
+            print(
+                f"   {name:<7} {stage.items:>6} items in {stage.calls:>5} calls, "
+                f"mean {stage.mean_ms:8.1f} ms, max {stage.max_seconds * 1000:8.1f} ms"
+            )
+        if self.rate_limited:
+            print(f"   ⏳ rate limited {self.rate_limited}x, peak embed concurrency {self.peak_concurrency}")
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit: +1 after ``limit`` consecutive successes, halved on a 429."""
+
+    def __init__(self, initial: int = 2, maximum: int = EMBED_CONCURRENCY, clock: Callable[[], float] = time.monotonic):
+        self.maximum = max(1, maximum)
+        self.limit = max(1, min(initial, self.maximum))
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._streak = 0
+        self._clock = clock
+        self._changed = asyncio.Condition()
+
+    async def acquire(self) -> None:
+        async with self._changed:
+            while True:
+                pause = self.paused_until - self._clock()
+                if pause > 0:
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self.in_flight < self.limit:
+                    self.in_flight += 1
+                    return
+                await self._changed.wait()
+
+    async def release(self, succeeded: bool = True) -> None:
+        async with self._changed:
+            self.in_flight -= 1
+            if succeeded:
+                self._streak += 1
+                if self._streak >= self.limit and self.limit < self.maximum:
+                    self.limit += 1
+                    self._streak = 0
+            self._changed.notify_all()
+
+    async def throttle(self, delay: float) -> None:
+        async with self._changed:
+            self.limit = max(1, self.limit // 2)
+            self._streak = 0
+            self.paused_until = max(self.paused_until, self._clock() + delay)
+            self._changed.notify_all()
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def to_points(items: List[EmbedItem]) -> List[models.PointStruct]:
+    return [models.PointStruct(id=item.point_id, vector=item.vector, payload=item.payload) for item in items]
+
+
+async def _next_batch(queue: asyncio.Queue, size: int, linger: float) -> Optional[List[Any]]:
+    """Waits for one item, then takes whatever else arrives within ``linger``. None once the queue is done."""
+    first = await queue.get()
+    if first is _DONE:
+        return None
+    batch = [first]
+    deadline = time.monotonic() + linger
+    while len(batch) < size:
+        timeout = deadline - time.monotonic()
+        try:
+            item = queue.get_nowait() if timeout <= 0 else await asyncio.wait_for(queue.get(), timeout)
+        except (asyncio.QueueEmpty, asyncio.TimeoutError):
+            break
+        if item is _DONE:
+            queue.put_nowait(_DONE)   # Leave the marker for the next call
+            break
+        batch.append(item)
+    return batch
+
+
+class EmbedPipeline:
+    def __init__(
+        self,
+        read: Callable[[Any], Optional[EmbedItem]],
+        upsert: Callable[[List[models.PointStruct]], Any],
+        embedder: Optional[EmbeddingProvider] = None,
+        is_current: Optional[Callable[[EmbedItem], bool]] = None,
+        on_upserted: Optional[Callable[[List[EmbedItem]], None]] = None,
+        read_workers: int = READ_WORKERS,
+        embed_batch_size: int = EMBED_BATCH_SIZE,
+        embed_concurrency: int = EMBED_CONCURRENCY,
+        upsert_batch_size: int = UPSERT_BATCH_SIZE,
+        upsert_concurrency: int = UPSERT_CONCURRENCY,
+        queue_size: int = QUEUE_SIZE,
+        linger: float = LINGER_SECONDS,
+    ):
+        self.read = read
+        self.upsert = upsert
+        self.embedder = embedder or get_provider()
+        self.is_current = is_current
+        self.on_upserted = on_upserted
+        self.read_workers = max(1, read_workers)
+        self.embed_batch_size = embed_batch_size
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.upsert_batch_size = upsert_batch_size
+        self.upsert_concurrency = max(1, upsert_concurrency)
+        self.queue_size = queue_size
+        self.linger = linger
+
+    def run(self, sources: Iterable[Any]) -> PipelineStats:
+        return asyncio.run(self.run_async(sources))
+
+    async def run_async(self, sources: Iterable[Any]) -> PipelineStats:
+        self.stats = PipelineStats()
+        self._loop = asyncio.get_running_loop()
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.read_workers + self.embed_concurrency + self.upsert_concurrency,
+            thread_name_prefix="embed-pipeline",
+        )
+        self.limiter = AdaptiveLimiter(initial=min(2, self.embed_concurrency), maximum=self.embed_concurrency)
+        sources_q = asyncio.Queue(self.queue_size)
+        read_q = asyncio.Queue(self.queue_size)
+        hashed_q = asyncio.Queue(self.queue_size)
+        embedded_q = asyncio.Queue(self.queue_size)
+
+        self._throttles = set()
+
+        # The embedder is usually the process-wide shared service; hand its hook back when done
+        previous_hook = self.embedder.on_rate_limit
+        self.embedder.on_rate_limit = self._rate_limited
+        started = time.perf_counter()
+        try:
+            await asyncio.gather(
+                self._feed(sources, sources_q),
+                self._read_stage(sources_q, read_q),
+                self._hash_stage(read_q, hashed_q),
+                self._embed_stage(hashed_q, embedded_q),
+                self._upsert_stage(embedded_q),
+            )
+            await asyncio.gather(*self._throttles)
+        finally:
+            self.embedder.on_rate_limit = previous_hook
+            self._pool.shutdown(wait=True)
+        self.stats.wall_seconds = time.perf_counter() - started
+        return self.stats
+
+    # --- Helpers ------------------------------------------------------------
+
+    async def _timed(self, stage: str, items: int, fn: Callable, *args):
+        started = time.perf_counter()
+        try:
+            return await self._loop.run_in_executor(self._pool, fn, *args)
+        finally:
+            self.stats.stages[stage].record(time.perf_counter() - started, items)
+
+    def _rate_limited(self, delay: float) -> None:
+        # Called from an embedding worker thread
+        self._loop.call_soon_threadsafe(self._throttle, delay)
+
+    def _throttle(self, delay: float) -> None:
+        self.stats.rate_limited += 1
+        task = asyncio.ensure_future(self.limiter.throttle(delay))
+        self._throttles.add(task)  # Held until done so the task is not garbage collected mid-flight
+        task.add_done_callback(self._throttles.discard)
+
+    # --- Stages -------------------------------------------------------------
+
+    async def _feed(self, sources: Iterable[Any], out: asyncio.Queue) -> None:
+        for source in sources:
+            await out.put(source)
+        for _ in range(self.read_workers):
+            await out.put(_DONE)
+
+    async def _read_stage(self, inq: asyncio.Queue, out: asyncio.Queue) -> None:
+        async def worker():
+            while (source := await inq.get()) is not _DONE:
+                try:
+                    item = await self._timed("read", 1, self.read, source)
+                except Exception as e:
+                    print(f"❌ Error reading {source}: {e}")
+                    self.stats.failed += 1
+                    continue
+                if item is None:
+                    self.stats.skipped += 1
+                else:
+                    await out.put(item)
+
+        await asyncio.gather(*(worker() for _ in range(self.read_workers)))
+        await out.put(_DONE)
+
+    async def _hash_stage(self, inq: asyncio.Queue, out: asyncio.Queue) -> None:
+        while (item := await inq.get()) is not _DONE:
+            started = time.perf_counter()
+            if item.content_hash is None:
+                item.content_hash = content_hash(item.text)
+            current = self.is_current is not None and self.is_current(item)
+            self.stats.stages["hash"].record(time.perf_counter() - started)
+            if current:
+                self.stats.skipped += 1
+            else:
+                await out.put(item)
+        await out.put(_DONE)
+
+    async def _embed_stage(self, inq: asyncio.Queue, out: asyncio.Queue) -> None:
+        async def embed_batch(batch: List[EmbedItem]) -> None:
+            succeeded = False
+            throttled_before = self.stats.rate_limited
+            try:
+                vectors = await self._timed("embed", len(batch), self.embedder.embed, [item.text for item in batch])
+                succeeded = self.stats.rate_limited == throttled_before
+            except Exception as e:
+                print(f"❌ Error embedding a batch of {len(batch)} items: {e}")
+                vectors = [None] * len(batch)
+            finally:
+                await self.limiter.release(succeeded)
+            for item, vector in zip(batch, vectors):
+                if vector is None:
+                    print(f"❌ No embedding generated for {item.key}")
+                    self.stats.failed += 1
+                else:
+                    item.vector = vector
+                    await out.put(item)
+
+        tasks = set()
+        while (batch := await _next_batch(inq, self.embed_batch_size, self.linger)) is not None:
+            await self.limiter.acquire()
+            self.stats.peak_concurrency = max(self.stats.peak_concurrency, self.limiter.in_flight)
+            task = asyncio.ensure_future(embed_batch(batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+        await out.put(_DONE)
+
+    async def _upsert_stage(self, inq: asyncio.Queue) -> None:
+        slots = asyncio.Semaphore(self.upsert_concurrency)
+
+        async def upsert_batch(batch: List[EmbedItem]) -> None:
+            try:
+                await self._timed("upsert", len(batch), self.upsert, to_points(batch))
+            except Exception as e:
+                print(f"❌ Error upserting a batch of {len(batch)} points: {e}")
+                self.stats.failed += len(batch)
+                return
+            finally:
+                slots.release()
+            self.stats.upserted += len(batch)
+            if self.on_upserted:
+                try:
+                    self.on_upserted(batch)
+                except Exception as e:
+                    print(f"❌ Error recording {len(batch)} upserted points: {e}")
+
+        tasks = set()
+        while (batch := await _next_batch(inq, self.upsert_batch_size, self.linger)) is not None:
+            await slots.acquire()
+            task = asyncio.ensure_future(upsert_batch(batch))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+
+def run_embed_pipeline(
+    sources: Iterable[Any],
+    read: Callable[[Any], Optional[EmbedItem]],
+    upsert: Callable[[List[models.PointStruct]], Any],
+    **kwargs,
+) -> PipelineStats:
+    """Runs the pipeline to completion from synchronous code. See ``EmbedPipeline`` for options."""
+    return EmbedPipeline(read, upsert, **kwargs).run(sources)
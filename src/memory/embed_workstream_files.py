@@ -1,18 +1,19 @@
 import uuid
 from pathlib import Path
 
-from openai import OpenAI
-from qdrant_client import QdrantClient
 from qdrant_client.models import Distance, PointStruct, VectorParams
 
-client = OpenAI()
-qdrant = QdrantClient("localhost", port=6333)
+from src.memory.collection_registry import verify_collection
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import lazy_qdrant_client
+from src.memory.qdrant_sync import ensure_payload_indexes
+
+qdrant = lazy_qdrant_client()
 COLLECTION = "workstream_items"
 
 
 def embed_text(text):
-    response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-    return response.data[0].embedding
+    return get_provider().embed_one(text)
 
 
 def ensure_collection():
@@ -20,16 +21,21 @@ def ensure_collection():
     if not any(c.name == COLLECTION for c in collections):
         qdrant.recreate_collection(
             collection_name=COLLECTION,
-            vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
+            vectors_config=VectorParams(size=get_provider().dimension, distance=Distance.COSINE),
         )
         print(f"✅ Created Qdrant collection: {COLLECTION}")
+    verify_collection(COLLECTION, get_provider(), client=qdrant, record=True)
+    ensure_payload_indexes(qdrant, COLLECTION)
 
 
 def process_directory(path, type_):
     md_files = list(Path(path).glob("*.md"))
-    for file in md_files:
-        text = file.read_text(encoding="utf-8")
-        vector = embed_text(text)
+    texts = [file.read_text(encoding="utf-8") for file in md_files]
+    vectors = get_provider().embed(texts)
+    for file, vector in zip(md_files, vectors):
+        if vector is None:
+            print(f"⚠️ Skipped: {file.name} (empty or failed to embed)")
+            continue
         qdrant.upsert(
             collection_name=COLLECTION,
             points=[
@@ -1,5 +1,226 @@
-"""Handles vector embedding."""
+"""
+Handles vector embedding.
 
+One ``EmbeddingService`` replaces the per-module ``embed_text`` /
+``get_embedding`` helpers that each sent a single string per HTTP request.
+Inputs are packed into requests bounded by an estimated token budget and an
+item count, and results come back in input order. Transient failures (rate
+limits, timeouts, connection errors, 5xx responses) are retried with backoff;
+other errors fail the batch at once. A request the API rejects outright is
+split in half until the offending input is isolated, so one bad input only
+costs its own slot.
+With a ``cache`` (see ``embedding_cache``), texts already embedded with the
+same model are served locally and only the misses reach the API.
 
-def embed():
-    pass
+Example usage:
+    from src.memory.embedder import embed_texts, embed_text
+
+    vectors = embed_texts(chunks)          # List[Optional[List[float]]], same order as chunks
+    query_vector = embed_text("open loops about hiring")
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+from openai import (
+    APIConnectionError,
+    APITimeoutError,
+    BadRequestError,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+
+from src.memory.embedding_cache import get_embedding_cache
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:  # Not installed, or the encoding can't be fetched offline
+    _ENCODING = None
+
+DEFAULT_MODEL = "text-embedding-3-small"
+MAX_BATCH_ITEMS = 512          # API limit is 2048 inputs per request
+MAX_BATCH_TOKENS = 250_000     # API limit is 300k tokens per request; the estimate leaves headroom
+MAX_INPUT_TOKENS = 8191
+MAX_RETRIES = 3
+BACKOFF_SECONDS = 1.0
+# Worth retrying besides rate limits: timeouts, dropped connections and 5xx responses
+TRANSIENT_ERRORS = (APITimeoutError, APIConnectionError, InternalServerError)
+
+Vector = List[float]
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Delay requested by a 429 response (``retry-after-ms`` or ``retry-after``), if any."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except ValueError:
+            continue  # HTTP-date form; fall back to our own backoff
+    return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Token count via tiktoken when installed, otherwise ~4 characters per token."""
+    if _ENCODING is not None:
+        try:
+            return len(_ENCODING.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return len(text) // 4 + 1
+
+
+class EmbeddingService:
+    def __init__(
+        self,
+        client=None,
+        model: str = DEFAULT_MODEL,
+        max_batch_items: int = MAX_BATCH_ITEMS,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_retries: int = MAX_RETRIES,
+        backoff: float = BACKOFF_SECONDS,
+        sleep: Callable[[float], None] = time.sleep,
+        cache=None,
+    ):
+        self._client = client
+        self.cache = cache
+        self.model = model
+        self.max_batch_items = max_batch_items
+        self.max_batch_tokens = max_batch_tokens
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self._sleep = sleep
+        self.stats = {"requests": 0, "inputs": 0, "retries": 0, "failed": 0, "rate_limited": 0}
+        # Called with the server's requested delay whenever a request is rate limited
+        self.on_rate_limit: Optional[Callable[[float], None]] = None
+
+    @property
+    def client(self):
+        # Created lazily so importing a module that embeds does not need an API key
+        if self._client is None:
+            self._client = OpenAI()
+        return self._client
+
+    def batches(self, texts: Sequence[str], positions: Optional[Iterable[int]] = None) -> List[List[int]]:
+        """Groups input positions into requests bounded by item count and estimated tokens."""
+        batches, current, current_tokens = [], [], 0
+        for i in range(len(texts)) if positions is None else positions:
+            text = texts[i]
+            if not text or not text.strip():
+                continue
+            tokens = min(estimate_tokens(text), MAX_INPUT_TOKENS)
+            if current and (
+                len(current) >= self.max_batch_items or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(i)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def embed(self, texts: Iterable[str]) -> List[Optional[Vector]]:
+        """
+        Embeds every text, preserving order. Empty texts and inputs that still fail
+        after retries come back as None, so callers can skip them individually.
+        """
+        texts = list(texts)
+        results: List[Optional[Vector]] = [None] * len(texts)
+        pending = [i for i, text in enumerate(texts) if text and text.strip()]
+        if self.cache is not None and pending:
+            cached = self.cache.get_many(self.model, [texts[i] for i in pending])
+            for i, vector in zip(pending, cached):
+                if vector is not None:
+                    results[i] = vector.tolist()
+            pending = [i for i in pending if results[i] is None]
+
+        for batch in self.batches(texts, pending):
+            self._embed_batch(texts, batch, results)
+
+        if self.cache is not None and pending:
+            self.cache.put_many(self.model, [texts[i] for i in pending], [results[i] for i in pending])
+        return results
+
+    def embed_one(self, text: str) -> Optional[Vector]:
+        return self.embed([text])[0]
+
+    def _request(self, inputs: List[str]) -> List[Vector]:
+        self.stats["requests"] += 1
+        response = self.client.embeddings.create(input=inputs, model=self.model)
+        data = list(response.data)
+        if len(data) != len(inputs):
+            raise ValueError(f"Expected {len(inputs)} embeddings, got {len(data)}")
+        # The API returns an index per item; don't rely on response order
+        if all(isinstance(getattr(item, "index", None), int) for item in data):
+            data.sort(key=lambda item: item.index)
+        return [list(item.embedding) for item in data]
+
+    def _embed_batch(self, texts: List[str], batch: List[int], results: List[Optional[Vector]]) -> None:
+        inputs = [texts[i] for i in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                vectors = self._request(inputs)
+                for i, vector in zip(batch, vectors):
+                    results[i] = vector
+                self.stats["inputs"] += len(batch)
+                return
+            except BadRequestError as e:
+                # Retrying the same payload won't help; split it to isolate the bad input
+                if len(batch) > 1:
+                    mid = len(batch) // 2
+                    self._embed_batch(texts, batch[:mid], results)
+                    self._embed_batch(texts, batch[mid:], results)
+                    return
+                error = e
+                break
+            except RateLimitError as e:
+                error = e
+                self.stats["rate_limited"] += 1
+                delay = retry_after_seconds(e)
+                if delay is None:
+                    delay = self.backoff * (2 ** attempt)
+                if self.on_rate_limit:
+                    self.on_rate_limit(delay)
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    self._sleep(delay)
+            except TRANSIENT_ERRORS as e:
+                error = e
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    self._sleep(self.backoff * (2 ** attempt))
+            except Exception as e:
+                # Authentication, permission or malformed responses: retrying won't help
+                error = e
+                break
+
+        self.stats["failed"] += len(batch)
+        label = f"'{texts[batch[0]][:50]}'" if len(batch) == 1 else f"a batch of {len(batch)} inputs"
+        print(f"❌ Error generating embedding for {label}: {error}")
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model: str = DEFAULT_MODEL) -> EmbeddingService:
+    """Shared service per model, so every caller reuses one HTTP client."""
+    with _services_lock:
+        if model not in _services:
+            _services[model] = EmbeddingService(model=model, cache=get_embedding_cache())
+        return _services[model]
+
+
+def embed_texts(texts: Iterable[str], model: str = DEFAULT_MODEL) -> List[Optional[Vector]]:
+    return get_embedding_service(model).embed(texts)
+
+
+def embed_text(text: str, model: str = DEFAULT_MODEL) -> Optional[Vector]:
+    return get_embedding_service(model).embed_one(text)
@@ -0,0 +1,289 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are keyed by ``(model, sha256(text))`` so the same text is only ever
+sent to the API once per model, whichever script embeds it. Vectors live as
+float32 rows in one memory-mapped file per dimension
+(``vectors-<dim>.f32``); an SQLite table maps each key to its row and keeps an
+LRU tick. When the cache grows past ``max_bytes`` the least recently used
+rows are evicted and their slots reused.
+
+Example usage:
+    from src.memory.embedding_cache import get_embedding_cache
+
+    cache = get_embedding_cache()
+    vectors = cache.get_many("text-embedding-3-small", texts)   # None where missing
+    cache.put_many("text-embedding-3-small", texts, new_vectors)
+    print(cache.summary())
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from src.system.path_config import VECTOR_INDEX_DIR
+
+EMBED_CACHE_DIR = VECTOR_INDEX_DIR / "embedding_cache"
+DEFAULT_MAX_BYTES = int(os.getenv("EMBED_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+EMBED_CACHE_ENABLED = os.getenv("EMBED_CACHE", "1") != "0"
+SQL_CHUNK = 500  # Stay well under SQLite's bound-parameter limit
+GROW_ROWS = 1024
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, directory: Path = EMBED_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.directory / "keys.db"
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._maps: Dict[int, np.memmap] = {}
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock:
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    model TEXT NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    slot INTEGER NOT NULL,
+                    last_used INTEGER NOT NULL,
+                    PRIMARY KEY (model, sha256)
+                );
+                CREATE INDEX IF NOT EXISTS idx_entries_lru ON entries(last_used);
+                CREATE TABLE IF NOT EXISTS free_slots (
+                    dim INTEGER NOT NULL,
+                    slot INTEGER NOT NULL,
+                    PRIMARY KEY (dim, slot)
+                );
+                CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+                """
+            )
+
+    # --- Vector file -------------------------------------------------------
+
+    def _vector_path(self, dim: int) -> Path:
+        return self.directory / f"vectors-{dim}.f32"
+
+    def _rows(self, dim: int, min_rows: int = 0) -> np.memmap:
+        """Returns a mapping of the vector file with at least ``min_rows`` rows, growing it if needed."""
+        path = self._vector_path(dim)
+        mapped = self._maps.get(dim)
+        if mapped is not None and mapped.shape[0] >= max(min_rows, 1):
+            return mapped
+
+        row_bytes = dim * 4
+        size = path.stat().st_size if path.exists() else 0
+        if size < min_rows * row_bytes:
+            rows = max(min_rows, size // row_bytes * 2, GROW_ROWS)
+            with open(path, "ab") as f:
+                f.truncate(rows * row_bytes)
+            size = rows * row_bytes
+        if mapped is not None:
+            mapped.flush()
+        mapped = np.memmap(path, dtype=np.float32, mode="r+", shape=(size // row_bytes, dim))
+        self._maps[dim] = mapped
+        return mapped
+
+    # --- Bookkeeping -------------------------------------------------------
+
+    @staticmethod
+    def _meta(conn: sqlite3.Connection, key: str) -> int:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, key: str, amount: int) -> int:
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + excluded.value",
+            (key, amount),
+        )
+        return EmbeddingCache._meta(conn, key)
+
+    def _lookup(self, conn, model: str, keys: Sequence[str]) -> Dict[str, tuple]:
+        found = {}
+        for start in range(0, len(keys), SQL_CHUNK):
+            chunk = keys[start:start + SQL_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            for sha, dim, slot in conn.execute(
+                f"SELECT sha256, dim, slot FROM entries WHERE model = ? AND sha256 IN ({placeholders})",
+                (model, *chunk),
+            ):
+                found[sha] = (dim, slot)
+        return found
+
+    # --- Public API --------------------------------------------------------
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[np.ndarray]]:
+        """Cached float32 vectors in input order; None for misses. Hits refresh their LRU tick."""
+        if not texts:
+            return []
+        keys = [text_key(t) for t in texts]
+        unique = list(dict.fromkeys(keys))
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")  # Slots can't be evicted and reused while we read them
+            try:
+                found = self._lookup(conn, model, unique)
+                vectors = {}
+                for sha, (dim, slot) in found.items():
+                    rows = self._rows(dim, slot + 1)
+                    vectors[sha] = np.array(rows[slot])
+
+                tick = self._bump(conn, "tick", 1)
+                if found:
+                    conn.executemany(
+                        "UPDATE entries SET last_used = ? WHERE model = ? AND sha256 = ?",
+                        [(tick, model, sha) for sha in found],
+                    )
+                hits = sum(1 for k in keys if k in vectors)
+                self._bump(conn, "hits", hits)
+                self._bump(conn, "misses", len(keys) - hits)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        self.stats["hits"] += hits
+        self.stats["misses"] += len(keys) - hits
+        return [vectors.get(k) for k in keys]
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Iterable) -> int:
+        """Stores vectors for texts (None vectors are skipped). Returns how many new keys were added."""
+        items = {}
+        for text, vector in zip(texts, vectors):
+            if vector is not None:
+                items[text_key(text)] = np.asarray(vector, dtype=np.float32)
+        if not items:
+            return 0
+
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")  # Serialises slot allocation across processes
+            try:
+                existing = self._lookup(conn, model, list(items))
+                tick = self._bump(conn, "tick", 1)
+                new = {sha: vector for sha, vector in items.items() if sha not in existing}
+                # Make room first so the new rows reuse evicted slots instead of growing the file
+                evicted = self._evict(conn, reserve=sum(v.nbytes for v in new.values()))
+                added = 0
+                touched_dims = set()
+                for sha, vector in new.items():
+                    dim = int(vector.shape[0])
+                    row = conn.execute(
+                        "SELECT slot FROM free_slots WHERE dim = ? ORDER BY slot LIMIT 1", (dim,)
+                    ).fetchone()
+                    if row:
+                        slot = row[0]
+                        conn.execute("DELETE FROM free_slots WHERE dim = ? AND slot = ?", (dim, slot))
+                    else:
+                        slot = self._bump(conn, f"next_slot_{dim}", 1) - 1
+                    rows = self._rows(dim, slot + 1)
+                    rows[slot] = vector
+                    touched_dims.add(dim)
+                    conn.execute(
+                        "INSERT INTO entries (model, sha256, dim, slot, last_used) VALUES (?, ?, ?, ?, ?)",
+                        (model, sha, dim, slot, tick),
+                    )
+                    added += 1
+                for dim in touched_dims:
+                    self._maps[dim].flush()
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        self.stats["stores"] += added
+        self.stats["evictions"] += evicted
+        return added
+
+    def put(self, model: str, text: str, vector) -> int:
+        return self.put_many(model, [text], [vector])
+
+    def _evict(self, conn, reserve: int = 0) -> int:
+        """Drops least recently used entries until ``reserve`` more bytes fit under ``max_bytes``."""
+        limit = self.max_bytes - reserve
+        total = conn.execute("SELECT COALESCE(SUM(dim * 4), 0) FROM entries").fetchone()[0]
+        evicted = 0
+        while total > limit:
+            victims = conn.execute(
+                "SELECT model, sha256, dim, slot FROM entries ORDER BY last_used LIMIT ?", (SQL_CHUNK,)
+            ).fetchall()
+            if not victims:
+                break
+            for model, sha, dim, slot in victims:
+                if total <= limit:
+                    break
+                conn.execute("DELETE FROM entries WHERE model = ? AND sha256 = ?", (model, sha))
+                conn.execute("INSERT OR IGNORE INTO free_slots (dim, slot) VALUES (?, ?)", (dim, slot))
+                total -= dim * 4
+                evicted += 1
+        return evicted
+
+    def summary(self) -> Dict[str, int]:
+        """Entry count, stored bytes and lifetime hit/miss counters (all processes)."""
+        with self._lock:
+            conn = self._conn
+            entries, stored = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(dim * 4), 0) FROM entries"
+            ).fetchone()
+            return {
+                "entries": entries,
+                "bytes": stored,
+                "max_bytes": self.max_bytes,
+                "hits": self._meta(conn, "hits"),
+                "misses": self._meta(conn, "misses"),
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.executescript("DELETE FROM entries; DELETE FROM free_slots; DELETE FROM meta;")
+            self._maps.clear()
+            for path in self.directory.glob("vectors-*.f32"):
+                path.unlink()
+
+
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[EmbeddingCache]:
+    """Process-wide cache, or None when disabled with EMBED_CACHE=0 or unusable."""
+    global _cache
+    if not EMBED_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = EmbeddingCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Embedding cache unavailable, continuing without it: {e}")
+                return None
+        return _cache
+
+
+if __name__ == "__main__":
+    cache = get_embedding_cache()
+    if cache is None:
+        print("Embedding cache is disabled (EMBED_CACHE=0).")
+    else:
+        summary = cache.summary()
+        lookups = summary["hits"] + summary["misses"]
+        hit_rate = summary["hits"] / lookups * 100 if lookups else 0.0
+        print(f"📦 {summary['entries']} vectors, {summary['bytes'] / 1e6:.1f} / {summary['max_bytes'] / 1e6:.0f} MB")
+        print(f"🎯 {summary['hits']} hits, {summary['misses']} misses ({hit_rate:.1f}% hit rate)")
@@ -0,0 +1,249 @@
+"""
+Embedding providers.
+
+Every vector store embeds through a provider chosen by a spec string, so a
+re-index can run offline and tests never need the network:
+
+    openai:text-embedding-3-small    OpenAI API via the batched EmbeddingService (default)
+    local:all-MiniLM-L6-v2           sentence-transformers on CPU, batched (needs the `ai` extras)
+    hashing:256                      Deterministic feature hashing, no model or network
+
+The default comes from the ``EMBEDDING_PROVIDER`` environment variable. Each
+provider exposes ``model_id`` and ``dimension``; ``collection_registry`` uses
+them to refuse searching a collection with vectors from a different model.
+
+Example usage:
+    from src.memory.embedding_providers import get_provider
+
+    provider = get_provider()                  # EMBEDDING_PROVIDER or OpenAI 3-small
+    vectors = provider.embed(texts)            # List[Optional[List[float]]], input order
+    offline = get_provider("local:all-MiniLM-L6-v2")
+"""
+
+import hashlib
+import os
+import re
+import threading
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from src.memory.embedder import DEFAULT_MODEL, get_embedding_service
+from src.memory.embedding_cache import get_embedding_cache
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+DEFAULT_PROVIDER = os.getenv("EMBEDDING_PROVIDER", f"openai:{DEFAULT_MODEL}")
+DEFAULT_LOCAL_MODEL = "all-MiniLM-L6-v2"
+LOCAL_BATCH_SIZE = 64
+DEFAULT_HASHING_DIMENSION = 256
+
+OPENAI_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+# Known sizes let us check collections without loading the model first
+LOCAL_DIMENSIONS = {
+    "all-MiniLM-L6-v2": 384,
+    "all-MiniLM-L12-v2": 384,
+    "all-mpnet-base-v2": 768,
+    "multi-qa-MiniLM-L6-cos-v1": 384,
+    "BAAI/bge-small-en-v1.5": 384,
+}
+
+Vector = List[float]
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_UNSET = object()
+
+
+class EmbeddingProvider(ABC):
+    backend = ""
+
+    def __init__(self, model: str):
+        self.model = model
+        self._on_rate_limit: Optional[Callable[[float], None]] = None
+
+    @property
+    def model_id(self) -> str:
+        return f"{self.backend}:{self.model}"
+
+    @property
+    def on_rate_limit(self) -> Optional[Callable[[float], None]]:
+        """Set by the embed pipeline; only the OpenAI backend is ever rate limited."""
+        return self._on_rate_limit
+
+    @on_rate_limit.setter
+    def on_rate_limit(self, hook: Optional[Callable[[float], None]]) -> None:
+        self._on_rate_limit = hook
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        """Length of the vectors this provider returns."""
+
+    @abstractmethod
+    def embed(self, texts: Iterable[str]) -> List[Optional[Vector]]:
+        """Embeds every text in input order; empty or failed inputs come back as None."""
+
+    def embed_one(self, text: str) -> Optional[Vector]:
+        return self.embed([text])[0]
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.model_id}>"
+
+
+class OpenAIProvider(EmbeddingProvider):
+    backend = "openai"
+
+    def __init__(self, model: str = DEFAULT_MODEL):
+        super().__init__(model)
+        self.service = get_embedding_service(model)
+
+    @property
+    def dimension(self) -> int:
+        return OPENAI_DIMENSIONS.get(self.model, 1536)
+
+    @property
+    def on_rate_limit(self):
+        return self.service.on_rate_limit
+
+    @on_rate_limit.setter
+    def on_rate_limit(self, hook):
+        self.service.on_rate_limit = hook  # The hook lives on the shared service that sees the 429s
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.service.stats
+
+    def embed(self, texts: Iterable[str]) -> List[Optional[Vector]]:
+        return self.service.embed(texts)
+
+
+class SentenceTransformerProvider(EmbeddingProvider):
+    """Local model on CPU. Inputs are encoded in batches and cached like API results."""
+
+    backend = "local"
+
+    def __init__(self, model: str = DEFAULT_LOCAL_MODEL, batch_size: int = LOCAL_BATCH_SIZE, device: str = "cpu"):
+        super().__init__(model)
+        self.batch_size = batch_size
+        self.device = device
+        self._cache = _UNSET
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        # Opened on first use so building a provider doesn't touch the cache directory
+        if self._cache is _UNSET:
+            self._cache = get_embedding_cache()
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        self._cache = cache
+
+    def _load(self):
+        if self._model is not None:
+            return self._model
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise RuntimeError("sentence-transformers is not installed; install the `ai` extras")
+        with self._lock:
+            if self._model is None:
+                print(f"🧠 Loading local embedding model {self.model} on {self.device}...")
+                self._model = SentenceTransformer(self.model, device=self.device)
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        if self.model in LOCAL_DIMENSIONS and self._model is None:
+            return LOCAL_DIMENSIONS[self.model]
+        return int(self._load().get_sentence_embedding_dimension())
+
+    def embed(self, texts: Iterable[str]) -> List[Optional[Vector]]:
+        texts = list(texts)
+        results: List[Optional[Vector]] = [None] * len(texts)
+        pending = [i for i, text in enumerate(texts) if text and text.strip()]
+        if self.cache is not None and pending:
+            for i, vector in zip(pending, self.cache.get_many(self.model_id, [texts[i] for i in pending])):
+                if vector is not None:
+                    results[i] = vector.tolist()
+            pending = [i for i in pending if results[i] is None]
+        if not pending:
+            return results
+
+        encoded = self._load().encode(
+            [texts[i] for i in pending],
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False,
+        ).astype(np.float32)
+        for i, vector in zip(pending, encoded):
+            results[i] = vector.tolist()
+        if self.cache is not None:
+            self.cache.put_many(self.model_id, [texts[i] for i in pending], encoded)
+        return results
+
+
+class HashingProvider(EmbeddingProvider):
+    """
+    Signed feature hashing of lowercased words and word bigrams, L2-normalised.
+    Deterministic across processes and machines; texts sharing words score higher.
+    """
+
+    backend = "hashing"
+
+    def __init__(self, dimension: int = DEFAULT_HASHING_DIMENSION):
+        super().__init__(str(dimension))
+        self._dimension = dimension
+
+    @property
+    def dimension(self) -> int:
+        return self._dimension
+
+    def _vector(self, text: str) -> Vector:
+        words = _TOKEN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        vector = np.zeros(self._dimension, dtype=np.float32)
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % self._dimension] += 1.0 if digest >> 63 else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed(self, texts: Iterable[str]) -> List[Optional[Vector]]:
+        return [self._vector(text) if text and text.strip() else None for text in texts]
+
+
+_providers: Dict[str, EmbeddingProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def create_provider(spec: str) -> EmbeddingProvider:
+    """Builds a provider from ``backend:model``. A bare model name means OpenAI."""
+    backend, _, model = spec.partition(":")
+    if not model and backend not in ("openai", "local", "hashing"):
+        backend, model = "openai", backend
+    if backend == "openai":
+        return OpenAIProvider(model or DEFAULT_MODEL)
+    if backend == "local":
+        return SentenceTransformerProvider(model or DEFAULT_LOCAL_MODEL)
+    if backend == "hashing":
+        return HashingProvider(int(model) if model else DEFAULT_HASHING_DIMENSION)
+    raise ValueError(f"Unknown embedding provider '{spec}' (expected openai:, local: or hashing:)")
+
+
+def get_provider(spec: Optional[str] = None) -> EmbeddingProvider:
+    """Shared provider per spec; ``EMBEDDING_PROVIDER`` when no spec is given."""
+    spec = spec or DEFAULT_PROVIDER
+    with _providers_lock:
+        if spec not in _providers:
+            _providers[spec] = create_provider(spec)
+        return _providers[spec]
@@ -1,28 +1,12 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import FieldCondition, Filter, MatchValue
+from src.memory.vector_store import get_vector_store
 
-qdrant = QdrantClient("localhost", port=6333)
 COLLECTION = "workstream_items"
 
 
 def purge_workstream_vectors():
     print("🚨 Deleting all program/project vectors from Qdrant collection...")
-    qdrant.delete(
-        collection_name=COLLECTION,
-        points_selector=Filter(
-            must=[
-                FieldCondition(key="type", match=MatchValue(value="program")),
-            ]
-        ),
-    )
-    qdrant.delete(
-        collection_name=COLLECTION,
-        points_selector=Filter(
-            must=[
-                FieldCondition(key="type", match=MatchValue(value="project")),
-            ]
-        ),
-    )
+    # One filtered delete (type in program, project) served by the "type" payload index
+    get_vector_store(COLLECTION).delete_by_filter({"type": ["program", "project"]})
     print("✅ Purge complete.")
 
 
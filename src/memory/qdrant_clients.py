@@ -0,0 +1,178 @@
+"""
+Shared Qdrant client factory.
+
+Modules used to build their own ``QdrantClient``: once per query, once per
+call, or at import time against a hard-coded host. They also disagreed on
+which server to use. Every module now asks this factory instead. A client is
+created on first use, one per distinct connection setting, and then shared.
+Each client keeps a pool of keep-alive connections, so repeat requests skip
+the TCP and TLS handshakes. Without ``pool_size`` qdrant-client opens a fresh
+connection for every REST request.
+
+Settings come from the environment:
+
+    QDRANT_URL           Full URL; wins over host/port (e.g. https://xyz.cloud.qdrant.io:6333)
+    QDRANT_HOST          Host name, default localhost
+    QDRANT_PORT          REST port, default 6333
+    QDRANT_GRPC_PORT     gRPC port, default 6334
+    QDRANT_PREFER_GRPC   1 to talk gRPC (faster for bulk upserts and batched search)
+    QDRANT_API_KEY       Optional API key
+    QDRANT_TIMEOUT       Request timeout in seconds, default 10
+    QDRANT_POOL_SIZE     Pooled connections per client, default 10 (ignored by clients without pool_size)
+    QDRANT_LOCATION      ":memory:" or a directory for qdrant-client local mode (no server)
+
+Example usage:
+    from src.memory.qdrant_clients import get_qdrant_client, try_qdrant_client
+
+    client = get_qdrant_client()                    # Shared, created lazily
+    client = try_qdrant_client(check=True)          # None (and a message) if unreachable
+    qdrant = lazy_qdrant_client()                   # Module-level handle; connects on first call
+    client = get_qdrant_client(QdrantSettings.from_env(prefer_grpc=True))
+"""
+
+import inspect
+import os
+import threading
+from dataclasses import dataclass, replace
+from typing import Dict, Optional
+
+from qdrant_client import QdrantClient
+
+DEFAULT_HOST = "localhost"
+DEFAULT_PORT = 6333
+DEFAULT_GRPC_PORT = 6334
+DEFAULT_TIMEOUT = 10
+DEFAULT_POOL_SIZE = 10
+
+
+def _flag(name: str) -> bool:
+    return os.getenv(name, "0").lower() in ("1", "true", "yes")
+
+
+@dataclass(frozen=True)
+class QdrantSettings:
+    url: Optional[str] = None
+    host: str = DEFAULT_HOST
+    port: int = DEFAULT_PORT
+    grpc_port: int = DEFAULT_GRPC_PORT
+    prefer_grpc: bool = False
+    api_key: Optional[str] = None
+    timeout: int = DEFAULT_TIMEOUT
+    pool_size: int = DEFAULT_POOL_SIZE
+    location: Optional[str] = None
+
+    @classmethod
+    def from_env(cls, **overrides) -> "QdrantSettings":
+        settings = cls(
+            url=os.getenv("QDRANT_URL") or None,
+            host=os.getenv("QDRANT_HOST", DEFAULT_HOST),
+            port=int(os.getenv("QDRANT_PORT", DEFAULT_PORT)),
+            grpc_port=int(os.getenv("QDRANT_GRPC_PORT", DEFAULT_GRPC_PORT)),
+            prefer_grpc=_flag("QDRANT_PREFER_GRPC"),
+            api_key=os.getenv("QDRANT_API_KEY") or None,
+            timeout=int(os.getenv("QDRANT_TIMEOUT", DEFAULT_TIMEOUT)),
+            pool_size=int(os.getenv("QDRANT_POOL_SIZE", DEFAULT_POOL_SIZE)),
+            location=os.getenv("QDRANT_LOCATION") or None,
+        )
+        return replace(settings, **overrides)
+
+    @property
+    def target(self) -> str:
+        """Human-readable server description for log lines."""
+        if self.location:
+            return f"local:{self.location}"
+        base = self.url or f"http://{self.host}:{self.port}"
+        return f"{base} (gRPC :{self.grpc_port})" if self.prefer_grpc else base
+
+    def create(self) -> QdrantClient:
+        if self.location == ":memory:":
+            return QdrantClient(location=":memory:")
+        if self.location:
+            return QdrantClient(path=self.location)
+        address = {"url": self.url} if self.url else {"host": self.host, "port": self.port}
+        if _client_accepts("pool_size"):
+            address["pool_size"] = self.pool_size  # Older clients hand unknown kwargs to httpx, which rejects them
+        return QdrantClient(
+            **address,
+            grpc_port=self.grpc_port,
+            prefer_grpc=self.prefer_grpc,
+            api_key=self.api_key,
+            timeout=self.timeout,
+        )
+
+
+def _client_accepts(parameter: str) -> bool:
+    """Whether the installed QdrantClient declares ``parameter`` (pool_size arrived after 1.7)."""
+    return parameter in inspect.signature(QdrantClient.__init__).parameters
+
+
+_clients: Dict[QdrantSettings, QdrantClient] = {}
+_checked = set()
+_clients_lock = threading.Lock()
+
+
+def get_qdrant_client(settings: Optional[QdrantSettings] = None) -> QdrantClient:
+    """The shared client for ``settings`` (default: environment), created on first use."""
+    settings = settings or QdrantSettings.from_env()
+    with _clients_lock:
+        client = _clients.get(settings)
+        if client is None:
+            client = _clients[settings] = settings.create()
+        return client
+
+
+def try_qdrant_client(settings: Optional[QdrantSettings] = None, check: bool = False) -> Optional[QdrantClient]:
+    """
+    Like ``get_qdrant_client`` but returns None when the client cannot be created,
+    or, with ``check``, when the server does not answer. The check runs once per client.
+    """
+    settings = settings or QdrantSettings.from_env()
+    try:
+        client = get_qdrant_client(settings)
+        if check and settings not in _checked:
+            client.get_collections()
+            _checked.add(settings)
+        return client
+    except Exception as e:
+        print(f"❌ Qdrant not available at {settings.target}: {e}")
+        close_qdrant_clients(settings)   # Retry with a fresh client next time
+        return None
+
+
+class LazyQdrantClient:
+    """Stands in for a module-level client: resolves the shared client on first attribute access."""
+
+    def __init__(self, settings: Optional[QdrantSettings] = None):
+        self._settings = settings
+
+    def __getattr__(self, name):
+        return getattr(get_qdrant_client(self._settings), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyQdrantClient {(self._settings or QdrantSettings.from_env()).target}>"
+
+
+def lazy_qdrant_client(settings: Optional[QdrantSettings] = None) -> LazyQdrantClient:
+    return LazyQdrantClient(settings)
+
+
+def close_qdrant_clients(settings: Optional[QdrantSettings] = None) -> None:
+    """Closes and forgets one shared client, or all of them."""
+    with _clients_lock:
+        keys = [settings] if settings is not None else list(_clients)
+        for key in keys:
+            client = _clients.pop(key, None)
+            _checked.discard(key)
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+
+if __name__ == "__main__":
+    settings = QdrantSettings.from_env()
+    client = try_qdrant_client(settings, check=True)
+    if client is not None:
+        names = [c.name for c in client.get_collections().collections]
+        print(f"✅ Connected to {settings.target}: {len(names)} collections {names}")
@@ -0,0 +1,198 @@
+"""
+Bulk helpers for keeping a Qdrant collection in step with files on disk.
+
+Sync tools used to issue one ``retrieve`` per file to compare a content hash
+and one ``upsert`` per point, each waiting for the server to apply it. Here
+hashes are fetched for many ids per request (or with one payload-only scroll),
+unchanged points are skipped locally, and upserts go out in batches of several
+hundred with ``wait=False``. ``BulkUpserter.close()`` sends the last batch with
+``wait=True``. Qdrant applies a collection's updates in order, so once that
+request returns, every earlier batch is visible too.
+
+``ensure_payload_indexes`` creates the payload indexes that filtered searches
+and deletes rely on (type, project, phase, status, workstream, uuid). Without
+them Qdrant scans every payload for each filter condition. Sync jobs call it
+once per run, and it only creates the indexes that are missing.
+
+``set_payloads`` overwrites a few payload keys on existing points without
+re-embedding them. Writers that change a filtered field outside Qdrant (a
+loop's status or weight in SQLite) call it so filtered searches stay correct.
+
+Example usage:
+    from src.memory.qdrant_sync import BulkUpserter, fetch_payload_values
+
+    known = fetch_payload_values(client, "workstream_items", ids)      # {id: content_hash}
+    with BulkUpserter(client, "workstream_items") as upserter:
+        upserter.add_many(p for p in points if known.get(str(p.id)) != p.payload["content_hash"])
+    ensure_payload_indexes(client, "workstream_items")
+"""
+
+import threading
+import time
+import warnings
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from qdrant_client.http import models
+
+HASH_FIELD = "content_hash"
+RETRIEVE_BATCH_SIZE = 512
+SCROLL_PAGE_SIZE = 1024
+UPSERT_BATCH_SIZE = 256
+
+# Payload fields that searches and deletes filter on, with their index type
+PAYLOAD_INDEXES: Dict[str, models.PayloadSchemaType] = {
+    "type": models.PayloadSchemaType.KEYWORD,
+    "project": models.PayloadSchemaType.KEYWORD,
+    "phase": models.PayloadSchemaType.KEYWORD,
+    "status": models.PayloadSchemaType.KEYWORD,
+    "workstream": models.PayloadSchemaType.KEYWORD,
+    "uuid": models.PayloadSchemaType.KEYWORD,
+}
+
+
+def ensure_payload_indexes(
+    client,
+    collection_name: str,
+    fields: Optional[Dict[str, models.PayloadSchemaType]] = None,
+) -> List[str]:
+    """Creates the missing payload indexes in ``fields`` (default PAYLOAD_INDEXES); returns the fields created."""
+    fields = PAYLOAD_INDEXES if fields is None else fields
+    existing = client.get_collection(collection_name).payload_schema or {}
+    created = []
+    for field_name, schema in fields.items():
+        if field_name in existing:
+            continue
+        with warnings.catch_warnings():
+            # qdrant-client local mode accepts the call but has no payload indexes
+            warnings.simplefilter("ignore", UserWarning)
+            client.create_payload_index(collection_name, field_name, field_schema=schema, wait=True)
+        created.append(field_name)
+    return created
+
+
+def fetch_payload_values(
+    client,
+    collection_name: str,
+    ids: Sequence[Any],
+    field: str = HASH_FIELD,
+    batch_size: int = RETRIEVE_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """``{str(id): payload[field]}`` for the ids that exist, fetched ``batch_size`` ids per request."""
+    values: Dict[str, Any] = {}
+    unique = list(dict.fromkeys(ids))
+    for start in range(0, len(unique), batch_size):
+        points = client.retrieve(
+            collection_name=collection_name,
+            ids=unique[start:start + batch_size],
+            with_payload=[field],
+            with_vectors=False,
+        )
+        for point in points:
+            values[str(point.id)] = (point.payload or {}).get(field)
+    return values
+
+
+def scroll_payload_values(
+    client,
+    collection_name: str,
+    field: str = HASH_FIELD,
+    page_size: int = SCROLL_PAGE_SIZE,
+    scroll_filter: Optional[models.Filter] = None,
+) -> Dict[str, Any]:
+    """``{str(id): payload[field]}`` for every point, read with payload-only scroll pages."""
+    values: Dict[str, Any] = {}
+    offset = None
+    while True:
+        points, offset = client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=page_size,
+            offset=offset,
+            with_payload=[field],
+            with_vectors=False,
+        )
+        for point in points:
+            values[str(point.id)] = (point.payload or {}).get(field)
+        if offset is None:
+            return values
+
+
+def set_payloads(
+    client,
+    collection_name: str,
+    payloads: Dict[Any, Dict[str, Any]],
+    batch_size: int = UPSERT_BATCH_SIZE,
+) -> int:
+    """
+    Sets ``payloads[id]`` on each point that exists, ``batch_size`` points per request.
+    Ids with no point are skipped (Qdrant rejects the whole request otherwise).
+    Returns the number of points updated.
+    """
+    updated = 0
+    ids = list(payloads)
+    by_id = {str(point_id): payload for point_id, payload in payloads.items()}
+    for start in range(0, len(ids), batch_size):
+        existing = client.retrieve(
+            collection_name=collection_name,
+            ids=ids[start:start + batch_size],
+            with_payload=False,
+            with_vectors=False,
+        )
+        operations = [
+            models.SetPayloadOperation(
+                set_payload=models.SetPayload(payload=by_id[str(point.id)], points=[point.id])
+            )
+            for point in existing
+        ]
+        if operations:
+            client.batch_update_points(collection_name=collection_name, update_operations=operations, wait=True)
+        updated += len(operations)
+    return updated
+
+
+class BulkUpserter:
+    """
+    Buffers points and upserts them ``batch_size`` at a time without waiting.
+    The last batch is held back until ``close()`` so it can carry ``wait=True``.
+    """
+
+    def __init__(self, client, collection_name: str, batch_size: int = UPSERT_BATCH_SIZE):
+        self.client = client
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.stats = {"points": 0, "requests": 0, "seconds": 0.0}
+        self._buffer: List[models.PointStruct] = []
+        self._lock = threading.Lock()
+
+    def _send(self, points: List[models.PointStruct], wait: bool) -> None:
+        started = time.perf_counter()
+        self.client.upsert(collection_name=self.collection_name, points=points, wait=wait)
+        self.stats["seconds"] += time.perf_counter() - started
+        self.stats["requests"] += 1
+        self.stats["points"] += len(points)
+
+    def add(self, point: models.PointStruct) -> None:
+        self.add_many([point])
+
+    def add_many(self, points: Iterable[models.PointStruct]) -> None:
+        with self._lock:
+            for point in points:
+                # Only send a full batch once another point arrives; close() sends the last one with wait=True
+                if len(self._buffer) >= self.batch_size:
+                    batch, self._buffer = self._buffer, []
+                    self._send(batch, wait=False)
+                self._buffer.append(point)
+
+    def close(self) -> Dict[str, Any]:
+        """Sends the remaining points and waits until everything sent so far is applied."""
+        with self._lock:
+            if self._buffer:
+                batch, self._buffer = self._buffer, []
+                self._send(batch, wait=True)
+        return self.stats
+
+    def __enter__(self) -> "BulkUpserter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
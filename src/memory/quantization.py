@@ -0,0 +1,434 @@
+"""
+Compressed vector codes for the local stores, with exact re-scoring.
+
+A 1536-d float32 embedding takes 6 KB, so a few hundred thousand chunks fill
+gigabytes of RAM. A quantizer replaces each vector with a short uint8 code:
+
+    int8    ScalarQuantizer: one byte per dimension, each dimension scaled
+            between its minimum and maximum. 4x smaller; scores move by a
+            fraction of a percent.
+    pq      ProductQuantizer: the vector split into ``m`` sub-vectors, each
+            replaced by the nearest of 256 k-means centroids. One byte per
+            sub-vector (1536-d with m=192: 32x smaller); coarser scores.
+
+Searches score every code, keep the best ``k * rerank`` candidates, and
+re-score only those against the float32 vectors. The float32 vectors stay in a
+memory-mapped file, so only the candidates' pages are read. Every quantizer
+records ``max_error``, the largest ``||x - decode(encode(x))||`` it has
+produced. ``|q . x - q . decode(x)| <= |q| * max_error``, so a threshold search
+that keeps candidates within that bound and re-scores them returns exactly the
+float32 result (see src.tasks.similarity).
+
+Scores are inner products. Callers that want cosine pass unit-length rows.
+
+``python -m src.memory.quantization`` reports memory against recall@k and
+latency for each setting. It runs on the task sidecar, the FAISS vector
+memory, or a synthetic corpus.
+
+Example usage:
+    from src.memory.quantization import get_quantizer, search_codes
+
+    quantizer = get_quantizer("int8").fit(vectors)
+    codes = quantizer.encode(vectors)
+    scores, rows = search_codes(quantizer, codes, queries, k=10, rerank=4, vectors=vectors)
+"""
+
+import argparse
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # Optional: only speeds up PQ training
+    faiss = None
+
+QUANTIZATION_KINDS = ("int8", "pq")
+SCORE_BLOCK = 8192       # Codes decoded per block while scoring, to bound temporary memory
+TRAIN_SAMPLE = 65536     # Rows used to fit a quantizer
+PQ_TRAIN_PER_CENTROID = 64
+ADC_MAX_QUERIES = 8      # Up to this many queries, PQ scores with lookup tables instead of decoding
+DEFAULT_RERANK = 4
+
+
+class Quantizer(ABC):
+    """Common interface: fit on a sample, encode rows to uint8 codes, score codes against queries."""
+
+    kind = ""
+
+    def __init__(self):
+        self.max_error = 0.0
+
+    @property
+    @abstractmethod
+    def dim(self) -> int:
+        """Dimension of the vectors the quantizer was fitted on."""
+
+    @property
+    @abstractmethod
+    def code_size(self) -> int:
+        """Bytes per encoded vector."""
+
+    @property
+    @abstractmethod
+    def nbytes(self) -> int:
+        """Bytes held by the quantizer itself (ranges or codebooks), excluding codes."""
+
+    @abstractmethod
+    def fit(self, vectors: np.ndarray) -> "Quantizer":
+        """Learns the ranges or codebooks from a sample of ``vectors``; returns self."""
+
+    @abstractmethod
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        """uint8 codes for one block of rows."""
+
+    @abstractmethod
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        """Reconstructed float32 rows for ``codes``."""
+
+    @abstractmethod
+    def _score_block(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Approximate ``queries @ decode(codes).T`` for one block of codes."""
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        """uint8 codes for ``vectors``; widens ``max_error`` to cover them."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        codes = np.empty((len(vectors), self.code_size), dtype=np.uint8)
+        for start in range(0, len(vectors), SCORE_BLOCK):
+            block = vectors[start:start + SCORE_BLOCK]
+            codes[start:start + len(block)] = self._encode(block)
+            errors = np.linalg.norm(block - self.decode(codes[start:start + len(block)]), axis=1)
+            self.max_error = max(self.max_error, float(errors.max(initial=0.0)))
+        return codes
+
+    def scores(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """Approximate ``queries @ vectors.T`` from the codes, shape (queries, rows)."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dim)
+        out = np.empty((len(queries), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_BLOCK):
+            block = np.asarray(codes[start:start + SCORE_BLOCK])
+            out[:, start:start + len(block)] = self._score_block(block, queries)
+        return out
+
+    def error_bound(self, queries: np.ndarray) -> np.ndarray:
+        """Per query, the most an approximate score can differ from the exact one."""
+        return np.linalg.norm(np.asarray(queries, dtype=np.float32).reshape(-1, self.dim), axis=1) * self.max_error
+
+    @abstractmethod
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """The fitted state as named arrays, as written by save() and read by load_quantizer()."""
+
+    def save(self, path: Path) -> None:
+        with open(path, "wb") as f:
+            np.savez(f, kind=np.array(self.kind), max_error=np.array(self.max_error), **self.to_arrays())
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.dim}-d, {self.code_size} bytes/vector>"
+
+
+class ScalarQuantizer(Quantizer):
+    kind = "int8"
+
+    def __init__(self, low: Optional[np.ndarray] = None, scale: Optional[np.ndarray] = None):
+        super().__init__()
+        self.low, self.scale = low, scale
+
+    @property
+    def dim(self) -> int:
+        return len(self.low)
+
+    @property
+    def code_size(self) -> int:
+        return self.dim
+
+    @property
+    def nbytes(self) -> int:
+        return self.low.nbytes + self.scale.nbytes
+
+    def fit(self, vectors: np.ndarray) -> "ScalarQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.low = vectors.min(axis=0)
+        span = vectors.max(axis=0) - self.low
+        self.scale = np.where(span > 0, span / 255.0, 1.0).astype(np.float32)
+        return self
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        # Rows outside the fitted range are clipped; max_error records how far that moved them
+        return np.clip(np.rint((vectors - self.low) / self.scale), 0, 255).astype(np.uint8)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return self.low + np.asarray(codes, dtype=np.float32) * self.scale
+
+    def _score_block(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        # q . (low + c * scale) = q . low + (q * scale) . c
+        return (queries * self.scale) @ codes.astype(np.float32).T + (queries @ self.low)[:, None]
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"low": self.low, "scale": self.scale}
+
+
+def kmeans(vectors: np.ndarray, clusters: int, iterations: int = 20, seed: int = 1234) -> np.ndarray:
+    """Lloyd's k-means (faiss when installed); empty clusters keep their previous centroid."""
+    if faiss is not None:
+        trainer = faiss.Kmeans(vectors.shape[1], clusters, niter=iterations, seed=seed, min_points_per_centroid=1)
+        trainer.train(np.ascontiguousarray(vectors, dtype=np.float32))
+        return trainer.centroids
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), clusters, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = nearest_centroids(vectors, centroids)
+        sums = np.stack([np.bincount(assignment, weights=column, minlength=clusters) for column in vectors.T], axis=1)
+        counts = np.bincount(assignment, minlength=clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+
+def nearest_centroids(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    distances = (centroids ** 2).sum(axis=1)[None, :] - 2.0 * vectors @ centroids.T
+    return distances.argmin(axis=1)
+
+
+class ProductQuantizer(Quantizer):
+    kind = "pq"
+
+    def __init__(self, m: int = 0, codebooks: Optional[np.ndarray] = None, iterations: int = 20, seed: int = 1234):
+        super().__init__()
+        self.m = m                      # 0 picks one sub-vector per 8 dimensions at fit time
+        self.codebooks = codebooks      # (m, ksub, dim // m)
+        self.iterations = iterations
+        self.seed = seed
+
+    @property
+    def dim(self) -> int:
+        return self.codebooks.shape[0] * self.codebooks.shape[2]
+
+    @property
+    def code_size(self) -> int:
+        return self.codebooks.shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        return self.codebooks.nbytes
+
+    def fit(self, vectors: np.ndarray) -> "ProductQuantizer":
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1]
+        m = self.m or max(1, dim // 8)
+        while dim % m:
+            m -= 1
+        ksub = min(256, len(vectors))
+        vectors = fit_sample(vectors, ksub * PQ_TRAIN_PER_CENTROID, self.seed)
+        sub = vectors.reshape(len(vectors), m, dim // m)
+        self.m = m
+        self.codebooks = np.stack([
+            kmeans(np.ascontiguousarray(sub[:, j]), ksub, self.iterations, self.seed + j) for j in range(m)
+        ])
+        return self
+
+    def _encode(self, vectors: np.ndarray) -> np.ndarray:
+        sub = vectors.reshape(len(vectors), self.m, -1)
+        return np.stack([nearest_centroids(sub[:, j], self.codebooks[j]) for j in range(self.m)], axis=1)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        codes = np.asarray(codes)
+        parts = self.codebooks[np.arange(self.m)[None, :], codes]      # (rows, m, dsub)
+        return parts.reshape(len(codes), -1)
+
+    def _score_block(self, codes: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        if len(queries) > ADC_MAX_QUERIES:
+            return queries @ self.decode(codes).T     # One matrix product serves the whole batch
+        # Asymmetric distance: a (m, ksub) table of sub-vector products per query, summed over the codes
+        tables = np.einsum("qmd,mkd->qmk", queries.reshape(len(queries), self.m, -1), self.codebooks)
+        sub_rows = np.arange(self.m)[None, :]
+        return np.stack([table[sub_rows, codes].sum(axis=1) for table in tables])
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks}
+
+
+def get_quantizer(kind: str, **params) -> Quantizer:
+    """An unfitted quantizer: ``int8`` or ``pq`` (``m`` sub-vectors)."""
+    if kind == "int8":
+        return ScalarQuantizer()
+    if kind == "pq":
+        return ProductQuantizer(**params)
+    raise ValueError(f"Unknown quantization '{kind}'. Use one of: {', '.join(QUANTIZATION_KINDS)}")
+
+
+def load_quantizer(path: Path) -> Quantizer:
+    with np.load(path) as data:
+        if str(data["kind"]) == "int8":
+            quantizer = ScalarQuantizer(data["low"], data["scale"])
+        else:
+            quantizer = ProductQuantizer(m=data["codebooks"].shape[0], codebooks=data["codebooks"])
+        quantizer.max_error = float(data["max_error"])
+    return quantizer
+
+
+def fit_sample(vectors: np.ndarray, size: int = TRAIN_SAMPLE, seed: int = 1234) -> np.ndarray:
+    """A uniform sample of rows to fit on, so fitting cost stays flat as the corpus grows."""
+    if len(vectors) <= size:
+        return np.asarray(vectors, dtype=np.float32)
+    rows = np.sort(np.random.default_rng(seed).choice(len(vectors), size, replace=False))
+    return np.asarray(vectors[rows], dtype=np.float32)
+
+
+def top_rows(scores: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the ``k`` highest scores in each row, best first."""
+    k = min(k, scores.shape[1])
+    if k < 1:
+        return np.zeros((len(scores), 0), dtype=np.int64)
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, top, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1)
+
+
+def rescore(vectors: np.ndarray, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """Exact scores of ``rows`` (read in ascending order, so a memory map reads each page once)."""
+    order = np.argsort(rows, kind="stable")
+    exact = np.empty(len(rows), dtype=np.float32)
+    exact[order] = np.asarray(vectors[rows[order]], dtype=np.float32) @ query
+    return exact
+
+
+def search_codes(
+    quantizer: Quantizer,
+    codes: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    rerank: int = DEFAULT_RERANK,
+    vectors: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top ``k`` rows by inner product for each query, as ``(scores, rows)``. With
+    ``vectors`` and ``rerank`` > 0 the best ``k * rerank`` code scores are
+    re-scored exactly; otherwise the scores are the approximate ones.
+    """
+    queries = np.asarray(queries, dtype=np.float32).reshape(-1, quantizer.dim)
+    approximate = quantizer.scores(codes, queries)
+    if vectors is None or not rerank:
+        rows = top_rows(approximate, k)
+        return np.take_along_axis(approximate, rows, axis=1), rows
+    candidates = top_rows(approximate, k * rerank)
+    all_scores, all_rows = [], []
+    for query, rows in zip(queries, candidates):
+        exact = rescore(vectors, rows, query)
+        best = np.argsort(-exact, kind="stable")[:k]
+        all_scores.append(exact[best])
+        all_rows.append(rows[best])
+    return np.array(all_scores, dtype=np.float32), np.array(all_rows, dtype=np.int64)
+
+
+# --- Evaluation ---------------------------------------------------------------
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def evaluate(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    settings: Sequence[Tuple[str, int]] = (("int8", 0), ("int8", DEFAULT_RERANK), ("pq", 0), ("pq", DEFAULT_RERANK)),
+    pq_m: int = 0,
+) -> List[Dict[str, float]]:
+    """
+    Memory, recall@k against exact float32 search, and latency per query for
+    each ``(kind, rerank)`` setting. The first row is the float32 baseline.
+    """
+    vectors = _unit(np.asarray(vectors, dtype=np.float32))
+    queries = _unit(np.asarray(queries, dtype=np.float32))
+    started = time.perf_counter()
+    truth = top_rows(queries @ vectors.T, k)
+    baseline_ms = (time.perf_counter() - started) / len(queries) * 1000
+    rows = [{"setting": "float32", "bytes_per_vector": vectors.shape[1] * 4, "memory_mb": vectors.nbytes / 1e6,
+             "recall": 1.0, "ms_per_query": baseline_ms, "fit_s": 0.0}]
+
+    fitted: Dict[str, Tuple[Quantizer, np.ndarray, float]] = {}
+    for kind, rerank in settings:
+        if kind not in fitted:
+            started = time.perf_counter()
+            quantizer = get_quantizer(kind, **({"m": pq_m} if kind == "pq" else {})).fit(fit_sample(vectors))
+            codes = quantizer.encode(vectors)
+            fitted[kind] = (quantizer, codes, time.perf_counter() - started)
+        quantizer, codes, fit_seconds = fitted[kind]
+        started = time.perf_counter()
+        _, found = search_codes(quantizer, codes, queries, k, rerank, vectors if rerank else None)
+        elapsed = time.perf_counter() - started
+        recall = float(np.mean([len(set(f) & set(t)) / len(t) for f, t in zip(found.tolist(), truth.tolist())]))
+        label = f"{kind} ({quantizer.code_size} B)" + (f" + rerank x{rerank}" if rerank else "")
+        rows.append({"setting": label, "bytes_per_vector": quantizer.code_size,
+                     "memory_mb": (codes.nbytes + quantizer.nbytes) / 1e6, "recall": recall,
+                     "ms_per_query": elapsed / len(queries) * 1000, "fit_s": fit_seconds})
+    return rows
+
+
+def print_report(rows: List[Dict[str, float]], count: int, dim: int, k: int) -> None:
+    print(f"{count} vectors, {dim}-d, recall@{k} against exact float32 search\n")
+    print(f"{'setting':<30} {'B/vector':>9} {'in RAM MB':>10} {'recall':>7} {'ms/query':>9} {'fit s':>6}")
+    for row in rows:
+        print(f"{row['setting']:<30} {row['bytes_per_vector']:9d} {row['memory_mb']:10.1f} {row['recall']:7.3f} "
+              f"{row['ms_per_query']:9.2f} {row['fit_s']:6.1f}")
+    print("\nWith rerank the float32 vectors stay on disk, memory-mapped; only the candidates are read.")
+
+
+def _load_source(args) -> np.ndarray:
+    if args.tasks_db:
+        from src.tasks.task_vector_store import TaskVectorStore
+
+        store = TaskVectorStore.for_db(args.tasks_db)
+        vectors, _, live = store.view()
+        return np.asarray(vectors[np.flatnonzero(live)], dtype=np.float32)
+    if args.vector_memory:
+        from src.memory.vector_memory import generation_vectors, load_generation
+
+        generation = load_generation()
+        if generation is None:
+            raise SystemExit("❌ No published vector memory generation.")
+        vectors = generation_vectors(generation)
+        if vectors is None:
+            raise SystemExit("❌ This generation's index is IVF-PQ and keeps no float32 vectors to evaluate.")
+        return np.asarray(vectors, dtype=np.float32)
+    # Clustered points on a low-dimensional subspace plus noise, as in scripts/bench_vector_index.py
+    rng = np.random.default_rng(42)
+    centers = rng.standard_normal((args.clusters, 32), dtype=np.float32)
+    points = centers[rng.integers(0, args.clusters, args.points)] + 0.5 * rng.standard_normal(
+        (args.points, 32), dtype=np.float32)
+    projection = rng.standard_normal((32, args.dim), dtype=np.float32)
+    return points @ projection + 0.5 * rng.standard_normal((args.points, args.dim), dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory against recall for quantized vector storage.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--tasks-db", help="Evaluate the task vector sidecar of this database")
+    source.add_argument("--vector-memory", action="store_true", help="Evaluate the published FAISS vector memory")
+    parser.add_argument("--points", type=int, default=20000, help="Synthetic corpus size (no source given)")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100, help="Queries sampled from the vectors")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", default=f"0,{DEFAULT_RERANK}", help="Comma-separated candidate multipliers")
+    parser.add_argument("--kinds", default="int8,pq")
+    parser.add_argument("--pq-m", type=int, default=0, help="PQ sub-vectors (0: one per 8 dimensions)")
+    args = parser.parse_args()
+
+    vectors = _load_source(args)
+    if len(vectors) < 2:
+        raise SystemExit("❌ Not enough vectors to evaluate.")
+    rng = np.random.default_rng(7)
+    sample = vectors[rng.choice(len(vectors), min(args.queries, len(vectors)), replace=False)]
+    queries = sample + 0.05 * rng.standard_normal(sample.shape).astype(np.float32)   # Near, not equal to, a row
+    settings = [(kind, int(r)) for kind in args.kinds.split(",") for r in args.rerank.split(",")]
+    rows = evaluate(vectors, queries, args.k, settings, args.pq_m)
+    print_report(rows, len(vectors), vectors.shape[1], args.k)
+
+
+if __name__ == "__main__":
+    main()
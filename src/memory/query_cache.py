@@ -0,0 +1,262 @@
+"""
+Query-embedding cache for interactive retrieval.
+
+Dashboards and agents ask the same questions over and over, and every search
+used to start with an embedding round trip. This cache keys the query vector
+by ``(model, normalised query)``, so a repeat query skips the provider
+entirely:
+
+    memory    OrderedDict LRU of the most recent queries (QUERY_CACHE_MEMORY_ENTRIES)
+    disk      SQLite table of float32 blobs shared by every process (QUERY_CACHE_DISK_ENTRIES)
+
+Entries expire QUERY_CACHE_TTL seconds after they were embedded, so a changed
+model deployment behind the same name is picked up eventually. Normalisation
+applies NFKC and collapses whitespace but keeps case, and the normalised text
+is what gets embedded, so two spellings that share a key also share a vector.
+``metrics()`` reports hits per tier, misses, expiries and the embedding time
+the hits avoided.
+
+Example usage:
+    from src.memory.query_cache import embed_query, get_query_cache
+
+    vector = embed_query("open loops about hiring")       # Default provider
+    vector = embed_query(text, provider=get_provider("hashing:256"))
+    print(get_query_cache().metrics())
+"""
+
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.memory.embedding_providers import EmbeddingProvider, get_provider
+from src.system.path_config import VECTOR_INDEX_DIR
+
+QUERY_CACHE_PATH = VECTOR_INDEX_DIR / "query_cache.db"
+QUERY_CACHE_ENABLED = os.getenv("QUERY_CACHE", "1") != "0"
+QUERY_CACHE_TTL = float(os.getenv("QUERY_CACHE_TTL", 7 * 24 * 3600))
+QUERY_CACHE_MEMORY_ENTRIES = int(os.getenv("QUERY_CACHE_MEMORY_ENTRIES", 1024))
+QUERY_CACHE_DISK_ENTRIES = int(os.getenv("QUERY_CACHE_DISK_ENTRIES", 50_000))
+
+Vector = List[float]
+Key = Tuple[str, str]
+
+
+def normalise_query(text: str) -> str:
+    """NFKC with runs of whitespace collapsed to one space. Case is kept; it can change an embedding."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").split())
+
+
+class QueryEmbeddingCache:
+    def __init__(
+        self,
+        path: Optional[Path] = QUERY_CACHE_PATH,
+        ttl: float = QUERY_CACHE_TTL,
+        memory_entries: int = QUERY_CACHE_MEMORY_ENTRIES,
+        disk_entries: int = QUERY_CACHE_DISK_ENTRIES,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.clock = clock
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "expired": 0, "stores": 0, "evictions": 0}
+        self._embed_seconds = 0.0   # Total time spent embedding misses
+        self._memory: "OrderedDict[Key, Tuple[float, Vector]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        if path is not None:  # None keeps the cache in-process only
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS queries (
+                    model TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL,
+                    PRIMARY KEY (model, query)
+                );
+                CREATE INDEX IF NOT EXISTS idx_queries_lru ON queries(last_used);
+                """
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _fresh(self, created_at: float, now: float) -> bool:
+        return self.ttl <= 0 or now - created_at < self.ttl
+
+    # --- Lookup ---------------------------------------------------------------
+
+    def get(self, model: str, query: str) -> Optional[Vector]:
+        """The cached vector for an already normalised query, or None (counted as a miss)."""
+        key, now, expired = (model, query), self.clock(), False
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if self._fresh(entry[0], now):
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return entry[1]
+                del self._memory[key]
+                expired = True
+
+            row = None
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT vector, created_at FROM queries WHERE model = ? AND query = ?", key
+                ).fetchone()
+            if row is not None:
+                if self._fresh(row[1], now):
+                    self._conn.execute(
+                        "UPDATE queries SET last_used = ? WHERE model = ? AND query = ?", (now, *key)
+                    )
+                    vector = np.frombuffer(row[0], dtype=np.float32).tolist()
+                    self._remember(key, row[1], vector)
+                    self.stats["disk_hits"] += 1
+                    return vector
+                self._conn.execute("DELETE FROM queries WHERE model = ? AND query = ?", key)
+                expired = True
+            self.stats["expired"] += expired   # Counted once, whichever tiers held the stale entry
+            self.stats["misses"] += 1
+            return None
+
+    # --- Storage --------------------------------------------------------------
+
+    def _remember(self, key: Key, created_at: float, vector: Vector) -> None:
+        self._memory[key] = (created_at, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def put(self, model: str, query: str, vector: Sequence[float]) -> None:
+        key, now = (model, query), self.clock()
+        vector = [float(x) for x in vector]
+        with self._lock:
+            self._remember(key, now, vector)
+            self.stats["stores"] += 1
+            if self._conn is None:
+                return
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (model, query, vector, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (model, query, np.asarray(vector, dtype=np.float32).tobytes(), now, now),
+            )
+            self._evict()
+
+    def _evict(self) -> None:
+        count = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        excess = count - self.disk_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM queries WHERE rowid IN (SELECT rowid FROM queries ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+            self.stats["evictions"] += excess
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM queries")
+
+    # --- Embedding ------------------------------------------------------------
+
+    def embed(self, provider: EmbeddingProvider, query: str) -> Optional[Vector]:
+        return self.embed_many(provider, [query])[0]
+
+    def embed_many(self, provider: EmbeddingProvider, queries: Sequence[str]) -> List[Optional[Vector]]:
+        """Vectors in input order. Misses go to the provider in one request; None where it failed."""
+        normalised = [normalise_query(q) for q in queries]
+        vectors = [self.get(provider.model_id, q) if q else None for q in normalised]
+        missing = list(dict.fromkeys(q for q, v in zip(normalised, vectors) if q and v is None))
+        if missing:
+            started = time.perf_counter()
+            fetched = dict(zip(missing, provider.embed(missing)))
+            with self._lock:
+                self._embed_seconds += time.perf_counter() - started
+            for query, vector in fetched.items():
+                if vector is not None:
+                    self.put(provider.model_id, query, vector)
+            vectors = [v if v is not None else fetched.get(q) for q, v in zip(normalised, vectors)]
+        return vectors
+
+    # --- Metrics --------------------------------------------------------------
+
+    def metrics(self) -> Dict[str, float]:
+        with self._lock:
+            stats = dict(self.stats)
+            embedded = stats["stores"]
+            stats["memory_entries"] = len(self._memory)
+            stats["disk_entries"] = (
+                self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0] if self._conn is not None else 0
+            )
+            avg_embed = self._embed_seconds / embedded if embedded else 0.0
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        stats["avg_embed_ms"] = avg_embed * 1000
+        stats["saved_ms"] = hits * avg_embed * 1000   # Estimated from the misses this process paid for
+        return stats
+
+    def report(self) -> None:
+        m = self.metrics()
+        print(f"🔁 Query cache: {m['memory_hits']} memory + {m['disk_hits']} disk hits, {m['misses']} misses "
+              f"({m['hit_rate']:.0%} hit rate), {m['expired']} expired")
+        print(f"  {m['memory_entries']} in memory, {m['disk_entries']} on disk, "
+              f"~{m['saved_ms']:.0f} ms of embedding avoided")
+
+
+_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_query_cache() -> Optional[QueryEmbeddingCache]:
+    """Process-wide cache, or None when disabled with QUERY_CACHE=0 or unusable."""
+    global _cache
+    if not QUERY_CACHE_ENABLED:
+        return None
+    with _cache_lock:
+        if _cache is None:
+            try:
+                _cache = QueryEmbeddingCache()
+            except (OSError, sqlite3.Error) as e:
+                print(f"⚠️ Query cache unavailable, continuing without it: {e}")
+                return None
+        return _cache
+
+
+def embed_query(query: str, provider: Optional[EmbeddingProvider] = None) -> Optional[Vector]:
+    """Embeds a search query, reusing the cached vector for a repeat query."""
+    provider = provider or get_provider()
+    cache = get_query_cache()
+    if cache is None:
+        return provider.embed_one(normalise_query(query))
+    return cache.embed(provider, query)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show or clear the query-embedding cache.")
+    parser.add_argument("--clear", action="store_true")
+    args = parser.parse_args()
+
+    cache = get_query_cache()
+    if cache is None:
+        print("Query cache is disabled (QUERY_CACHE=0).")
+    elif args.clear:
+        cache.clear()
+        print("🧹 Query cache cleared.")
+    else:
+        cache.report()
@@ -1,16 +1,19 @@
 import hashlib
-from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict  # Added for type hinting
 
 import yaml
-from qdrant_client.http import models  # For PointStruct if needed later
+
+from src.memory.collection_registry import verify_collection
+from src.memory.embed_pipeline import EmbedItem, run_embed_pipeline
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_sync import BulkUpserter, ensure_payload_indexes
 
 # Assuming src.qdrant.query handles OpenAI and Qdrant client initialization
-from src.qdrant.query import (  # Changed to import get_qdrant_client
-    embed_text,
-    get_qdrant_client,
-)
+from src.qdrant.query import get_qdrant_client  # Changed to import get_qdrant_client
+from src.system.frontmatter_reader import read_frontmatter
+from src.system.loop_index import get_loop_index
+from src.system.sync_manifest import open_manifest
 
 # Determine project root assuming this script is in src/memory/resync_qdrant_and_manifest.py
 project_root = Path(__file__).resolve().parent.parent.parent
@@ -25,18 +28,11 @@ def sha256_text(text: str) -> str:
 def extract_frontmatter(file_path: Path) -> Dict[str, Any]:
     """Extracts frontmatter from a markdown file."""
     try:
-        content = file_path.read_text(encoding="utf-8")
-        parts = content.split("---", 2)
-        if len(parts) >= 3:
-            frontmatter = yaml.safe_load(parts[1])
-            if isinstance(frontmatter, dict):
-                return frontmatter
-            else:
-                print(f"Warning: Frontmatter in {file_path.name} is not a dictionary. Returning empty.")
-                return {}
-        else:
+        frontmatter, _ = read_frontmatter(file_path)
+        if frontmatter is None:
             print(f"Warning: No frontmatter found in {file_path.name}. Returning empty.")
             return {}
+        return frontmatter
     except FileNotFoundError:
         print(f"Error: File not found at {file_path}")
         return {}
@@ -47,16 +43,6 @@ def extract_frontmatter(file_path: Path) -> Dict[str, Any]:
         print(f"An unexpected error occurred while extracting frontmatter from {file_path.name}: {e}")
         return {}
 
-def update_manifest_entry(manifest: Dict[str, Any], file_path: Path, uuid: str, content_hash: str):
-    """Updates a single entry in the manifest dictionary."""
-    # Use relative path string for manifest keys for consistency
-    relative_path_str = str(file_path.relative_to(project_root))
-    manifest[relative_path_str] = {
-        "uuid": uuid,
-        "hash": content_hash,
-        "last_updated": datetime.now().isoformat()
-    }
-
 def main():
     print("Starting Qdrant and Manifest resync process.")
     print(f"Monitoring loop directory: {LOOP_DIR}")
@@ -67,88 +53,92 @@ def main():
         print("❌ Qdrant client not available. Aborting sync process.")
         return
 
-    try:
-        manifest_content = MANIFEST_PATH.read_text(encoding="utf-8") if MANIFEST_PATH.exists() else "{}"
-        manifest = yaml.safe_load(manifest_content) or {}
-        if not isinstance(manifest, dict):
-            print(f"Warning: Manifest content at {MANIFEST_PATH} is not a dictionary. Initializing empty manifest.")
-            manifest = {}
-    except yaml.YAMLError as e:
-        print(f"Error parsing manifest YAML from {MANIFEST_PATH}: {e}. Initializing empty manifest.")
-        manifest = {}
-    except Exception as e:
-        print(f"An unexpected error occurred reading manifest {MANIFEST_PATH}: {e}. Initializing empty manifest.")
-        manifest = {}
+    # Refuse to mix vectors from different models in one collection
+    provider = get_provider()
+    verify_collection(COLLECTION_NAME, provider, client=qclient, record=True)
+    created = ensure_payload_indexes(qclient, COLLECTION_NAME)
+    if created:
+        print(f"🗂️ Created payload indexes: {', '.join(created)}")
+
+    # SQLite manifest; the YAML file is imported once and is otherwise only a git snapshot export
+    manifest = open_manifest(MANIFEST_PATH)
 
     if not LOOP_DIR.exists():
         print(f"⚠️ Loop directory {LOOP_DIR} does not exist. Creating it.")
         LOOP_DIR.mkdir(parents=True, exist_ok=True)
 
-    processed_files = 0
-    for file_path in LOOP_DIR.glob("*.md"):
-        print(f"\nProcessing file: {file_path.name}")
-        try:
-            content = file_path.read_text(encoding="utf-8")
-            frontmatter = extract_frontmatter(file_path)
-
-            uuid = frontmatter.get("uuid")
-            if not uuid:
-                print(f"⚠️ Skipping {file_path.name}, no UUID in frontmatter.")
-                continue
-
-            # Check if file needs update based on hash (optional optimization)
-            current_hash = sha256_text(content)
-            relative_path_str = str(file_path.relative_to(project_root))
-            if manifest.get(relative_path_str, {}).get("hash") == current_hash:
-                print(f"⚪️ Skipping {file_path.name}, content hash unchanged.")
-                # Optionally update last_updated timestamp if desired even if hash is same
-                # update_manifest_entry(manifest, file_path, uuid, current_hash)
-                continue
-
-            print(f"  Embedding content for {file_path.name} (UUID: {uuid})...")
-            embedding = embed_text(content) # This can raise exceptions if OpenAI key is missing or API fails
-
-            point_payload = {
-                "filename": str(file_path.name), # Storing only filename, not full path
-                "uuid": uuid,
-                "project": frontmatter.get("project"),
-                "phase": frontmatter.get("phase"),
-                "tags": frontmatter.get("tags", []),
-                 # Add other relevant frontmatter fields to payload as needed
-                "source": frontmatter.get("source"),
-                "created": frontmatter.get("created")
-            }
-            # Remove None values from payload to keep it clean
-            point_payload = {k: v for k, v in point_payload.items() if v is not None}
-
-            print(f"  Upserting to Qdrant collection '{COLLECTION_NAME}'...")
-            qclient.upsert(
-                collection_name=COLLECTION_NAME,
-                points=[
-                    models.PointStruct(
-                        id=uuid,
-                        vector=embedding,
-                        payload=point_payload
-                    )
-                ]
-            )
-
-            update_manifest_entry(manifest, file_path, uuid, current_hash)
-            print(f"✅ Embedded and manifest updated for: {file_path.name}")
-            processed_files += 1
-
-        except Exception as e:
-            print(f"❌ Error processing {file_path.name}: {e}")
-            import traceback
-            traceback.print_exc() # Print full traceback for debugging
-            continue # Move to the next file
-
+    # Stat-only pre-pass: only files whose size or mtime moved are re-hashed
+    refreshed = manifest.refresh(LOOP_DIR)
+    pending = {entry.path for entry in manifest.pending(LOOP_DIR)}
+    print(f"🔍 {refreshed['scanned']} files scanned, {refreshed['updated']} changed on disk, {len(pending)} pending sync.")
+
+    def read(entry):
+        """Read stage: skips files without a UUID."""
+        file_path = entry.path
+        frontmatter = entry.frontmatter
+
+        uuid = frontmatter.get("uuid")
+        if not uuid:
+            print(f"⚠️ Skipping {file_path.name}, no UUID in frontmatter.")
+            return None
+
+        point_payload = {
+            "filename": str(file_path.name), # Storing only filename, not full path
+            "uuid": uuid,
+            "project": frontmatter.get("project"),
+            "phase": frontmatter.get("phase"),
+            "status": frontmatter.get("status"),
+            "workstream": frontmatter.get("workstream"),
+            "tags": frontmatter.get("tags", []),
+             # Add other relevant frontmatter fields to payload as needed
+            "source": frontmatter.get("source"),
+            "created": frontmatter.get("created"),
+            "content_hash": entry.sha256,
+        }
+        # Remove None values from payload to keep it clean
+        point_payload = {k: v for k, v in point_payload.items() if v is not None}
+        return EmbedItem(
+            key=file_path.name,
+            point_id=uuid,
+            text=entry.read_text(),
+            payload=point_payload,
+            content_hash=entry.sha256,
+        )
+
+    # Batches of several hundred go out without waiting; close() is the consistency barrier
+    upserter = BulkUpserter(qclient, COLLECTION_NAME)
+
+    synced = []
+
+    def record(items):
+        for item in items:
+            synced.append((manifest.relative(LOOP_DIR / item.key), item.point_id, item.content_hash))
+            print(f"✅ Embedded: {item.key}")
+
+    # Reads, embedding requests and upserts overlap; see src.memory.embed_pipeline
+    sources = [entry for entry in get_loop_index(LOOP_DIR).entries() if manifest.relative(entry.path) in pending]
+    stats = run_embed_pipeline(
+        sources,
+        read,
+        upserter.add_many,
+        embedder=provider,
+        on_upserted=record,
+    )
     try:
-        MANIFEST_PATH.write_text(yaml.safe_dump(manifest, sort_keys=False, indent=2), encoding="utf-8")
-        print(f"\nProcessed {processed_files} files.")
-        print("✅ Manifest successfully updated.")
+        upserter.close()
     except Exception as e:
-        print(f"❌ Error writing manifest file to {MANIFEST_PATH}: {e}")
+        # Entries recorded above may not have reached Qdrant; leave the manifest as it was
+        print(f"❌ Error upserting to Qdrant collection '{COLLECTION_NAME}': {e}. Manifest not updated.")
+        manifest.close()
+        return
+    stats.report()
+    print(f"  Upserted {upserter.stats['points']} points in {upserter.stats['requests']} requests.")
+    processed_files = stats.upserted
+
+    manifest.mark_synced(synced)
+    manifest.close()
+    print(f"\nProcessed {processed_files} files.")
+    print("✅ Manifest successfully updated.")
 
 if __name__ == "__main__":
     import os
@@ -5,25 +5,34 @@ from datetime import datetime
 from pathlib import Path
 
 import frontmatter
-from openai import OpenAI
-from qdrant_client import QdrantClient
 from qdrant_client.http.exceptions import UnexpectedResponse as QdrantUnexpectedResponse
 from qdrant_client.models import Distance, PointStruct, VectorParams
 
+from src.memory.collection_registry import verify_collection
+from src.memory.embed_pipeline import EmbedItem, run_embed_pipeline
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import get_qdrant_client
+from src.memory.qdrant_sync import (
+    BulkUpserter,
+    ensure_payload_indexes,
+    fetch_payload_values,
+    scroll_payload_values,
+)
+
 # Assuming EMBED_TRACK_FILE is not strictly needed for single file updates,
 # but will keep it if resync logic is maintained.
 # from src.path_config import EMBED_TRACK_FILE # Commented out for now, revise if resync needed
 
-client = OpenAI()
-# Ensure QDRANT_HOST and QDRANT_PORT are configured, e.g., via environment variables or a config file
-QDRANT_HOST = "170.64.176.146" # Updated to Droplet IP
-QDRANT_PORT = 6333      # Or get from env
+# The server comes from QDRANT_URL / QDRANT_HOST (see src/memory/qdrant_clients.py)
 QDRANT_COLLECTION_NAME = "workstream_items"
-TEXT_EMBEDDING_MODEL_DIMENSION = 1536 # For text-embedding-3-small
+_collection_ready = False
 
-# Initialize Qdrant Client and ensure collection exists
+# Shared Qdrant client; the collection is ensured on first use instead of at import
 def get_qdrant_client_and_ensure_collection():
-    client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+    global _collection_ready
+    client = get_qdrant_client()
+    if _collection_ready:
+        return client
     try:
         collections = client.get_collections().collections
         collection_names = [c.name for c in collections]
@@ -31,11 +40,15 @@ def get_qdrant_client_and_ensure_collection():
             print(f"Collection '{QDRANT_COLLECTION_NAME}' not found. Creating it...")
             client.create_collection(
                 collection_name=QDRANT_COLLECTION_NAME,
-                vectors_config=VectorParams(size=TEXT_EMBEDDING_MODEL_DIMENSION, distance=Distance.COSINE)
+                vectors_config=VectorParams(size=get_provider().dimension, distance=Distance.COSINE)
             )
             print(f"Collection '{QDRANT_COLLECTION_NAME}' created successfully.")
         else:
             print(f"Collection '{QDRANT_COLLECTION_NAME}' already exists.")
+        created = ensure_payload_indexes(client, QDRANT_COLLECTION_NAME)
+        if created:
+            print(f"Created payload indexes on {', '.join(created)}.")
+        _collection_ready = True
     except Exception as e:
         print(f"Error connecting to Qdrant or ensuring collection: {e}")
         print("Please ensure Qdrant is running and accessible, and the API key for OpenAI is set if needed by other parts.")
@@ -43,9 +56,6 @@ def get_qdrant_client_and_ensure_collection():
         # For now, let's allow it to try to continue, operations will fail if client is None or collection isn't truly there
     return client
 
-qdrant = get_qdrant_client_and_ensure_collection() # Global qdrant client instance
-
-
 def get_content_hash(content: str) -> str:
     """Generates a SHA-256 hash for the given content."""
     return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -56,12 +66,7 @@ def embed_text(text: str): # Renamed from 'embed' to be more specific
     if not text:
         print("⚠️ Cannot embed empty text.")
         return None
-    try:
-        response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"❌ Error generating embedding: {e}")
-        return None
+    return get_provider().embed_one(text)
 
 
 def is_valid_uuid(val):
@@ -87,69 +92,96 @@ def get_qdrant_id(metadata: dict, file_stem: str) -> str:
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, file_stem))
 
 
-def process_and_embed_loop_file(file_path_str: str):
-    """Loads a loop file, extracts content and metadata, generates embedding, and upserts to Qdrant."""
-    file_path = Path(file_path_str)
-    if not file_path.exists():
-        print(f"❌ File not found: {file_path_str}")
-        return
-
-    try:
-        post = frontmatter.load(file_path)
-        content = post.content
-        metadata = post.metadata
-        file_stem = file_path.stem # Original filename stem for reference
+def prepare_loop_point(file_path: Path):
+    """Returns (qdrant_id, content, payload) for a loop file, or None if it has no content."""
+    post = frontmatter.load(file_path)
+    content = post.content
+    metadata = post.metadata
+    file_stem = file_path.stem # Original filename stem for reference
 
-        qdrant_id = get_qdrant_id(metadata, file_stem)
-        print(f"ℹ️ Using Qdrant ID: {qdrant_id} for file: {file_path.name}")
+    qdrant_id = get_qdrant_id(metadata, file_stem)
+    if not content.strip():
+        print(f"⚠️ Skipped embedding for {file_stem} (ID: {qdrant_id}) (empty content).")
+        return None
 
-        if not content.strip():
-            print(f"⚠️ Skipped embedding for {file_stem} (ID: {qdrant_id}) (empty content).")
-            return
+    payload = {
+        "path": str(file_path),
+        "file_stem": file_stem, # Store original file stem
+        "title": metadata.get("title", file_stem),
+        "tags": metadata.get("tags", []),
+        "created_at": metadata.get("created_at", datetime.now().isoformat()),
+        "content_hash": get_content_hash(content),
+        **{k: v for k, v in metadata.items() if k not in ["title", "tags", "created_at", "id", "uuid"]}
+    }
+    return qdrant_id, content, payload
 
-        current_hash = get_content_hash(content)
 
+def fetch_existing_hashes(ids) -> dict:
+    """Content hashes already stored in Qdrant, fetched in batches. Empty if they can't be read."""
+    try:
+        return fetch_payload_values(get_qdrant_client_and_ensure_collection(), QDRANT_COLLECTION_NAME, ids)
+    except QdrantUnexpectedResponse as qe:
+        print(f"⚠️ Could not verify existing points due to Qdrant error: {qe}. Proceeding with upsert attempt.")
+    except Exception as e:
+        print(f"⚠️ Could not verify existing points due to general error: {e}. Proceeding with upsert attempt.")
+    return {}
+
+
+def process_and_embed_loop_files(file_paths):
+    """
+    Embeds and upserts loop files whose content hash differs from the one stored in Qdrant.
+    Hashes are checked in batched retrieves and points are upserted in bulk.
+    """
+    prepared = []
+    for file_path_str in file_paths:
+        file_path = Path(file_path_str)
+        if not file_path.exists():
+            print(f"❌ File not found: {file_path_str}")
+            continue
         try:
-            retrieved_points = qdrant.retrieve(collection_name=QDRANT_COLLECTION_NAME, ids=[qdrant_id])
-            existing_point = retrieved_points[0] if retrieved_points else None
-
-            if existing_point and existing_point.payload and existing_point.payload.get("content_hash") == current_hash:
-                print(f"ℹ️ Loop ID {qdrant_id} ({file_stem}) already up-to-date in Qdrant. Skipping.")
-                return
-        except QdrantUnexpectedResponse as qe: # Catch Qdrant specific API errors for retrieve.
-            if hasattr(qe, 'status_code') and qe.status_code == 404: # Point not found is expected for new items
-                 print(f"ℹ️ Point ID {qdrant_id} not found in Qdrant. Proceeding to embed.")
-            elif hasattr(qe, 'content') and "is not a valid point ID" in str(qe.content): # Defensive check
-                print(f"❌ Error: Generated Qdrant ID '{qdrant_id}' is invalid for Qdrant: {qe.content}. Skipping file {file_stem}.")
-                return
-            else:
-                print(f"⚠️ Could not verify existing point for ID {qdrant_id} ({file_stem}) due to Qdrant error: {qe}. Proceeding with upsert attempt.")
+            point = prepare_loop_point(file_path)
         except Exception as e:
-            print(f"⚠️ Could not verify existing point for ID {qdrant_id} ({file_stem}) due to general error: {e}. Proceeding with upsert attempt.")
-
-        vector = embed_text(content)
-        if vector is None:
-            print(f"❌ Failed to generate embedding for {file_stem} (ID: {qdrant_id}). Skipping Qdrant update.")
-            return
-
-        payload = {
-            "path": str(file_path),
-            "file_stem": file_stem, # Store original file stem
-            "title": metadata.get("title", file_stem),
-            "tags": metadata.get("tags", []),
-            "created_at": metadata.get("created_at", datetime.now().isoformat()),
-            "content_hash": current_hash,
-            **{k: v for k, v in metadata.items() if k not in ["title", "tags", "created_at", "id", "uuid"]}
-        }
-
-        qdrant.upsert(
-            collection_name=QDRANT_COLLECTION_NAME,
-            points=[PointStruct(id=qdrant_id, vector=vector, payload=payload)],
-        )
-        print(f"✅ Embedded and updated Qdrant for ID: {qdrant_id} ({file_path.name})")
+            print(f"❌ Failed to process or embed {file_path.name}: {e}")
+            continue
+        if point:
+            print(f"ℹ️ Using Qdrant ID: {point[0]} for file: {file_path.name}")
+            prepared.append(point)
+    if not prepared:
+        return 0
+
+    existing = fetch_existing_hashes([qdrant_id for qdrant_id, _, _ in prepared])
+    changed = []
+    for qdrant_id, content, payload in prepared:
+        if existing.get(qdrant_id) == payload["content_hash"]:
+            print(f"ℹ️ Loop ID {qdrant_id} ({payload['file_stem']}) already up-to-date in Qdrant. Skipping.")
+        else:
+            changed.append((qdrant_id, content, payload))
+    if not changed:
+        return 0
+
+    provider = get_provider()
+    qdrant = get_qdrant_client_and_ensure_collection()
+    verify_collection(QDRANT_COLLECTION_NAME, provider, client=qdrant, record=True)
+    vectors = provider.embed(content for _, content, _ in changed)
+
+    upserted = 0
+    with BulkUpserter(qdrant, QDRANT_COLLECTION_NAME) as upserter:
+        for (qdrant_id, _, payload), vector in zip(changed, vectors):
+            if vector is None:
+                print(f"❌ Failed to generate embedding for {payload['file_stem']} (ID: {qdrant_id}). Skipping Qdrant update.")
+                continue
+            upserter.add(PointStruct(id=qdrant_id, vector=vector, payload=payload))
+            upserted += 1
+    print(f"✅ Embedded and updated Qdrant for {upserted} file(s) in {upserter.stats['requests']} request(s)")
+    return upserted
 
+
+def process_and_embed_loop_file(file_path_str: str):
+    """Loads a loop file, extracts content and metadata, generates embedding, and upserts to Qdrant."""
+    try:
+        process_and_embed_loop_files([file_path_str])
     except Exception as e:
-        print(f"❌ Failed to process or embed {file_path.name}: {e}")
+        print(f"❌ Failed to process or embed {Path(file_path_str).name}: {e}")
 
 
 # The following functions are part of the old resync logic.
@@ -181,39 +213,42 @@ def resync_embeddings():
     files_projects = list(Path("/Users/air/AIR01/02 Workstreams/Projects").glob("*.md"))
     files = files_programs + files_projects
 
-    processed_count = 0
-    for file_path in files:
-        try:
-            # Check if file was modified since last sync
-            if datetime.fromtimestamp(file_path.stat().st_mtime) > last_sync:
-                print(f"🔄 Resyncing: {file_path.name}")
-                # Reuse the single file processing logic
-                # For resync, we might not need the detailed hash check if we rely on mtime,
-                # but using process_and_embed_loop_file ensures consistency.
-                # However, process_and_embed_loop_file loads frontmatter which might be slow for many files.
-                # For simplicity now, directly calling embed and upsert for resync as before.
-                content = file_path.read_text()
-                if not content.strip():
-                    print(f"⚠️ Skipped resync for {file_path.name} (empty content).")
-                    continue
-
-                vector = embed_text(content)
-                if vector:
-                    qdrant.upsert(
-                        collection_name=QDRANT_COLLECTION_NAME,
-                        points=[PointStruct(id=file_path.stem, vector=vector, payload={"path": str(file_path)})],
-                    )
-                    print(f"✅ Re-embedded during resync: {file_path.name}")
-                    processed_count += 1
-                else:
-                    print(f"❌ Failed to generate embedding for {file_path.name} during resync.")
-            else:
-                # print(f" फाइल {file_path.name} has not been modified since last sync.")
-                pass
-
+    provider = get_provider()
+    qdrant = get_qdrant_client_and_ensure_collection()
+    verify_collection(QDRANT_COLLECTION_NAME, provider, client=qdrant, record=True)
+    # One payload-only scroll instead of a retrieve per file
+    known_hashes = scroll_payload_values(qdrant, QDRANT_COLLECTION_NAME)
+
+    def read(file_path):
+        # Check if file was modified since last sync
+        if datetime.fromtimestamp(file_path.stat().st_mtime) <= last_sync:
+            return None
+        point = prepare_loop_point(file_path)
+        if point is None:
+            return None
+        qdrant_id, content, payload = point
+        return EmbedItem(
+            key=file_path.name, point_id=qdrant_id, text=content, payload=payload,
+            content_hash=payload["content_hash"],
+        )
 
-        except Exception as e:
-            print(f"❌ Error resyncing {file_path.name}: {e}")
+    def record(items):
+        for item in items:
+            print(f"✅ Re-embedded during resync: {item.key}")
+
+    upserter = BulkUpserter(qdrant, QDRANT_COLLECTION_NAME)
+    # Reads, embedding requests and upserts overlap; see src.memory.embed_pipeline
+    stats = run_embed_pipeline(
+        files,
+        read,
+        upserter.add_many,
+        embedder=provider,
+        is_current=lambda item: known_hashes.get(item.point_id) == item.content_hash,
+        on_upserted=record,
+    )
+    upserter.close()  # Consistency barrier: returns once every batch is applied
+    stats.report()
+    processed_count = stats.upserted
 
     if processed_count > 0:
         update_last_sync()
@@ -223,16 +258,16 @@ def resync_embeddings():
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Update Qdrant embeddings for loop files.")
     parser.add_argument(
-        "file_path",
-        nargs="?", # Makes the argument optional
+        "file_paths",
+        nargs="*", # Makes the argument optional
         type=str,
-        help="Path to the specific loop .md file to process. If not provided, runs full resync."
+        help="Paths of the loop .md files to process. If not provided, runs full resync."
     )
     args = parser.parse_args()
 
-    if args.file_path:
-        print(f"Processing single file: {args.file_path}")
-        process_and_embed_loop_file(args.file_path)
+    if args.file_paths:
+        print(f"Processing {len(args.file_paths)} file(s)")
+        process_and_embed_loop_files(args.file_paths)
     else:
         print("No specific file provided, running full resync...")
         # resync_embeddings() # Kept the old resync logic callable if no args provided.
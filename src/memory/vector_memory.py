@@ -1,25 +1,87 @@
+"""
+FAISS vector memory over markdown notes.
+
+Queries go through a long-lived ``VectorMemory`` instead of re-reading the
+index and unpickling the metadata for every lookup. The index is opened with
+memory-mapped I/O, so the OS page cache is shared across processes and a warm
+query only pays for the search. Chunk metadata is stored column-wise (see
+``ChunkMetadata``) and memory-mapped as well.
+
+``build_vector_index`` is incremental. Chunks live in an ``IndexIDMap`` under
+stable ids, each a hash of ``(path, chunk_text)``. A per-generation ledger
+records every file's size and mtime, so a rebuild reads only the files that
+changed. It embeds only chunks not already indexed and removes the chunks of
+edited or deleted files. Each build is written as a new generation directory,
+then a ``CURRENT`` pointer is atomically swapped to it. ``VectorMemory`` stats
+that pointer before each query. When the version changes it opens the new
+generation and swaps it in with a single assignment, so concurrent queries see
+either the old index or the new one, never a mix.
+
+The index type is configurable (``IndexConfig``, or the env var
+VECTOR_MEMORY_INDEX). ``flat`` is exact brute force. ``ivfpq`` (IVF lists
+with product-quantised codes, trained on a sample) and ``hnsw`` (a graph
+over full vectors) are approximate and cover millions of chunks. Search
+breadth is tuned with ``nprobe`` and ``efSearch``. ``sq8`` is brute force over
+int8 codes, a quarter of the memory of ``flat``.
+
+The quantised kinds (``sq8``, ``ivfpq``) also write their float32 vectors
+beside the metadata (``vectors.npy``, memory-mapped, never loaded whole). A
+query fetches ``top_k * rerank`` candidates from the codes, then re-ranks them
+by exact distance (VECTOR_MEMORY_RERANK, default 4; 0 turns it off). Only
+the candidates' rows of the float32 file are read.
+``python -m src.memory.quantization --vector-memory`` reports memory against
+recall for the published vectors.
+``scripts/bench_vector_index.py`` measures recall@k against latency for each
+setting, relative to the flat baseline.
+
+Example usage:
+    from src.memory.vector_memory import get_vector_memory
+
+    memory = get_vector_memory()
+    memory.query("What did we decide about hiring?", top_k=5)
+    memory.query_batch(["hiring plan", "lease renewal"], top_k=3)
+"""
+
+import hashlib
+import json
 import logging
 import os
 import pickle
+import shutil
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
 from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import faiss
 import numpy as np
-from openai import OpenAI
 
-from src.path_config import INDEX_PATH, META_PATH
+from src.memory.collection_registry import (
+    EmbeddingModelMismatchError,
+    record_collection,
+    verify_collection,
+)
+from src.memory.embedding_providers import EmbeddingProvider, get_provider
+from src.system.path_config import INDEX_PATH, META_PATH, VECTOR_MEMORY_DIR
 
 # === CONFIG ===
-EMBED_MODEL = "text-embedding-3-small"
+INDEX_NAME = "vector_memory"  # Key in the collection registry
 DATA_DIRS = [
     Path("/Users/air/AIR01/Retrospectives"),
     Path("/Users/air/AIR01/System"),
     Path("/Users/air/AIR01/0001 HQ"),
 ]
-INDEX_PATH = INDEX_PATH
-META_PATH = META_PATH
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+INDEX_PATH = INDEX_PATH  # Legacy single-file index, migrated on first load
+META_PATH = META_PATH    # Legacy pickled metadata
+CURRENT_POINTER = "CURRENT"
+KEEP_GENERATIONS = 2  # The live generation and the one before it
+LEDGER_FILE = "ledger.json"
+INDEX_CONFIG_FILE = "index.json"
+# Flat codes are only memory-mapped with IO_FLAG_MMAP_IFC (faiss >= 1.8)
+MMAP_FLAGS = faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
+# IO_FLAG_MMAP only maps IVF lists written as OnDiskInvertedLists; in-memory lists must be read
+IVF_READ_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", 0) | faiss.IO_FLAG_READ_ONLY
 
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
@@ -29,11 +91,19 @@ logger = logging.getLogger(__name__)
 
 # === EMBEDDING ===
 def embed_text(text: str) -> list[float]:
-    response = client.embeddings.create(model=EMBED_MODEL, input=[text])
-    return response.data[0].embedding
+    vector = get_provider().embed_one(text)
+    if vector is None:
+        raise RuntimeError("Failed to generate embedding")
+    return vector
 
 
 # === CHUNKING ===
+def chunk_id(source: str, text: str) -> int:
+    """Stable FAISS id for a chunk: the same text in the same file always maps to the same id."""
+    digest = hashlib.blake2b(f"{source}\0{text}".encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & 0x7FFF_FFFF_FFFF_FFFF  # Non-negative: faiss uses -1 for "no hit"
+
+
 def chunk_markdown(file_path: Path, max_chars: int = 800) -> list[tuple[str, str]]:
     chunks = []
     current = []
@@ -55,55 +125,621 @@ def chunk_markdown(file_path: Path, max_chars: int = 800) -> list[tuple[str, str
     return chunks
 
 
+# === METADATA ===
+class ChunkMetadata:
+    """
+    Chunk metadata stored by column instead of as a pickled list of dicts.
+
+    Rows are sorted by chunk id (``ids.npy``), so a FAISS label is found with
+    a binary search. ``source_ids.npy`` holds an int32 per chunk that indexes
+    ``sources.json``. The UTF-8 text of every chunk sits back to back in
+    ``text.bin``, sliced by ``text_offsets.npy``. The arrays are memory-mapped,
+    so opening a generation only parses the short list of sources.
+    Generations written before chunk ids existed have no ``ids.npy``; their
+    labels are row positions. Quantised generations add ``vectors.npy``, the
+    float32 vector of each row, in the same order.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.sources: List[str] = json.loads((self.directory / "sources.json").read_text(encoding="utf-8"))
+        ids_path = self.directory / "ids.npy"
+        self.ids = np.load(ids_path, mmap_mode="r") if ids_path.exists() else None
+        self.source_ids = np.load(self.directory / "source_ids.npy", mmap_mode="r")
+        self.offsets = np.load(self.directory / "text_offsets.npy", mmap_mode="r")
+        text_path = self.directory / "text.bin"
+        # np.memmap refuses empty files
+        self.text = np.memmap(text_path, dtype=np.uint8, mode="r") if text_path.stat().st_size else np.zeros(0, np.uint8)
+        vectors_path = self.directory / "vectors.npy"
+        self.vectors = np.load(vectors_path, mmap_mode="r") if vectors_path.exists() else None
+
+    def __len__(self) -> int:
+        return len(self.source_ids)
+
+    def rows(self, labels) -> np.ndarray:
+        """Metadata rows for FAISS labels, -1 where a label is missing."""
+        labels = np.asarray(labels, dtype=np.int64)
+        if self.ids is None:
+            return np.where((labels >= 0) & (labels < len(self)), labels, -1)
+        positions = np.searchsorted(self.ids, labels)
+        found = positions < len(self)
+        found[found] = self.ids[positions[found]] == labels[found]
+        return np.where(found, positions, -1)
+
+    def source(self, position: int) -> str:
+        return self.sources[int(self.source_ids[position])]
+
+    def text_at(self, position: int) -> str:
+        start, end = int(self.offsets[position]), int(self.offsets[position + 1])
+        return self.text[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, position: int) -> Tuple[str, str]:
+        return self.source(position), self.text_at(position)
+
+    @staticmethod
+    def write(
+        directory: Path,
+        sources: Sequence[str],
+        texts: Sequence[str],
+        ids: Optional[Sequence[int]] = None,
+        vectors: Optional[np.ndarray] = None,
+    ) -> None:
+        directory = Path(directory)
+        if ids is not None:
+            order = np.argsort(np.asarray(ids, dtype=np.int64), kind="stable")
+            ids = np.asarray(ids, dtype=np.int64)[order]
+            sources = [sources[i] for i in order]
+            texts = [texts[i] for i in order]
+            np.save(directory / "ids.npy", ids)
+            if vectors is not None:
+                vectors = np.asarray(vectors, dtype=np.float32)[order]
+        if vectors is not None:
+            np.save(directory / "vectors.npy", np.asarray(vectors, dtype=np.float32))
+        unique = list(dict.fromkeys(sources))
+        lookup = {source: i for i, source in enumerate(unique)}
+        encoded = [text.encode("utf-8") for text in texts]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(chunk) for chunk in encoded], out=offsets[1:])
+
+        (directory / "sources.json").write_text(json.dumps(unique), encoding="utf-8")
+        np.save(directory / "source_ids.npy", np.array([lookup[s] for s in sources], dtype=np.int32))
+        np.save(directory / "text_offsets.npy", offsets)
+        (directory / "text.bin").write_bytes(b"".join(encoded))
+
+
+# === INDEX TYPES ===
+INDEX_KINDS = ("flat", "ivfpq", "hnsw", "sq8")
+LOSSY_KINDS = ("ivfpq", "sq8")  # Codes cannot give back the vectors, so vectors.npy keeps them
+
+
+@dataclass
+class IndexConfig:
+    kind: str = "flat"
+    nlist: int = 0            # IVF cells; 0 picks about 4 * sqrt(n)
+    pq_m: int = 0             # PQ sub-quantizers; 0 picks one per 16 dimensions
+    pq_bits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 80
+    nprobe: int = 16          # IVF cells visited per query
+    ef_search: int = 64       # HNSW candidate list per query
+    train_size: int = 0       # IVF-PQ training sample; 0 picks 64 points per cell
+    rerank: int = 4           # Quantised kinds: candidates per hit re-ranked by exact distance; 0 turns it off
+    seed: int = 1234
+
+    def __post_init__(self):
+        if self.kind not in INDEX_KINDS:
+            raise ValueError(f"Unknown index kind '{self.kind}'. Use one of: {', '.join(INDEX_KINDS)}")
+
+    @classmethod
+    def from_dict(cls, values: Optional[Dict]) -> "IndexConfig":
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (values or {}).items() if k in known})
+
+    @classmethod
+    def from_env(cls) -> "IndexConfig":
+        return cls(
+            kind=os.getenv("VECTOR_MEMORY_INDEX", "flat"),
+            nprobe=int(os.getenv("VECTOR_MEMORY_NPROBE", "16")),
+            ef_search=int(os.getenv("VECTOR_MEMORY_EF_SEARCH", "64")),
+            rerank=int(os.getenv("VECTOR_MEMORY_RERANK", "4")),
+        )
+
+    def read_flags(self) -> int:
+        return IVF_READ_FLAGS if self.kind == "ivfpq" else MMAP_FLAGS
+
+
+def training_sample(vectors: np.ndarray, size: int, seed: int = 1234) -> np.ndarray:
+    """A uniform sample of rows, so training cost stays flat as the corpus grows."""
+    if size >= len(vectors):
+        return vectors
+    rows = np.random.default_rng(seed).choice(len(vectors), size, replace=False)
+    return vectors[np.sort(rows)]
+
+
+def create_index(config: IndexConfig, dim: int, vectors: np.ndarray) -> Tuple["faiss.Index", IndexConfig]:
+    """
+    An empty index that takes ``add_with_ids``, trained on a sample of ``vectors`` when needed.
+    Returns the config actually used: IVF-PQ falls back to flat when there is too little data to train it.
+    """
+    n = len(vectors)
+    if config.kind == "ivfpq":
+        nlist = config.nlist or max(1, int(4 * np.sqrt(n)))
+        nlist = min(nlist, max(1, n // 39))  # faiss wants at least 39 training points per cell
+        pq_m = config.pq_m or max(1, dim // 16)
+        while dim % pq_m:
+            pq_m -= 1
+        if n < max(2 ** config.pq_bits, nlist):
+            logger.info(f"{n} vectors are too few to train IVF-PQ; using a flat index.")
+            config = IndexConfig.from_dict({**asdict(config), "kind": "flat"})
+        else:
+            config = IndexConfig.from_dict({**asdict(config), "nlist": nlist, "pq_m": pq_m})
+            # Built directly: index_factory also turns on polysemous training, which search never uses
+            index = faiss.IndexIVFPQ(faiss.IndexFlatL2(dim), dim, nlist, pq_m, config.pq_bits)
+            sample = training_sample(vectors, config.train_size or 64 * nlist, config.seed)
+            started = time.perf_counter()
+            index.train(np.ascontiguousarray(sample, dtype=np.float32))
+            logger.info(f"Trained IVF{nlist},PQ{pq_m}x{config.pq_bits} on {len(sample)} vectors in {time.perf_counter() - started:.1f}s")
+            return index, config
+    if config.kind == "sq8":
+        quantizer = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+        if len(vectors):
+            quantizer.train(np.ascontiguousarray(training_sample(vectors, config.train_size or 65536, config.seed)))
+            return faiss.IndexIDMap(quantizer), config
+        logger.info("No vectors to train int8 ranges on; using a flat index.")
+        config = IndexConfig.from_dict({**asdict(config), "kind": "flat"})
+    if config.kind == "hnsw":
+        graph = faiss.IndexHNSWFlat(dim, config.hnsw_m)
+        graph.hnsw.efConstruction = config.ef_construction
+        return faiss.IndexIDMap2(graph), config  # IDMap2 can reconstruct, which rebuilds need
+    return faiss.IndexIDMap(faiss.IndexFlatL2(dim)), config
+
+
+def set_search_params(index: "faiss.Index", config: IndexConfig) -> None:
+    if config.kind == "ivfpq":
+        faiss.extract_index_ivf(index).nprobe = config.nprobe
+    elif config.kind == "hnsw":
+        faiss.downcast_index(index.index).hnsw.efSearch = config.ef_search
+
+
+def stored_vectors(index: "faiss.Index", config: IndexConfig) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """``(vectors, ids)`` held by a flat or HNSW index; None for IVF-PQ and SQ8, whose codes are lossy."""
+    if config.kind in LOSSY_KINDS:
+        return None
+    return index.index.reconstruct_n(0, index.ntotal), faiss.vector_to_array(index.id_map)
+
+
+def generation_vectors(generation: "IndexGeneration") -> Optional[np.ndarray]:
+    """float32 vectors in metadata row order: vectors.npy, else reconstructed from a flat or HNSW index."""
+    if generation.metadata.vectors is not None:
+        return generation.metadata.vectors
+    stored = stored_vectors(generation.index, generation.config)
+    if stored is None or generation.metadata.ids is None:
+        return None
+    vectors, ids = stored
+    ordered = np.empty_like(vectors)
+    ordered[generation.metadata.rows(ids)] = vectors
+    return ordered
+
+
+def convert_index(
+    index: "faiss.Index",
+    config: IndexConfig,
+    target: IndexConfig,
+    stored: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+) -> Optional[Tuple["faiss.Index", IndexConfig]]:
+    """
+    Re-indexes stored vectors under ``target`` without re-embedding them; None when they cannot be
+    recovered. ``stored`` supplies ``(vectors, ids)`` kept outside the index (vectors.npy).
+    """
+    stored = stored if stored is not None else stored_vectors(index, config)
+    if stored is None:
+        return None
+    vectors, ids = stored
+    converted, target = create_index(target, index.d, vectors)
+    converted.add_with_ids(vectors, ids)
+    return converted, target
+
+
+def remove_chunks(index: "faiss.Index", ids: Sequence[int], config: IndexConfig) -> "faiss.Index":
+    """Removes ``ids``. HNSW graphs cannot delete, so they are rebuilt from their stored vectors (no re-embedding)."""
+    ids = np.asarray(ids, dtype=np.int64)
+    if config.kind != "hnsw":
+        index.remove_ids(ids)
+        return index
+    vectors, labels = stored_vectors(index, config)
+    keep = ~np.isin(labels, ids)
+    rebuilt, _ = create_index(config, index.d, vectors[keep])
+    rebuilt.add_with_ids(vectors[keep], labels[keep])
+    return rebuilt
+
+
+# === GENERATIONS ===
+@dataclass
+class IndexGeneration:
+    version: str
+    index: "faiss.Index"
+    metadata: ChunkMetadata
+    ledger: Optional[Dict[str, List[int]]] = None  # {path: [size, mtime_ns]}; None before incremental builds
+    config: Optional[IndexConfig] = None
+
+
+def read_current_version(directory: Path = VECTOR_MEMORY_DIR) -> Optional[str]:
+    try:
+        return (Path(directory) / CURRENT_POINTER).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def publish_generation(
+    index: "faiss.Index",
+    sources: Sequence[str],
+    texts: Sequence[str],
+    directory: Path = VECTOR_MEMORY_DIR,
+    ids: Optional[Sequence[int]] = None,
+    ledger: Optional[Dict[str, List[int]]] = None,
+    config: Optional[IndexConfig] = None,
+    vectors: Optional[np.ndarray] = None,
+) -> str:
+    """Writes a new generation beside the live one, then flips the CURRENT pointer to it."""
+    if index.ntotal != len(sources) or len(sources) != len(texts):
+        raise ValueError(f"Index holds {index.ntotal} vectors but {len(sources)} sources and {len(texts)} texts were given.")
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    version = f"{time.time_ns():x}"
+
+    staging = directory / f".staging-{version}"
+    staging.mkdir()
+    faiss.write_index(index, str(staging / "index.faiss"))
+    ChunkMetadata.write(staging, sources, texts, ids, vectors)
+    if ledger is not None:
+        (staging / LEDGER_FILE).write_text(json.dumps(ledger, sort_keys=True), encoding="utf-8")
+    if config is not None:
+        (staging / INDEX_CONFIG_FILE).write_text(json.dumps(asdict(config), sort_keys=True), encoding="utf-8")
+    staging.rename(directory / f"gen-{version}")
+
+    pointer = directory / f".{CURRENT_POINTER}.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, directory / CURRENT_POINTER)
+
+    # Readers still holding an older generation keep their mappings after it is unlinked
+    for stale in sorted(directory.glob("gen-*"))[:-KEEP_GENERATIONS]:
+        shutil.rmtree(stale, ignore_errors=True)
+    return version
+
+
+def migrate_legacy_index(
+    directory: Path = VECTOR_MEMORY_DIR,
+    index_path: Path = INDEX_PATH,
+    meta_path: Path = META_PATH,
+) -> Optional[str]:
+    """Publishes an index written by older builds (faiss_index.idx + chunk_metadata.pkl) as a generation."""
+    if not index_path.exists() or not meta_path.exists():
+        return None
+    index = faiss.read_index(str(index_path))
+    with meta_path.open("rb") as f:
+        metadata = pickle.load(f)
+    version = publish_generation(
+        index, [m["source"] for m in metadata], [m["text"] for m in metadata], directory
+    )
+    logger.info(f"Migrated {index_path.name} and {meta_path.name} to generation {version}")
+    return version
+
+
 # === INDEXING ===
-def build_vector_index() -> None:
-    all_chunks = []
-    for directory in DATA_DIRS:
-        for md_file in directory.rglob("*.md"):
-            all_chunks.extend(chunk_markdown(md_file))
+def open_generation(directory: Path, version: str, mmap: bool = True) -> IndexGeneration:
+    path = Path(directory) / f"gen-{version}"
+    config_path = path / INDEX_CONFIG_FILE
+    config = IndexConfig.from_dict(json.loads(config_path.read_text(encoding="utf-8")) if config_path.exists() else None)
+    index = faiss.read_index(str(path / "index.faiss"), config.read_flags() if mmap else 0)
+    ledger_path = path / LEDGER_FILE
+    ledger = json.loads(ledger_path.read_text(encoding="utf-8")) if ledger_path.exists() else None
+    return IndexGeneration(version, index, ChunkMetadata(path), ledger, config)
 
-    logger.info(f"Embedding {len(all_chunks)} chunks...")
 
-    vectors = []
-    metadata = []
+def load_generation(directory: Path = VECTOR_MEMORY_DIR, mmap: bool = True) -> Optional[IndexGeneration]:
+    """The published generation, or None. Pass ``mmap=False`` to get an index that can be modified."""
+    version = read_current_version(directory)
+    return None if version is None else open_generation(directory, version, mmap)
 
-    for chunk_text, source in all_chunks:
-        embedding = embed_text(chunk_text)
+
+def _file_stamp(path: Path) -> List[int]:
+    stat = path.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def build_vector_index(
+    directory: Path = VECTOR_MEMORY_DIR,
+    data_dirs: Optional[Sequence[Path]] = None,
+    provider: Optional[EmbeddingProvider] = None,
+    full: bool = False,
+    config: Optional[IndexConfig] = None,
+) -> Optional[str]:
+    """
+    Brings the index up to date with the markdown under ``data_dirs`` and returns the live version.
+    Unchanged files are only stat'ed; chunks already indexed are not re-embedded.
+    """
+    provider = provider or get_provider()
+    data_dirs = DATA_DIRS if data_dirs is None else data_dirs
+    config = config or IndexConfig.from_env()
+
+    previous = None if full else load_generation(directory, mmap=False)
+    if previous is not None and previous.ledger is None:
+        logger.info("Published index predates the chunk ledger; rebuilding in full.")
+        previous = None
+    if previous is not None:
+        try:
+            verify_collection(INDEX_NAME, provider)
+            if previous.index.d != provider.dimension:
+                raise EmbeddingModelMismatchError(f"Index stores {previous.index.d}-d vectors")
+        except EmbeddingModelMismatchError as e:
+            logger.info(f"{e}; rebuilding in full for {provider.model_id}.")
+            previous = None
+    converted = False
+    exact = generation_vectors(previous) if previous is not None else None  # Rows of previous.metadata
+    if previous is not None and previous.config.kind != config.kind:
+        # Also retries IVF-PQ once a corpus that was too small to train it has grown
+        kept = None if exact is None else (np.asarray(exact), np.asarray(previous.metadata.ids))
+        result = convert_index(previous.index, previous.config, config, kept)
+        if result is None:
+            logger.info(f"Index type changes from {previous.config.kind} to {config.kind}; rebuilding in full.")
+            previous = None
+        else:
+            converted = result[1].kind != previous.config.kind
+            previous.index, previous.config = result
+            if converted:
+                logger.info(f"Converted the index to {config.kind} from its stored vectors.")
+
+    old_ledger = previous.ledger if previous else {}
+    ledger: Dict[str, List[int]] = {}
+    changed = set()
+    fresh: Dict[int, Tuple[str, str]] = {}  # Chunks of changed files, by id
+    for data_dir in data_dirs:
+        for md_file in sorted(data_dir.rglob("*.md")):
+            source = str(md_file)
+            ledger[source] = _file_stamp(md_file)
+            if old_ledger.get(source) == ledger[source]:
+                continue  # Untouched: not even read
+            changed.add(source)
+            for chunk_text, _ in chunk_markdown(md_file):
+                fresh.setdefault(chunk_id(source, chunk_text), (source, chunk_text))
+    changed.update(set(old_ledger) - set(ledger))  # Deleted files
+
+    # Existing rows survive unless their file changed and the chunk is no longer in it
+    kept_ids, kept_sources, kept_texts, kept_rows, stale = [], [], [], [], []
+    existing = set()
+    if previous is not None:
+        metadata = previous.metadata
+        for row in range(len(metadata)):
+            row_id, source = int(metadata.ids[row]), metadata.source(row)
+            if source in changed and row_id not in fresh:
+                stale.append(row_id)
+                continue
+            existing.add(row_id)
+            kept_rows.append(row)
+            kept_ids.append(row_id)
+            kept_sources.append(source)
+            kept_texts.append(metadata.text_at(row))
+
+    pending = [(chunk, (source, text)) for chunk, (source, text) in fresh.items() if chunk not in existing]
+    if previous is not None and not pending and not stale and ledger == old_ledger and not converted:
+        logger.info(f"Vector index is up to date ({len(kept_ids)} chunks); nothing to do.")
+        return previous.version
+
+    logger.info(f"{len(changed)} files changed: embedding {len(pending)} new chunks, removing {len(stale)}.")
+    embeddings = provider.embed(text for _, (_, text) in pending)
+    new_ids, vectors = [], []
+    for (chunk, (source, text)), embedding in zip(pending, embeddings):
+        if embedding is None:
+            ledger.pop(source, None)  # Retry this file on the next build
+            continue  # Empty chunk, or the request failed after retries
+        new_ids.append(chunk)
         vectors.append(embedding)
-        metadata.append({"source": source, "text": chunk_text})
+        kept_ids.append(chunk)
+        kept_sources.append(source)
+        kept_texts.append(text)
 
-    dim = len(vectors[0])
-    index = faiss.IndexFlatL2(dim)
-    index.add(np.array(vectors).astype("float32"))
+    vectors = np.array(vectors, dtype=np.float32).reshape(-1, provider.dimension)
+    if previous is not None:
+        index, config = previous.index, previous.config  # Keeps the trained quantizers
+    else:
+        index, config = create_index(config, provider.dimension, vectors)
+    if stale:
+        index = remove_chunks(index, stale, config)
+    if new_ids:
+        index.add_with_ids(vectors, np.array(new_ids, dtype=np.int64))
+    if not index.ntotal:
+        logger.error("No chunks could be embedded; index not written.")
+        return None
 
-    INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
-    faiss.write_index(index, str(INDEX_PATH))
+    full_vectors = None
+    if config.kind in LOSSY_KINDS:
+        if kept_rows and exact is None:
+            logger.info("Earlier chunks have no stored float32 vectors; queries skip the exact re-ranking.")
+        else:
+            previous_rows = np.asarray(exact[np.asarray(kept_rows)]) if kept_rows else np.zeros((0, index.d), np.float32)
+            full_vectors = np.concatenate([previous_rows, vectors])
 
-    with META_PATH.open("wb") as f:
-        pickle.dump(metadata, f)
+    record_collection(INDEX_NAME, provider)  # Claims the index for this model
+    version = publish_generation(
+        index, kept_sources, kept_texts, directory, ids=kept_ids, ledger=ledger, config=config, vectors=full_vectors
+    )
 
-    logger.info(f"Indexed {len(vectors)} chunks to {INDEX_PATH}")
+    logger.info(f"Indexed {index.ntotal} chunks (+{len(new_ids)} -{len(stale)}) as generation {version} in {directory}")
+    return version
 
 
 # === QUERYING ===
-def query_vector_memory(query: str, top_k: int = 5) -> list[tuple[str, str]]:
-    if not INDEX_PATH.exists() or not META_PATH.exists():
-        logger.error("Vector index or metadata not found.")
-        raise FileNotFoundError("Vector index or metadata not found.")
+def rerank_exact(vectors: np.ndarray, rows: np.ndarray, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Squared L2 distances of candidate ``rows`` (-1 for none) from float32 ``vectors``, best ``k`` per query.
+    Rows are read in ascending order, so a memory-mapped file is read once per page.
+    """
+    distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+    best = np.full((len(queries), k), -1, dtype=np.int64)
+    for i, (query, candidates) in enumerate(zip(queries, rows)):
+        candidates = np.unique(candidates[candidates >= 0])   # Sorted
+        if not len(candidates):
+            continue
+        exact = ((np.asarray(vectors[candidates], dtype=np.float32) - query) ** 2).sum(axis=1)
+        order = np.argsort(exact, kind="stable")[:k]
+        distances[i, : len(order)] = exact[order]
+        best[i, : len(order)] = candidates[order]
+    return distances, best
 
-    index = faiss.read_index(str(INDEX_PATH))
-    with META_PATH.open("rb") as f:
-        metadata = pickle.load(f)
 
-    query_vec = embed_text(query)
-    D, indices = index.search(np.array([query_vec]).astype("float32"), top_k)
+class VectorMemory:
+    """
+    Long-lived handle on the published index. Each query stats the CURRENT
+    pointer and loads a new generation only when it moved.
+    """
+
+    def __init__(
+        self,
+        directory: Path = VECTOR_MEMORY_DIR,
+        provider: Optional[EmbeddingProvider] = None,
+        index_name: str = INDEX_NAME,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None,
+        rerank: Optional[int] = None,
+    ):
+        self.directory = Path(directory)
+        self.index_name = index_name
+        self._provider = provider
+        self._search_overrides = {"nprobe": nprobe, "ef_search": ef_search, "rerank": rerank}
+        self._generation: Optional[IndexGeneration] = None
+        self._pointer_stat = None
+        self._lock = threading.Lock()
+        self.stats = {"loads": 0, "queries": 0}
+
+    @property
+    def provider(self) -> EmbeddingProvider:
+        if self._provider is None:
+            self._provider = get_provider()
+        return self._provider
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._generation.version if self._generation else None
+
+    def _stat_pointer(self):
+        try:
+            st = (self.directory / CURRENT_POINTER).stat()
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size  # os.replace always changes the inode
+
+    def refresh(self) -> IndexGeneration:
+        """Returns the live generation, loading the published one first if the pointer moved."""
+        pointer_stat = self._stat_pointer()
+        generation = self._generation
+        if generation is not None and pointer_stat == self._pointer_stat:
+            return generation
+
+        if pointer_stat is None and migrate_legacy_index(self.directory):
+            pointer_stat = self._stat_pointer()
+        if pointer_stat is None:
+            logger.error("Vector index or metadata not found.")
+            raise FileNotFoundError("Vector index or metadata not found.")
+
+        with self._lock:
+            version = read_current_version(self.directory)
+            if self._generation is None or self._generation.version != version:
+                self._generation = self._load(version)  # One assignment: queries see old or new, never a mix
+            self._pointer_stat = pointer_stat
+            return self._generation
+
+    def _load(self, version: str) -> IndexGeneration:
+        started = time.perf_counter()
+        generation = open_generation(self.directory, version)
+        index, metadata, path = generation.index, generation.metadata, self.directory / f"gen-{version}"
+        self._apply_search_params(generation)
+        if index.ntotal != len(metadata):
+            raise ValueError(f"Generation {version} has {index.ntotal} vectors but {len(metadata)} metadata rows.")
+
+        verify_collection(self.index_name, self.provider)
+        if index.d != self.provider.dimension:
+            raise EmbeddingModelMismatchError(
+                f"{path.name} stores {index.d}-d vectors but {self.provider.model_id} produces {self.provider.dimension}-d vectors."
+            )
+        self.stats["loads"] += 1
+        logger.info(
+            f"Loaded vector memory generation {version} ({index.ntotal} chunks, {generation.config.kind}) "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return generation
 
-    results = []
-    for idx in indices[0]:
-        meta = metadata[idx]
-        results.append((meta["source"], meta["text"]))
+    def _apply_search_params(self, generation: IndexGeneration) -> None:
+        overrides = {k: v for k, v in self._search_overrides.items() if v is not None}
+        set_search_params(generation.index, IndexConfig.from_dict({**asdict(generation.config), **overrides}))
 
-    return results
+    def tune(self, nprobe: Optional[int] = None, ef_search: Optional[int] = None, rerank: Optional[int] = None) -> None:
+        """Changes search breadth for the live generation and any later one."""
+        if nprobe is not None:
+            self._search_overrides["nprobe"] = nprobe
+        if ef_search is not None:
+            self._search_overrides["ef_search"] = ef_search
+        if rerank is not None:
+            self._search_overrides["rerank"] = rerank
+        if self._generation is not None:
+            self._apply_search_params(self._generation)
+
+    def search(self, vectors, top_k: int = 5) -> List[List[Tuple[str, str, float]]]:
+        """``(source, text, distance)`` hits for each row of ``vectors``."""
+        generation = self.refresh()
+        queries = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, generation.index.d)
+        k = min(top_k, generation.index.ntotal)
+        if not len(queries) or k < 1:
+            return [[] for _ in range(len(queries))]
+        rerank = self._search_overrides["rerank"]
+        rerank = generation.config.rerank if rerank is None else rerank
+        if rerank and generation.metadata.vectors is not None:
+            candidates = min(k * rerank, generation.index.ntotal)
+            _, labels = generation.index.search(queries, candidates)
+            distances, rows = rerank_exact(generation.metadata.vectors, generation.metadata.rows(labels), queries, k)
+        else:
+            distances, labels = generation.index.search(queries, k)
+            rows = generation.metadata.rows(labels)
+        self.stats["queries"] += len(queries)
+        return [
+            [(*generation.metadata[int(row)], float(distance)) for distance, row in zip(row_d, row_r) if row >= 0]
+            for row_d, row_r in zip(distances, rows)
+        ]
+
+    def query_batch(self, queries: Sequence[str], top_k: int = 5) -> List[List[Tuple[str, str]]]:
+        """Embeds all queries in one batch and searches them together."""
+        generation = self.refresh()
+        embeddings = self.provider.embed(queries)
+        found = [i for i, vector in enumerate(embeddings) if vector is not None]
+        results: List[List[Tuple[str, str]]] = [[] for _ in queries]
+        if found:
+            vectors = np.array([embeddings[i] for i in found], dtype=np.float32).reshape(-1, generation.index.d)
+            for i, hits in zip(found, self.search(vectors, top_k)):
+                results[i] = [(source, text) for source, text, _ in hits]
+        return results
+
+    def query(self, query: str, top_k: int = 5) -> List[Tuple[str, str]]:
+        self.refresh()  # A missing index fails before paying for an embedding
+        vector = self.provider.embed_one(query)
+        if vector is None:
+            raise RuntimeError("Failed to generate embedding")
+        return [(source, text) for source, text, _ in self.search([vector], top_k)[0]]
+
+
+_vector_memory: Optional[VectorMemory] = None
+_vector_memory_lock = threading.Lock()
+
+
+def get_vector_memory() -> VectorMemory:
+    """Process-wide VectorMemory, created on first use."""
+    global _vector_memory
+    with _vector_memory_lock:
+        if _vector_memory is None:
+            _vector_memory = VectorMemory()
+        return _vector_memory
+
+
+def query_vector_memory(query: str, top_k: int = 5) -> list[tuple[str, str]]:
+    return get_vector_memory().query(query, top_k)
 
 
 # === CLI USAGE ===
@@ -0,0 +1,449 @@
+"""
+One interface for vector access, with interchangeable backends.
+
+Modules used to call QdrantClient directly (search, retrieve, upsert, delete
+with a Filter), so none of them could run, be tested or be benchmarked
+without a live server. They now go through a ``VectorStore``:
+
+    qdrant    QdrantVectorStore on the shared remote client (src.memory.qdrant_clients)
+    local     QdrantVectorStore on qdrant-client local mode, in memory or in a directory
+    numpy     NumpyVectorStore, exact brute-force cosine search in process
+
+Every backend stores cosine-normalised vectors and returns ``SearchHit``s
+(``id``, ``score``, ``payload``), so callers written against Qdrant's
+ScoredPoint keep working. Filters are plain dicts of payload conditions; a
+list value matches any of its items and a ``Range`` bounds a number:
+
+    {"type": "project"}                    payload["type"] == "project"
+    {"type": ["program", "project"]}       payload["type"] in (...)
+    {"weight": Range(gte=3)}               payload["weight"] >= 3
+
+Filters are applied inside the search, so a selective filter still returns
+``limit`` hits when enough points match. On a Qdrant server the filtered
+fields should have payload indexes (``ensure_payload_indexes``).
+
+``get_vector_store`` picks the backend from VECTOR_STORE_BACKEND (default
+qdrant). VECTOR_STORE_PATH sets where local mode keeps its data (default in
+memory). scripts/bench_vector_store.py runs the same workload against all three.
+
+Example usage:
+    from src.memory.vector_store import Range, VectorRecord, get_vector_store
+
+    store = get_vector_store("workstream_items")
+    store.upsert_batch([VectorRecord(id=uuid, vector=vector, payload={"type": "loop"})])
+    hits = store.search(query_vector, limit=5, filter={"type": "loop", "weight": Range(gte=3)})
+    store.delete_by_filter({"type": ["program", "project"]})
+"""
+
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+from qdrant_client.http import models
+
+from src.memory.qdrant_clients import QdrantSettings, get_qdrant_client
+from src.memory.qdrant_sync import (
+    RETRIEVE_BATCH_SIZE,
+    SCROLL_PAGE_SIZE,
+    BulkUpserter,
+    ensure_payload_indexes,
+)
+
+VECTOR_STORE_BACKEND = os.getenv("VECTOR_STORE_BACKEND", "qdrant")
+VECTOR_STORE_PATH = os.getenv("VECTOR_STORE_PATH", ":memory:")
+BACKENDS = ("qdrant", "local", "numpy")
+
+Filter = Dict[str, Any]
+
+
+@dataclass
+class VectorRecord:
+    id: Any
+    vector: Optional[List[float]] = None
+    payload: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Range:
+    """Numeric bounds for a payload field; ``None`` leaves that side open."""
+
+    gte: Optional[float] = None
+    gt: Optional[float] = None
+    lte: Optional[float] = None
+    lt: Optional[float] = None
+
+    def contains(self, value: Any) -> bool:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return False
+        return ((self.gte is None or value >= self.gte) and (self.gt is None or value > self.gt)
+                and (self.lte is None or value <= self.lte) and (self.lt is None or value < self.lt))
+
+
+@dataclass
+class SearchHit:
+    id: Any
+    score: float
+    payload: Dict[str, Any] = field(default_factory=dict)
+    vector: Optional[List[float]] = None
+
+
+def _values(value) -> Optional[list]:
+    return list(value) if isinstance(value, (list, tuple, set, frozenset)) else None
+
+
+def matches(payload: Dict[str, Any], filter: Optional[Filter]) -> bool:
+    """Evaluates a filter dict against one payload, the way Qdrant would."""
+    for key, expected in (filter or {}).items():
+        value = payload.get(key)
+        options = _values(expected)
+        stored = _values(value) if value is not None else []
+        stored = stored if stored is not None else [value]   # Array payloads match on any element
+        if isinstance(expected, Range):
+            if not any(expected.contains(v) for v in stored):
+                return False
+            continue
+        if options is None:
+            options = [expected]
+        if not any(v in options for v in stored):
+            return False
+    return True
+
+
+class VectorStore(ABC):
+    """Interface shared by every backend. Vectors are compared by cosine similarity."""
+
+    backend = ""
+
+    def __init__(self, collection: str):
+        self.collection = collection
+
+    @property
+    def client(self):
+        """The underlying Qdrant client, for helpers such as verify_collection (None without one)."""
+        return None
+
+    @abstractmethod
+    def ensure_collection(self, dimension: int) -> None:
+        """Creates the collection for ``dimension``-d vectors if it does not exist."""
+
+    def ensure_payload_indexes(self, fields=None) -> List[str]:
+        """Indexes the payload fields filters use; returns the fields created. Only a Qdrant server has any."""
+        return []
+
+    @abstractmethod
+    def count(self, filter: Optional[Filter] = None) -> int:
+        """Number of points, or of the points matching ``filter``."""
+
+    @abstractmethod
+    def upsert_batch(self, records: Iterable[VectorRecord]) -> int:
+        """Inserts or replaces the records by id; returns how many were written."""
+
+    @abstractmethod
+    def retrieve(self, ids: Sequence[Any], with_vectors: bool = False) -> List[VectorRecord]:
+        """The records with these ids that exist."""
+
+    def search(self, vector: Sequence[float], limit: int = 10, filter: Optional[Filter] = None,
+               with_vectors: bool = False, score_threshold: Optional[float] = None) -> List[SearchHit]:
+        return self.search_batch([vector], limit, filter, with_vectors, score_threshold)[0]
+
+    @abstractmethod
+    def search_batch(self, vectors: Sequence[Sequence[float]], limit: int = 10, filter: Optional[Filter] = None,
+                     with_vectors: bool = False, score_threshold: Optional[float] = None) -> List[List[SearchHit]]:
+        """The ``limit`` nearest hits that match ``filter`` for each query vector, best first."""
+
+    @abstractmethod
+    def delete_by_filter(self, filter: Filter) -> None:
+        """Deletes every point matching ``filter`` (which must not be empty)."""
+
+    @abstractmethod
+    def scroll(self, filter: Optional[Filter] = None, with_vectors: bool = False,
+               page_size: int = SCROLL_PAGE_SIZE) -> Iterator[VectorRecord]:
+        """Every point matching ``filter``, read ``page_size`` at a time."""
+
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} {self.collection}>"
+
+
+# --- Qdrant (remote server or local mode) -------------------------------------
+
+
+def to_qdrant_filter(filter: Optional[Filter]) -> Optional[models.Filter]:
+    if not filter:
+        return None
+    conditions = []
+    for key, expected in filter.items():
+        if isinstance(expected, Range):
+            bounds = models.Range(gte=expected.gte, gt=expected.gt, lte=expected.lte, lt=expected.lt)
+            conditions.append(models.FieldCondition(key=key, range=bounds))
+            continue
+        options = _values(expected)
+        match = models.MatchAny(any=options) if options is not None else models.MatchValue(value=expected)
+        conditions.append(models.FieldCondition(key=key, match=match))
+    return models.Filter(must=conditions)
+
+
+def _hit(point) -> SearchHit:
+    return SearchHit(id=point.id, score=point.score, payload=point.payload or {}, vector=point.vector)
+
+
+class QdrantVectorStore(VectorStore):
+    backend = "qdrant"
+
+    def __init__(self, collection: str, client=None, hnsw_ef: Optional[int] = None):
+        super().__init__(collection)
+        self._client = client if client is not None else get_qdrant_client()
+        self.hnsw_ef = hnsw_ef
+
+    @classmethod
+    def local(cls, collection: str, path: str = ":memory:") -> "QdrantVectorStore":
+        """qdrant-client local mode; data in memory or in ``path``. Shared per path, like the server client."""
+        store = cls(collection, client=get_qdrant_client(QdrantSettings(location=str(path))))
+        store.backend = "local"
+        return store
+
+    @property
+    def client(self):
+        return self._client
+
+    def ensure_collection(self, dimension: int) -> None:
+        if not self._client.collection_exists(self.collection):
+            self._client.create_collection(
+                self.collection,
+                vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE),
+            )
+
+    def ensure_payload_indexes(self, fields=None) -> List[str]:
+        return ensure_payload_indexes(self._client, self.collection, fields)
+
+    def count(self, filter: Optional[Filter] = None) -> int:
+        return self._client.count(self.collection, count_filter=to_qdrant_filter(filter), exact=True).count
+
+    def upsert_batch(self, records: Iterable[VectorRecord]) -> int:
+        # Batches go out without waiting; close() waits for the last one (see qdrant_sync)
+        with BulkUpserter(self._client, self.collection) as upserter:
+            upserter.add_many(
+                models.PointStruct(id=r.id, vector=list(map(float, r.vector)), payload=r.payload or {})
+                for r in records
+            )
+        return upserter.stats["points"]
+
+    def retrieve(self, ids: Sequence[Any], with_vectors: bool = False) -> List[VectorRecord]:
+        records = []
+        ids = list(dict.fromkeys(ids))
+        for start in range(0, len(ids), RETRIEVE_BATCH_SIZE):
+            points = self._client.retrieve(
+                self.collection, ids=ids[start:start + RETRIEVE_BATCH_SIZE],
+                with_payload=True, with_vectors=with_vectors,
+            )
+            records.extend(VectorRecord(p.id, p.vector if with_vectors else None, p.payload or {}) for p in points)
+        return records
+
+    def _search_params(self) -> Optional[models.SearchParams]:
+        return models.SearchParams(hnsw_ef=self.hnsw_ef) if self.hnsw_ef else None
+
+    def search(self, vector, limit=10, filter=None, with_vectors=False, score_threshold=None) -> List[SearchHit]:
+        query = {"limit": limit, "with_payload": True, "with_vectors": with_vectors,
+                 "score_threshold": score_threshold, "search_params": self._search_params()}
+        if hasattr(self._client, "query_points"):
+            points = self._client.query_points(
+                self.collection, query=list(map(float, vector)), query_filter=to_qdrant_filter(filter), **query
+            ).points
+        else:  # qdrant-client < 1.10
+            points = self._client.search(
+                self.collection, query_vector=list(map(float, vector)), query_filter=to_qdrant_filter(filter), **query
+            )
+        return [_hit(p) for p in points]
+
+    def search_batch(self, vectors, limit=10, filter=None, with_vectors=False, score_threshold=None):
+        """All queries in one request."""
+        if not len(vectors):
+            return []
+        query_filter = to_qdrant_filter(filter)
+        common = {"limit": limit, "filter": query_filter, "with_payload": True, "with_vector": with_vectors,
+                  "score_threshold": score_threshold, "params": self._search_params()}
+        if hasattr(self._client, "query_batch_points"):
+            responses = self._client.query_batch_points(
+                self.collection,
+                requests=[models.QueryRequest(query=list(map(float, v)), **common) for v in vectors],
+            )
+            return [[_hit(p) for p in response.points] for response in responses]
+        responses = self._client.search_batch(  # qdrant-client < 1.10
+            self.collection,
+            requests=[models.SearchRequest(vector=list(map(float, v)), **common) for v in vectors],
+        )
+        return [[_hit(p) for p in points] for points in responses]
+
+    def delete_by_filter(self, filter: Filter) -> None:
+        if not filter:
+            raise ValueError("delete_by_filter needs at least one condition; use delete_collection to empty it.")
+        self._client.delete(
+            self.collection,
+            points_selector=models.FilterSelector(filter=to_qdrant_filter(filter)),
+            wait=True,
+        )
+
+    def scroll(self, filter=None, with_vectors=False, page_size=SCROLL_PAGE_SIZE) -> Iterator[VectorRecord]:
+        offset = None
+        while True:
+            points, offset = self._client.scroll(
+                self.collection, scroll_filter=to_qdrant_filter(filter), limit=page_size,
+                offset=offset, with_payload=True, with_vectors=with_vectors,
+            )
+            for p in points:
+                yield VectorRecord(p.id, p.vector if with_vectors else None, p.payload or {})
+            if offset is None:
+                return
+
+
+# --- NumPy brute force --------------------------------------------------------
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact search over a dense float32 matrix in process memory. Scores match
+    Qdrant's cosine distance, so it can stand in for a server in tests and
+    serves as the recall baseline in benchmarks. The row mask of each filter
+    is kept until the next write, standing in for Qdrant's payload indexes.
+    """
+
+    backend = "numpy"
+    MIN_CAPACITY = 256
+
+    def __init__(self, collection: str, dimension: Optional[int] = None):
+        super().__init__(collection)
+        self.dimension = dimension
+        self._vectors = np.zeros((0, dimension or 0), dtype=np.float32)
+        self._ids: List[Any] = []
+        self._payloads: List[Dict[str, Any]] = []
+        self._rows: Dict[Any, int] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def ensure_collection(self, dimension: int) -> None:
+        if self.dimension is None:
+            self.dimension = dimension
+            self._vectors = np.zeros((0, dimension), dtype=np.float32)
+        elif self.dimension != dimension:
+            raise ValueError(f"Collection '{self.collection}' stores {self.dimension}-d vectors, not {dimension}-d.")
+
+    def count(self, filter: Optional[Filter] = None) -> int:
+        with self._lock:
+            if not filter:
+                return len(self._ids)
+            return int(self._mask(filter).sum())
+
+    def _mask(self, filter: Filter) -> np.ndarray:
+        """Rows matching ``filter``, cached until the next upsert or delete."""
+        key = repr(sorted(filter.items()))
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = np.fromiter((matches(p, filter) for p in self._payloads), dtype=bool, count=len(self._payloads))
+            self._masks[key] = mask
+        return mask
+
+    def _grow(self, rows: int) -> None:
+        if rows > len(self._vectors):
+            grown = np.zeros((max(self.MIN_CAPACITY, rows, 2 * len(self._vectors)), self.dimension), dtype=np.float32)
+            grown[: len(self._ids)] = self._vectors[: len(self._ids)]
+            self._vectors = grown
+
+    def upsert_batch(self, records: Iterable[VectorRecord]) -> int:
+        records = list(records)
+        if not records:
+            return 0
+        vectors = _unit(np.asarray([r.vector for r in records], dtype=np.float32))
+        with self._lock:
+            self.ensure_collection(vectors.shape[1])
+            self._grow(len(self._ids) + len(records))
+            self._masks.clear()
+            for record, vector in zip(records, vectors):
+                row = self._rows.get(record.id)
+                if row is None:
+                    row = self._rows[record.id] = len(self._ids)
+                    self._ids.append(record.id)
+                    self._payloads.append({})
+                self._vectors[row] = vector
+                self._payloads[row] = dict(record.payload or {})
+        return len(records)
+
+    def retrieve(self, ids: Sequence[Any], with_vectors: bool = False) -> List[VectorRecord]:
+        with self._lock:
+            rows = [self._rows[i] for i in dict.fromkeys(ids) if i in self._rows]
+            return [self._record(row, with_vectors) for row in rows]
+
+    def _record(self, row: int, with_vectors: bool) -> VectorRecord:
+        vector = self._vectors[row].tolist() if with_vectors else None
+        return VectorRecord(self._ids[row], vector, dict(self._payloads[row]))
+
+    def search_batch(self, vectors, limit=10, filter=None, with_vectors=False, score_threshold=None):
+        queries = _unit(np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1))
+        with self._lock:
+            count = len(self._ids)
+            if not count or not len(queries):
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self._vectors[:count].T
+            if filter:
+                scores[:, ~self._mask(filter)] = -np.inf
+            k = min(limit, count)
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            results = []
+            for row_scores, candidates in zip(scores, top):
+                order = candidates[np.argsort(-row_scores[candidates], kind="stable")]
+                hits = []
+                for row in order:
+                    score = float(row_scores[row])
+                    if score == -np.inf or (score_threshold is not None and score < score_threshold):
+                        continue
+                    hits.append(SearchHit(self._ids[row], score, dict(self._payloads[row]),
+                                          self._vectors[row].tolist() if with_vectors else None))
+                results.append(hits)
+            return results
+
+    def delete_by_filter(self, filter: Filter) -> None:
+        if not filter:
+            raise ValueError("delete_by_filter needs at least one condition.")
+        with self._lock:
+            keep = np.flatnonzero(~self._mask(filter)).tolist()
+            self._masks.clear()
+            self._vectors = self._vectors[keep].copy()
+            self._ids = [self._ids[row] for row in keep]
+            self._payloads = [self._payloads[row] for row in keep]
+            self._rows = {point_id: row for row, point_id in enumerate(self._ids)}
+
+    def scroll(self, filter=None, with_vectors=False, page_size=SCROLL_PAGE_SIZE) -> Iterator[VectorRecord]:
+        with self._lock:
+            rows = [row for row, payload in enumerate(self._payloads) if matches(payload, filter)]
+            records = [self._record(row, with_vectors) for row in rows]
+        yield from records
+
+
+# --- Factory ------------------------------------------------------------------
+
+_numpy_stores: Dict[str, NumpyVectorStore] = {}
+_numpy_lock = threading.Lock()
+
+
+def get_vector_store(collection: str, backend: Optional[str] = None, path: Optional[str] = None) -> VectorStore:
+    """
+    Store for ``collection`` on ``backend`` (default VECTOR_STORE_BACKEND). NumPy stores
+    live for the process and are shared per collection, like the Qdrant clients.
+    """
+    backend = backend or VECTOR_STORE_BACKEND
+    if backend == "qdrant":
+        return QdrantVectorStore(collection)
+    if backend == "local":
+        return QdrantVectorStore.local(collection, path or VECTOR_STORE_PATH)
+    if backend == "numpy":
+        with _numpy_lock:
+            if collection not in _numpy_stores:
+                _numpy_stores[collection] = NumpyVectorStore(collection)
+            return _numpy_stores[collection]
+    raise ValueError(f"Unknown vector store backend '{backend}'. Expected one of {', '.join(BACKENDS)}.")
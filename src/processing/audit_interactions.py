@@ -229,7 +229,7 @@ def run_comprehensive_audit(project_root: Path) -> Dict[str, any]:
     if phase_stats['phase_10_2_interactions'] == 0:
         critical_issues.append("No Phase 10.2 interactions found")
     
-    if linking_stats['linked'] == 0 and linking_stats['processed'] > 0:
+    if linking_stats['linked'] + linking_stats.get('already_linked', 0) == 0 and linking_stats['processed'] > 0:
         critical_issues.append("No interactions successfully linked to loops")
     
     if critical_issues:
@@ -4,11 +4,18 @@ Interaction Logger: Cross-link interaction files to loop memory traces and execu
 
 This script processes all interaction-*.md files and adds summary references
 to the corresponding loop files' Memory Trace or Execution Log sections.
+
+Summary lines are grouped by loop file and section so each loop file is read
+and rewritten (atomically) at most once per run. Linked interactions are
+recorded in a ledger next to the interactions, so reruns only handle new files.
 """
 
+import json
 import os
 import re
 import sys
+import tempfile
+from collections import defaultdict
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
@@ -23,6 +30,13 @@ def get_project_root() -> Path:
     return current_file.parents[2]
 
 
+LEDGER_FILENAME = ".linked_interactions.json"
+SECTION_HEADERS = {
+    'memory': '## 🧠 Memory Trace',
+    'execution': '## 🧾 Execution Log',
+}
+
+
 def parse_interaction_file(filepath: Path) -> Optional[Dict]:
     """Parse a single interaction markdown file."""
     try:
@@ -131,8 +145,22 @@ def create_summary_line(interaction: Dict) -> str:
         return f"- {date_str}: 🤖 Ora action [{uuid[:8]}]: {message_summary}"
 
 
-def find_loop_file(loop_id: str, loops_dir: Path) -> Optional[Path]:
+def build_stem_index(loops_dir: Path) -> Dict[str, Path]:
+    """Map every loop file stem to its path with a single directory listing."""
+    return {file.stem: file for file in sorted(loops_dir.glob("*.md"))}
+
+
+def find_loop_file(loop_id: str, loops_dir: Path, stem_index: Optional[Dict[str, Path]] = None) -> Optional[Path]:
     """Find the corresponding loop file for a loop ID."""
+    if stem_index is not None:
+        if loop_id in stem_index:
+            return stem_index[loop_id]
+        # Try some variations if exact match doesn't exist
+        for stem, file in stem_index.items():
+            if loop_id in stem:
+                return file
+        return None
+
     loop_file = loops_dir / f"{loop_id}.md"
     if loop_file.exists():
         return loop_file
@@ -145,63 +173,111 @@ def find_loop_file(loop_id: str, loops_dir: Path) -> Optional[Path]:
     return None
 
 
+def insert_section_lines(content: str, section_header: str, summary_lines: List[str]) -> str:
+    """Return content with summary_lines appended to the end of the given section."""
+    if not summary_lines:
+        return content
+
+    # Check if section exists
+    if section_header not in content:
+        # Create the section at the end
+        return content.rstrip() + f'\n\n{section_header}\n\n' + '\n'.join(summary_lines) + '\n'
+
+    # Find the section and add the lines
+    lines = content.split('\n')
+    new_lines = []
+    in_target_section = False
+    added = False
+
+    for line in lines:
+        new_lines.append(line)
+
+        # Check if we're entering the target section
+        if line.strip() == section_header:
+            in_target_section = True
+            continue
+
+        # Check if we're leaving the target section (next ## header)
+        if in_target_section and line.startswith('## ') and line.strip() != section_header:
+            # Add our lines before this new section
+            for summary_line in summary_lines:
+                new_lines.insert(-1, summary_line)
+                new_lines.insert(-1, '')
+            added = True
+            in_target_section = False
+
+    # If we were still in the target section at the end, add the lines
+    if in_target_section and not added:
+        for summary_line in summary_lines:
+            new_lines.append('')
+            new_lines.append(summary_line)
+
+    return '\n'.join(new_lines)
+
+
+def write_atomic(path: Path, content: str) -> None:
+    """Write content to a temp file beside path, then swap it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
 def add_to_loop_section(loop_file: Path, section_type: str, summary_line: str) -> bool:
     """Add summary line to the appropriate section in the loop file."""
+    return apply_loop_updates(loop_file, {section_type: [summary_line]})
+
+
+def apply_loop_updates(loop_file: Path, updates: Dict[str, List[str]]) -> bool:
+    """
+    Add all pending summary lines for one loop file in a single read and write.
+    Lines already present in the file (e.g. linked before the ledger existed) are not added twice.
+    """
     try:
         with open(loop_file, 'r', encoding='utf-8') as f:
             content = f.read()
-        
-        # Determine section header
-        if section_type == 'memory':
-            section_header = '## 🧠 Memory Trace'
-        else:
-            section_header = '## 🧾 Execution Log'
-        
-        # Check if section exists
-        if section_header not in content:
-            # Create the section at the end
-            content = content.rstrip() + f'\n\n{section_header}\n\n{summary_line}\n'
-        else:
-            # Find the section and add the line
-            lines = content.split('\n')
-            new_lines = []
-            in_target_section = False
-            added = False
-            
-            for i, line in enumerate(lines):
-                new_lines.append(line)
-                
-                # Check if we're entering the target section
-                if line.strip() == section_header:
-                    in_target_section = True
-                    continue
-                
-                # Check if we're leaving the target section (next ## header)
-                if in_target_section and line.startswith('## ') and line.strip() != section_header:
-                    # Add our line before this new section
-                    new_lines.insert(-1, summary_line)
-                    new_lines.insert(-1, '')
-                    added = True
-                    in_target_section = False
-            
-            # If we were still in the target section at the end, add the line
-            if in_target_section and not added:
-                new_lines.append('')
-                new_lines.append(summary_line)
-            
-            content = '\n'.join(new_lines)
-        
-        # Write back to file
-        with open(loop_file, 'w', encoding='utf-8') as f:
-            f.write(content)
-        
+
+        present = set(content.splitlines())
+        updated = content
+        for section_type, summary_lines in updates.items():
+            new_lines = [line for line in dict.fromkeys(summary_lines) if line not in present]
+            if not new_lines:
+                continue
+            section_header = SECTION_HEADERS.get(section_type, SECTION_HEADERS['execution'])
+            updated = insert_section_lines(updated, section_header, new_lines)
+
+        if updated != content:
+            write_atomic(loop_file, updated)
+
         return True
-        
+
     except Exception as e:
         print(f"Error updating {loop_file}: {e}")
         return False
 
 
+def load_ledger(ledger_path: Path) -> Dict[str, Dict]:
+    """Load the processed-interaction ledger (interaction filename -> link record)."""
+    try:
+        with open(ledger_path, 'r', encoding='utf-8') as f:
+            ledger = json.load(f)
+        return ledger if isinstance(ledger, dict) else {}
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Ignoring unreadable ledger {ledger_path.name}: {e}")
+        return {}
+
+
+def save_ledger(ledger_path: Path, ledger: Dict[str, Dict]) -> None:
+    write_atomic(ledger_path, json.dumps(ledger, indent=2, sort_keys=True) + '\n')
+
+
 def process_interactions(project_root: Path, dry_run: bool = False) -> Dict[str, int]:
     """Process all interactions and link them to loop files."""
     interactions_dir = project_root / "runtime" / "interactions"
@@ -209,20 +285,31 @@ def process_interactions(project_root: Path, dry_run: bool = False) -> Dict[str,
     
     if not interactions_dir.exists():
         print(f"❌ Interactions directory not found: {interactions_dir}")
-        return {'processed': 0, 'linked': 0, 'errors': 0}
+        return {'processed': 0, 'linked': 0, 'already_linked': 0, 'errors': 0}
     
     if not loops_dir.exists():
         print(f"❌ Loops directory not found: {loops_dir}")
-        return {'processed': 0, 'linked': 0, 'errors': 0}
+        return {'processed': 0, 'linked': 0, 'already_linked': 0, 'errors': 0}
     
-    stats = {'processed': 0, 'linked': 0, 'errors': 0}
-    interaction_files = list(interactions_dir.glob("interaction-*.md"))
+    stats = {'processed': 0, 'linked': 0, 'already_linked': 0, 'errors': 0}
+    interaction_files = sorted(interactions_dir.glob("interaction-*.md"))
+    ledger_path = interactions_dir / LEDGER_FILENAME
+    ledger = load_ledger(ledger_path)
+    stem_index = build_stem_index(loops_dir)
+
+    # loop file -> section type -> [(interaction filename, summary line)]
+    pending: Dict[Path, Dict[str, List[Tuple[str, str]]]] = defaultdict(lambda: defaultdict(list))
     
     print(f"📂 Found {len(interaction_files)} interaction files")
     
     for filepath in interaction_files:
-        print(f"🔍 Processing {filepath.name}...")
         stats['processed'] += 1
+
+        if filepath.name in ledger:
+            stats['already_linked'] += 1
+            continue
+
+        print(f"🔍 Processing {filepath.name}...")
         
         # Parse interaction
         interaction = parse_interaction_file(filepath)
@@ -238,7 +325,7 @@ def process_interactions(project_root: Path, dry_run: bool = False) -> Dict[str,
             continue
         
         # Find loop file
-        loop_file = find_loop_file(loop_id, loops_dir)
+        loop_file = find_loop_file(loop_id, loops_dir, stem_index)
         if not loop_file:
             print(f"  ⚠️ Loop file not found for {loop_id}")
             continue
@@ -251,19 +338,40 @@ def process_interactions(project_root: Path, dry_run: bool = False) -> Dict[str,
         
         print(f"  📝 Linking to {loop_file.name} ({section_type} section)")
         print(f"      {summary_line}")
-        
-        if not dry_run:
-            # Add to loop file
-            success = add_to_loop_section(loop_file, section_type, summary_line)
-            if success:
-                stats['linked'] += 1
-                print(f"  ✅ Successfully linked")
-            else:
-                stats['errors'] += 1
-                print(f"  ❌ Failed to link")
+        pending[loop_file][section_type].append((filepath.name, summary_line))
+
+    if pending:
+        print(f"🗂 Applying updates to {len(pending)} loop files")
+
+    linked_at = datetime.now().isoformat(timespec='seconds')
+    for loop_file, sections in pending.items():
+        if dry_run:
+            count = sum(len(entries) for entries in sections.values())
+            stats['linked'] += count
+            print(f"  ✅ Would link {count} interactions to {loop_file.name} (dry run)")
+            continue
+
+        updates = {section_type: [line for _, line in entries] for section_type, entries in sections.items()}
+        count = sum(len(entries) for entries in sections.values())
+        if apply_loop_updates(loop_file, updates):
+            stats['linked'] += count
+            print(f"  ✅ Linked {count} interactions to {loop_file.name}")
+            for section_type, entries in sections.items():
+                for interaction_name, _ in entries:
+                    ledger[interaction_name] = {
+                        'loop': loop_file.name,
+                        'section': section_type,
+                        'linked_at': linked_at,
+                    }
         else:
-            stats['linked'] += 1
-            print(f"  ✅ Would link (dry run)")
+            stats['errors'] += count
+            print(f"  ❌ Failed to link {count} interactions to {loop_file.name}")
+
+    if not dry_run and pending:
+        try:
+            save_ledger(ledger_path, ledger)
+        except OSError as e:
+            print(f"⚠️ Could not save ledger {ledger_path}: {e}")
     
     return stats
 
@@ -290,6 +398,7 @@ def main():
     print(f"\n📊 Processing Summary:")
     print(f"  Interactions processed: {stats['processed']}")
     print(f"  Successfully linked: {stats['linked']}")
+    print(f"  Already linked: {stats['already_linked']}")
     print(f"  Errors: {stats['errors']}")
     
     if stats['linked'] > 0:
@@ -4,7 +4,7 @@ from typing import Optional
 
 import yaml
 
-from .reembedding import reembed_loop_by_uuid
+from src.semantic.reembedding import reembed_loop_by_uuid
 
 LOOP_DIR = "runtime/loops"
 
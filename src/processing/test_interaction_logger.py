@@ -6,20 +6,22 @@ Tests for the interaction logger cross-linking functionality.
 import os
 import tempfile
 import unittest
-from pathlib import Path
 from datetime import datetime
+from pathlib import Path
 
 import yaml
 
 # Import the functions we want to test
 from interaction_logger import (
-    parse_interaction_file,
-    get_loop_context,
-    determine_section_type,
+    LEDGER_FILENAME,
+    add_to_loop_section,
+    build_stem_index,
     create_summary_line,
+    determine_section_type,
     find_loop_file,
-    add_to_loop_section,
-    process_interactions
+    get_loop_context,
+    parse_interaction_file,
+    process_interactions,
 )
 
 
@@ -360,6 +362,72 @@ Test full integration.
         memory_section = updated_content.split('## 🧠 Memory Trace')[1].split('## 🧾 Execution Log')[0]
         self.assertIn('👤 User interaction', memory_section)
 
+    
+    def test_batch_groups_updates_and_reruns_are_idempotent(self):
+        """Test that all lines for a loop land in one write and reruns add nothing."""
+        for i, (actor, source) in enumerate([('user', 'chat'), ('user', 'chat'), ('ora', 'system')]):
+            self.create_test_interaction_file(
+                f"interaction-batch-{i}.md",
+                {
+                    'uuid': f'batch{i}-uuid',
+                    'timestamp': '2025-06-08T10:30:00',
+                    'actor': actor,
+                    'source': source,
+                    'context': 'loop-batch',
+                },
+                f"Batch message {i}",
+                "Done"
+            )
+        
+        loop_file = self.create_test_loop_file(
+            "loop-batch.md",
+            "---\nuuid: loop-batch\n---\n\n## 🧠 Memory Trace\n\n- 2025-06-07: Initial setup\n\n## Notes\n"
+        )
+        
+        stats = process_interactions(self.test_dir, dry_run=False)
+        self.assertEqual(stats['linked'], 3)
+        self.assertEqual(stats['errors'], 0)
+        
+        content = loop_file.read_text(encoding='utf-8')
+        memory_section = content.split('## 🧠 Memory Trace')[1].split('## Notes')[0]
+        self.assertIn('[batch0-u]', memory_section)
+        self.assertIn('[batch1-u]', memory_section)
+        self.assertIn('## 🧾 Execution Log', content)
+        self.assertIn('[batch2-u]', content.split('## 🧾 Execution Log')[1])
+        
+        ledger = yaml.safe_load((self.interactions_dir / LEDGER_FILENAME).read_text())
+        self.assertEqual(ledger['interaction-batch-2.md']['section'], 'execution')
+        
+        # A rerun skips ledgered interactions and leaves the loop file untouched
+        stats = process_interactions(self.test_dir, dry_run=False)
+        self.assertEqual(stats['already_linked'], 3)
+        self.assertEqual(stats['linked'], 0)
+        self.assertEqual(loop_file.read_text(encoding='utf-8'), content)
+        
+        # Without the ledger, lines already in the loop file are not added again
+        (self.interactions_dir / LEDGER_FILENAME).unlink()
+        process_interactions(self.test_dir, dry_run=False)
+        self.assertEqual(loop_file.read_text(encoding='utf-8'), content)
+        self.assertEqual(list(self.loops_dir.glob(".*.tmp")), [])
+        
+        # Only exact lines count as present: an edited copy of a line does not block it
+        line = next(l for l in content.splitlines() if '[batch2-u]' in l)
+        loop_file.write_text(content.replace(line, line + ' (edited)'), encoding='utf-8')
+        (self.interactions_dir / LEDGER_FILENAME).unlink()
+        process_interactions(self.test_dir, dry_run=False)
+        updated = loop_file.read_text(encoding='utf-8').splitlines()
+        self.assertIn(line, updated)
+        self.assertIn(line + ' (edited)', updated)
+    
+    def test_find_loop_file_with_stem_index(self):
+        """Test lookups against a prebuilt stem index."""
+        self.create_test_loop_file("loop-2025-06-08-alpha.md", "content")
+        index = build_stem_index(self.loops_dir)
+        
+        self.assertEqual(find_loop_file("loop-2025-06-08-alpha", self.loops_dir, index).name, "loop-2025-06-08-alpha.md")
+        self.assertEqual(find_loop_file("2025-06-08", self.loops_dir, index).name, "loop-2025-06-08-alpha.md")
+        self.assertIsNone(find_loop_file("loop-missing", self.loops_dir, index))
+
 
 if __name__ == '__main__':
     # Run tests
@@ -1,10 +1,16 @@
 import os
-from typing import Any, Dict, List  # Added for type hinting
+from typing import Any, Dict, List, Optional  # Added for type hinting
 
-import qdrant_client
 from dotenv import load_dotenv
-from openai import OpenAI  # Import the main OpenAI class
-from qdrant_client.http import models
+
+from src.memory.collection_registry import (
+    EmbeddingModelMismatchError,
+    verify_collection,
+)
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import try_qdrant_client
+from src.memory.query_cache import embed_query
+from src.memory.vector_store import QdrantVectorStore
 
 # Load environment variables from .env file
 load_dotenv()
@@ -16,50 +22,32 @@ if not OPENAI_API_KEY:
     print("Warning: OPENAI_API_KEY not found. Embedding will fail.")
     # openai.api_key will not be set globally in v1.x, client uses key directly
 
-# Initialize OpenAI Client (v1.x API)
-# The API key is typically passed to the constructor or set as an env var OPENAI_API_KEY
-client = OpenAI()
+# Embeddings come from the configured provider (EMBEDDING_PROVIDER, see src/memory/embedding_providers.py).
+# This used to be ada-002 while the writers used 3-small, so searches compared vectors from different models.
 
-# Default QDRANT_HOST is now the remote IP, QDRANT_PORT remains configurable
-QDRANT_REMOTE_HOST = "170.64.176.146"
-QDRANT_PORT = int(os.getenv("QDRANT_PORT", 6333))
-# QDRANT_GRPC_PORT = int(os.getenv("QDRANT_GRPC_PORT", 6334))
+# Connection settings come from QDRANT_URL / QDRANT_HOST / QDRANT_PORT (see src/memory/qdrant_clients.py).
+# The droplet used to be hard-coded here; set QDRANT_HOST=170.64.176.146 to keep using it.
+SEARCH_BATCH_SIZE = 256  # Queries per search_batch request
 
-# Initialize qclient as None globally
-qclient = None
 
 def get_qdrant_client():
-    """Initializes and returns a Qdrant client, or None if connection fails."""
-    global qclient
-    if qclient is None:
-        try:
-            # Use the remote host IP
-            # QDRANT_HOST environment variable can override this if set, else defaults to QDRANT_REMOTE_HOST
-            effective_host = os.getenv("QDRANT_HOST", QDRANT_REMOTE_HOST)
-            qdrant_url = f"http://{effective_host}:{QDRANT_PORT}"
-            print(f"Attempting to initialize Qdrant client with explicit URL: {qdrant_url}")
-            temp_qclient = qdrant_client.QdrantClient(url=qdrant_url, timeout=10) # Added timeout
-            temp_qclient.get_collections() # Test connection
-            print(f"Qdrant client successfully initialized with URL: {qdrant_url}")
-            qclient = temp_qclient
-        except Exception as e:
-            print(f"Error initializing Qdrant client with URL {qdrant_url}: {e}")
-            qclient = None
-    return qclient
+    """Returns the shared Qdrant client, or None if the server cannot be reached."""
+    return try_qdrant_client(check=True)
 
 def embed_text(text: str) -> List[float]:
     """Generates embeddings for the given text using OpenAI v1.x API."""
-    if not OPENAI_API_KEY: # Check if key was loaded, as client init might not fail silently
+    vector = embed_texts([text])[0]
+    if vector is None:
+        raise RuntimeError("OpenAI Embedding API returned no embedding")
+    return vector
+
+
+def embed_texts(texts: List[str]) -> List[Optional[List[float]]]:
+    """Embeds many texts in batched requests, in input order (None where an input failed)."""
+    provider = get_provider()
+    if provider.backend == "openai" and not OPENAI_API_KEY: # Check if key was loaded, as client init might not fail silently
         raise ValueError("OpenAI API key is not set. Cannot generate embeddings.")
-    try:
-        response = client.embeddings.create(
-            input=text,
-            model="text-embedding-ada-002"
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        print(f"Error calling OpenAI Embedding API: {e}")
-        raise
+    return provider.embed(texts)
 
 def find_nearest_project_match(text: str, collection_name: str = "workstream_items") -> Dict[str, Any]:
     """Finds the nearest project match in Qdrant for the given text embedding."""
@@ -69,22 +57,34 @@ def find_nearest_project_match(text: str, collection_name: str = "workstream_ite
         return {"project": None, "phase": None, "score": 0.0, "error": "Qdrant client not available"}
 
     try:
-        embedding = embed_text(text)
+        verify_collection(collection_name, get_provider(), client=current_qclient)
+    except EmbeddingModelMismatchError as e:
+        print(f"❌ {e}")
+        return {"project": None, "phase": None, "score": 0.0, "error": str(e)}
+
+    try:
+        provider = get_provider()
+        if provider.backend == "openai" and not OPENAI_API_KEY:
+            raise ValueError("OpenAI API key is not set. Cannot generate embeddings.")
+        embedding = embed_query(text, provider)  # Repeat lookups skip the API
+        if embedding is None:
+            raise RuntimeError("Embedding provider returned no embedding")
     except Exception as e:
         print(f"Failed to generate embedding for text: '{text[:100]}...'")
         return {"project": None, "phase": None, "score": 0.0, "error": str(e)}
 
     try:
-        hits = current_qclient.search(
-            collection_name=collection_name,
-            query_vector=embedding,
-            limit=1,
-            search_params=models.SearchParams(hnsw_ef=64)
-        )
+        store = QdrantVectorStore(collection_name, client=current_qclient, hnsw_ef=64)
+        hits = store.search(embedding, limit=1)
     except Exception as e:
         print(f"Error searching Qdrant collection '{collection_name}': {e}")
         return {"project": None, "phase": None, "score": 0.0, "error": f"Qdrant search error: {e}"}
 
+    return project_match(hits)
+
+
+def project_match(hits) -> Dict[str, Any]:
+    """Project, phase and score of the best hit (an empty match if there is none)."""
     if not hits:
         return {"project": None, "phase": None, "score": 0.0}
 
@@ -95,13 +95,55 @@ def find_nearest_project_match(text: str, collection_name: str = "workstream_ite
         "score": round(hits[0].score, 3)
     }
 
+
+def find_nearest_project_matches(
+    texts: List[str], collection_name: str = "workstream_items", batch_size: int = SEARCH_BATCH_SIZE
+) -> List[Dict[str, Any]]:
+    """
+    Batched find_nearest_project_match: all texts are embedded in one provider call
+    and searched ``batch_size`` at a time with search_batch. Results are in input
+    order; a text that could not be matched gets an "error" entry.
+    """
+    def failed(error: str) -> Dict[str, Any]:
+        return {"project": None, "phase": None, "score": 0.0, "error": error}
+
+    if not texts:
+        return []
+    current_qclient = get_qdrant_client()
+    if not current_qclient:
+        print("Qdrant client not available. Returning empty matches.")
+        return [failed("Qdrant client not available") for _ in texts]
+
+    try:
+        verify_collection(collection_name, get_provider(), client=current_qclient)
+        vectors = embed_texts(texts)
+    except Exception as e:
+        print(f"❌ Could not embed {len(texts)} texts for project matching: {e}")
+        return [failed(str(e)) for _ in texts]
+
+    results = [failed("Embedding provider returned no embedding") for _ in texts]
+    pending = [i for i, vector in enumerate(vectors) if vector is not None]
+    store = QdrantVectorStore(collection_name, client=current_qclient, hnsw_ef=64)
+    for start in range(0, len(pending), batch_size):
+        chunk = pending[start:start + batch_size]
+        try:
+            hit_lists = store.search_batch([vectors[i] for i in chunk], limit=1)
+        except Exception as e:
+            print(f"Error searching Qdrant collection '{collection_name}': {e}")
+            for i in chunk:
+                results[i] = failed(f"Qdrant search error: {e}")
+            continue
+        for i, hits in zip(chunk, hit_lists):
+            results[i] = project_match(hits)
+    return results
+
 # Example usage (optional, for testing this module directly)
 if __name__ == "__main__":
     if not OPENAI_API_KEY:
         print("OPENAI_API_KEY is not set in the environment. Skipping Qdrant query example.")
     else:
         print("Attempting to get Qdrant client for __main__ test...")
-        # __main__ will now also attempt to connect to the configured QDRANT_HOST (remote by default)
+        # __main__ connects to the configured server (QDRANT_URL or QDRANT_HOST)
         test_qclient = get_qdrant_client()
         if not test_qclient:
             print("Qdrant client could not be initialized for __main__ test. Skipping Qdrant query example.")
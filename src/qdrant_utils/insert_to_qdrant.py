@@ -2,35 +2,70 @@
 insert_to_qdrant.py
 
 Embeds the summary and inserts it into a live Qdrant instance using UUID point IDs.
+
+query_loops filters on each point's status and weight inside the search, so
+those payload keys have to follow the loops table. ``sync_loop_payload`` updates
+them for one loop when SQLite changes, and running this module backfills every
+loop from the table.
+
+Example usage:
+    from src.qdrant_utils.insert_to_qdrant import sync_loop_payload
+
+    sync_loop_payload("loop-2025-04-01-x", status="closed")
+    sync_loop_payloads({"loop-a": {"weight": 2.5}, "loop-b": {"weight": 0}})
 """
 
+import sqlite3
 import uuid
 
-from openai import OpenAI
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, PointStruct, VectorParams
+from qdrant_client.models import Distance, PayloadSchemaType, PointStruct, VectorParams
+
+from src.memory.collection_registry import record_collection
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import lazy_qdrant_client
+from src.memory.qdrant_sync import PAYLOAD_INDEXES, ensure_payload_indexes, set_payloads
+from src.system.path_config import LOOP_MEMORY_DB
 
-client = OpenAI()
-qdrant = QdrantClient(host="localhost", port=6333)
+qdrant = lazy_qdrant_client()
 
 COLLECTION_NAME = "loop_embeddings"
+# query_loops filters on status and weight inside the search (see src/loops/query_loops.py)
+LOOP_PAYLOAD_INDEXES = {
+    **PAYLOAD_INDEXES,
+    "loop_id": PayloadSchemaType.KEYWORD,
+    "weight": PayloadSchemaType.FLOAT,
+}
+_collection_ready = False
 
 
 def embed_text(text):
-    response = client.embeddings.create(input=[text], model="text-embedding-3-small")
-    return response.data[0].embedding
+    vector = get_provider().embed_one(text)
+    if vector is None:
+        raise RuntimeError("Failed to generate embedding")
+    return vector
 
 
 def generate_uuid_from_string(value):
     return str(uuid.uuid5(uuid.NAMESPACE_DNS, value))
 
 
+def ensure_collection():
+    """Creates the collection and its payload indexes once per process (recreating it dropped every loop)."""
+    global _collection_ready
+    if _collection_ready:
+        return
+    if COLLECTION_NAME not in {c.name for c in qdrant.get_collections().collections}:
+        qdrant.create_collection(
+            collection_name=COLLECTION_NAME,
+            vectors_config=VectorParams(size=get_provider().dimension, distance=Distance.COSINE),
+        )
+    record_collection(COLLECTION_NAME, get_provider())
+    ensure_payload_indexes(qdrant, COLLECTION_NAME, LOOP_PAYLOAD_INDEXES)
+    _collection_ready = True
+
+
 def insert_to_qdrant(loop_id, summary, metadata):
-    # Ensure collection exists
-    qdrant.recreate_collection(
-        collection_name=COLLECTION_NAME,
-        vectors_config=VectorParams(size=1536, distance=Distance.COSINE),
-    )
+    ensure_collection()
 
     vector = embed_text(summary)
     point_id = generate_uuid_from_string(loop_id)
@@ -48,6 +83,7 @@ def insert_to_qdrant(loop_id, summary, metadata):
                     "status": metadata["status"],
                     "type": metadata["type"],
                     "priority": metadata["priority"],
+                    "weight": metadata.get("weight"),
                     "source": metadata["source"],
                 },
             )
@@ -57,3 +93,34 @@ def insert_to_qdrant(loop_id, summary, metadata):
     print(
         f"✅ Embedded and inserted loop {loop_id} (ID: {point_id}) into Qdrant collection '{COLLECTION_NAME}'"
     )
+
+
+def sync_loop_payloads(fields_by_loop):
+    """Copies changed loop fields (status, weight) onto each loop's point; returns how many loops had one."""
+    ensure_collection()
+    payloads = {generate_uuid_from_string(loop_id): fields for loop_id, fields in fields_by_loop.items()}
+    return set_payloads(qdrant, COLLECTION_NAME, payloads)
+
+
+def sync_loop_payload(loop_id, **fields):
+    """``sync_loop_payloads`` for one loop; False if the loop has no point yet."""
+    return sync_loop_payloads({loop_id: fields}) == 1
+
+
+def backfill_loop_payloads(db_path=LOOP_MEMORY_DB):
+    """Copies status and weight from every row of the loops table onto its point."""
+    conn = sqlite3.connect(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(loops)")}
+    fields = [name for name in ("status", "weight") if name in columns]
+    if not fields:
+        conn.close()
+        return 0
+    rows = conn.execute(f"SELECT id, {', '.join(fields)} FROM loops").fetchall()
+    conn.close()
+    updated = sync_loop_payloads({row[0]: dict(zip(fields, row[1:])) for row in rows})
+    print(f"✅ Synced {', '.join(fields)} for {updated}/{len(rows)} loops into '{COLLECTION_NAME}'")
+    return updated
+
+
+if __name__ == "__main__":
+    backfill_loop_payloads()
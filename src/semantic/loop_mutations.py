@@ -1,44 +1,28 @@
 import logging
 import os
+from pathlib import Path
 from typing import Optional
 
 import yaml
 
+from src.system.loop_index import find_loop_file
+
 from .reembedding import reembed_loop_by_uuid
 
 LOOP_DIR = "runtime/loops"
 
 def find_loop_file_by_uuid(uuid: str) -> Optional[str]:
     logging.info(f"🔍 Searching for loop with UUID: {uuid}")
-    # Ensure LOOP_DIR exists to prevent os.listdir error if it doesn't
+    # Ensure LOOP_DIR exists before asking the index about it
     if not os.path.isdir(LOOP_DIR):
         logging.warning(f"⚠️ LOOP_DIR not found or is not a directory: {LOOP_DIR}")
         return None
-    for filename in os.listdir(LOOP_DIR):
-        if not filename.startswith("loop-") or not filename.endswith(".md"):
-            continue
-        path = os.path.join(LOOP_DIR, filename)
-        try:
-            with open(path, encoding="utf-8") as f:
-                content = f.read()
-            if content.startswith("---"):
-                parts = content.split("---", 2)
-                if len(parts) >= 3:
-                    front = yaml.safe_load(parts[1])
-                    if front and isinstance(front, dict):
-                        found_uuid = str(front.get("uuid", "")).strip()
-                        logging.info(f"🧾 File: {filename} — uuid: '{found_uuid}'")
-                        if found_uuid.strip().lower() == uuid.strip().lower():
-                            logging.info(f"✅ Match found in {filename}")
-                            return path
-        except yaml.YAMLError as e:
-            logging.error(f"❌ YAML parsing error in {path}: {e}")
-        except OSError as e:
-            logging.error(f"❌ IO error reading {path}: {e}")
-        except Exception as e:
-            logging.error(f"❌ Unexpected error processing {path}: {e}")
-    logging.warning(f"❌ No loop file found matching the UUID: {uuid}")
-    return None
+    path = find_loop_file(uuid, directory=Path(LOOP_DIR), pattern="loop-*.md")
+    if path is None:
+        logging.warning(f"❌ No loop file found matching the UUID: {uuid}")
+        return None
+    logging.info(f"✅ Match found in {path.name}")
+    return os.path.join(LOOP_DIR, path.name)
 
 def promote_loop_to_roadmap(uuid: str) -> bool:
     path = find_loop_file_by_uuid(uuid)
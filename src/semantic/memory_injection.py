@@ -7,12 +7,11 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# These are third-party libraries. Ensure they are installed in your environment.
-# e.g., via pip install openai qdrant-client
-from openai import (
-    OpenAI,  # Removed APIError as it's not directly used in a way that requires its specific type for generic except block
-)
-from qdrant_client import QdrantClient
+from src.memory.collection_registry import verify_collection
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import QdrantSettings, get_qdrant_client
+from src.memory.query_cache import embed_query
+from src.memory.vector_store import get_vector_store
 
 # from qdrant_client.http.exceptions import QdrantException # Not used directly for generic except block
 
@@ -22,12 +21,10 @@ logger = logging.getLogger(__name__)
 
 # Environment variables - these should be configured in your environment
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-QDRANT_URL = os.getenv("QDRANT_URL")
-QDRANT_API_KEY = os.getenv("QDRANT_API_KEY")  # This is optional for Qdrant, depending on its configuration
+# Qdrant connection settings (QDRANT_URL, QDRANT_API_KEY, ...) are read by src.memory.qdrant_clients
 
 # Constants
 QDRANT_COLLECTION_NAME = "workstream_items"
-EMBEDDING_MODEL = "text-embedding-ada-002"
 EXPECTED_LOOP_METADATA_KEYS = ["title", "uuid", "tags", "summary", "content"]
 
 
@@ -35,7 +32,7 @@ def get_top_k_loops_for_query(query: str, k: int = 3) -> List[Dict]:
     """
     Retrieves the top-k most relevant loops for a given query from Qdrant.
 
-    The function embeds the query using OpenAI, then queries a Qdrant
+    The function embeds the query with the configured provider, then queries a Qdrant
     collection for the most similar items based on cosine similarity.
     It handles potential errors such as connection issues, no matches,
     or missing metadata in the retrieved loops.
@@ -50,45 +47,32 @@ def get_top_k_loops_for_query(query: str, k: int = 3) -> List[Dict]:
         Returns an empty list if a critical error occurs (e.g., API key missing,
         Qdrant unavailable) or if no valid loops are found.
     """
-    if not OPENAI_API_KEY:
+    provider = get_provider()
+    if provider.backend == "openai" and not OPENAI_API_KEY:
         logger.error("OPENAI_API_KEY environment variable is not set. Cannot get embeddings.")
         return []
-    if not QDRANT_URL:
-        logger.error("QDRANT_URL environment variable is not set. Cannot connect to Qdrant.")
-        return []
 
-    # 1. Embed the query using OpenAI embeddings
+    # 1. Embed the query with the same model that indexed the collection (repeat queries hit the cache)
     query_embedding: List[float]
     try:
-        client_openai = OpenAI(api_key=OPENAI_API_KEY)
-        response = client_openai.embeddings.create(
-            input=[query],
-            model=EMBEDDING_MODEL
-        )
-        query_embedding = response.data[0].embedding
+        query_embedding = embed_query(query, provider)
+        if query_embedding is None:
+            raise RuntimeError("no embedding returned")
     except Exception as e:
-        logger.error(f"Failed to get embeddings from OpenAI for query '{query[:50]}...': {e}")
+        logger.error(f"Failed to get embeddings from {provider.model_id} for query '{query[:50]}...': {e}")
         return []
 
     # 2. Query Qdrant `workstream_items` collection
     search_result = []
     try:
-        # Initialize Qdrant client.
-        # For cloud, QDRANT_URL and QDRANT_API_KEY are typically used.
-        # For local, QDRANT_URL (e.g. "http://localhost:6333") is used.
-        client_qdrant = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY)
-
-        # It's good practice to check collection existence or handle errors from search robustly.
-        # client_qdrant.get_collection(QDRANT_COLLECTION_NAME) # Could be used for an explicit check
-
-        search_result = client_qdrant.search(
-            collection_name=QDRANT_COLLECTION_NAME,
-            query_vector=query_embedding,
-            limit=k,
-            with_payload=True,  # Crucial to get the metadata
-            with_vectors=False # We don't need to retrieve the vectors themselves
-            # score_threshold can be added if a minimum similarity is desired
-        )
+        # VECTOR_STORE_BACKEND picks the store; the Qdrant client and its connection pool are shared
+        store = get_vector_store(QDRANT_COLLECTION_NAME)
+
+        # Refuses collections indexed by a different model
+        verify_collection(QDRANT_COLLECTION_NAME, provider, client=store.client)
+
+        # Payloads carry the loop metadata; score_threshold can be added if a minimum similarity is desired
+        search_result = store.search(query_embedding, limit=k)
     except Exception as e:
         # This can catch various issues: network, collection not found, auth, etc.
         logger.error(f"Qdrant query failed for collection '{QDRANT_COLLECTION_NAME}': {e}")
@@ -157,13 +141,13 @@ def format_loops_for_prompt(loops: List[dict]) -> str:
 
 if __name__ == '__main__':
     # Example Usage (requires environment variables to be set)
-    # Ensure OPENAI_API_KEY and QDRANT_URL (and QDRANT_API_KEY if needed) are set.
+    # Ensure OPENAI_API_KEY and QDRANT_URL or QDRANT_HOST (and QDRANT_API_KEY if needed) are set.
     # Also, ensure your Qdrant instance is running, the collection exists, and has data.
 
     logger.info("Starting example usage of get_top_k_loops_for_query...")
 
-    if not OPENAI_API_KEY or not QDRANT_URL:
-        logger.warning("OPENAI_API_KEY or QDRANT_URL environment variables are not set.")
+    if not OPENAI_API_KEY:
+        logger.warning("OPENAI_API_KEY environment variable is not set.")
         logger.warning("Skipping example usage as it will fail.")
     else:
         example_query = "example query about project management"
@@ -172,7 +156,7 @@ if __name__ == '__main__':
         try:
             # Attempt to connect to Qdrant to check if the server is available and the collection exists
             # This is a more direct check before running the main function for the example.
-            q_client_test = QdrantClient(url=QDRANT_URL, api_key=QDRANT_API_KEY, timeout=5)
+            q_client_test = get_qdrant_client()
             q_client_test.get_collection(collection_name=QDRANT_COLLECTION_NAME)
             logger.info(f"Successfully connected to Qdrant and collection '{QDRANT_COLLECTION_NAME}' seems to exist.")
 
@@ -195,7 +179,7 @@ if __name__ == '__main__':
             logger.error(f"Could not run example: {e}")
             logger.error("Please ensure Qdrant is running, the collection "
                          f"'{QDRANT_COLLECTION_NAME}' exists, and it's populated with data.")
-            logger.error("Also, verify QDRANT_URL and any necessary QDRANT_API_KEY.")
+            logger.error(f"Also, verify the Qdrant settings (currently {QdrantSettings.from_env().target}).")
 
         # New test code provided by the user
         print("\n\n------------------------------------------")
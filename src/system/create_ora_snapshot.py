@@ -40,6 +40,16 @@ def main():
     manifest_file = Path(".system_manifest.yaml")
     manifest_abs_path = project_root / manifest_file
 
+    # The manifest lives in SQLite; git gets a YAML export of it
+    sys.path.append(str(project_root))
+    from src.system.sync_manifest import open_manifest
+
+    manifest = open_manifest(manifest_abs_path)
+    if len(manifest):   # A fresh checkout has no database yet; keep the tracked YAML as is
+        exported = manifest.export_yaml(manifest_abs_path)
+        print(f"📤 Exported {exported} manifest entries to {manifest_file}")
+    manifest.close()
+
     if not manifest_abs_path.exists():
         print(f"Error: Manifest file not found at {manifest_abs_path}")
         sys.exit(1)
@@ -0,0 +1,100 @@
+"""
+Header-only YAML frontmatter reader.
+
+Parsers across the tree used to read a whole markdown file, ``split("---", 2)``
+it and hand the first part to ``yaml.safe_load``. ``read_frontmatter`` instead
+reads the file in READ_CHUNK (8 KB) chunks and stops at the first chunk that
+holds the closing fence. In the default metadata-only mode, at most that one
+chunk of the body is read, never the rest of the file. YAML is parsed with
+libyaml's ``CSafeLoader`` when PyYAML was built with it.
+
+Example usage:
+    from src.system.frontmatter_reader import read_frontmatter
+    metadata, _ = read_frontmatter(path)                          # header only
+    metadata, body = read_frontmatter(path, metadata_only=False)  # header + body
+"""
+
+import re
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+HAS_LIBYAML = YAML_LOADER is not yaml.SafeLoader
+
+FENCE = b"---"
+CLOSING_FENCE = re.compile(rb"\n---[ \t]*(\r?\n|$)")
+READ_CHUNK = 8192
+MAX_HEADER_BYTES = 256 * 1024  # Give up on files whose opening fence is never closed
+
+
+def load_yaml(text: str) -> Any:
+    """``yaml.safe_load`` equivalent that uses the C loader when available."""
+    return yaml.load(text, Loader=YAML_LOADER)
+
+
+def _as_mapping(data: Any) -> Dict[str, Any]:
+    return data if isinstance(data, dict) else {}
+
+
+def read_header(path: Path) -> Tuple[Optional[str], int]:
+    """
+    Returns the raw YAML between the frontmatter fences and the byte offset where
+    the body starts. Returns (None, 0) if the file has no frontmatter block.
+    Reads READ_CHUNK bytes at a time until the closing fence has been seen.
+    """
+    with open(path, "rb") as f:
+        buf = f.read(READ_CHUNK)
+        eof = len(buf) < READ_CHUNK
+        first_nl = buf.find(b"\n")
+        first_line = buf if first_nl == -1 else buf[:first_nl]
+        if first_line.lstrip(b"\xef\xbb\xbf").strip() != FENCE or first_nl == -1:
+            return None, 0
+        while True:
+            match = CLOSING_FENCE.search(buf, first_nl)
+            # A fence at the very end of the buffer only counts once the whole file is read
+            if match and (match.group(1) or eof):
+                return buf[first_nl + 1:match.start()].decode("utf-8"), match.end()
+            if eof or len(buf) > MAX_HEADER_BYTES:
+                return None, 0
+            chunk = f.read(READ_CHUNK)
+            eof = len(chunk) < READ_CHUNK
+            buf += chunk
+
+
+def read_frontmatter(
+    path: Path, metadata_only: bool = True
+) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Reads the frontmatter of ``path`` as a dict (``{}`` if the YAML is not a mapping,
+    None if there is no frontmatter block). In metadata-only mode the returned body
+    is None and the file is not read past the closing fence.
+
+    Raises ``yaml.YAMLError`` for invalid YAML and ``OSError`` for unreadable files,
+    matching what callers of ``yaml.safe_load`` / ``open`` already handle.
+    """
+    header, body_offset = read_header(path)
+    if header is None:
+        if metadata_only:
+            return None, None
+        return None, Path(path).read_text(encoding="utf-8")
+
+    metadata = _as_mapping(load_yaml(header))
+    if metadata_only:
+        return metadata, None
+    with open(path, "rb") as f:
+        f.seek(body_offset)
+        return metadata, f.read().decode("utf-8")
+
+
+def split_frontmatter(text: str) -> Tuple[Optional[Dict[str, Any]], str]:
+    """Same contract as ``read_frontmatter`` for content that is already in memory."""
+    lines = text.splitlines(keepends=True)
+    if not lines or lines[0].lstrip("\ufeff").strip() != "---":
+        return None, text
+    for i in range(1, len(lines)):
+        if lines[i].strip() == "---":
+            metadata = _as_mapping(load_yaml("".join(lines[1:i])))
+            return metadata, "".join(lines[i + 1:])
+    return None, text
@@ -0,0 +1,386 @@
+"""
+Persistent, mtime-keyed index of the markdown files in a loop directory.
+
+Every loop scanner used to glob ``runtime/loops`` and re-parse the YAML
+frontmatter of every file on every call. ``LoopIndex`` keeps one SQLite
+index per directory holding (size, mtime_ns, sha256, frontmatter, section
+offsets) for each file. ``refresh()`` is a stat-only pass: only files whose
+size or mtime changed are read and parsed again.
+
+Lookups by uuid, id or file stem go through in-memory maps maintained with
+the entries. Each key maps to every file carrying it, so duplicates survive
+the deletion of one copy. A hit is validated with a single stat (and re-parsed
+if the file changed); a miss or stale hit falls back to a refresh that repairs
+the maps.
+
+Example usage:
+    from src.system.loop_index import find_loop_file, get_loop_index
+    for entry in get_loop_index().entries("loop-*.md"):
+        print(entry.name, entry.frontmatter.get("uuid"))
+    path = find_loop_file("2f1c...")
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+from src.system.frontmatter_reader import load_yaml
+from src.system.path_config import RUNTIME_LOOPS_DIR
+
+INDEX_FILENAME = ".loop_index.db"
+INDEX_VERSION = 1
+
+HEADING_PATTERN = re.compile(rb"^#{1,6}\s+(.+?)\s*$")
+LOOKUP_FIELDS = ("uuid", "id", "stem")
+
+
+@dataclass
+class LoopFileEntry:
+    path: Path
+    size: int
+    mtime_ns: int
+    sha256: str
+    frontmatter: Dict[str, Any] = field(default_factory=dict)
+    has_frontmatter: bool = False
+    body_offset: int = 0
+    sections: Dict[str, Tuple[int, int]] = field(default_factory=dict)  # heading -> byte range
+    error: Optional[str] = None
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    def lookup_keys(self) -> Dict[str, str]:
+        """Normalised values this entry can be found by, per lookup field."""
+        keys = {"stem": _lookup_key(self.path.stem)}
+        for fld in ("uuid", "id"):
+            value = self.frontmatter.get(fld)
+            if value not in (None, ""):
+                keys[fld] = _lookup_key(value)
+        return keys
+
+    def read_text(self) -> str:
+        return self.path.read_text(encoding="utf-8")
+
+    def read_body(self) -> str:
+        """Reads everything after the closing frontmatter fence."""
+        with open(self.path, "rb") as f:
+            f.seek(self.body_offset)
+            return f.read().decode("utf-8")
+
+    def read_section(self, heading: str) -> Optional[str]:
+        """Reads a single section by heading text without loading the rest of the file."""
+        span = self.sections.get(heading)
+        if span is None:
+            return None
+        start, end = span
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return f.read(end - start).decode("utf-8")
+
+
+def _lookup_key(value: Any) -> str:
+    return str(value).strip().lower()
+
+
+def _normalise(value: Any) -> Any:
+    """Round-trips frontmatter through JSON so fresh and cached entries have identical types."""
+    return json.loads(json.dumps(value, default=str))
+
+
+def parse_loop_bytes(raw: bytes) -> Dict[str, Any]:
+    """Parses frontmatter and section offsets out of the raw bytes of a markdown file."""
+    parsed: Dict[str, Any] = {
+        "frontmatter": {},
+        "has_frontmatter": False,
+        "body_offset": 0,
+        "sections": {},
+        "error": None,
+    }
+    lines = raw.splitlines(keepends=True)
+    offset = 0
+    start_line = 0
+
+    if lines and lines[0].strip() == b"---":
+        offset = len(lines[0])
+        for i in range(1, len(lines)):
+            if lines[i].strip() == b"---":
+                header = b"".join(lines[1:i])
+                offset += len(lines[i])
+                parsed["has_frontmatter"] = True
+                parsed["body_offset"] = offset
+                start_line = i + 1
+                try:
+                    data = load_yaml(header.decode("utf-8"))
+                    if isinstance(data, dict):
+                        parsed["frontmatter"] = _normalise(data)
+                except (yaml.YAMLError, UnicodeDecodeError) as e:
+                    parsed["error"] = str(e)
+                break
+            offset += len(lines[i])
+        else:
+            offset = 0
+
+    current = None
+    for line in lines[start_line:]:
+        match = HEADING_PATTERN.match(line.rstrip(b"\r\n"))
+        if match:
+            if current is not None:
+                parsed["sections"][current[0]] = (current[1], offset)
+            heading = match.group(1).decode("utf-8", errors="replace")
+            current = None if heading in parsed["sections"] else (heading, offset + len(line))
+        offset += len(line)
+    if current is not None:
+        parsed["sections"][current[0]] = (current[1], offset)
+
+    return parsed
+
+
+class LoopIndex:
+    """Incrementally maintained frontmatter index for one directory of markdown files."""
+
+    def __init__(self, directory: Path = RUNTIME_LOOPS_DIR, db_path: Optional[Path] = None):
+        self.directory = Path(directory)
+        self.db_path = Path(db_path) if db_path else self.directory / INDEX_FILENAME
+        self._entries: Dict[str, LoopFileEntry] = {}
+        self._lookup: Dict[str, Dict[str, List[str]]] = {fld: {} for fld in LOOKUP_FIELDS}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        try:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS loop_files")
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS loop_files (
+                    name TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL,
+                    frontmatter TEXT NOT NULL,
+                    has_frontmatter INTEGER NOT NULL,
+                    body_offset INTEGER NOT NULL,
+                    sections TEXT NOT NULL,
+                    error TEXT
+                )
+            """)
+        except sqlite3.Error as e:
+            # Read-only or missing directories still work, just without persistence.
+            print(f"[loop_index] Index database unavailable at {self.db_path}: {e}")
+            return None
+        return conn
+
+    def _load(self) -> None:
+        if not self.directory.is_dir():
+            return
+        conn = self._connect()
+        if conn is None:
+            return
+        with closing(conn):
+            rows = conn.execute(
+                "SELECT name, size, mtime_ns, sha256, frontmatter, has_frontmatter, "
+                "body_offset, sections, error FROM loop_files"
+            ).fetchall()
+        for name, size, mtime_ns, sha256, fm, has_fm, body_offset, sections, error in rows:
+            self._store(LoopFileEntry(
+                path=self.directory / name,
+                size=size,
+                mtime_ns=mtime_ns,
+                sha256=sha256,
+                frontmatter=json.loads(fm),
+                has_frontmatter=bool(has_fm),
+                body_offset=body_offset,
+                sections={k: tuple(v) for k, v in json.loads(sections).items()},
+                error=error,
+            ))
+
+    def _store(self, entry: LoopFileEntry) -> None:
+        self._discard(entry.name)
+        self._entries[entry.name] = entry
+        for fld, key in entry.lookup_keys().items():
+            names = self._lookup[fld].setdefault(key, [])
+            names.append(entry.name)
+            names.sort()
+
+    def _discard(self, name: str) -> None:
+        old = self._entries.pop(name, None)
+        if old is None:
+            return
+        for fld, key in old.lookup_keys().items():
+            names = self._lookup[fld].get(key, [])
+            if name in names:
+                names.remove(name)
+            if not names:
+                self._lookup[fld].pop(key, None)
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self._load()
+            self._loaded = True
+
+    def _build_entry(self, path: Path, stat: os.stat_result) -> LoopFileEntry:
+        try:
+            raw = path.read_bytes()
+        except OSError as e:
+            return LoopFileEntry(path, stat.st_size, stat.st_mtime_ns, "", error=str(e))
+        parsed = parse_loop_bytes(raw)
+        return LoopFileEntry(
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            sha256=hashlib.sha256(raw).hexdigest(),
+            **parsed,
+        )
+
+    def refresh(self) -> Dict[str, int]:
+        """Stat-only pass over the directory; re-parses only added or modified files."""
+        with self._lock:
+            return self._refresh_locked()
+
+    def _refresh_locked(self) -> Dict[str, int]:
+        stats = {"scanned": 0, "parsed": 0, "removed": 0}
+        self._ensure_loaded()
+
+        if not self.directory.is_dir():
+            stats["removed"] = len(self._entries)
+            self._entries.clear()
+            self._lookup = {fld: {} for fld in LOOKUP_FIELDS}
+            return stats
+
+        changed: List[LoopFileEntry] = []
+        seen = set()
+        with os.scandir(self.directory) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith(".md") or not dir_entry.is_file():
+                    continue
+                stats["scanned"] += 1
+                seen.add(dir_entry.name)
+                st = dir_entry.stat()
+                cached = self._entries.get(dir_entry.name)
+                if cached and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+                    continue
+                entry = self._build_entry(Path(dir_entry.path), st)
+                self._store(entry)
+                changed.append(entry)
+
+        removed = [name for name in self._entries if name not in seen]
+        for name in removed:
+            self._discard(name)
+        stats["parsed"] = len(changed)
+        stats["removed"] = len(removed)
+
+        if changed or removed:
+            self._persist(changed, removed)
+        return stats
+
+    def _revalidate(self, name: str) -> Optional[LoopFileEntry]:
+        """Checks a single cached entry against the filesystem, re-parsing it if it changed."""
+        path = self.directory / name
+        try:
+            st = path.stat()
+        except OSError:
+            self._discard(name)
+            self._persist([], [name])
+            return None
+        cached = self._entries.get(name)
+        if cached and cached.size == st.st_size and cached.mtime_ns == st.st_mtime_ns:
+            return cached
+        entry = self._build_entry(path, st)
+        self._store(entry)
+        self._persist([entry], [])
+        return entry
+
+    def find(self, value: Any, field: str = "uuid", pattern: str = "*.md") -> Optional[LoopFileEntry]:
+        """
+        Looks up an entry by ``uuid``, ``id`` or file ``stem`` (case-insensitive).
+        When several files carry the key, the first by name that matches
+        ``pattern`` wins. Each cached candidate is confirmed with one stat; if
+        none survives, a refresh picks up newly added or rewritten files.
+        """
+        if field not in LOOKUP_FIELDS:
+            raise ValueError(f"Unknown lookup field: {field}")
+        key = _lookup_key(value)
+        with self._lock:
+            self._ensure_loaded()
+            for name in list(self._lookup[field].get(key, [])):
+                if not fnmatch.fnmatch(name, pattern):
+                    continue
+                entry = self._revalidate(name)
+                if entry is not None and entry.lookup_keys().get(field) == key:
+                    return entry
+            self._refresh_locked()
+            for name in self._lookup[field].get(key, []):
+                if fnmatch.fnmatch(name, pattern):
+                    return self._entries[name]
+            return None
+
+    def _persist(self, changed: List[LoopFileEntry], removed: List[str]) -> None:
+        conn = self._connect()
+        if conn is None:
+            return
+        try:
+            with closing(conn), conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO loop_files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            e.name, e.size, e.mtime_ns, e.sha256, json.dumps(e.frontmatter),
+                            int(e.has_frontmatter), e.body_offset, json.dumps(e.sections), e.error,
+                        )
+                        for e in changed
+                    ],
+                )
+                conn.executemany("DELETE FROM loop_files WHERE name = ?", [(n,) for n in removed])
+        except sqlite3.Error as e:
+            # The in-memory view is still correct; the next process just re-parses.
+            print(f"[loop_index] Could not persist index to {self.db_path}: {e}")
+
+    def entries(self, pattern: str = "*.md", refresh: bool = True) -> List[LoopFileEntry]:
+        """Returns index entries whose filename matches ``pattern``, sorted by name."""
+        if refresh:
+            self.refresh()
+        return [
+            entry for name, entry in sorted(self._entries.items())
+            if fnmatch.fnmatch(name, pattern)
+        ]
+
+    def get(self, path: Path, refresh: bool = True) -> Optional[LoopFileEntry]:
+        if refresh:
+            self.refresh()
+        return self._entries.get(Path(path).name)
+
+
+_indexes: Dict[Path, LoopIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_loop_index(directory: Path = RUNTIME_LOOPS_DIR) -> LoopIndex:
+    """Returns the process-wide index for ``directory`` so callers share parsed state."""
+    key = Path(directory).resolve()
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = LoopIndex(key)
+        return _indexes[key]
+
+
+def find_loop_file(
+    value: Any, field: str = "uuid", directory: Path = RUNTIME_LOOPS_DIR, pattern: str = "*.md"
+) -> Optional[Path]:
+    """Returns the path of the loop whose ``field`` (uuid, id or stem) matches ``value``."""
+    if not Path(directory).is_dir():
+        return None
+    entry = get_loop_index(directory).find(value, field=field, pattern=pattern)
+    return entry.path if entry else None
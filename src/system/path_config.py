@@ -8,6 +8,8 @@ DB_DIR = RUNTIME_DIR / "db"
 LOG_DIR = RUNTIME_DIR / "logs"
 VECTOR_INDEX_DIR = RUNTIME_DIR / "vector_index"
 CREDENTIALS_DIR = RUNTIME_DIR / "credentials"
+RUNTIME_LOOPS_DIR = RUNTIME_DIR / "loops"
+RUNTIME_INTERACTIONS_DIR = RUNTIME_DIR / "interactions"
 
 # Ensure directories exist
 DB_DIR.mkdir(parents=True, exist_ok=True)
@@ -27,6 +29,7 @@ MCP_LOG = LOG_DIR / "sync_loops.out"
 VAULT_SNAPSHOT = RUNTIME_DIR / "vault_structure_snapshot.json"
 INDEX_PATH = VECTOR_INDEX_DIR / "faiss_index.idx"
 META_PATH = VECTOR_INDEX_DIR / "chunk_metadata.pkl"
+VECTOR_MEMORY_DIR = VECTOR_INDEX_DIR / "vector_memory"
 EMBED_TRACK_FILE = RUNTIME_DIR / ".last_embed_sync"
 EXTRACT_LOG_PATH = LOG_DIR / "extract_loops.log"
 CADENCE_LOG_FILE = LOG_DIR / "cadence-manager.log"
@@ -0,0 +1,233 @@
+"""
+SQLite-backed sync manifest.
+
+Replaces the YAML ``.system_manifest.yaml`` as the record of which files have
+been pushed to Qdrant. One row per file, keyed by its path relative to the
+project root:
+
+    path, size, mtime_ns, sha256, uuid, synced_sha256, qdrant_synced_at
+
+``refresh()`` is stat-only for untouched files. It rides on ``LoopIndex``,
+which hashes and parses a file (one read) only when its size or mtime changed.
+A file needs syncing while ``sha256 != synced_sha256``; ``mark_synced`` records
+the push. The YAML file is now an export, written for git snapshots by
+``create_ora_snapshot``. An existing YAML manifest is imported on first use so
+unchanged files are not re-embedded.
+
+Example usage:
+    from src.system.sync_manifest import SyncManifest
+
+    manifest = SyncManifest()
+    manifest.refresh(RUNTIME_LOOPS_DIR)
+    for entry in manifest.pending(RUNTIME_LOOPS_DIR):
+        ...
+    manifest.mark_synced([(entry.path, entry.uuid, entry.sha256)])
+    manifest.export_yaml()
+"""
+
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import yaml
+
+from src.system.loop_index import get_loop_index
+from src.system.path_config import DB_DIR, PROJECT_ROOT
+
+MANIFEST_DB = DB_DIR / "sync_manifest.db"
+MANIFEST_YAML = PROJECT_ROOT / ".system_manifest.yaml"
+
+
+@dataclass
+class ManifestEntry:
+    path: str                          # Relative to the project root
+    size: int
+    mtime_ns: int
+    sha256: str
+    uuid: Optional[str] = None
+    synced_sha256: Optional[str] = None
+    qdrant_synced_at: Optional[str] = None
+
+    @property
+    def needs_sync(self) -> bool:
+        return self.sha256 != self.synced_sha256
+
+
+_COLUMNS = "path, size, mtime_ns, sha256, uuid, synced_sha256, qdrant_synced_at"
+
+
+class SyncManifest:
+    def __init__(self, db_path: Path = MANIFEST_DB, project_root: Path = PROJECT_ROOT):
+        self.db_path = Path(db_path)
+        self.project_root = Path(project_root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS manifest (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                uuid TEXT,
+                synced_sha256 TEXT,
+                qdrant_synced_at TEXT
+            )
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "SyncManifest":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def relative(self, path: Path) -> str:
+        path = Path(path)
+        try:
+            return path.resolve().relative_to(self.project_root.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _prefix(self, directory: Optional[Path]) -> str:
+        return "" if directory is None else self.relative(directory).rstrip("/") + "/"
+
+    # --- Reading -------------------------------------------------------------
+
+    def entries(self, directory: Optional[Path] = None) -> List[ManifestEntry]:
+        prefix = self._prefix(directory)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM manifest WHERE substr(path, 1, ?) = ? ORDER BY path",
+                (len(prefix), prefix),
+            ).fetchall()
+        return [ManifestEntry(*row) for row in rows]
+
+    def get(self, path: Path) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM manifest WHERE path = ?", (self.relative(path),)
+            ).fetchone()
+        return ManifestEntry(*row) if row else None
+
+    def pending(self, directory: Optional[Path] = None) -> List[ManifestEntry]:
+        """Files whose current content has not been synced."""
+        return [entry for entry in self.entries(directory) if entry.needs_sync]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM manifest").fetchone()[0]
+
+    # --- Writing -------------------------------------------------------------
+
+    def refresh(self, directory: Path, pattern: str = "*.md") -> Dict[str, int]:
+        """Brings rows for ``directory`` up to date. Only files whose size or mtime changed are hashed."""
+        stats = {"scanned": 0, "updated": 0, "removed": 0}
+        known = {entry.path: entry for entry in self.entries(directory)}
+        updates: List[Tuple] = []
+        seen = set()
+        for file_entry in get_loop_index(Path(directory)).entries(pattern):
+            stats["scanned"] += 1
+            path = self.relative(file_entry.path)
+            seen.add(path)
+            row = known.get(path)
+            if row and (row.size, row.mtime_ns) == (file_entry.size, file_entry.mtime_ns):
+                continue
+            uuid = file_entry.frontmatter.get("uuid") or file_entry.frontmatter.get("id")
+            updates.append((path, file_entry.size, file_entry.mtime_ns, file_entry.sha256,
+                            None if uuid is None else str(uuid)))
+        removed = [path for path in known if path not in seen]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO manifest (path, size, mtime_ns, sha256, uuid) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(path) DO UPDATE SET
+                    size = excluded.size, mtime_ns = excluded.mtime_ns,
+                    sha256 = excluded.sha256, uuid = excluded.uuid
+                """,
+                updates,
+            )
+            self._conn.executemany("DELETE FROM manifest WHERE path = ?", [(p,) for p in removed])
+        stats["updated"], stats["removed"] = len(updates), len(removed)
+        return stats
+
+    def mark_synced(self, synced: Iterable[Tuple[str, Optional[str], str]], when: Optional[str] = None) -> int:
+        """Records ``(path, uuid, sha256)`` triples as pushed to Qdrant."""
+        when = when or datetime.now().isoformat()
+        rows = [(uuid, sha256, when, path if isinstance(path, str) else self.relative(path))
+                for path, uuid, sha256 in synced]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "UPDATE manifest SET uuid = COALESCE(?, uuid), synced_sha256 = ?, qdrant_synced_at = ? "
+                "WHERE path = ?",
+                rows,
+            )
+        return len(rows)
+
+    # --- YAML ----------------------------------------------------------------
+
+    def import_yaml(self, yaml_path: Path = MANIFEST_YAML) -> int:
+        """
+        One-time migration from the YAML manifest written by resync_qdrant_and_manifest
+        (``path: {uuid, hash, last_updated}``). Imported rows get a sentinel size so the
+        next refresh re-stats them, while keeping their synced hash.
+        """
+        yaml_path = Path(yaml_path)
+        if not yaml_path.exists():
+            return 0
+        try:
+            data = yaml.safe_load(yaml_path.read_text(encoding="utf-8")) or {}
+        except yaml.YAMLError as e:
+            print(f"⚠️ Could not import manifest {yaml_path.name}: {e}")
+            return 0
+        if not isinstance(data, dict):
+            return 0
+        rows = []
+        for path, record in data.items():
+            if not isinstance(record, dict):
+                continue
+            synced = record.get("hash") or record.get("synced_sha256")
+            if not synced:
+                continue   # Older snapshot formats carry no sync state
+            synced_at = record.get("last_updated") or record.get("qdrant_synced_at")
+            rows.append((str(path), -1, -1, synced, record.get("uuid"), synced, synced_at))
+        with self._lock, self._conn:
+            self._conn.executemany(
+                f"INSERT OR IGNORE INTO manifest ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        return len(rows)
+
+    def export_yaml(self, yaml_path: Path = MANIFEST_YAML) -> int:
+        """Writes a sorted, diff-friendly YAML snapshot of the manifest."""
+        entries = self.entries()
+        snapshot = {
+            entry.path: {
+                "uuid": entry.uuid,
+                "sha256": entry.sha256,
+                "hash": entry.synced_sha256,
+                "qdrant_synced_at": entry.qdrant_synced_at,
+            }
+            for entry in entries
+        }
+        Path(yaml_path).write_text(yaml.safe_dump(snapshot, sort_keys=True, indent=2), encoding="utf-8")
+        return len(entries)
+
+
+def open_manifest(yaml_path: Path = MANIFEST_YAML) -> SyncManifest:
+    """The project manifest, importing the legacy YAML file the first time."""
+    manifest = SyncManifest()
+    if not len(manifest) and Path(yaml_path).exists():
+        imported = manifest.import_yaml(yaml_path)
+        if imported:
+            print(f"📥 Imported {imported} entries from {Path(yaml_path).name} into {manifest.db_path.name}")
+    return manifest
@@ -0,0 +1,337 @@
+"""
+Full-text index over loops and interactions, with hybrid keyword + vector search.
+
+Keyword lookups used to regex or substring-match whole files. This module
+keeps one SQLite FTS5 table of every loop (title, summary, body) and every
+interaction (context, outcome, message) in ``runtime/db/text_index.db``.
+
+``refresh()`` is incremental. Loop files come through ``LoopIndex`` and
+interaction files through a stat scan. Only files whose size or mtime changed
+are read again, and removed files are dropped. ``get_text_index()`` refreshes
+at most every REFRESH_INTERVAL seconds, so the searches that follow are pure
+index lookups.
+
+``search`` ranks with BM25; titles weigh most, then summaries, then bodies.
+``hybrid_search`` takes the top BM25 candidates (any query term may match)
+and reranks them by cosine similarity to the query embedding. A semantic
+query therefore scores a few dozen candidates rather than the whole vault.
+Loop vectors are read back from the loop collection (one retrieve by point
+id), once the collection registry confirms they come from the active
+provider's model. Only candidates without a stored vector, such as
+interactions or loops not yet synced, are embedded; the provider serves
+repeat texts from the embedding cache. An unsynced loop is embedded from its
+body alone, the text update_qdrant_embeddings stores, so both kinds of loop
+vector score the same text.
+
+Example usage:
+    from src.system.text_index import get_text_index
+
+    index = get_text_index()
+    hits = index.search("lease renewal", k=10)                  # BM25, all terms
+    hits = index.hybrid_search("who owns the office move?", k=5)
+    for hit in hits:
+        print(hit.kind, hit.title, round(hit.score, 3), hit.snippet)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+import uuid as uuid_lib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.data.interaction_store import parse_interaction_file, scan_interaction_files
+from src.memory.collection_registry import (
+    EmbeddingModelMismatchError,
+    verify_collection,
+)
+from src.memory.embedding_providers import get_provider
+from src.memory.query_cache import embed_query
+from src.memory.update_qdrant_embeddings import QDRANT_COLLECTION_NAME, get_qdrant_id
+from src.memory.vector_store import VectorStore, get_vector_store
+from src.system.loop_index import get_loop_index
+from src.system.path_config import DB_DIR, RUNTIME_INTERACTIONS_DIR, RUNTIME_LOOPS_DIR
+
+TEXT_INDEX_DB = DB_DIR / "text_index.db"
+REFRESH_INTERVAL = 30.0            # Seconds between automatic refreshes in get_text_index()
+BM25_WEIGHTS = (5.0, 2.0, 1.0)     # title, summary, body
+HYBRID_CANDIDATES = 50
+RERANK_CHARS = 4000                # Text per interaction candidate sent to the embedding provider
+LOOP_VECTOR_COLLECTION = QDRANT_COLLECTION_NAME   # Where update_qdrant_embeddings stores loop vectors
+
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class TextHit:
+    key: str                  # "loop:<file name>" or "interaction:<file name>"
+    kind: str
+    path: str
+    uuid: Optional[str]
+    title: str
+    score: float              # -bm25 for keyword search, cosine for hybrid search
+    snippet: str = ""
+    bm25: float = 0.0
+
+
+def match_expression(query: str, any_term: bool = False) -> Optional[str]:
+    """Quotes every word of a free-text query so FTS5 never sees operators or stray quotes."""
+    terms = _TERM.findall(query or "")
+    if not terms:
+        return None
+    return (" OR " if any_term else " ").join(f'"{term}"' for term in terms)
+
+
+class TextIndex:
+    def __init__(
+        self,
+        db_path: Path = TEXT_INDEX_DB,
+        loops_dir: Optional[Path] = RUNTIME_LOOPS_DIR,
+        interactions_dir: Optional[Path] = RUNTIME_INTERACTIONS_DIR,
+        vector_store: Optional[VectorStore] = None,
+    ):
+        self.db_path = Path(db_path)
+        self.loops_dir = Path(loops_dir) if loops_dir else None
+        self.interactions_dir = Path(interactions_dir) if interactions_dir else None
+        self.vector_store = vector_store   # Loop vectors for hybrid reranking; defaults to LOOP_VECTOR_COLLECTION
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.last_refresh = 0.0
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                kind TEXT NOT NULL,
+                path TEXT NOT NULL,
+                uuid TEXT,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                title, summary, body, tokenize = 'porter unicode61'
+            );
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    # --- Incremental refresh ----------------------------------------------------
+
+    def _known(self, kind: str) -> Dict[str, Tuple[int, int, int]]:
+        rows = self._conn.execute("SELECT key, id, size, mtime_ns FROM documents WHERE kind = ?", (kind,))
+        return {key: (doc_id, size, mtime_ns) for key, doc_id, size, mtime_ns in rows}
+
+    def _upsert(self, doc_id: Optional[int], key: str, kind: str, path: Path, uuid, size: int, mtime_ns: int,
+                title: str, summary: str, body: str) -> None:
+        if doc_id is not None:
+            self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+            self._conn.execute(
+                "UPDATE documents SET path = ?, uuid = ?, size = ?, mtime_ns = ? WHERE id = ?",
+                (str(path), uuid, size, mtime_ns, doc_id),
+            )
+        else:
+            doc_id = self._conn.execute(
+                "INSERT INTO documents (key, kind, path, uuid, size, mtime_ns) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, str(path), uuid, size, mtime_ns),
+            ).lastrowid
+        self._conn.execute(
+            "INSERT INTO documents_fts (rowid, title, summary, body) VALUES (?, ?, ?, ?)",
+            (doc_id, title, summary, body),
+        )
+
+    def _remove(self, doc_ids: List[int]) -> None:
+        for doc_id in doc_ids:
+            self._conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (doc_id,))
+            self._conn.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+
+    def _refresh_loops(self, stats: Dict[str, int]) -> None:
+        known = self._known("loop")
+        seen = set()
+        if self.loops_dir is not None and self.loops_dir.is_dir():
+            for entry in get_loop_index(self.loops_dir).entries("*.md"):
+                key = f"loop:{entry.name}"
+                seen.add(key)
+                stats["scanned"] += 1
+                doc_id, size, mtime_ns = known.get(key, (None, None, None))
+                if (size, mtime_ns) == (entry.size, entry.mtime_ns):
+                    continue
+                front = entry.frontmatter
+                uuid = front.get("uuid") or front.get("id")
+                try:
+                    body = entry.read_body() if entry.has_frontmatter else entry.read_text()
+                except OSError:
+                    continue
+                self._upsert(doc_id, key, "loop", entry.path, None if uuid is None else str(uuid),
+                             entry.size, entry.mtime_ns, str(front.get("title") or entry.path.stem),
+                             str(front.get("summary") or ""), body)
+                stats["indexed"] += 1
+        removed = [doc_id for key, (doc_id, _, _) in known.items() if key not in seen]
+        self._remove(removed)
+        stats["removed"] += len(removed)
+
+    def _refresh_interactions(self, stats: Dict[str, int]) -> None:
+        known = self._known("interaction")
+        on_disk = {}
+        if self.interactions_dir is not None and self.interactions_dir.is_dir():
+            on_disk = scan_interaction_files(self.interactions_dir)
+        for name, (size, mtime_ns) in on_disk.items():
+            key = f"interaction:{name}"
+            stats["scanned"] += 1
+            doc_id, known_size, known_mtime = known.get(key, (None, None, None))
+            if (known_size, known_mtime) == (size, mtime_ns):
+                continue
+            row = parse_interaction_file(self.interactions_dir / name)
+            self._upsert(doc_id, key, "interaction", self.interactions_dir / name, row.get("uuid"), size, mtime_ns,
+                         row.get("context") or name, row.get("outcome") or "", row.get("message") or "")
+            stats["indexed"] += 1
+        removed = [doc_id for key, (doc_id, _, _) in known.items() if key.split(":", 1)[1] not in on_disk]
+        self._remove(removed)
+        stats["removed"] += len(removed)
+
+    def refresh(self) -> Dict[str, int]:
+        """Indexes new and changed files and drops deleted ones. Unchanged files cost one stat."""
+        stats = {"scanned": 0, "indexed": 0, "removed": 0}
+        with self._lock, self._conn:
+            self._refresh_loops(stats)
+            self._refresh_interactions(stats)
+        self.last_refresh = time.monotonic()
+        return stats
+
+    # --- Search -------------------------------------------------------------------
+
+    def search(self, query: str, k: int = 10, kind: Optional[str] = None, any_term: bool = False) -> List[TextHit]:
+        """BM25-ranked documents. By default every query term must match; ``any_term`` relaxes that."""
+        expression = match_expression(query, any_term)
+        if expression is None:
+            return []
+        sql = (
+            "SELECT d.key, d.kind, d.path, d.uuid, f.title, bm25(documents_fts, ?, ?, ?) AS rank, "
+            "snippet(documents_fts, 2, '**', '**', ' … ', 12) "
+            "FROM documents_fts f JOIN documents d ON d.id = f.rowid "
+            "WHERE documents_fts MATCH ?" + (" AND d.kind = ?" if kind else "") +
+            " ORDER BY rank LIMIT ?"
+        )
+        params = [*BM25_WEIGHTS, expression] + ([kind] if kind else []) + [k]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            TextHit(key, kind_, path, uuid, title, -rank, snippet, bm25=-rank)
+            for key, kind_, path, uuid, title, rank, snippet in rows
+        ]
+
+    def _texts(self, keys: List[str]) -> Dict[str, str]:
+        """Text to embed per key: a loop's body (as update_qdrant_embeddings embeds it), else title, summary, body."""
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT d.key, d.kind, f.title, f.summary, f.body FROM documents_fts f "
+                f"JOIN documents d ON d.id = f.rowid WHERE d.key IN ({placeholders})",
+                keys,
+            ).fetchall()
+        return {
+            key: body.strip() if kind == "loop" else f"{title}\n\n{summary}\n\n{body}".strip()[:RERANK_CHARS]
+            for key, kind, title, summary, body in rows
+        }
+
+    def _stored_vectors(self, hits: List[TextHit], provider) -> Dict[str, Any]:
+        """
+        Stored loop vectors by hit key, fetched in one retrieve. Empty when the store is
+        unreachable or its vectors come from a different model than ``provider``.
+        """
+        point_ids = {}
+        for hit in hits:
+            if hit.kind == "loop":
+                point_ids[str(uuid_lib.UUID(get_qdrant_id({"uuid": hit.uuid}, Path(hit.path).stem)))] = hit.key
+        if not point_ids:
+            return {}
+        try:
+            store = self.vector_store or get_vector_store(LOOP_VECTOR_COLLECTION)
+            verify_collection(LOOP_VECTOR_COLLECTION, provider, client=store.client)
+            records = store.retrieve(list(point_ids), with_vectors=True)
+        except EmbeddingModelMismatchError as e:
+            print(f"[text_index] Stored loop vectors are from another model, embedding candidates instead: {e}")
+            return {}
+        except Exception as e:
+            print(f"[text_index] Stored loop vectors unavailable, embedding candidates instead: {e}")
+            return {}
+        return {point_ids[str(r.id)]: r.vector for r in records if str(r.id) in point_ids and r.vector is not None}
+
+    def hybrid_search(self, query: str, k: int = 10, candidates: int = HYBRID_CANDIDATES,
+                      kind: Optional[str] = None, provider=None) -> List[TextHit]:
+        """BM25 prefilter (any term) followed by a cosine rerank of the candidates against the query."""
+        hits = self.search(query, k=candidates, kind=kind, any_term=True)
+        if not hits:
+            return []
+        provider = provider or get_provider()
+        query_vector = embed_query(query, provider)
+        if query_vector is None:
+            return hits[:k]                      # Keyword order when the query cannot be embedded
+        q = np.asarray(query_vector, dtype=np.float32)
+        q /= np.linalg.norm(q) or 1.0
+
+        vectors = {key: v for key, v in self._stored_vectors(hits, provider).items() if len(v) == len(q)}
+        missing = [hit for hit in hits if hit.key not in vectors]
+        if missing:
+            texts = self._texts([hit.key for hit in missing])
+            embedded = provider.embed([texts.get(hit.key, hit.title) for hit in missing])
+            vectors.update((hit.key, v) for hit, v in zip(missing, embedded) if v is not None)
+
+        for hit in hits:
+            vector = vectors.get(hit.key)
+            if vector is None:
+                hit.score = -1.0
+                continue
+            v = np.asarray(vector, dtype=np.float32)
+            hit.score = float(v @ q / (np.linalg.norm(v) or 1.0))
+        return sorted(hits, key=lambda hit: hit.score, reverse=True)[:k]
+
+
+_index: Optional[TextIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_text_index(max_age: float = REFRESH_INTERVAL) -> TextIndex:
+    """Process-wide index over the runtime loops and interactions, refreshed when older than ``max_age``."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = TextIndex()
+        if time.monotonic() - _index.last_refresh > max_age:
+            _index.refresh()
+        return _index
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Refresh the full-text index and optionally search it.")
+    parser.add_argument("query", nargs="?", help="Search terms")
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--hybrid", action="store_true", help="Rerank BM25 candidates with embeddings")
+    parser.add_argument("--kind", choices=["loop", "interaction"])
+    args = parser.parse_args()
+
+    index = TextIndex()
+    started = time.perf_counter()
+    stats = index.refresh()
+    print(f"🔎 {len(index)} documents ({stats['indexed']} indexed, {stats['removed']} removed) "
+          f"in {time.perf_counter() - started:.2f}s")
+    if args.query:
+        started = time.perf_counter()
+        results = (index.hybrid_search if args.hybrid else index.search)(args.query, k=args.k, kind=args.kind)
+        print(f"{len(results)} results in {(time.perf_counter() - started) * 1000:.1f} ms")
+        for hit in results:
+            print(f"- [{hit.kind}] {hit.title} ({hit.score:.3f}) {hit.path}\n    {hit.snippet}")
@@ -0,0 +1,311 @@
+"""
+Memory-mapped sidecar for the vectors in the tasks table.
+
+SQLite keeps each task embedding as a BLOB, so readers had to decode row by
+row. The sidecar holds the same vectors as one contiguous float32 matrix that
+readers map with zero copies. Its rows are L2-normalised, so a cosine
+similarity is a single matrix-vector product.
+
+Layout, next to the database in ``<db>.vectors/``:
+
+    vectors-<gen>.npy   (capacity, dim) float32; the .npy header carries the dimension
+    ids-<gen>.npy       (capacity,) task uuids
+    live-<gen>.npy      (capacity,) bool, False for tombstoned rows
+    codes-<gen>.npy     (capacity, code_size) uint8, only with quantization
+    quantizer-<gen>.npz the fitted quantizer for those codes
+    meta.json           {"generation", "count", "live", "dim", "skipped", "table_version", "quantization"}
+
+Writes append in place while capacity lasts and update meta.json last, so
+readers see either the old row count or the new one. Replacing a task
+tombstones its old row. Growing the capacity, or compacting once tombstones
+pass COMPACT_RATIO of the rows, writes a new generation and then swaps
+meta.json. Readers that still map the old files keep a valid view. One writer
+at a time is assumed (the indexer).
+
+With TASK_VECTOR_QUANTIZATION=int8 (or pq) each rebuild also writes
+compressed codes (see src.memory.quantization). Similarity scoring then reads
+the codes and re-scores only the rows that could pass the threshold against
+the float32 matrix. Each scan reads 4x (int8) or more fewer bytes, and the
+results match the float32 scan.
+
+``sync()`` compares the table's write counter (see similarity.tasks_table_version)
+with the one recorded at the last write and rebuilds the sidecar if they differ.
+Only writers (the indexer and this module's CLI) sync. Readers check
+``is_current()`` and fall back to the BLOBs while the sidecar is stale.
+
+Example usage:
+    from src.tasks.task_vector_store import TaskVectorStore
+
+    store = TaskVectorStore.for_db("runtime/db/ora.db")
+    store.sync(conn, version)
+    vectors, ids, live = store.view()       # Zero-copy memmaps
+    quantized = store.quantized_view()      # (quantizer, codes) or None
+"""
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.memory.quantization import fit_sample, get_quantizer, load_quantizer
+
+SIDECAR_SUFFIX = ".vectors"
+META_FILE = "meta.json"
+ID_DTYPE = "<U64"
+MIN_CAPACITY = 1024
+COMPACT_RATIO = 0.25  # Compact once this share of rows is tombstoned
+TASK_VECTOR_QUANTIZATION = os.getenv("TASK_VECTOR_QUANTIZATION", "")  # "", "int8" or "pq"
+
+
+def sidecar_path(db_path) -> Path:
+    return Path(str(db_path) + SIDECAR_SUFFIX)
+
+
+def _unit_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)  # Zero vectors stay zero and score 0
+
+
+class TaskVectorStore:
+    def __init__(self, directory: Path, quantization: Optional[str] = None):
+        self.directory = Path(directory)
+        self.meta = self._read_meta()
+        # Applies from the next rebuild; readers follow whatever meta.json records
+        self.quantization = TASK_VECTOR_QUANTIZATION if quantization is None else quantization
+
+    @classmethod
+    def for_db(cls, db_path, quantization: Optional[str] = None) -> "TaskVectorStore":
+        return cls(sidecar_path(db_path), quantization)
+
+    # --- Metadata ------------------------------------------------------------
+
+    def _read_meta(self) -> Optional[dict]:
+        try:
+            return json.loads((self.directory / META_FILE).read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _write_meta(self, **changes) -> None:
+        meta = {**(self.meta or {}), **changes}
+        tmp = self.directory / f".{META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.directory / META_FILE)
+        self.meta = meta
+
+    def refresh(self) -> None:
+        self.meta = self._read_meta()
+
+    @property
+    def exists(self) -> bool:
+        return self.meta is not None
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.meta["dim"] if self.meta else None
+
+    @property
+    def count(self) -> int:
+        return self.meta["count"] if self.meta else 0
+
+    @property
+    def live_count(self) -> int:
+        return self.meta["live"] if self.meta else 0
+
+    @property
+    def table_version(self) -> Any:
+        version = self.meta.get("table_version") if self.meta else None
+        return tuple(version) if isinstance(version, list) else version  # JSON turns tuples into lists
+
+    def is_current(self, table_version: Any) -> bool:
+        """True when the sidecar was last written at ``table_version`` of the tasks table."""
+        return self.exists and table_version is not None and self.table_version == table_version
+
+    def _path(self, name: str, generation: Optional[int] = None, suffix: str = ".npy") -> Path:
+        generation = self.meta["generation"] if generation is None else generation
+        return self.directory / f"{name}-{generation}{suffix}"
+
+    # --- Reading -------------------------------------------------------------
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """``(vectors, ids, live)`` over the first ``count`` rows, memory-mapped read-only."""
+        if not self.exists:
+            raise FileNotFoundError(f"No task vector sidecar at {self.directory}")
+        count = self.count
+        vectors = np.load(self._path("vectors"), mmap_mode="r")[:count]
+        ids = np.load(self._path("ids"), mmap_mode="r")[:count]
+        live = np.load(self._path("live"), mmap_mode="r")[:count]
+        return vectors, ids, live
+
+    def quantized_view(self):
+        """``(quantizer, codes)`` over the first ``count`` rows, or None when the sidecar stores no codes."""
+        if not self.exists or not self.meta.get("quantization"):
+            return None
+        quantizer = load_quantizer(self._path("quantizer", suffix=".npz"))
+        return quantizer, np.load(self._path("codes"), mmap_mode="r")[: self.count]
+
+    # --- Writing -------------------------------------------------------------
+
+    def _allocate(self, generation: int, capacity: int, dim: int):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        vectors = open_memmap(self._path("vectors", generation), mode="w+", dtype=np.float32, shape=(capacity, dim))
+        ids = open_memmap(self._path("ids", generation), mode="w+", dtype=ID_DTYPE, shape=(capacity,))
+        live = open_memmap(self._path("live", generation), mode="w+", dtype=np.bool_, shape=(capacity,))
+        return vectors, ids, live
+
+    def _write_codes(self, generation: int, capacity: int, unit_rows: np.ndarray) -> Optional[str]:
+        """Fits a quantizer on the rows and writes their codes for ``generation``; returns the kind written."""
+        if not self.quantization or not len(unit_rows):
+            return None
+        quantizer = get_quantizer(self.quantization).fit(fit_sample(unit_rows))
+        codes = open_memmap(self._path("codes", generation), mode="w+", dtype=np.uint8,
+                            shape=(capacity, quantizer.code_size))
+        codes[: len(unit_rows)] = quantizer.encode(unit_rows)
+        codes.flush()
+        quantizer.save(self._path("quantizer", generation, ".npz"))
+        return quantizer.kind
+
+    def _append_codes(self, start: int, unit_rows: np.ndarray) -> None:
+        path = self._path("quantizer", suffix=".npz")
+        quantizer = load_quantizer(path)
+        bound = quantizer.max_error
+        codes = open_memmap(self._path("codes"), mode="r+")
+        codes[start:start + len(unit_rows)] = quantizer.encode(unit_rows)
+        codes.flush()
+        if quantizer.max_error != bound:
+            quantizer.save(path)  # Readers' error bound must cover the new rows
+
+    def _publish(self, generation: int, arrays, count: int, live_count: int, **meta) -> None:
+        for array in arrays:
+            array.flush()
+        previous = self.meta["generation"] if self.meta else None
+        self._write_meta(generation=generation, count=count, live=live_count, **meta)
+        if previous is not None and previous != generation:
+            for name in ("vectors", "ids", "live", "codes"):
+                self._path(name, previous).unlink(missing_ok=True)  # Open maps stay valid
+            self._path("quantizer", previous, ".npz").unlink(missing_ok=True)
+
+    def rebuild(self, ids: Sequence[str], vectors: np.ndarray, table_version: Any = None, skipped: int = 0) -> None:
+        """Replaces the whole sidecar with ``vectors`` (one row per id)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dim = vectors.shape[1] if vectors.ndim == 2 and len(vectors) else (self.dim or 0)
+        generation = (self.meta["generation"] + 1) if self.meta else 0
+        capacity = max(MIN_CAPACITY, 2 * len(ids))
+        arrays = self._allocate(generation, capacity, dim)
+        unit_rows = _unit_rows(vectors) if len(ids) else np.zeros((0, dim), np.float32)
+        if len(ids):
+            arrays[0][: len(ids)] = unit_rows
+            arrays[1][: len(ids)] = np.asarray(ids, dtype=ID_DTYPE)
+            arrays[2][: len(ids)] = True
+        quantization = self._write_codes(generation, capacity, unit_rows)
+        self._publish(generation, arrays, len(ids), len(ids), dim=dim, skipped=skipped, table_version=table_version,
+                      quantization=quantization)
+
+    def append(self, ids: Sequence[str], vectors: np.ndarray, table_version: Any = None) -> None:
+        """Adds or replaces tasks. A replaced task's old row becomes a tombstone."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        if not self.exists or not self.count:
+            self.rebuild(ids, vectors, table_version)
+            return
+        if vectors.shape[1] != self.dim:
+            raise ValueError(f"Sidecar stores {self.dim}-d vectors, got {vectors.shape[1]}-d.")
+
+        self._tombstone(ids)
+        count, needed = self.count, self.count + len(ids)
+        capacity = np.load(self._path("ids"), mmap_mode="r").shape[0]
+        if needed > capacity:
+            self._compact(extra_ids=ids, extra_vectors=vectors, table_version=table_version)
+            return
+        stored, stored_ids, live = (open_memmap(self._path(name), mode="r+") for name in ("vectors", "ids", "live"))
+        stored[count:needed] = _unit_rows(vectors)
+        if self.meta.get("quantization"):
+            self._append_codes(count, stored[count:needed])
+        stored_ids[count:needed] = np.asarray(ids, dtype=ID_DTYPE)
+        live[count:needed] = True
+        self._publish(self.meta["generation"], (stored, stored_ids, live), needed, int(np.count_nonzero(live[:needed])),
+                      table_version=table_version)
+        self._maybe_compact()
+
+    def delete(self, ids: Sequence[str], table_version: Any = None) -> int:
+        removed = self._tombstone(ids)
+        if removed:
+            self._write_meta(live=self.live_count - removed, table_version=table_version)
+            self._maybe_compact()
+        return removed
+
+    def _tombstone(self, ids: Sequence[str]) -> int:
+        if not self.exists or not self.count or not len(ids):
+            return 0
+        live = open_memmap(self._path("live"), mode="r+")
+        stored_ids = np.load(self._path("ids"), mmap_mode="r")[: self.count]
+        rows = np.flatnonzero(np.isin(stored_ids, np.asarray(ids, dtype=ID_DTYPE)) & live[: self.count])
+        live[rows] = False
+        live.flush()
+        return len(rows)
+
+    def _maybe_compact(self) -> None:
+        if self.count and (self.count - self.live_count) / self.count > COMPACT_RATIO:
+            self._compact(table_version=self.table_version)
+
+    def compact(self) -> None:
+        """Rewrites the live rows contiguously in a new generation."""
+        self._compact(table_version=self.table_version)
+
+    def _compact(self, extra_ids=(), extra_vectors=None, table_version: Any = None) -> None:
+        vectors, ids, live = self.view()
+        keep = np.flatnonzero(live)
+        new_ids = np.concatenate([ids[keep], np.asarray(extra_ids, dtype=ID_DTYPE)])
+        parts = [vectors[keep]] + ([_unit_rows(extra_vectors)] if extra_vectors is not None and len(extra_ids) else [])
+        generation = self.meta["generation"] + 1
+        capacity = max(MIN_CAPACITY, 2 * len(new_ids))
+        arrays = self._allocate(generation, capacity, self.dim)
+        arrays[0][: len(new_ids)] = np.concatenate(parts) if parts else np.zeros((0, self.dim), np.float32)
+        arrays[1][: len(new_ids)] = new_ids
+        arrays[2][: len(new_ids)] = True
+        quantization = self._write_codes(generation, capacity, arrays[0][: len(new_ids)])
+        self._publish(generation, arrays, len(new_ids), len(new_ids), table_version=table_version,
+                      quantization=quantization)
+
+    # --- Table sync ----------------------------------------------------------
+
+    def sync(self, conn: sqlite3.Connection, table_version: Any) -> bool:
+        """Rebuilds from the tasks table when it changed since the last write. Returns True if the sidecar is usable."""
+        if self.is_current(table_version):
+            return True
+        try:
+            rows = conn.execute("SELECT uuid, vector FROM tasks WHERE vector IS NOT NULL").fetchall()
+        except sqlite3.Error:
+            return False
+        dims = [len(blob) // 4 for _, blob in rows]
+        dim = max(set(dims), key=dims.count) if dims else (self.dim or 0)  # Most common model wins
+        kept = [(uuid, blob) for (uuid, blob), d in zip(rows, dims) if d == dim]
+        vectors = np.frombuffer(b"".join(blob for _, blob in kept), dtype=np.float32).reshape(len(kept), dim)
+        self.rebuild([uuid for uuid, _ in kept], vectors, table_version, skipped=len(rows) - len(kept))
+        return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from src.tasks.similarity import tasks_table_version
+
+    parser = argparse.ArgumentParser(description="Build or compact the task vector sidecar for a database.")
+    parser.add_argument("db_path", nargs="?", default="runtime/db/ora.db")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--quantization", choices=["none", "int8", "pq"],
+                        help="Rebuild with these codes (default: TASK_VECTOR_QUANTIZATION)")
+    args = parser.parse_args()
+
+    quantization = None if args.quantization is None else ("" if args.quantization == "none" else args.quantization)
+    store = TaskVectorStore.for_db(args.db_path, quantization)
+    conn = sqlite3.connect(args.db_path)
+    store.sync(conn, tasks_table_version(conn))
+    conn.close()
+    if args.compact or (args.quantization is not None and (store.meta or {}).get("quantization") != (quantization or None)):
+        store.compact()  # Also rewrites the codes under the requested quantization
+    codes = f", {store.meta['quantization']} codes" if store.meta and store.meta.get("quantization") else ""
+    print(f"✅ {store.directory}: {store.live_count} live rows of {store.count}, {store.dim}-d{codes}")
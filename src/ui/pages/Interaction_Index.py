@@ -1,12 +1,22 @@
-import os
-import re
+import sys
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Any
 
 import pandas as pd
 import streamlit as st
-import yaml
+
+# Add project root to sys.path to resolve imports
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.data.interaction_store import (
+    CACHE_FILENAME,
+    list_parse_errors,
+    load_interactions,
+    refresh_interaction_index,
+)
+from src.system.path_config import RUNTIME_INTERACTIONS_DIR
 
 # Try to import plotly, fall back to basic charts if not available
 try:
@@ -26,105 +36,26 @@ try:
 except IndexError:
     PROJECT_ROOT = Path.cwd()
 
-interactions_dir = PROJECT_ROOT / "runtime/interactions"
+interactions_dir = RUNTIME_INTERACTIONS_DIR
 
 # --- Helper Functions ---
 
-def parse_interaction_file(filepath: Path) -> Dict[str, Any]:
-    """Parse a single interaction markdown file."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Split frontmatter and content
-        if content.startswith('---\n'):
-            parts = content.split('---\n', 2)
-            if len(parts) >= 3:
-                frontmatter_str = parts[1]
-                body = parts[2]
-                
-                # Parse frontmatter
-                frontmatter = yaml.safe_load(frontmatter_str)
-                
-                # Extract message and outcome from body
-                message_match = re.search(r'## 💬 Message\s*\n(.*?)(?=\n## |$)', body, re.DOTALL)
-                outcome_match = re.search(r'## 🔄 Outcome\s*\n(.*?)(?=\n## |$)', body, re.DOTALL)
-                
-                message = message_match.group(1).strip() if message_match else ""
-                outcome = outcome_match.group(1).strip() if outcome_match else ""
-                
-                # Add parsed content
-                frontmatter['message'] = message
-                frontmatter['outcome'] = outcome
-                frontmatter['filename'] = filepath.name
-                
-                # Parse timestamp
-                if 'timestamp' in frontmatter:
-                    try:
-                        frontmatter['parsed_timestamp'] = pd.to_datetime(frontmatter['timestamp'])
-                    except:
-                        frontmatter['parsed_timestamp'] = None
-                
-                # Extract phase from tags if available
-                phase = None
-                if 'tags' in frontmatter and isinstance(frontmatter['tags'], list):
-                    for tag in frontmatter['tags']:
-                        if isinstance(tag, str) and tag.startswith('phase-'):
-                            phase = tag
-                            break
-                frontmatter['phase'] = phase
-                
-                # Extract workstream info
-                workstream = None
-                if 'context' in frontmatter:
-                    context = frontmatter['context']
-                    if 'loop-' in context:
-                        workstream = 'loop'
-                    elif 'task-' in context:
-                        workstream = 'task'
-                    elif 'phase-' in context:
-                        workstream = 'phase'
-                frontmatter['workstream'] = workstream
-                
-                return frontmatter
-    except Exception as e:
-        st.warning(f"Error parsing {filepath.name}: {e}")
-        return None
-    return None
-
 @st.cache_data
-def load_all_interactions() -> pd.DataFrame:
-    """Load and parse all interaction files."""
-    if not interactions_dir.exists():
-        return pd.DataFrame()
-    
-    interactions = []
-    interaction_files = list(interactions_dir.glob("interaction-*.md"))
-    
-    progress_bar = st.progress(0)
-    status_text = st.empty()
-    
-    for i, filepath in enumerate(interaction_files):
-        status_text.text(f"Loading {filepath.name}...")
-        progress_bar.progress((i + 1) / len(interaction_files))
-        
-        parsed = parse_interaction_file(filepath)
-        if parsed:
-            interactions.append(parsed)
-    
-    progress_bar.empty()
-    status_text.empty()
-    
-    if not interactions:
-        return pd.DataFrame()
-    
-    df = pd.DataFrame(interactions)
-    
-    # Sort by timestamp descending (newest first)
-    if 'parsed_timestamp' in df.columns:
-        df = df.sort_values('parsed_timestamp', ascending=False)
-    
-    return df
+def _read_interactions(cache_version: int, actors: tuple = (), since=None, until=None) -> pd.DataFrame:
+    """Columnar read keyed by the cache file's mtime, so a refresh invalidates it."""
+    return load_interactions(
+        interactions_dir, actors=list(actors) or None, since=since, until=until, refresh=False
+    )
+
+
+def load_all_interactions(actors: tuple = (), since=None, until=None) -> pd.DataFrame:
+    """Load parsed interactions, parsing only files that changed since the last visit."""
+    stats = refresh_interaction_index(interactions_dir)
+    if stats["parsed"] or stats["removed"]:
+        st.caption(f"Indexed {stats['parsed']} new or changed and {stats['removed']} removed interaction files")
+    cache_file = interactions_dir / CACHE_FILENAME
+    cache_version = cache_file.stat().st_mtime_ns if cache_file.exists() else 0
+    return _read_interactions(cache_version, tuple(actors), since, until)
 
 # --- Data Loading ---
 st.subheader("📥 Loading Interaction Data")
@@ -150,6 +81,10 @@ if df.empty:
 
 st.success(f"Successfully loaded {len(df)} interactions")
 
+parse_errors = list_parse_errors(interactions_dir)
+for _, failed in parse_errors.iterrows():
+    st.warning(f"Error parsing {failed['filename']}: {failed['parse_error']}")
+
 # --- Summary Metrics ---
 st.subheader("📈 Summary Metrics")
 
@@ -246,7 +181,7 @@ if 'phase' in df.columns:
 # --- Filtering Controls ---
 st.subheader("🔍 Filter Interactions")
 
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     actor_filter = st.multiselect(
@@ -276,11 +211,22 @@ with col4:
         default=[]
     )
 
-# Apply filters
-filtered_df = df.copy()
+with col5:
+    valid_timestamps = df['parsed_timestamp'].dropna()
+    full_range = (valid_timestamps.min().date(), valid_timestamps.max().date()) if not valid_timestamps.empty else ()
+    date_range = st.date_input("Date range", value=full_range)
+
+# Apply filters: actor and date range are pushed down to the columnar read
+since = until = None
+if isinstance(date_range, (list, tuple)) and len(date_range) == 2 and tuple(date_range) != full_range:
+    since = pd.Timestamp(date_range[0])
+    until = pd.Timestamp(date_range[1]) + pd.Timedelta(days=1) - pd.Timedelta(microseconds=1)
+
+if actor_filter or since is not None:
+    filtered_df = load_all_interactions(tuple(actor_filter), since, until)
+else:
+    filtered_df = df.copy()
 
-if actor_filter:
-    filtered_df = filtered_df[filtered_df['actor'].isin(actor_filter)]
 if source_filter:
     filtered_df = filtered_df[filtered_df['source'].isin(source_filter)]
 if phase_filter:
@@ -9,6 +9,14 @@ import pandas as pd
 import streamlit as st
 import yaml
 
+# Add project root to sys.path to resolve imports
+project_root = Path(__file__).resolve().parents[3]
+if str(project_root) not in sys.path:
+    sys.path.append(str(project_root))
+
+from src.system.frontmatter_reader import split_frontmatter
+from src.system.loop_index import find_loop_file
+
 DB_PATH = "runtime/db/feedback.db"
 LOOP_DIR = Path("runtime/loops")
 
@@ -32,22 +40,17 @@ def load_scores_from_sqlite():
 def parse_frontmatter(file_content: str) -> dict | None:
     """Parses YAML frontmatter from a file's content string."""
     try:
-        if not file_content.startswith("---"): return None
-        parts = file_content.split("---", 2)
-        if len(parts) < 3: return None
-        frontmatter = yaml.safe_load(parts[1])
-        return frontmatter if isinstance(frontmatter, dict) else None
+        frontmatter, _ = split_frontmatter(file_content)
+        return frontmatter or None
     except yaml.YAMLError:
         return None
 
 def load_loop_content_by_uuid(uuid: str) -> str:
-    """Efficiently finds and loads the full content of a loop file by its UUID."""
-    for file_path in LOOP_DIR.glob("loop-*.md"):
-        content = file_path.read_text(encoding="utf-8")
-        frontmatter = parse_frontmatter(content)
-        if frontmatter and str(frontmatter.get("uuid", "")).strip() == uuid.strip():
-            return content
-    return "⚠️ Loop file not found or UUID mismatch."
+    """Loads the full content of a loop file via the shared uuid index (no directory scan)."""
+    file_path = find_loop_file(uuid, directory=LOOP_DIR, pattern="loop-*.md")
+    if file_path is None:
+        return "⚠️ Loop file not found or UUID mismatch."
+    return file_path.read_text(encoding="utf-8")
 
 def render_loop_dashboard():
     st.set_page_config(page_title="Ora Feedback Dashboard", layout="wide")
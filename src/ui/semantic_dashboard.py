@@ -1,12 +1,18 @@
 import sqlite3
+import time
 from pathlib import Path
 
 import streamlit as st
 from qdrant_client import QdrantClient, models
 
+from src.memory.embedding_providers import get_provider
+from src.memory.qdrant_clients import QdrantSettings
+from src.memory.qdrant_clients import get_qdrant_client as shared_qdrant_client
+from src.memory.query_cache import embed_query, get_query_cache
+from src.system.text_index import get_text_index
+
 # --- Configuration ---
-QDRANT_HOST = "localhost"
-QDRANT_PORT = 6333
+QDRANT_SETTINGS = QdrantSettings.from_env()  # QDRANT_URL / QDRANT_HOST, see src/memory/qdrant_clients.py
 QDRANT_COLLECTION = "workstream_items"
 DB_PATH = "/Users/air/AIR01/System/data/loops.db"  # Path from promote_loops.py
 LOOP_DIR_PATH = Path("runtime/loops/")
@@ -15,7 +21,7 @@ LOOP_DIR_PATH = Path("runtime/loops/")
 @st.cache_resource
 def get_qdrant_client():
     try:
-        client = QdrantClient(host=QDRANT_HOST, port=QDRANT_PORT)
+        client = shared_qdrant_client(QDRANT_SETTINGS)
         # Check if collection exists
         try:
             client.get_collection(collection_name=QDRANT_COLLECTION)
@@ -25,7 +31,7 @@ def get_qdrant_client():
             return None
         return client
     except Exception as e:
-        st.error(f"Failed to connect to Qdrant at {QDRANT_HOST}:{QDRANT_PORT}: {e}")
+        st.error(f"Failed to connect to Qdrant at {QDRANT_SETTINGS.target}: {e}")
         return None
 
 # --- Database Helper ---
@@ -51,10 +57,32 @@ def get_loop_feedback_scores(loop_id: str) -> dict:
 
 # --- Feature Implementations ---
 
+def render_text_hits(query: str, top_n: int, hybrid: bool):
+    """Loops and interactions from the local full-text index (src/system/text_index.py)."""
+    index = get_text_index()
+    started = time.perf_counter()
+    hits = index.hybrid_search(query, k=top_n) if hybrid else index.search(query, k=top_n)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    st.caption(f"{len(hits)} results from {len(index)} indexed documents in {elapsed_ms:.1f} ms")
+    if not hits:
+        st.write("No matching loops or interactions.")
+        return
+    for hit in hits:
+        with st.expander(f"{hit.title} ({hit.kind}, score {hit.score:.3f})"):
+            if hit.uuid:
+                st.markdown(f"**ID:** `{hit.uuid}`")
+            if hit.snippet:
+                st.markdown(hit.snippet)
+            st.caption(hit.path)
+
+
 def render_related_loops_view(client: QdrantClient):
     st.subheader("🔍 Related Loops View")
     search_term = st.text_input("Enter Loop ID (e.g., loop-xyz) or search query for content:", key="related_loops_input")
     top_n = st.slider("Number of similar loops to retrieve:", 1, 20, 5, key="related_loops_top_n")
+    mode = st.radio("Text query mode:", ["Hybrid", "Keyword", "Semantic"], horizontal=True, key="related_loops_mode",
+                    help="Keyword: BM25 over titles, summaries and bodies. Hybrid: BM25 candidates reranked by "
+                         "embedding similarity. Semantic: nearest vectors in Qdrant.")
 
     if search_term:
         try:
@@ -83,10 +111,20 @@ def render_related_loops_view(client: QdrantClient):
                  else:
                     st.warning(f"Could not find vector for loop ID '{search_term}' in Qdrant.")
                     return
-            else:
-                st.info("Text query search is not yet fully implemented here. Please use a Loop ID.")
-                st.warning("For now, please use Loop ID for related search.")
+            elif mode != "Semantic":
+                render_text_hits(search_term, top_n, hybrid=(mode == "Hybrid"))
                 return
+            else:
+                # Free-text query; Streamlit reruns repeat the same query, so the cache answers those
+                target_vector = embed_query(search_term, get_provider())
+                if target_vector is None:
+                    st.warning("Could not embed the query. Check the embedding provider configuration.")
+                    return
+                cache = get_query_cache()
+                if cache is not None:
+                    metrics = cache.metrics()
+                    st.caption(f"Query cache: {metrics['hit_rate']:.0%} hit rate, "
+                               f"{metrics['memory_hits'] + metrics['disk_hits']} hits, {metrics['misses']} misses")
 
             if target_vector:
                 hits = client.search(
@@ -324,7 +362,7 @@ def render_embedding_quality_check(client: QdrantClient):
 # --- Main Dashboard Rendering ---
 def render_semantic_dashboard():
     st.title("🧠 Semantic Dashboard")
-    st.caption(f"Exploring loops from Qdrant collection: `{QDRANT_COLLECTION}` on `{QDRANT_HOST}:{QDRANT_PORT}`")
+    st.caption(f"Exploring loops from Qdrant collection: `{QDRANT_COLLECTION}` on `{QDRANT_SETTINGS.target}`")
     st.caption(f"Monitoring loop files from: `{LOOP_DIR_PATH.resolve()}`")
 
     client = get_qdrant_client()
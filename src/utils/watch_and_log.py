@@ -1,14 +1,12 @@
 #!/usr/bin/env python3
-import os
 import time
 from datetime import datetime
 
-from src.path_config import WATCH_DIR
+from src.ingestion.watcher import MODIFIED, ChangeEvent, VaultWatcher
+from src.system.path_config import PROJECT_ROOT
 
+WATCH_DIR = PROJECT_ROOT / "src"
 LOG_FILE = "/Users/air/AIR01/System/Logs/system-log.md"
-SCAN_INTERVAL = 5  # seconds
-
-last_mtimes = {}
 
 
 def log_change(filepath):
@@ -19,28 +17,26 @@ def log_change(filepath):
         f.write(f"🔧 Modified: /{relative_path}\n")
         f.write("🎯 Change: Edited with Cursor inline GPT\n")
         f.write("🧪 Status: Auto-logged\n")
-        f.write("👀 Context: polling_watchdog\n\n")
+        f.write("👀 Context: watchdog\n\n")
     print(f"✅ Logged change to /{relative_path}")
 
 
-def scan_files():
-    global last_mtimes
-    for root, _, files in os.walk(WATCH_DIR):
-        for filename in files:
-            if filename.endswith(".py"):
-                full_path = os.path.join(root, filename)
-                try:
-                    mtime = os.path.getmtime(full_path)
-                except FileNotFoundError:
-                    continue
-                if full_path not in last_mtimes or mtime > last_mtimes[full_path]:
-                    if full_path in last_mtimes:
-                        log_change(full_path)
-                    last_mtimes[full_path] = mtime
+def on_change(event: ChangeEvent):
+    log_change(str(event.path))
+
+
+def build_watcher(watch_dir=WATCH_DIR) -> VaultWatcher:
+    """Logs edits to existing .py files, one entry per debounced save."""
+    watcher = VaultWatcher(roots=[watch_dir], patterns=("*.py",))
+    watcher.subscribe(on_change, kinds=[MODIFIED])
+    return watcher
 
 
 if __name__ == "__main__":
-    print(f"👀 Polling for changes in {WATCH_DIR} every {SCAN_INTERVAL} seconds...")
-    while True:
-        scan_files()
-        time.sleep(SCAN_INTERVAL)
+    print(f"👀 Watching {WATCH_DIR} for changes...")
+    with build_watcher():
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
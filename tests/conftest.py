@@ -5,6 +5,31 @@ from pathlib import Path
 import frontmatter
 import pytest
 
+from src.memory.embedding_providers import HashingProvider
+
+
+class CountingProvider(HashingProvider):
+    """HashingProvider that records what it embeds: ``calls`` per batch, ``embedded`` per text."""
+
+    def __init__(self, dimension, query_vector=True):
+        super().__init__(dimension)
+        self.calls = []
+        self.embedded = []
+        self.query_vector = query_vector   # False returns no vectors, like a provider that is down
+
+    def embed(self, texts):
+        texts = list(texts)
+        self.calls.append(texts)
+        self.embedded.extend(texts)
+        vectors = super().embed(texts)
+        return vectors if self.query_vector else [None] * len(texts)
+
+
+@pytest.fixture
+def counting_provider():
+    """``CountingProvider`` factory, called with the dimension."""
+    return CountingProvider
+
 
 @pytest.fixture(scope="session")
 def test_env():
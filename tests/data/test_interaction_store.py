@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+
+from src.data.interaction_store import (
+    CACHE_FILENAME,
+    list_parse_errors,
+    load_interactions,
+    refresh_interaction_index,
+)
+
+
+def _write_interaction(directory, name, actor, timestamp, message="hello"):
+    path = directory / name
+    path.write_text(
+        f"---\nuuid: {name}\ntimestamp: '{timestamp}'\nactor: {actor}\nsource: chat\n"
+        f"context: loop-2025-06-01-x\ntags: [phase-10.2, chat]\n---\n\n"
+        f"## 💬 Message\n\n{message}\n\n## 🔄 Outcome\n\ndone\n"
+    )
+    return path
+
+
+def test_refresh_parses_only_changed_files(tmp_path):
+    _write_interaction(tmp_path, "interaction-a.md", "user", "2025-06-01T10:00:00Z")
+    _write_interaction(tmp_path, "interaction-b.md", "ora", "2025-06-02T10:00:00Z")
+    (tmp_path / "interaction-bad.md").write_text("no frontmatter\n")
+
+    assert refresh_interaction_index(tmp_path) == {"scanned": 3, "parsed": 3, "removed": 0}
+    assert (tmp_path / CACHE_FILENAME).exists()
+    assert refresh_interaction_index(tmp_path) == {"scanned": 3, "parsed": 0, "removed": 0}
+
+    path = _write_interaction(tmp_path, "interaction-a.md", "user", "2025-06-01T10:00:00Z", "edited")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    (tmp_path / "interaction-b.md").unlink()
+    assert refresh_interaction_index(tmp_path) == {"scanned": 2, "parsed": 1, "removed": 1}
+
+    df = load_interactions(tmp_path)
+    assert df["filename"].tolist() == ["interaction-a.md"]
+    assert df.loc[0, "message"] == "edited"
+    assert df.loc[0, "phase"] == "phase-10.2"
+    assert df.loc[0, "workstream"] == "loop"
+    assert df.loc[0, "tags"] == ["phase-10.2", "chat"]
+    assert list_parse_errors(tmp_path)["filename"].tolist() == ["interaction-bad.md"]
+
+
+def test_actor_and_time_filters(tmp_path):
+    for day in range(1, 6):
+        actor = "user" if day % 2 else "ora"
+        _write_interaction(tmp_path, f"interaction-{day}.md", actor, f"2025-06-0{day}T12:00:00Z")
+
+    df = load_interactions(tmp_path)
+    assert df["filename"].tolist() == [f"interaction-{d}.md" for d in range(5, 0, -1)]
+    assert isinstance(df.loc[0, "parsed_timestamp"], pd.Timestamp)
+
+    users = load_interactions(tmp_path, actors=["user"], since="2025-06-02", until="2025-06-05")
+    assert users["filename"].tolist() == ["interaction-3.md"]
+
+    narrow = load_interactions(tmp_path, columns=["uuid"], since="2025-06-04")
+    assert narrow.columns.tolist() == ["uuid"]
+    assert narrow["uuid"].tolist() == ["interaction-5.md", "interaction-4.md"]
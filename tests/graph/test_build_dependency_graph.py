@@ -0,0 +1,61 @@
+import sqlite3
+
+import pytest
+
+from src.graph.build_dependency_graph import init_db, scan_md_files
+
+
+@pytest.fixture
+def vault(tmp_path):
+    vault_path = tmp_path / "vault"
+    (vault_path / "Projects").mkdir(parents=True)
+    (vault_path / "Projects" / "note-a.md").write_text(
+        "---\nloop: loop-1\nproject: Ora\ngoal: Ship the graph\n---\nbody\n"
+    )
+    (vault_path / "note-b.md").write_text("---\nproject: Ora\nperson: [ash, isaac]\n---\nbody\n")
+    return vault_path
+
+
+def _edges(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return sorted(conn.execute("SELECT from_id, to_id, reason FROM edges").fetchall())
+
+
+def test_rerun_does_not_duplicate_edges(vault, tmp_path):
+    db_path = tmp_path / "graph.db"
+    init_db(db_path)
+    stats = scan_md_files(vault, db_path, workers=1)
+    assert stats["changed"] == 2
+    first = _edges(db_path)
+    assert ("Projects/note-a.md", "goal:Ship the graph", "linked_goal") in first
+    assert ("note-b.md", "isaac", "linked_person") in first
+
+    stats = scan_md_files(vault, db_path, workers=1)
+    assert stats["parsed"] == 0
+    assert _edges(db_path) == first
+
+
+def test_only_changed_and_deleted_files_are_rederived(vault, tmp_path):
+    db_path = tmp_path / "graph.db"
+    init_db(db_path)
+    scan_md_files(vault, db_path, workers=1)
+
+    (vault / "Projects" / "note-a.md").write_text("---\nproject: Renner\n---\nnew body\n")
+    (vault / "note-b.md").unlink()
+    stats = scan_md_files(vault, db_path, workers=1)
+    assert stats["changed"] == 1
+    assert stats["deleted"] == 1
+    assert _edges(db_path) == [("Projects/note-a.md", "Renner", "linked_project")]
+
+    with sqlite3.connect(db_path) as conn:
+        nodes = {row[0] for row in conn.execute("SELECT id FROM nodes")}
+    assert nodes == {"Projects/note-a.md", "Renner"}
+
+
+def test_init_db_collapses_existing_duplicates(tmp_path):
+    db_path = tmp_path / "graph.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("CREATE TABLE edges (from_id TEXT, to_id TEXT, reason TEXT)")
+        conn.executemany("INSERT INTO edges VALUES (?, ?, ?)", [("a", "b", "linked_loop")] * 3)
+    init_db(db_path)
+    assert _edges(db_path) == [("a", "b", "linked_loop")]
@@ -0,0 +1,93 @@
+import threading
+from pathlib import Path
+
+from src.ingestion.watcher import (
+    CREATED,
+    DELETED,
+    MODIFIED,
+    MOVED,
+    ChangeCoalescer,
+    VaultWatcher,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _drain(coalescer, quiet=0.5):
+    return sorted((kind, str(path), src and str(src)) for kind, path, src, _ in coalescer.drain(quiet))
+
+
+def test_coalescer_collapses_bursts():
+    clock = FakeClock()
+    c = ChangeCoalescer(clock)
+    a, b, gone = Path("/v/a.md"), Path("/v/b.md"), Path("/v/gone.md")
+    c.add(CREATED, a)
+    c.add(MODIFIED, a)
+    c.add(MODIFIED, b)
+    c.add(MODIFIED, b)
+    c.add(CREATED, gone)
+    c.add(DELETED, gone)
+    assert _drain(c) == []  # Still inside the debounce window
+
+    clock.now = 1.0
+    assert _drain(c) == [(CREATED, "/v/a.md", None), (MODIFIED, "/v/b.md", None)]
+    assert len(c) == 0
+
+
+def test_coalescer_moves_and_replacements():
+    clock = FakeClock()
+    c = ChangeCoalescer(clock)
+    c.add(MOVED, Path("/v/a.md"), Path("/v/b.md"))
+    c.add(MOVED, Path("/v/b.md"), Path("/v/c.md"))
+    c.add(DELETED, Path("/v/d.md"))
+    c.add(CREATED, Path("/v/d.md"))
+    c.add(MOVED, Path("/v/e.md"), Path("/v/f.md"))
+    c.add(DELETED, Path("/v/f.md"))
+    clock.now = 1.0
+    assert _drain(c) == [
+        (DELETED, "/v/e.md", None),
+        (MODIFIED, "/v/d.md", None),
+        (MOVED, "/v/c.md", "/v/a.md"),
+    ]
+
+
+def test_pattern_filter_and_atomic_rename(tmp_path):
+    watcher = VaultWatcher(roots=[tmp_path])
+    seen = []
+    watcher.subscribe(seen.append)
+    watcher.subscribe(lambda e: 1 / 0)  # A failing handler must not block the others
+
+    watcher._record(MODIFIED, tmp_path / ".loop_index.db")
+    watcher._record(CREATED, tmp_path / "loop.md.tmp")
+    watcher._record(MOVED, tmp_path / "loop.md.tmp", tmp_path / "loop.md")
+    watcher._record(MOVED, tmp_path / "old.md", tmp_path / "old.md~")
+    events = watcher.flush()
+
+    assert sorted((e.kind, e.path.name) for e in events) == [(DELETED, "old.md"), (MODIFIED, "loop.md")]
+    assert all(e.root == tmp_path.resolve() for e in events)
+    assert len(seen) == 2
+
+
+def test_live_events_are_debounced(tmp_path):
+    received = []
+    done = threading.Event()
+
+    def handler(event):
+        received.append(event)
+        done.set()
+
+    watcher = VaultWatcher(roots=[tmp_path], debounce=0.2)
+    watcher.subscribe(handler, kinds=[CREATED])
+    with watcher:
+        path = tmp_path / "loop-new.md"
+        path.write_text("---\nuuid: x\n---\n")
+        path.write_text("---\nuuid: x\n---\nmore\n")
+        assert done.wait(5)
+
+    assert [(e.kind, e.path.name) for e in received] == [(CREATED, "loop-new.md")]
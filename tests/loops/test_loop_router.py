@@ -0,0 +1,37 @@
+from src.loops import loop_router
+
+
+def _loop(path, frontmatter, body):
+    path.write_text(f"---\n{frontmatter}\n---\n\n{body}\n", encoding="utf-8")
+    return path
+
+
+def test_batch_routes_tags_locally_and_matches_the_rest_in_one_call(tmp_path, monkeypatch, capsys):
+    calls = []
+
+    def fake_matches(texts, collection_name="workstream_items"):
+        calls.append(list(texts))
+        return [{"project": "Data Platform", "phase": "2.1", "score": 0.8512} for _ in texts]
+
+    monkeypatch.setattr(loop_router, "find_nearest_project_matches", fake_matches)
+    tagged = _loop(tmp_path / "loop-a.md", "title: A", "Ship the #ora assistant for #phase-5.1")
+    partial = _loop(tmp_path / "loop-b.md", "title: B\ntags:\n- '@project/ora'", "Phase still open")
+    untagged = _loop(tmp_path / "loop-c.md", "title: C", "Plan the database migration")
+    broken = tmp_path / "loop-d.md"
+    broken.write_text("no frontmatter here", encoding="utf-8")
+
+    routed = loop_router.route_loops_batch([tagged, partial, untagged, broken])
+
+    assert calls == [["Phase still open", "Plan the database migration"]]   # One batch, tags resolved locally
+    assert routed[tagged]["project"] == "Ora Executive Assistant" and routed[tagged]["score"] == 1.0
+    assert (routed[partial]["project"], routed[partial]["phase"]) == ("Ora Executive Assistant", "2.1")
+    assert routed[untagged]["score"] == 0.851
+    assert broken not in routed
+    assert "score: 0.851" in untagged.read_text(encoding="utf-8")
+    assert "3 written, 0 unchanged" in capsys.readouterr().out
+
+    # A second run changes no frontmatter, so no file is rewritten
+    before = {p: p.stat().st_mtime_ns for p in (tagged, partial, untagged)}
+    loop_router.route_loops_batch([tagged, partial, untagged])
+    assert {p: p.stat().st_mtime_ns for p in before} == before
+    assert "0 written, 3 unchanged" in capsys.readouterr().out
@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+from openai import RateLimitError
+
+from src.memory.embed_pipeline import (
+    AdaptiveLimiter,
+    EmbedItem,
+    EmbedPipeline,
+    content_hash,
+)
+from src.memory.embedder import EmbeddingService
+
+
+class FakeEmbeddings:
+    def __init__(self, rate_limit_times=0, retry_after="0"):
+        self.calls = []
+        self.rate_limit_times = rate_limit_times
+        self.retry_after = retry_after
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        if self.rate_limit_times:
+            self.rate_limit_times -= 1
+            response = httpx.Response(
+                429,
+                headers={"retry-after": self.retry_after},
+                request=httpx.Request("POST", "https://api.openai.com/v1/embeddings"),
+            )
+            raise RateLimitError("slow down", response=response, body=None)
+        return SimpleNamespace(data=[SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)])
+
+
+def _pipeline(fake, upserted, **kwargs):
+    def read(n):
+        if n % 5 == 0:
+            return None
+        return EmbedItem(key=n, point_id=str(n), text="x" * n, payload={"n": n})
+
+    embedder = EmbeddingService(SimpleNamespace(embeddings=fake), sleep=lambda s: None)
+    return EmbedPipeline(read, lambda points: upserted.extend(points), embedder=embedder, linger=0.01, **kwargs)
+
+
+def test_pipeline_embeds_and_upserts_every_changed_item():
+    fake, upserted, recorded = FakeEmbeddings(), [], []
+    pipeline = _pipeline(
+        fake,
+        upserted,
+        embed_batch_size=4,
+        upsert_batch_size=3,
+        is_current=lambda item: item.content_hash == content_hash("x" * 7),
+        on_upserted=recorded.extend,
+    )
+    stats = pipeline.run(range(1, 21))
+
+    expected = [n for n in range(1, 21) if n % 5 and n != 7]
+    assert sorted(int(p.id) for p in upserted) == expected
+    assert all(p.vector == [float(p.payload["n"])] for p in upserted)
+    assert sorted(item.key for item in recorded) == expected
+    assert all(len(call) <= 4 for call in fake.calls)
+    assert stats.upserted == len(expected)
+    assert stats.skipped == 5             # 4 from read (n % 5 == 0), 1 unchanged hash
+    assert stats.stages["read"].items == 20
+    assert stats.stages["embed"].items == len(expected)
+    assert stats.stages["upsert"].calls >= len(expected) // 3
+
+
+def test_rate_limits_shrink_concurrency_and_items_still_arrive():
+    fake, upserted = FakeEmbeddings(rate_limit_times=2), []
+    pipeline = _pipeline(fake, upserted, embed_batch_size=2, embed_concurrency=4)
+    pipeline.embedder.on_rate_limit = print                    # e.g. another caller's hook on the shared service
+    stats = pipeline.run(range(1, 11))
+
+    assert pipeline.embedder.on_rate_limit is print           # Restored once the pipeline finishes
+    assert stats.rate_limited == 2 and not pipeline._throttles
+    assert sorted(int(p.id) for p in upserted) == [1, 2, 3, 4, 6, 7, 8, 9]
+    assert stats.failed == 0
+
+
+def test_adaptive_limiter_grows_and_halves():
+    async def scenario():
+        limiter = AdaptiveLimiter(initial=2, maximum=4)
+        for _ in range(2):
+            await limiter.acquire()
+        for _ in range(2):
+            await limiter.release()
+        assert limiter.limit == 3
+        await limiter.throttle(0.01)
+        assert limiter.limit == 1
+        await limiter.acquire()   # Waits out the pause
+        assert limiter.in_flight == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+from types import SimpleNamespace
+
+import httpx
+from openai import APITimeoutError, AuthenticationError, BadRequestError
+
+from src.memory.embedder import EmbeddingService
+
+
+class FakeEmbeddings:
+    """Returns [len(text), position] vectors in reverse order, like an API that reorders items."""
+
+    def __init__(self, fail_times=0, bad_input=None, error=None):
+        self.calls = []
+        self.fail_times = fail_times
+        self.bad_input = bad_input
+        self.error = error
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+        if self.error is not None:
+            raise self.error
+        if self.fail_times:
+            self.fail_times -= 1
+            raise APITimeoutError(request=request)
+        if self.bad_input in input:
+            raise BadRequestError("bad input", response=httpx.Response(400, request=request), body=None)
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), float(i)]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=list(reversed(data)))
+
+
+def _service(embeddings, **kwargs):
+    return EmbeddingService(SimpleNamespace(embeddings=embeddings), sleep=lambda s: None, **kwargs)
+
+
+def test_embed_preserves_order_and_skips_empty():
+    fake = FakeEmbeddings()
+    vectors = _service(fake).embed(["a", "", "ccc", "   ", "bb"])
+    assert vectors == [[1.0, 0.0], None, [3.0, 1.0], None, [2.0, 2.0]]
+    assert fake.calls == [["a", "ccc", "bb"]]
+
+
+def test_batches_respect_item_and_token_budgets():
+    fake = FakeEmbeddings()
+    service = _service(fake, max_batch_items=2, max_batch_tokens=10)
+    texts = ["x" * 16, "y" * 16, "z" * 16, "w" * 40]   # ~5, 5, 5 and 11 estimated tokens
+    vectors = service.embed(texts)
+    assert [len(call) for call in fake.calls] == [2, 1, 1]
+    assert [v[0] for v in vectors] == [16.0, 16.0, 16.0, 40.0]
+
+    fake = FakeEmbeddings()
+    _service(fake, max_batch_items=2).embed(["a", "b", "c", "d", "e"])
+    assert fake.calls == [["a", "b"], ["c", "d"], ["e"]]
+
+
+def test_transient_failures_are_retried():
+    fake = FakeEmbeddings(fail_times=2)
+    service = _service(fake)
+    assert service.embed(["a", "bb"]) == [[1.0, 0.0], [2.0, 1.0]]
+    assert service.stats["retries"] == 2
+
+    fake = FakeEmbeddings(fail_times=10)
+    service = _service(fake, max_retries=1)
+    assert service.embed(["a", "bb"]) == [None, None]
+    assert service.stats["failed"] == 2
+
+
+def test_permanent_failures_are_not_retried():
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    fake = FakeEmbeddings(error=AuthenticationError("bad key", response=httpx.Response(401, request=request), body=None))
+    service = _service(fake)
+    assert service.embed(["a", "bb"]) == [None, None]
+    assert len(fake.calls) == 1 and service.stats["retries"] == 0
+
+
+def test_rejected_batch_is_split_to_isolate_bad_input():
+    fake = FakeEmbeddings(bad_input="bad")
+    vectors = _service(fake).embed(["a", "bb", "bad", "dddd"])
+    assert vectors[2] is None
+    assert [v[0] for i, v in enumerate(vectors) if i != 2] == [1.0, 2.0, 4.0]
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from src.memory.embedder import EmbeddingService
+from src.memory.embedding_cache import EmbeddingCache
+
+MODEL = "text-embedding-3-small"
+
+
+class CountingEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    def create(self, input, model):
+        self.calls.append(list(input))
+        data = [SimpleNamespace(index=i, embedding=[float(len(t)), 1.0, 2.0]) for i, t in enumerate(input)]
+        return SimpleNamespace(data=data)
+
+
+def test_hits_misses_and_persistence(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    assert cache.get_many(MODEL, ["alpha", "beta"]) == [None, None]
+    assert cache.put_many(MODEL, ["alpha", "beta"], [[1, 2, 3], [4, 5, 6]]) == 2
+    assert cache.put_many(MODEL, ["alpha"], [[9, 9, 9]]) == 0   # Same content, already stored
+
+    reopened = EmbeddingCache(tmp_path)
+    alpha, missing, beta = reopened.get_many(MODEL, ["alpha", "gamma", "beta"])
+    assert alpha.dtype == np.float32 and alpha.tolist() == [1.0, 2.0, 3.0]
+    assert beta.tolist() == [4.0, 5.0, 6.0]
+    assert missing is None
+    assert reopened.get("other-model", "alpha") is None
+
+    summary = reopened.summary()
+    assert summary["entries"] == 2
+    assert summary["bytes"] == 2 * 3 * 4
+    assert summary["hits"] == 2
+    assert summary["misses"] == 4
+
+
+def test_least_recently_used_rows_are_evicted_and_slots_reused(tmp_path):
+    cache = EmbeddingCache(tmp_path, max_bytes=2 * 4 * 4)   # Room for two 4-dim vectors
+    cache.put_many(MODEL, ["a", "b"], [[1, 1, 1, 1], [2, 2, 2, 2]])
+    cache.get(MODEL, "a")                                   # "b" is now least recently used
+    cache.put(MODEL, "c", [3, 3, 3, 3])
+
+    assert cache.get(MODEL, "b") is None
+    assert cache.get(MODEL, "a").tolist() == [1, 1, 1, 1]
+    assert cache.get(MODEL, "c").tolist() == [3, 3, 3, 3]
+    assert cache.stats["evictions"] == 1
+    assert cache.summary()["entries"] == 2
+    # "c" took over the evicted slot instead of growing the file
+    assert cache._conn.execute("SELECT MAX(slot) FROM entries").fetchone()[0] == 1
+
+
+def test_service_only_embeds_uncached_texts(tmp_path):
+    cache = EmbeddingCache(tmp_path)
+    fake = CountingEmbeddings()
+    service = EmbeddingService(SimpleNamespace(embeddings=fake), cache=cache)
+
+    first = service.embed(["one", "", "three"])
+    assert fake.calls == [["one", "three"]]
+
+    second = service.embed(["three", "one", "", "four"])
+    assert fake.calls[1:] == [["four"]]
+    assert second[0] == first[2] and second[1] == first[0]
+    assert second[2] is None
+
+    service.embed(["one", "three", "four"])
+    assert len(fake.calls) == 2
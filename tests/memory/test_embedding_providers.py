@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.memory.collection_registry import (
+    EmbeddingModelMismatchError,
+    collection_info,
+    record_collection,
+    verify_collection,
+)
+from src.memory.embedding_cache import EmbeddingCache
+from src.memory.embedding_providers import (
+    HashingProvider,
+    OpenAIProvider,
+    SentenceTransformerProvider,
+    create_provider,
+)
+
+
+def test_hashing_provider_is_deterministic_and_normalised():
+    provider = HashingProvider(64)
+    a, b, empty, c = provider.embed(["Hire a data engineer", "hire a DATA engineer!", "  ", "Renew the lease"])
+    assert a == b
+    assert empty is None
+    assert len(a) == 64
+    assert np.isclose(np.linalg.norm(a), 1.0)
+
+    query = np.array(provider.embed_one("data engineer hiring"))
+    assert query @ np.array(a) > query @ np.array(c)
+    assert HashingProvider(64).embed_one("Hire a data engineer") == a   # Stable across instances
+
+
+def test_provider_specs(monkeypatch):
+    monkeypatch.setattr("src.memory.embedding_cache.EMBED_CACHE_ENABLED", False)
+    assert isinstance(create_provider("hashing:32"), HashingProvider)
+    assert create_provider("hashing:32").model_id == "hashing:32"
+    openai = create_provider("text-embedding-ada-002")
+    assert isinstance(openai, OpenAIProvider)
+    assert (openai.model_id, openai.dimension) == ("openai:text-embedding-ada-002", 1536)
+    hook = print
+    openai.on_rate_limit = hook
+    assert openai.service.on_rate_limit is hook and create_provider("text-embedding-ada-002").on_rate_limit is hook
+    openai.on_rate_limit = None
+    local = create_provider("local")
+    assert isinstance(local, SentenceTransformerProvider)
+    assert local.dimension == 384                 # Known size, model not loaded
+    with pytest.raises(ValueError):
+        create_provider("bogus:model")
+
+
+def test_local_provider_batches_on_cpu_and_caches(tmp_path):
+    calls = []
+
+    class FakeModel:
+        def encode(self, texts, batch_size, **kwargs):
+            calls.append((list(texts), batch_size, kwargs["normalize_embeddings"]))
+            return np.array([[float(len(t)), 0.0] for t in texts])
+
+    provider = SentenceTransformerProvider("tiny-model", batch_size=8)
+    provider.cache = EmbeddingCache(tmp_path)
+    provider._model = FakeModel()
+
+    assert provider.embed(["ab", "", "abcd"]) == [[2.0, 0.0], None, [4.0, 0.0]]
+    assert provider.embed(["abcd", "xyz"]) == [[4.0, 0.0], [3.0, 0.0]]
+    assert calls == [(["ab", "abcd"], 8, True), (["xyz"], 8, True)]
+
+
+def test_registry_refuses_mismatched_collections(tmp_path):
+    registry = tmp_path / "collections.json"
+    small, other = HashingProvider(16), HashingProvider(32)
+
+    verify_collection("loops", small, path=registry)            # Unclaimed: reading is allowed
+    assert collection_info("loops", registry) is None
+    verify_collection("loops", small, path=registry, record=True)
+    assert collection_info("loops", registry)["model"] == "hashing:16"
+
+    with pytest.raises(EmbeddingModelMismatchError, match="hashing:16"):
+        verify_collection("loops", other, path=registry)
+
+    record_collection("loops", other, registry)                  # A full re-index re-claims it
+    verify_collection("loops", other, path=registry)
+
+
+def test_registry_checks_live_collection_size(tmp_path):
+    client = SimpleNamespace(
+        get_collection=lambda name: SimpleNamespace(
+            config=SimpleNamespace(params=SimpleNamespace(vectors=SimpleNamespace(size=1536)))
+        )
+    )
+    with pytest.raises(EmbeddingModelMismatchError, match="1536-d"):
+        verify_collection("workstream_items", HashingProvider(256), client=client, path=tmp_path / "c.json")
@@ -0,0 +1,60 @@
+import pytest
+
+from src.memory import qdrant_clients
+from src.memory.qdrant_clients import (
+    QdrantSettings,
+    close_qdrant_clients,
+    get_qdrant_client,
+    lazy_qdrant_client,
+    try_qdrant_client,
+)
+
+
+def test_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("QDRANT_HOST", "qdrant.internal")
+    monkeypatch.setenv("QDRANT_PREFER_GRPC", "1")
+    monkeypatch.setenv("QDRANT_TIMEOUT", "3")
+    monkeypatch.delenv("QDRANT_URL", raising=False)
+    settings = QdrantSettings.from_env(pool_size=4)
+    assert (settings.host, settings.prefer_grpc, settings.timeout, settings.pool_size) == ("qdrant.internal", True, 3, 4)
+    assert settings.target == "http://qdrant.internal:6333 (gRPC :6334)"
+
+
+def test_clients_are_created_lazily_and_shared():
+    local = QdrantSettings(location=":memory:")
+    try:
+        handle = lazy_qdrant_client(local)
+        assert local not in qdrant_clients._clients          # Nothing connects at import time
+
+        handle.create_collection("lazy", vectors_config={"size": 2, "distance": "Cosine"})
+        client = get_qdrant_client(local)
+        assert client is get_qdrant_client(local) is try_qdrant_client(local, check=True)
+        assert client.collection_exists("lazy")              # The handle used the shared client
+
+        close_qdrant_clients(local)
+        assert get_qdrant_client(local) is not client        # A fresh client after close
+    finally:
+        close_qdrant_clients(local)
+
+
+@pytest.mark.filterwarnings("ignore:Failed to obtain server version")
+def test_remote_clients_build_from_url_or_host(monkeypatch):
+    created = []
+
+    class OldClient:
+        """qdrant-client 1.7 style: unknown kwargs reach httpx, which rejects them."""
+
+        def __init__(self, url=None, host=None, port=6333, grpc_port=6334, prefer_grpc=False, api_key=None,
+                     timeout=None, **kwargs):
+            if kwargs:
+                raise TypeError(f"unexpected {sorted(kwargs)}")
+            created.append(url or host)
+
+    for settings in (QdrantSettings(url="http://qdrant.internal:6333", timeout=1), QdrantSettings(host="qdrant.internal")):
+        client = settings.create()                           # The installed client; no server needed
+        client.close()
+
+    monkeypatch.setattr(qdrant_clients, "QdrantClient", OldClient)
+    QdrantSettings(url="http://qdrant.internal:6333").create()
+    QdrantSettings(host="qdrant.internal", pool_size=4).create()
+    assert created == ["http://qdrant.internal:6333", "qdrant.internal"]
@@ -0,0 +1,68 @@
+import pytest
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+
+from src.memory.qdrant_sync import (
+    BulkUpserter,
+    fetch_payload_values,
+    scroll_payload_values,
+)
+
+COLLECTION = "sync_test"
+
+
+class RecordingClient:
+    def __init__(self, client):
+        self.client = client
+        self.upserts = []
+        self.retrieves = []
+
+    def upsert(self, collection_name, points, wait):
+        self.upserts.append((len(points), wait))
+        return self.client.upsert(collection_name=collection_name, points=points, wait=wait)
+
+    def retrieve(self, collection_name, ids, **kwargs):
+        self.retrieves.append(len(ids))
+        return self.client.retrieve(collection_name=collection_name, ids=ids, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+@pytest.fixture
+def client():
+    qdrant = QdrantClient(location=":memory:")
+    qdrant.create_collection(COLLECTION, vectors_config=models.VectorParams(size=2, distance=models.Distance.COSINE))
+    yield RecordingClient(qdrant)
+    qdrant.close()
+
+
+def _points(count, version="a"):
+    return [
+        models.PointStruct(id=i, vector=[1.0, float(i)], payload={"content_hash": f"{version}{i}", "n": i})
+        for i in range(1, count + 1)
+    ]
+
+
+def test_bulk_upserter_batches_without_waiting_until_close(client):
+    with BulkUpserter(client, COLLECTION, batch_size=4) as upserter:
+        upserter.add_many(_points(10))
+        assert client.upserts == [(4, False), (4, False)]   # Last batch held back
+    assert client.upserts[-1] == (2, True)                    # Final barrier waits
+    assert upserter.stats["points"] == 10
+    assert client.count(COLLECTION).count == 10
+
+    BulkUpserter(client, COLLECTION).close()                  # Nothing buffered: no request
+    assert len(client.upserts) == 3
+
+
+def test_hashes_are_fetched_in_batches(client):
+    with BulkUpserter(client, COLLECTION) as upserter:
+        upserter.add_many(_points(7))
+
+    known = fetch_payload_values(client, COLLECTION, [1, 2, 3, 99, 2], batch_size=2)
+    assert known == {"1": "a1", "2": "a2", "3": "a3"}
+    assert client.retrieves == [2, 2]                          # Duplicates dropped, then 2 + 2 ids
+
+    scrolled = scroll_payload_values(client, COLLECTION, page_size=3)
+    assert scrolled == {str(i): f"a{i}" for i in range(1, 8)}
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from src.memory.quantization import (
+    evaluate,
+    get_quantizer,
+    load_quantizer,
+    search_codes,
+    top_rows,
+)
+
+
+def _corpus(count=2000, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((40, dim)).astype(np.float32)
+    vectors = centers[rng.integers(40, size=count)] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("kind", ["int8", "pq"])
+def test_codes_bound_their_error_and_rerank_recovers_exact_neighbours(kind, tmp_path):
+    vectors = _corpus()
+    queries = vectors[:20] + 0.05
+    quantizer = get_quantizer(kind).fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert codes.dtype == np.uint8 and codes.nbytes * (4 if kind == "int8" else 8) <= vectors.nbytes
+
+    exact = queries @ vectors.T
+    approximate = quantizer.scores(codes, queries)
+    assert np.all(np.abs(approximate - exact) <= quantizer.error_bound(queries)[:, None] + 1e-5)
+    assert np.allclose(quantizer.scores(codes, queries[:1]), approximate[:1], atol=1e-4)   # Table and decode paths
+
+    truth = top_rows(exact, 10)
+    scores, rows = search_codes(quantizer, codes, queries, k=10, rerank=10, vectors=vectors)
+    assert np.mean([len(set(r) & set(t)) / 10 for r, t in zip(rows.tolist(), truth.tolist())]) >= 0.95
+    assert np.allclose(scores, np.take_along_axis(exact, rows, axis=1), atol=1e-5)
+
+    quantizer.save(tmp_path / "q.npz")
+    loaded = load_quantizer(tmp_path / "q.npz")
+    assert loaded.kind == kind and loaded.max_error == quantizer.max_error
+    assert np.array_equal(loaded.encode(vectors[:50]), codes[:50])
+
+
+def test_evaluation_reports_memory_against_recall():
+    vectors = _corpus(1000)
+    rows = evaluate(vectors, vectors[:10] + 0.05, k=5, settings=[("int8", 0), ("int8", 4)])
+    assert [row["setting"] for row in rows] == ["float32", "int8 (64 B)", "int8 (64 B) + rerank x4"]
+    assert rows[1]["memory_mb"] < rows[0]["memory_mb"] / 3
+    assert rows[2]["recall"] == 1.0
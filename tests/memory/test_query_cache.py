@@ -0,0 +1,51 @@
+from src.memory.query_cache import QueryEmbeddingCache, normalise_query
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_repeat_queries_skip_the_provider(tmp_path, counting_provider):
+    provider = counting_provider(64)
+    cache = QueryEmbeddingCache(tmp_path / "q.db", memory_entries=2)
+
+    first = cache.embed(provider, "open loops  about\thiring")
+    assert normalise_query(" open loops about hiring ") == "open loops about hiring"
+    assert cache.embed(provider, "open loops about hiring ") == first   # Same key after normalising
+    assert provider.calls == [["open loops about hiring"]]
+
+    # Batch: only the new query goes out, once, even when repeated
+    vectors = cache.embed_many(provider, ["budget review", "open loops about hiring", "budget review"])
+    assert provider.calls[-1] == ["budget review"]
+    assert vectors[0] == vectors[2] and vectors[1] == first
+
+    # A second process sees the disk tier; the memory LRU only holds two entries
+    other = QueryEmbeddingCache(tmp_path / "q.db")
+    assert other.embed(provider, "open loops about hiring") == first
+    assert len(provider.calls) == 2
+    metrics = other.metrics()
+    assert (metrics["disk_hits"], metrics["memory_hits"], metrics["misses"]) == (1, 0, 0)
+    assert cache.metrics()["memory_hits"] == 2 and cache.metrics()["memory_entries"] == 2
+
+
+def test_entries_expire_and_disk_is_bounded(tmp_path, counting_provider):
+    provider, clock = counting_provider(64), Clock()
+    cache = QueryEmbeddingCache(tmp_path / "q.db", ttl=60, disk_entries=2, clock=clock)
+
+    cache.embed(provider, "a")
+    clock.now += 30
+    cache.embed(provider, "a")
+    assert len(provider.calls) == 1
+
+    clock.now += 31                                  # Past the TTL: embedded again
+    cache.embed(provider, "a")
+    assert len(provider.calls) == 2
+    assert cache.metrics()["expired"] == 1
+
+    cache.embed_many(provider, ["b", "c"])
+    metrics = cache.metrics()
+    assert metrics["disk_entries"] == 2 and metrics["evictions"] == 1
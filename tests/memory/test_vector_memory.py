@@ -0,0 +1,195 @@
+import os
+import pickle
+
+import faiss
+import numpy as np
+import pytest
+
+from src.memory import collection_registry
+from src.memory.embedding_providers import HashingProvider
+from src.memory.vector_memory import (
+    ChunkMetadata,
+    IndexConfig,
+    VectorMemory,
+    build_vector_index,
+    chunk_id,
+    convert_index,
+    create_index,
+    load_generation,
+    migrate_legacy_index,
+    publish_generation,
+    read_current_version,
+    remove_chunks,
+    set_search_params,
+)
+
+CHUNKS = [
+    ("notes/hiring.md", "Hire a data engineer for the pipeline team"),
+    ("notes/lease.md", "Renew the office lease before March"),
+    ("notes/hiring.md", "Interview loop for the data engineer role — ünïcode"),
+]
+
+
+def _index(provider, chunks):
+    index = faiss.IndexFlatL2(provider.dimension)
+    index.add(np.array(provider.embed([text for _, text in chunks]), dtype=np.float32))
+    return index
+
+
+def _memory(tmp_path, provider):
+    return VectorMemory(tmp_path / "vm", provider=provider, index_name="test_vector_memory")
+
+
+def test_columnar_metadata_round_trips(tmp_path):
+    ChunkMetadata.write(tmp_path, [s for s, _ in CHUNKS], [t for _, t in CHUNKS])
+    metadata = ChunkMetadata(tmp_path)
+    assert len(metadata) == 3
+    assert metadata.sources == ["notes/hiring.md", "notes/lease.md"]
+    assert [metadata[i] for i in range(3)] == CHUNKS
+
+
+def test_queries_reuse_the_loaded_generation_until_a_new_one_is_published(tmp_path):
+    provider = HashingProvider(256)
+    publish_generation(_index(provider, CHUNKS), [s for s, _ in CHUNKS], [t for _, t in CHUNKS], tmp_path / "vm")
+    memory = _memory(tmp_path, provider)
+
+    assert memory.query("office lease renewal", top_k=1) == [CHUNKS[1]]
+    hiring, lease = memory.query_batch(["data engineer hiring", "lease"], top_k=2)
+    assert set(hiring) == {CHUNKS[0], CHUNKS[2]}
+    assert lease[0] == CHUNKS[1]
+    assert memory.stats["loads"] == 1
+    first = memory.version
+
+    extra = CHUNKS + [("notes/budget.md", "Quarterly budget review")]
+    publish_generation(_index(provider, extra), [s for s, _ in extra], [t for _, t in extra], tmp_path / "vm")
+    assert memory.query("quarterly budget", top_k=1) == [extra[3]]
+    assert memory.stats["loads"] == 2
+    assert memory.version == read_current_version(tmp_path / "vm") != first
+
+
+def test_legacy_pickle_index_is_migrated(tmp_path):
+    provider = HashingProvider(256)
+    index_path, meta_path = tmp_path / "faiss_index.idx", tmp_path / "chunk_metadata.pkl"
+    faiss.write_index(_index(provider, CHUNKS), str(index_path))
+    meta_path.write_bytes(pickle.dumps([{"source": s, "text": t} for s, t in CHUNKS]))
+
+    assert migrate_legacy_index(tmp_path / "vm", index_path, meta_path)
+    assert _memory(tmp_path, provider).query("lease", top_k=1) == [CHUNKS[1]]
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    path = tmp_path / "collections.json"
+    monkeypatch.setattr(
+        "src.memory.vector_memory.record_collection",
+        lambda name, provider: collection_registry.record_collection(name, provider, path),
+    )
+    monkeypatch.setattr(
+        "src.memory.vector_memory.verify_collection",
+        lambda name, provider: collection_registry.verify_collection(name, provider, path=path),
+    )
+    return path
+
+
+HIRING = "Hire a data engineer " + "x" * 760  # Fills a chunk on its own
+
+
+def test_rebuild_only_touches_the_delta(tmp_path, registry, counting_provider):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    (notes / "hiring.md").write_text(HIRING + "\nInterview loop for the role\n")
+    (notes / "lease.md").write_text("Renew the office lease before March\n")
+    (notes / "budget.md").write_text("Quarterly budget review\n")
+    provider = counting_provider(256)
+
+    def build(**kwargs):
+        return build_vector_index(tmp_path / "vm", data_dirs=[notes], provider=provider, **kwargs)
+
+    first = build()
+    assert len(provider.embedded) == 4
+    assert build() == first                                    # Nothing changed: no new generation
+    assert len(provider.embedded) == 4
+
+    (notes / "hiring.md").write_text(HIRING + "\nOffer sent to the candidate\n")   # Same size as before
+    os.utime(notes / "hiring.md", ns=(1, 1))
+    (notes / "budget.md").unlink()
+    provider.embedded.clear()
+    second = build()
+    assert provider.embedded == ["Offer sent to the candidate"]   # The unchanged first chunk is kept
+
+    generation = load_generation(tmp_path / "vm")
+    assert generation.version == second != first
+    assert generation.index.ntotal == len(generation.metadata) == 3
+    assert set(generation.ledger) == {str(notes / "hiring.md"), str(notes / "lease.md")}
+    source = str(notes / "hiring.md")
+    assert sorted(generation.metadata.ids) == sorted(
+        [chunk_id(source, HIRING), chunk_id(source, "Offer sent to the candidate"),
+         chunk_id(str(notes / "lease.md"), "Renew the office lease before March")]
+    )
+
+    memory = VectorMemory(tmp_path / "vm", provider=provider)
+    assert memory.query("offer candidate", top_k=1) == [(source, "Offer sent to the candidate")]
+    assert memory.query("quarterly budget", top_k=3)[0][0] != str(notes / "budget.md")
+
+
+def test_approximate_index_types_support_ids_removal_and_conversion(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((1000, 32)).astype(np.float32)
+    ids = np.arange(1000, dtype=np.int64) * 7 + 1
+    ivfpq = IndexConfig(kind="ivfpq", nlist=8, pq_m=8, pq_bits=6, nprobe=8)   # Small enough to train quickly
+
+    _, used = create_index(IndexConfig(kind="ivfpq"), 32, vectors[:100])
+    assert used.kind == "flat"                                  # Too few vectors to train PQ
+
+    for config in (ivfpq, IndexConfig(kind="hnsw", ef_search=128)):
+        index, used = create_index(config, 32, vectors)
+        index.add_with_ids(vectors, ids)
+        set_search_params(index, used)
+        _, labels = index.search(vectors[:50], 1)
+        assert (labels[:, 0] == ids[:50]).mean() > 0.9, used.kind
+
+        index = remove_chunks(index, ids[:10], used)
+        assert index.ntotal == 990
+        assert not np.isin(index.search(vectors[:10], 5)[1], ids[:10]).any()
+
+    flat, config = create_index(IndexConfig(), 32, vectors)
+    flat.add_with_ids(vectors, ids)
+    hnsw, config = convert_index(flat, config, IndexConfig(kind="hnsw"))
+    assert (config.kind, hnsw.ntotal) == ("hnsw", 1000)
+    assert convert_index(*create_index(ivfpq, 32, vectors), IndexConfig()) is None
+
+
+def test_sq8_index_keeps_float32_vectors_for_exact_reranking(tmp_path, registry, counting_provider):
+    notes = tmp_path / "notes"
+    notes.mkdir()
+    for i, topic in enumerate(["office lease renewal", "data engineer hiring", "quarterly budget review",
+                               "customer churn analysis", "vendor contract audit"]):
+        (notes / f"note-{i}.md").write_text(f"{topic} notes\n")
+    provider = counting_provider(256)
+    queries = np.array(provider.embed(["lease", "budget review"]), dtype=np.float32)
+
+    def build(**kwargs):
+        return build_vector_index(tmp_path / "vm", data_dirs=[notes], provider=provider, **kwargs)
+
+    build(config=IndexConfig())
+    flat = VectorMemory(tmp_path / "vm", provider=provider).search(queries, top_k=3)
+    provider.embedded.clear()
+    build(config=IndexConfig(kind="sq8"))                      # Converted from the flat index's vectors
+    generation = load_generation(tmp_path / "vm")
+    assert provider.embedded == [] and generation.config.kind == "sq8"
+    assert generation.metadata.vectors.shape == (5, 256)
+
+    memory = VectorMemory(tmp_path / "vm", provider=provider)
+    reranked = memory.search(queries, top_k=3)
+    assert [hits[0][:2] for hits in reranked] == [hits[0][:2] for hits in flat]    # Lower ranks are ties
+    assert np.allclose([[hit[2] for hit in hits] for hits in reranked], [[hit[2] for hit in hits] for hits in flat],
+                       atol=1e-4)                              # Exact distances, not int8 approximations
+    memory.tune(rerank=0)
+    assert len(memory.search(queries, top_k=3)[0]) == 3        # Codes only
+
+    (notes / "note-5.md").write_text("lease break clause\n")
+    build(config=IndexConfig(kind="sq8"))
+    generation = load_generation(tmp_path / "vm")
+    assert provider.embedded == ["lease break clause"] and generation.metadata.vectors.shape == (6, 256)
+    row = generation.metadata.rows([chunk_id(str(notes / "note-5.md"), "lease break clause")])[0]
+    assert np.allclose(generation.metadata.vectors[row], provider.embed_one("lease break clause"), atol=1e-6)
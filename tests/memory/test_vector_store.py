@@ -0,0 +1,184 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from src.memory.qdrant_clients import QdrantSettings, close_qdrant_clients
+from src.memory.qdrant_sync import ensure_payload_indexes
+from src.memory.vector_store import (
+    NumpyVectorStore,
+    QdrantVectorStore,
+    Range,
+    VectorRecord,
+    get_vector_store,
+)
+
+
+def _records(count=40, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    kinds = ["loop", "program", "project", "task"]
+    return [
+        VectorRecord(id=str(uuid.UUID(int=i + 1)), vector=vectors[i].tolist(),
+                     payload={"type": kinds[i % 4], "n": i, "tags": ["even" if i % 2 == 0 else "odd"]})
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=["numpy", "local"])
+def store(request):
+    if request.param == "numpy":
+        yield NumpyVectorStore("parity")
+        return
+    store = QdrantVectorStore.local("parity")
+    store.ensure_collection(8)
+    yield store
+    close_qdrant_clients(QdrantSettings(location=":memory:"))
+
+
+def test_backends_agree_on_every_operation(store):
+    records = _records()
+    assert store.upsert_batch(records) == 40
+    store.upsert_batch([VectorRecord(records[0].id, records[0].vector, {"type": "loop", "n": 0, "tags": ["edited"]})])
+    assert store.count() == 40 and store.count({"type": "loop"}) == 10
+
+    exact = NumpyVectorStore("reference")
+    exact.upsert_batch(records)
+    queries = [r.vector for r in records[5:8]]
+    expected = [[h.id for h in hits] for hits in exact.search_batch(queries, limit=5)]
+    assert [[h.id for h in hits] for hits in store.search_batch(queries, limit=5)] == expected
+    assert store.search(queries[0], limit=1)[0].score == pytest.approx(1.0, abs=1e-4)
+
+    filtered = store.search(queries[0], limit=40, filter={"type": ["program", "project"], "tags": "odd"})
+    assert filtered and all(h.payload["type"] in ("program", "project") and h.payload["n"] % 2 for h in filtered)
+
+    found = store.retrieve([records[0].id, "00000000-0000-0000-0000-0000000000ff"], with_vectors=True)
+    assert [r.payload["tags"] for r in found] == [["edited"]]
+    assert np.allclose(np.linalg.norm(found[0].vector), 1.0, atol=1e-4)   # Stored cosine-normalised
+
+    store.delete_by_filter({"type": ["program", "project"]})
+    assert store.count() == 20
+    assert sorted(r.payload["n"] for r in store.scroll({"type": "task"}, page_size=3)) == list(range(3, 40, 4))
+    with pytest.raises(ValueError):
+        store.delete_by_filter({})
+
+
+def test_get_vector_store_selects_backend():
+    assert get_vector_store("shared", backend="numpy") is get_vector_store("shared", backend="numpy")
+    with pytest.raises(ValueError):
+        get_vector_store("shared", backend="faiss")
+
+
+def test_loop_retrieval_runs_without_a_server(monkeypatch):
+    from src.memory import query_cache
+    from src.memory.embedding_providers import HashingProvider
+    from src.semantic import memory_injection
+
+    provider = HashingProvider(256)
+    store = NumpyVectorStore("workstream_items")
+    monkeypatch.setattr(memory_injection, "get_provider", lambda: provider)
+    monkeypatch.setattr(memory_injection, "get_vector_store", lambda name: store)
+    monkeypatch.setattr(query_cache, "_cache", query_cache.QueryEmbeddingCache(path=None))
+
+    texts = {"a": "Hire a data engineer for the CRM migration", "b": "Renew the office lease before June"}
+    store.upsert_batch(
+        VectorRecord(str(uuid.uuid5(uuid.NAMESPACE_DNS, key)), provider.embed_one(text),
+                     {"title": key, "uuid": key, "tags": [], "summary": text, "content": text})
+        for key, text in texts.items()
+    )
+    loops = memory_injection.get_top_k_loops_for_query("office lease renewal", k=1)
+    assert [loop["uuid"] for loop in loops] == ["b"]
+
+
+def test_range_filters_run_inside_the_search(store):
+    records = _records()
+    store.upsert_batch(records)
+    query = records[0].vector
+    hits = store.search(query, limit=5, filter={"type": "task", "n": Range(gte=20)})
+    assert len(hits) == 5 and all(h.payload["type"] == "task" and h.payload["n"] >= 20 for h in hits)
+    assert store.count({"n": Range(gt=9, lt=20)}) == 10
+    store.upsert_batch([VectorRecord(records[25].id, records[25].vector, {"type": "task", "n": 5})])
+    assert store.count({"n": Range(gt=9, lt=20)}) == 10 and store.count({"n": Range(lte=5)}) == 7   # Masks refreshed
+
+
+def test_sync_creates_missing_payload_indexes_once():
+    class Client:
+        def __init__(self):
+            self.schema = {"type": "keyword"}
+
+        def get_collection(self, name):
+            return type("Info", (), {"payload_schema": dict(self.schema)})()
+
+        def create_payload_index(self, name, field, field_schema, wait):
+            self.schema[field] = field_schema
+
+    client = Client()
+    assert ensure_payload_indexes(client, "workstream_items") == ["project", "phase", "status", "workstream", "uuid"]
+    assert ensure_payload_indexes(client, "workstream_items") == []
+
+
+def test_set_payloads_updates_existing_points_only():
+    from src.memory.qdrant_sync import set_payloads
+
+    records = _records(count=3)
+    store = QdrantVectorStore.local("loop_embeddings")
+    store.ensure_collection(8)
+    store.upsert_batch(records)
+    missing = str(uuid.UUID(int=999))
+    assert set_payloads(store.client, "loop_embeddings", {records[0].id: {"n": -1}, missing: {"n": -2}}) == 1
+    assert store.retrieve([records[0].id])[0].payload == {**records[0].payload, "n": -1}
+    assert store.retrieve([records[1].id])[0].payload == records[1].payload    # Other points keep their payload
+    close_qdrant_clients(QdrantSettings(location=":memory:"))
+
+
+def test_query_loops_filters_inside_the_search(tmp_path, monkeypatch):
+    import sqlite3
+
+    from src.loops import query_loops
+    from src.memory import purge_workstream_vectors
+
+    def status(i):
+        return "open" if i % 10 == 0 else "closed"
+
+    db_path = tmp_path / "loop_memory.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE loops (id TEXT, summary TEXT, status TEXT, priority TEXT, weight REAL)")
+    conn.executemany("INSERT INTO loops VALUES (?, ?, ?, ?, ?)", [
+        (f"loop-{i}", f"summary {i}", status(i), "p2", i % 7) for i in range(200)
+    ])
+    conn.commit()
+    conn.close()
+
+    store = NumpyVectorStore("loop_embeddings")
+    rng = np.random.default_rng(1)
+    store.upsert_batch(
+        VectorRecord(i, rng.standard_normal(8).tolist(), {"loop_id": f"loop-{i}", "status": status(i), "weight": i % 7})
+        for i in range(200)
+    )
+    searches, verified = [], []
+    search = store.search
+    monkeypatch.setattr(store, "search", lambda *args, **kwargs: searches.append(kwargs) or search(*args, **kwargs))
+    monkeypatch.setattr(query_loops, "LOOP_MEMORY_DB", db_path)
+    monkeypatch.setattr(query_loops, "get_vector_store", lambda name: store)
+    monkeypatch.setattr(query_loops, "verify_collection", lambda *args, **kwargs: verified.append(args[0]))
+
+    query = rng.standard_normal(8)
+    rows = query_loops.search_loops(query, top_k=5, status_filter="open", min_weight=3)
+    assert len(searches) == 1 and searches[0]["limit"] == 5 and verified == ["loop_embeddings"]
+    assert searches[0]["filter"] == {"status": "open", "weight": Range(gte=3)}
+    nearest = [h.payload["loop_id"] for h in store.search(query, limit=200)]
+    assert [row[0] for row in rows] == [i for i in nearest if int(i[5:]) % 10 == 0 and int(i[5:]) % 7 >= 3][:5]
+
+    # A payload that lags behind SQLite can drop a loop but never add one
+    stale = rows[0][0]
+    conn = sqlite3.connect(db_path)
+    conn.execute("UPDATE loops SET status = 'closed' WHERE id = ?", (stale,))
+    conn.commit()
+    conn.close()
+    assert stale not in [row[0] for row in query_loops.search_loops(query, top_k=5, status_filter="open")]
+
+    workstream = NumpyVectorStore("workstream_items")
+    workstream.upsert_batch(_records())
+    monkeypatch.setattr(purge_workstream_vectors, "get_vector_store", lambda name: workstream)
+    purge_workstream_vectors.purge_workstream_vectors()
+    assert workstream.count() == 20 and workstream.count({"type": ["program", "project"]}) == 0
@@ -0,0 +1,59 @@
+import pytest
+import yaml
+
+from src.system.frontmatter_reader import (
+    read_frontmatter,
+    read_header,
+    split_frontmatter,
+)
+
+
+def test_read_frontmatter_metadata_only(tmp_path):
+    path = tmp_path / "loop.md"
+    path.write_text("---\nuuid: abc\ntags: [one, two]\n---\n\n## Body\ntext\n")
+    metadata, body = read_frontmatter(path)
+    assert metadata == {"uuid": "abc", "tags": ["one", "two"]}
+    assert body is None
+
+
+def test_read_frontmatter_with_body(tmp_path):
+    path = tmp_path / "loop.md"
+    path.write_text("---\nuuid: abc\n---\nfirst line\n---\nnot a fence for the header\n")
+    metadata, body = read_frontmatter(path, metadata_only=False)
+    assert metadata == {"uuid": "abc"}
+    assert body == "first line\n---\nnot a fence for the header\n"
+
+
+def test_read_header_stops_at_closing_fence(tmp_path):
+    path = tmp_path / "loop.md"
+    path.write_bytes(b"---\nuuid: abc\n---\n" + b"\xff" * 64)  # Body is not valid UTF-8
+    header, offset = read_header(path)
+    assert header == "uuid: abc"
+    assert offset == len(b"---\nuuid: abc\n---\n")
+
+
+def test_missing_or_unclosed_frontmatter(tmp_path):
+    plain = tmp_path / "plain.md"
+    plain.write_text("just text\n")
+    assert read_frontmatter(plain) == (None, None)
+    assert read_frontmatter(plain, metadata_only=False) == (None, "just text\n")
+
+    unclosed = tmp_path / "unclosed.md"
+    unclosed.write_text("---\nuuid: abc\nbody without a closing fence\n")
+    assert read_frontmatter(unclosed) == (None, None)
+
+
+def test_non_mapping_and_invalid_yaml(tmp_path):
+    scalar = tmp_path / "scalar.md"
+    scalar.write_text("---\njust a string\n---\nbody\n")
+    assert read_frontmatter(scalar) == ({}, None)
+
+    invalid = tmp_path / "invalid.md"
+    invalid.write_text("---\nuuid: [unclosed\n---\nbody\n")
+    with pytest.raises(yaml.YAMLError):
+        read_frontmatter(invalid)
+
+
+def test_split_frontmatter():
+    assert split_frontmatter("---\nuuid: abc\n---\nbody\n") == ({"uuid": "abc"}, "body\n")
+    assert split_frontmatter("no header") == (None, "no header")
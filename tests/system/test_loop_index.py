@@ -0,0 +1,129 @@
+import os
+
+import pytest
+
+from src.system.loop_index import LoopIndex, get_loop_index, parse_loop_bytes
+
+
+@pytest.fixture
+def loops_dir(tmp_path):
+    loops = tmp_path / "loops"
+    loops.mkdir()
+    (loops / "loop-a.md").write_text(
+        "---\nuuid: uuid-a\ntitle: Loop A\ncreated: 2025-06-01\n---\n\n"
+        "## Summary\nFirst loop.\n\n## 🛠 Tasks\n- [ ] do a thing\n"
+    )
+    (loops / "loop-b.md").write_text("---\nuuid: uuid-b\n---\nbody b\n")
+    (loops / "notes.md").write_text("no frontmatter here\n")
+    return loops
+
+
+def test_parse_loop_bytes_sections():
+    raw = b"---\nuuid: x\n---\nintro\n## One\nfirst\n## Two\nsecond\n"
+    parsed = parse_loop_bytes(raw)
+    assert parsed["has_frontmatter"]
+    assert parsed["frontmatter"] == {"uuid": "x"}
+    start, end = parsed["sections"]["One"]
+    assert raw[start:end] == b"first\n"
+    start, end = parsed["sections"]["Two"]
+    assert raw[start:end] == b"second\n"
+    assert raw[parsed["body_offset"]:].startswith(b"intro")
+
+
+def test_parse_loop_bytes_invalid_yaml():
+    parsed = parse_loop_bytes(b"---\nuuid: [unclosed\n---\nbody\n")
+    assert parsed["error"]
+    assert parsed["frontmatter"] == {}
+
+
+def test_entries_and_sections(loops_dir):
+    index = LoopIndex(loops_dir)
+    entries = index.entries()
+    assert [e.name for e in entries] == ["loop-a.md", "loop-b.md", "notes.md"]
+
+    loop_a = entries[0]
+    assert loop_a.frontmatter["uuid"] == "uuid-a"
+    assert loop_a.frontmatter["created"] == "2025-06-01"
+    assert loop_a.read_section("Summary").strip() == "First loop."
+    assert "do a thing" in loop_a.read_section("🛠 Tasks")
+    assert loop_a.read_body().lstrip().startswith("## Summary")
+
+    notes = entries[2]
+    assert not notes.has_frontmatter
+    assert notes.frontmatter == {}
+
+    assert [e.name for e in index.entries("loop-*.md")] == ["loop-a.md", "loop-b.md"]
+
+
+def test_refresh_only_parses_changed_files(loops_dir):
+    index = LoopIndex(loops_dir)
+    assert index.refresh()["parsed"] == 3
+    assert index.refresh() == {"scanned": 3, "parsed": 0, "removed": 0}
+
+    path = loops_dir / "loop-b.md"
+    path.write_text("---\nuuid: uuid-b2\n---\nchanged body\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    (loops_dir / "notes.md").unlink()
+
+    stats = index.refresh()
+    assert stats["parsed"] == 1
+    assert stats["removed"] == 1
+    assert index.get(path).frontmatter["uuid"] == "uuid-b2"
+
+
+def test_index_persists_between_instances(loops_dir):
+    LoopIndex(loops_dir).refresh()
+    second = LoopIndex(loops_dir)
+    assert second.refresh()["parsed"] == 0
+    assert second.get(loops_dir / "loop-a.md").frontmatter["title"] == "Loop A"
+
+
+def test_get_loop_index_is_shared(loops_dir):
+    assert get_loop_index(loops_dir) is get_loop_index(loops_dir)
+
+
+def test_find_by_uuid_id_and_stem(loops_dir):
+    (loops_dir / "loop-c.md").write_text("---\nuuid: UUID-C\nid: loop-0003\n---\nbody c\n")
+    index = LoopIndex(loops_dir)
+    assert index.find("uuid-c").name == "loop-c.md"
+    assert index.find("loop-0003", field="id").name == "loop-c.md"
+    assert index.find("notes", field="stem").name == "notes.md"
+    assert index.find("uuid-a", pattern="notes*.md") is None
+    assert index.find("missing") is None
+
+
+def test_find_detects_stale_and_new_files(loops_dir):
+    index = LoopIndex(loops_dir)
+    assert index.find("uuid-b").name == "loop-b.md"
+
+    # Rewritten file no longer carries the uuid: the stale hit must not be returned
+    path = loops_dir / "loop-b.md"
+    path.write_text("---\nuuid: uuid-other\n---\nbody\n")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    assert index.find("uuid-b") is None
+    assert index.find("uuid-other").name == "loop-b.md"
+
+    # A file added after the index was built is found by the fallback refresh
+    (loops_dir / "loop-new.md").write_text("---\nuuid: uuid-new\n---\n")
+    assert index.find("uuid-new").name == "loop-new.md"
+
+    (loops_dir / "loop-new.md").unlink()
+    assert index.find("uuid-new") is None
+
+
+def test_find_falls_through_duplicates(loops_dir):
+    (loops_dir / "loop-a-copy.md").write_text("---\nuuid: uuid-a\n---\ncopy\n")
+    (loops_dir / "archive-b.md").write_text("---\nuuid: uuid-b\n---\narchived\n")
+    index = LoopIndex(loops_dir)
+    assert index.find("uuid-a").name == "loop-a-copy.md"
+
+    # The remaining duplicate is still registered after the first one is deleted
+    (loops_dir / "loop-a-copy.md").unlink()
+    assert index.find("uuid-a").name == "loop-a.md"
+    assert index.refresh()["removed"] == 0
+
+    # A candidate that fails the pattern does not hide one that matches
+    assert index.find("uuid-b").name == "archive-b.md"
+    assert index.find("uuid-b", pattern="loop-*.md").name == "loop-b.md"
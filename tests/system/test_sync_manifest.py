@@ -0,0 +1,67 @@
+import os
+
+import yaml
+
+from src.system.sync_manifest import SyncManifest
+
+
+def _write(path, uuid, body, mtime_ns=None):
+    path.write_text(f"---\nuuid: {uuid}\n---\n{body}\n")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_refresh_is_stat_only_and_tracks_sync_state(tmp_path):
+    loops = tmp_path / "runtime" / "loops"
+    loops.mkdir(parents=True)
+    _write(loops / "a.md", "uuid-a", "first", 1_000)
+    _write(loops / "b.md", "uuid-b", "second", 1_000)
+    manifest = SyncManifest(tmp_path / "manifest.db", project_root=tmp_path)
+
+    assert manifest.refresh(loops) == {"scanned": 2, "updated": 2, "removed": 0}
+    assert [e.path for e in manifest.pending(loops)] == ["runtime/loops/a.md", "runtime/loops/b.md"]
+    entry = manifest.get(loops / "a.md")
+    assert entry.uuid == "uuid-a" and entry.size == (loops / "a.md").stat().st_size
+
+    manifest.mark_synced([(e.path, e.uuid, e.sha256) for e in manifest.pending(loops)], when="t1")
+    assert manifest.pending(loops) == []
+    assert manifest.refresh(loops)["updated"] == 0                 # Nothing moved: no rows rewritten
+
+    _write(loops / "a.md", "uuid-a", "first, edited", 2_000)
+    (loops / "b.md").unlink()
+    assert manifest.refresh(loops) == {"scanned": 1, "updated": 1, "removed": 1}
+    pending = manifest.pending(loops)
+    assert [e.path for e in pending] == ["runtime/loops/a.md"]
+    assert pending[0].qdrant_synced_at == "t1"                     # Still records the last push
+    manifest.close()
+
+
+def test_yaml_import_keeps_sync_state_and_export_round_trips(tmp_path):
+    loops = tmp_path / "runtime" / "loops"
+    loops.mkdir(parents=True)
+    _write(loops / "a.md", "uuid-a", "unchanged")
+    _write(loops / "b.md", "uuid-b", "edited since last sync")
+
+    probe = SyncManifest(tmp_path / "probe.db", project_root=tmp_path)
+    probe.refresh(loops)
+    a_hash = probe.get(loops / "a.md").sha256
+    probe.close()
+
+    legacy = tmp_path / ".system_manifest.yaml"
+    legacy.write_text(yaml.safe_dump({
+        "runtime/loops/a.md": {"uuid": "uuid-a", "hash": a_hash, "last_updated": "t0"},
+        "runtime/loops/b.md": {"uuid": "uuid-b", "hash": "stale", "last_updated": "t0"},
+        "c.md": {"id": None, "sha256": "x"},                       # Snapshot format, no sync state
+    }))
+    manifest = SyncManifest(tmp_path / "manifest.db", project_root=tmp_path)
+    assert manifest.import_yaml(legacy) == 2
+    manifest.refresh(loops)
+    assert [e.path for e in manifest.pending(loops)] == ["runtime/loops/b.md"]
+
+    exported = tmp_path / "export.yaml"
+    assert manifest.export_yaml(exported) == 2
+    snapshot = yaml.safe_load(exported.read_text())
+    assert snapshot["runtime/loops/a.md"] == {
+        "uuid": "uuid-a", "sha256": a_hash, "hash": a_hash, "qdrant_synced_at": "t0",
+    }
+    manifest.close()
@@ -0,0 +1,98 @@
+import os
+import uuid
+
+from src.memory import query_cache
+from src.memory.collection_registry import EmbeddingModelMismatchError
+from src.memory.embedding_providers import HashingProvider
+from src.memory.vector_store import NumpyVectorStore, VectorRecord
+from src.system import text_index
+from src.system.text_index import TextIndex, match_expression
+
+
+def _loop(path, title, body, mtime_ns=None):
+    path.write_text(f"---\nuuid: {path.stem}\ntitle: {title}\nsummary: {title}\n---\n{body}\n", encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def _interaction(path, context, message):
+    path.write_text(f"---\nuuid: {path.stem}\nactor: user\ncontext: '{context}'\n---\n"
+                    f"## 💬 Message\n{message}\n\n## 🔄 Outcome\nnoted\n", encoding="utf-8")
+
+
+def _index(tmp_path, vector_store=None):
+    loops, interactions = tmp_path / "loops", tmp_path / "interactions"
+    loops.mkdir()
+    interactions.mkdir()
+    _loop(loops / "loop-lease.md", "Office lease renewal", "Renew the office lease before June.", 1_000)
+    _loop(loops / "loop-hire.md", "Hire a data engineer", "Open a role for the CRM migration.", 1_000)
+    _interaction(interactions / "interaction-1.md", "Workstream: Ops", "Can we move the lease signing to May?")
+    return TextIndex(tmp_path / "text.db", loops, interactions, vector_store or NumpyVectorStore("loops")), loops
+
+
+def test_refresh_is_incremental_and_search_ranks_with_bm25(tmp_path):
+    index, loops = _index(tmp_path)
+    assert index.refresh() == {"scanned": 3, "indexed": 3, "removed": 0}
+    assert index.refresh() == {"scanned": 3, "indexed": 0, "removed": 0}        # Nothing changed
+
+    hits = index.search("lease")
+    assert [h.key for h in hits] == ["loop:loop-lease.md", "interaction:interaction-1.md"]   # Title match first
+    assert hits[0].uuid == "loop-lease" and "**lease**" in hits[0].snippet
+    assert [h.kind for h in index.search("lease", kind="interaction")] == ["interaction"]
+    assert index.search("lease engineer") == []                                  # All terms by default
+    assert len(index.search("lease engineer", any_term=True)) == 3
+    assert index.search('"unbalanced AND (') == [] and match_expression("?!") is None
+
+    _loop(loops / "loop-hire.md", "Hire a data engineer", "Hiring paused until the lease is signed.", 2_000)
+    (loops / "loop-lease.md").unlink()
+    assert index.refresh() == {"scanned": 2, "indexed": 1, "removed": 1}
+    assert [h.key for h in index.search("lease", kind="loop")] == ["loop:loop-hire.md"]
+    index.close()
+
+
+def test_hybrid_search_reranks_bm25_candidates_by_vector(tmp_path, monkeypatch):
+    monkeypatch.setattr(query_cache, "_cache", query_cache.QueryEmbeddingCache(path=None))
+    index, _ = _index(tmp_path)
+    index.refresh()
+
+    provider = HashingProvider(256)
+    hits = index.hybrid_search("data engineer for the CRM lease", k=2, provider=provider)
+    assert hits[0].key == "loop:loop-hire.md"
+    assert all(-1.0 <= h.score <= 1.0 and h.bm25 > 0 for h in hits)
+    assert index.hybrid_search("nothing matches this", provider=provider) == []
+    index.close()
+
+
+def test_hybrid_search_reranks_with_stored_loop_vectors(tmp_path, monkeypatch, counting_provider):
+    monkeypatch.setattr(query_cache, "_cache", query_cache.QueryEmbeddingCache(path=None))
+    store = NumpyVectorStore("loops")
+    index, _ = _index(tmp_path, store)
+    index.refresh()
+    provider = counting_provider(256)
+    query = "who renews the lease"
+    for stem in ("loop-lease", "loop-hire"):
+        point_id = str(uuid.uuid5(uuid.NAMESPACE_DNS, stem))             # update_qdrant_embeddings' point ids
+        store.upsert_batch([VectorRecord(point_id, provider.embed_one(query if stem == "loop-hire" else "unrelated"))])
+    provider.embedded.clear()
+
+    hits = index.hybrid_search(query, k=3, provider=provider)
+    assert hits[0].key == "loop:loop-hire.md" and hits[0].score > 0.99    # Scored with the stored vector
+    assert provider.embedded == [query, "Workstream: Ops\n\nnoted\n\nCan we move the lease signing to May?"]
+
+    silent = counting_provider(256, query_vector=False)
+    assert [h.key for h in index.hybrid_search("lease", k=3, provider=silent)] == \
+        [h.key for h in index.search("lease", k=3, any_term=True)]
+    assert silent.embedded == ["lease"]                                    # No candidate embedded without a query vector
+
+    def mismatch(*args, **kwargs):
+        raise EmbeddingModelMismatchError("workstream_items holds text-embedding-ada-002 vectors")
+
+    monkeypatch.setattr(text_index, "verify_collection", mismatch)
+    provider.embedded.clear()
+    hits = index.hybrid_search(query, k=3, provider=provider)
+    assert all(h.score < 0.99 for h in hits)                               # Stored vectors ignored
+    assert set(provider.embedded) == {                                     # Loops embedded from their body alone
+        "Renew the office lease before June.", "Open a role for the CRM migration.",
+        "Workstream: Ops\n\nnoted\n\nCan we move the lease signing to May?",
+    }
+    index.close()
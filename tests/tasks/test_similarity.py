@@ -1,19 +1,31 @@
+import sqlite3
+from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import numpy as np
 import pandas as pd
 
-from src.tasks.similarity import cosine_similarity, find_similar_tasks, get_embedding
-
-
-@patch("src.tasks.similarity.OpenAI")
-def test_get_embedding(mock_openai):
+from src.memory.embedder import EmbeddingService
+from src.memory.quantization import ScalarQuantizer
+from src.tasks.similarity import (
+    TaskMatrix,
+    cosine_similarity,
+    find_similar_tasks,
+    find_similar_tasks_batch,
+    get_embedding,
+    invalidate_task_matrix,
+    threshold_candidates,
+)
+
+
+@patch("src.tasks.similarity.get_embedding_service")
+def test_get_embedding(mock_service):
     """Test the get_embedding function."""
     mock_client = MagicMock()
-    mock_openai.return_value = mock_client
     mock_embedding = MagicMock()
     mock_embedding.embedding = [1.0, 2.0, 3.0]
     mock_client.embeddings.create.return_value = MagicMock(data=[mock_embedding])
+    mock_service.return_value = EmbeddingService(mock_client)
 
     embedding = get_embedding("test")
 
@@ -87,8 +99,8 @@ def test_find_similar_tasks_empty_df(mock_read_sql, mock_get_embedding, mock_con
     tasks = find_similar_tasks("test", db_path=db_path)
     assert tasks == []
 
-@patch("src.tasks.similarity.OpenAI", side_effect=Exception("API error"))
-def test_get_embedding_error(mock_openai):
+@patch("src.tasks.similarity.get_embedding_service", side_effect=Exception("API error"))
+def test_get_embedding_error(mock_service):
     """Test the get_embedding function when there is an API error."""
     embedding = get_embedding("test")
     assert embedding is None
@@ -116,3 +128,60 @@ def test_find_similar_tasks_mismatched_dims(mock_read_sql, mock_get_embedding, m
     db_path.touch()
     tasks = find_similar_tasks("test", db_path=db_path)
     assert tasks == []
+
+def _tasks_db(tmp_path, vectors):
+    db_path = tmp_path / "ora.db"
+    schema = Path(__file__).resolve().parents[2] / "runtime/db/schema.sql"
+    conn = sqlite3.connect(db_path)
+    conn.executescript(schema.read_text())
+    conn.executemany(
+        "INSERT INTO tasks (uuid, workstream, verb, vector, source_loop_id) VALUES (?, ?, ?, ?, ?)",
+        [(f"uuid{i}", "ws", f"verb{i}", np.array(v, dtype=np.float32).tobytes(), f"loop{i}") for i, v in enumerate(vectors)],
+    )
+    conn.commit()
+    conn.close()
+    return db_path
+
+@patch("src.tasks.similarity.get_embedding", return_value=np.array([1.0, 0.0], dtype=np.float32))
+def test_task_matrix_is_cached_until_the_table_changes(mock_get_embedding, tmp_path):
+    """Vectors are loaded once and reloaded only after a write bumps the tasks version."""
+    db_path = _tasks_db(tmp_path, [[1, 0], [0.9, 0.1], [0, 1], [0.95, 0.05]])
+    invalidate_task_matrix()
+    with patch("src.tasks.similarity.pd.read_sql", wraps=pd.read_sql) as read_sql:
+        tasks = find_similar_tasks("test", threshold=0.9, db_path=db_path)
+        assert [t["task_uuid"] for t in tasks] == ["uuid0", "uuid3", "uuid1"]
+        assert [t["task_uuid"] for t in find_similar_tasks("test", 0.9, db_path, top_k=2)] == ["uuid0", "uuid3"]
+        assert read_sql.call_count == 1
+
+        conn = sqlite3.connect(db_path)
+        conn.execute("DELETE FROM tasks WHERE uuid = 'uuid0'")
+        conn.commit()
+        conn.close()
+        assert [t["task_uuid"] for t in find_similar_tasks("test", 0.9, db_path)] == ["uuid3", "uuid1"]
+        assert read_sql.call_count == 2
+
+@patch("src.tasks.similarity.get_embeddings")
+def test_find_similar_tasks_batch(mock_get_embeddings, tmp_path):
+    """Many verbs are scored in one pass; failed embeddings get the single-verb error."""
+    db_path = _tasks_db(tmp_path, [[1, 0], [0, 1]])
+    mock_get_embeddings.return_value = [np.array([0.0, 2.0]), None, np.array([1.0, 0.1])]
+    first, failed, third = find_similar_tasks_batch(["a", "b", "c"], threshold=0.9, db_path=db_path)
+    assert [t["task_uuid"] for t in first] == ["uuid1"]
+    assert first[0]["similarity"] == 1.0
+    assert "error" in failed
+    assert [t["task_uuid"] for t in third] == ["uuid0"]
+
+
+def test_threshold_candidates_allow_for_float32_rounding():
+    class RoundingQuantizer(ScalarQuantizer):
+        def _score_block(self, codes, queries):
+            return super()._score_block(codes, queries) - 1e-7   # Rounded one ulp below the exact score
+
+    vectors = np.eye(4, dtype=np.float32)
+    quantizer = RoundingQuantizer().fit(vectors)
+    codes = quantizer.encode(vectors)
+    assert quantizer.max_error == 0.0                             # The codes are exact; only rounding differs
+    matrix = TaskMatrix(None, {"uuid": list("abcd")}, {4: (vectors, np.arange(4))}, {4: (quantizer, codes)})
+
+    [(rows, scores)] = threshold_candidates(matrix, 4, vectors[:1], threshold=1.0)
+    assert rows.tolist() == [0] and scores[0] == 1.0
@@ -0,0 +1,118 @@
+import sqlite3
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from src.tasks import task_vector_store
+from src.tasks.similarity import (
+    TaskMatrix,
+    find_similar_tasks,
+    invalidate_task_matrix,
+    load_task_matrix,
+    rank_similar_tasks,
+    tasks_table_version,
+)
+from src.tasks.task_vector_store import TaskVectorStore
+
+
+def _insert(db_path, rows):
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "INSERT OR REPLACE INTO tasks (uuid, workstream, verb, vector, source_loop_id) VALUES (?, ?, ?, ?, ?)",
+        [(uuid, "ws", f"verb {uuid}", np.array(v, dtype=np.float32).tobytes(), "loop") for uuid, v in rows],
+    )
+    conn.commit()
+    conn.close()
+
+
+def test_append_tombstones_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(task_vector_store, "MIN_CAPACITY", 4)
+    monkeypatch.setattr(task_vector_store, "COMPACT_RATIO", 0.5)
+    store = TaskVectorStore(tmp_path / "sidecar")
+    store.append(["a", "b"], np.array([[3.0, 4.0], [0.0, 2.0]]))
+    vectors, ids, live = store.view()
+    assert isinstance(vectors.base, np.memmap) or isinstance(vectors, np.memmap)   # Zero-copy view
+    np.testing.assert_allclose(vectors, [[0.6, 0.8], [0.0, 1.0]])
+    assert ids.tolist() == ["a", "b"]
+
+    store.append(["a"], np.array([[1.0, 0.0]]))                 # Replace: old row becomes a tombstone
+    vectors, ids, live = store.view()
+    assert (ids.tolist(), live.tolist()) == (["a", "b", "a"], [False, True, True])
+    assert store.live_count == 2
+
+    store.delete(["b"])                                          # 2 of 3 rows dead: compacted
+    vectors, ids, live = store.view()
+    assert (ids.tolist(), live.tolist(), store.count) == (["a"], [True], 1)
+    np.testing.assert_allclose(vectors, [[1.0, 0.0]])
+
+    store.append(["c", "d", "e", "f", "g"], np.eye(2)[[0, 1, 0, 1, 0]])   # Past capacity: new generation
+    assert store.view()[1].tolist() == ["a", "c", "d", "e", "f", "g"]
+    assert len(list((tmp_path / "sidecar").glob("vectors-*.npy"))) == 1
+    assert TaskVectorStore(tmp_path / "sidecar").count == 6       # Persisted
+
+
+def test_similarity_reads_the_synced_sidecar(tmp_path):
+    db_path = tmp_path / "ora.db"
+    conn = sqlite3.connect(db_path)
+    conn.executescript((Path(__file__).resolve().parents[2] / "runtime/db/schema.sql").read_text())
+    conn.close()
+    _insert(db_path, [("t1", [1, 0]), ("t2", [0, 1]), ("t3", [1, 0, 0])])   # t3 is from another model
+
+    store = TaskVectorStore.for_db(db_path)
+    conn = sqlite3.connect(db_path)
+    store.sync(conn, tasks_table_version(conn))
+    conn.close()
+    assert (store.count, store.dim, store.meta["skipped"]) == (2, 2, 1)
+
+    invalidate_task_matrix()
+    with patch("src.tasks.similarity.get_embedding", return_value=np.array([2.0, 0.1], dtype=np.float32)):
+        assert [t["task_uuid"] for t in find_similar_tasks("x", 0.9, db_path)] == ["t1"]
+        matrix = load_task_matrix(db_path)
+        assert isinstance(matrix.matrices[2][0].base, np.memmap) or isinstance(matrix.matrices[2][0], np.memmap)
+
+        _insert(db_path, [("t4", [0.99, 0.05])])                  # Written behind the sidecar's back
+        assert [t["task_uuid"] for t in find_similar_tasks("x", 0.9, db_path)] == ["t4", "t1"]   # From the BLOBs
+        assert TaskVectorStore.for_db(db_path).count == 2             # Readers never rebuild
+
+        conn = sqlite3.connect(db_path)
+        store.sync(conn, tasks_table_version(conn))                  # The indexer's job
+        conn.close()
+        invalidate_task_matrix()
+        assert [t["task_uuid"] for t in find_similar_tasks("x", 0.9, db_path)] == ["t4", "t1"]
+        assert 3 in load_task_matrix(db_path).matrices[2][1]          # Row ids of the refreshed sidecar
+
+
+@pytest.mark.parametrize("kind", ["int8", "pq"])
+def test_quantized_sidecar_gives_the_float32_results(tmp_path, monkeypatch, kind):
+    monkeypatch.setattr(task_vector_store, "MIN_CAPACITY", 4)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((300, 32)).astype(np.float32)
+    ids = [f"t{i}" for i in range(300)]
+    plain = TaskVectorStore(tmp_path / "plain", quantization="")
+    quantized = TaskVectorStore(tmp_path / "quantized", quantization=kind)
+    for store in (plain, quantized):
+        store.rebuild(ids[:200], vectors[:200])
+        store.append(ids[200:], vectors[200:])                       # Encoded with the fitted quantizer
+    assert plain.quantized_view() is None and quantized.meta["quantization"] == kind
+    quantizer, codes = quantized.quantized_view()
+    assert codes.shape == (300, quantizer.code_size)
+
+    def rank(store, queries, threshold):
+        vectors, ids, _ = store.view()
+        matrix = TaskMatrix(None, {"uuid": ids.tolist(), "verb": ids.tolist(), "workstream": ids.tolist(),
+                                   "source_loop_id": ids.tolist()})
+        matrix.matrices[32] = (vectors, np.arange(len(ids)))
+        if store.quantized_view() is not None:
+            matrix.quantized[32] = store.quantized_view()
+        return rank_similar_tasks(matrix, queries, threshold, top_k=5)
+
+    queries = list(vectors[:5] + 0.3 * rng.standard_normal((5, 32)).astype(np.float32))
+    for threshold in (0.5, 0.9):
+        assert rank(quantized, queries, threshold) == rank(plain, queries, threshold)
+
+    quantized.compact()                                              # New generation, codes refitted
+    assert len(list((tmp_path / "quantized").glob("codes-*.npy"))) == 1
+    assert len(list((tmp_path / "quantized").glob("quantizer-*.npz"))) == 1
+    assert rank(quantized, queries, 0.5) == rank(plain, queries, 0.5)
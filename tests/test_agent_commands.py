@@ -136,7 +136,7 @@ def test_find_loop_file_by_uuid(tmp_path):
     assert find_loop_file_by_uuid("uuid1", loops_dir=tmp_path / "non_existent_dir") is None
 
 @patch("src.agent.commands.promote_loop.promote_loop_to_roadmap")
-@patch("src.agent.commands.promote_loop.find_similar_tasks", return_value=["task1", "task2"])
+@patch("src.agent.commands.promote_loop.find_similar_tasks_batch", return_value=[["task1", "task2"]])
 @patch("src.agent.commands.promote_loop.pd.read_sql")
 @patch("src.agent.commands.promote_loop.sqlite3.connect")
 def test_suggest_roadmap_promotions(mock_connect, mock_read_sql, mock_find_similar_tasks, mock_promote_loop_to_roadmap, tmp_path):
@@ -161,7 +161,7 @@ def test_suggest_roadmap_promotions(mock_connect, mock_read_sql, mock_find_simil
     assert result["promoted_items"][0]["title"] == "title1"
 
 @patch("src.agent.commands.promote_loop.promote_loop_to_roadmap")
-@patch("src.agent.commands.promote_loop.find_similar_tasks", return_value=[])
+@patch("src.agent.commands.promote_loop.find_similar_tasks_batch", return_value=[[]])
 @patch("src.agent.commands.promote_loop.pd.read_sql")
 @patch("src.agent.commands.promote_loop.sqlite3.connect")
 def test_suggest_roadmap_promotions_no_feedback(mock_connect, mock_read_sql, mock_find_similar_tasks, mock_promote_loop_to_roadmap, tmp_path):
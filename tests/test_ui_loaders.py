@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 import pytest
+import yaml
 
 from src.data.ui_loaders import load_promotable_loops
 
@@ -37,11 +38,11 @@ def test_load_promotable_loops(mock_connect, temp_dirs):
     assert len(loops) == 1
     assert loops[0]["uuid"] == "uuid1"
 
-@patch("src.data.ui_loaders.frontmatter.load", side_effect=Exception("test error"))
+@patch("src.system.loop_index.load_yaml", side_effect=yaml.YAMLError("test error"))
 def test_load_promotable_loops_load_error(mock_load, temp_dirs):
     """Test the load_promotable_loops function when there is an error loading a file."""
     db_path, loops_dir, roadmap_dir = temp_dirs
-    (loops_dir / "loop1.md").touch()
+    (loops_dir / "loop1.md").write_text("---\nuuid: uuid1\n---\ncontent")
     loops = load_promotable_loops(db_path, loops_dir, roadmap_dir)
     assert len(loops) == 0
 